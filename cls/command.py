@@ -83,6 +83,10 @@ COMMANDS: CommandsDict = {
         "match": [r"^レート$", r"^レーティング$", r"^rate$", r"^ratings?$"],
         "action": lambda _: {"rating": True},
     },
+    "batch": {  # 一括生成
+        "match": [r"^一括$", r"^batch$"],
+        "action": lambda _: {"batch": True},
+    },
     "verbose": {  # 詳細
         "match": [r"^詳細$", r"^verbose$"],
         "action": lambda _: {"verbose": True},
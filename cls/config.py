@@ -240,10 +240,57 @@ class SettingSection(BaseSection):
     """成績管理データベースファイル名"""
     backup_dir: Optional[Path]
     """バックアップ先ディレクトリ"""
+    journal_mode: str
+    """ジャーナルモード(PRAGMA journal_mode)"""
+    synchronous: str
+    """同期モード(PRAGMA synchronous)"""
+    cache_size: int
+    """ページキャッシュサイズ(PRAGMA cache_size)
+    - *正の値*: ページ数
+    - *負の値*: KiB
+    """
+    mmap_size: int
+    """メモリマップI/Oに使用する最大バイト数(PRAGMA mmap_size)"""
+    temp_store: str
+    """一時テーブルの格納先(PRAGMA temp_store)"""
+    materialize_individual_results: bool
+    """個人成績(individual_results)の実体化
+    - *True*: テーブルとして保持し、データ更新時に差分を反映する
+    - *False*: VIEWで都度計算する
+    """
+    materialize_game_results: bool
+    """ゲーム結果(game_results/game_info)の実体化
+    - *True*: テーブル(game_results_mat)として保持し、トリガーで差分を反映する
+    - *False*: VIEWで都度計算する
+    """
+    stats_cache: bool
+    """成績詳細の累積値キャッシュ
+    - *True*: プレイヤー/チーム単位の累積値を保持し、スコア登録時に差分を反映する
+    - *False*: 都度SQLで集計する
+    """
+    rating_history: bool
+    """レーティング推移の保持
+    - *True*: ゲームごとのレーティングをテーブルに保持し、変更のあったゲーム以降のみ再計算する
+    - *False*: 都度全ゲームから計算する
+    """
+    command_cache: int
+    """集計コマンドの結果を保持する数(0はキャッシュしない)"""
+    command_cache_ttl: int
+    """集計コマンドの結果を保持する秒数"""
     font_file: Path
     """グラフ描写に使用するフォントファイル"""
     graph_style: str
     """グラフスタイル"""
+    render_workers: int
+    """グラフ描写に使用するワーカープロセス数(0は呼び出し元で描写する)"""
+    graph_cache_size: int
+    """生成したグラフ画像を保持する合計サイズ(MiB、0は保持しない)"""
+    graph_downsample: str
+    """推移グラフの間引き方法(`lttb`/`minmax`/`none`)"""
+    graph_downsample_points: int
+    """推移グラフを間引く点数(これを超える場合に間引く)"""
+    report_workers: int
+    """レポートのセクションを並列に生成するスレッド数(1以下は順番に生成する)"""
     work_dir: Path
 
     def __init__(self):
@@ -263,8 +310,24 @@ class SettingSection(BaseSection):
         self.guest_mark = str("※")
         self.database_file = Path("mahjong.db")
         self.backup_dir = None
+        self.journal_mode = str("wal")
+        self.synchronous = str("normal")
+        self.cache_size = int(-16000)
+        self.mmap_size = int(268435456)
+        self.temp_store = str("memory")
+        self.materialize_individual_results = bool(False)
+        self.materialize_game_results = bool(False)
+        self.stats_cache = bool(True)
+        self.rating_history = bool(True)
+        self.command_cache = int(16)
+        self.command_cache_ttl = int(600)
         self.font_file = Path("ipaexg.ttf")
         self.graph_style = str("ggplot")
+        self.render_workers = int(0)
+        self.graph_cache_size = int(64)
+        self.graph_downsample = str("lttb")
+        self.graph_downsample_points = int(2000)
+        self.report_workers = int(4)
         self.work_dir = Path("work")
 
     def config_load(self, outer: "AppConfig"):
@@ -0,0 +1,110 @@
+"""
+cls/context.py
+"""
+
+import copy
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, TypeVar, cast
+
+import libs.global_value as g
+
+if TYPE_CHECKING:
+    from libs.types import PlaceholderDict
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class QueryContext(Mapping[str, Any]):
+    """集計パラメータの不変スナップショット
+
+    リクエストごとに生成し、ワーカースレッドへはこのオブジェクトを渡す。
+    実行時は`activate()`/`run()`で`g.params`(コンテキスト単位)に複製を展開するため、
+    既存の`g.params`を参照する処理もそのまま動作する。
+    """
+
+    data: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    """パラメータ(読み取り専用)"""
+
+    @classmethod
+    def from_params(cls, params: Mapping[str, Any]) -> "QueryContext":
+        """パラメータからスナップショットを生成する
+
+        Args:
+            params (Mapping[str, Any]): パラメータ
+
+        Returns:
+            QueryContext: スナップショット(元の辞書とは独立)
+        """
+
+        return cls(MappingProxyType(copy.deepcopy(dict(params))))
+
+    @classmethod
+    def current(cls) -> "QueryContext":
+        """実行中のコンテキストの`g.params`からスナップショットを生成する
+
+        Returns:
+            QueryContext: スナップショット
+        """
+
+        return cls.from_params(cast(dict, g.params))
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def replace(self, **kwargs: Any) -> "QueryContext":
+        """値を差し替えたスナップショットを返す
+
+        Returns:
+            QueryContext: 新しいスナップショット
+        """
+
+        return QueryContext.from_params({**self.data, **kwargs})
+
+    def to_params(self) -> "PlaceholderDict":
+        """変更可能な複製を返す
+
+        Returns:
+            PlaceholderDict: プレースホルダ用辞書
+        """
+
+        return cast("PlaceholderDict", copy.deepcopy(dict(self.data)))
+
+    @contextmanager
+    def activate(self) -> Iterator["PlaceholderDict"]:
+        """ブロック内の`g.params`をこのスナップショットの複製に切り替える
+
+        Yields:
+            PlaceholderDict: 展開した`g.params`
+        """
+
+        saved = g.params
+        g.params = self.to_params()
+        try:
+            yield g.params
+        finally:
+            g.params = saved
+
+    def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """このスナップショットを展開して関数を実行する
+
+        `ThreadPoolExecutor.submit(ctx.run, func, ...)`のように、ワーカースレッドへ処理を渡すときに使用する。
+
+        Args:
+            func (Callable[..., T]): 実行する関数
+
+        Returns:
+            T: 関数の戻り値
+        """
+
+        with self.activate():
+            return func(*args, **kwargs)
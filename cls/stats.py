@@ -4,12 +4,13 @@ cls/stats.py
 
 import textwrap
 from dataclasses import dataclass, field, fields
-from typing import Literal, Optional, Union, get_type_hints
+from typing import Literal, Optional, Union, cast, get_type_hints
 
 import pandas as pd
 
+from cls.context import QueryContext
 from cls.timekit import ExtendedDatetime as ExtDt
-from libs.data import loader
+from libs.data import loader, stats_cache
 
 
 @dataclass
@@ -351,15 +352,22 @@ class StatsInfo:
     result_df: pd.DataFrame = field(default_factory=pd.DataFrame)
     record_df: pd.DataFrame = field(default_factory=pd.DataFrame)
 
-    def read(self, params: dict):
+    def read(self, params: dict | QueryContext):
         """データ読み込み
 
         Args:
-            params (dict): プレースホルダ
+            params (dict | QueryContext): プレースホルダ(`QueryContext`の場合は実行中のみ`g.params`に展開)
         """
 
-        self.result_df = loader.read_data("RESULTS_INFO", params)
-        self.record_df = loader.read_data("RECORD_INFO", params)
+        if isinstance(params, QueryContext):
+            with params.activate() as local_params:
+                return self.read(cast(dict, local_params))
+
+        if cached := stats_cache.lookup(params):
+            self.result_df, self.record_df = cached
+        else:
+            self.result_df = loader.read_data("RESULTS_INFO", params)
+            self.record_df = loader.read_data("RECORD_INFO", params)
 
         if self.result_df.empty or self.record_df.empty:
             return
@@ -276,8 +276,16 @@ class ExtendedDatetime:
         return hash(self.dt)
 
     def __getattr__(self, name):
+        if name.startswith("__"):  # copy/pickleの探索で初期化前の_dtを参照しない
+            raise AttributeError(name)
         return getattr(self._dt, name)
 
+    def __copy__(self) -> "ExtendedDatetime":
+        return ExtendedDatetime(self._dt)
+
+    def __deepcopy__(self, memo: dict) -> "ExtendedDatetime":
+        return ExtendedDatetime(self._dt)
+
     @property
     def dt(self) -> datetime:
         """datetime型を返すプロパティ"""
@@ -28,6 +28,14 @@ help:
         --vacuum              database vacuum
         --gen-test-data [count]
                               テスト用サンプルデータ生成(count=生成回数, default: 1)
+        --rebuild-materialized
+                              実体化テーブル再構築
+        --check-materialized  実体化テーブル整合性チェック
+        --report-batch [KEYWORD ...]
+                              全メンバーの成績レポートを一括生成(KEYWORD=レポート生成コマンドの引数)
+
+    Only allowed when --report-batch:
+        --zip                 生成したレポートをzipにまとめる
 """
 
 import libs.global_value as g
@@ -51,3 +59,9 @@ if __name__ == "__main__":
         t.vacuum.main()
     if g.args.gen_test_data:
         t.gen_test_data.main(g.args.gen_test_data)
+    if g.args.rebuild_materialized:
+        t.materialize.main()
+    if g.args.check_materialized:
+        t.materialize.check()
+    if g.args.report_batch is not None:
+        t.report_batch.main(g.args.report_batch, g.args.archive)
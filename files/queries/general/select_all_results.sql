@@ -1,10 +1,12 @@
 --
 select
-    rank, rpoint
+    playtime, ts, seat, rank, rpoint
 from
     individual_results
 where
-    mode = :mode
-    and rule_version in (<<rule_list>>)
+    rule_version = :rule_version
     and name = :player_name
+    and (playtime, ts, seat) > (:playtime, :ts, :seat)
+order by
+    playtime, ts, seat
 ;
@@ -1,6 +1,7 @@
 -- ranking.ratings
 select
     results.playtime,
+    results.ts,
     --[individual] --[unregistered_not_replace] case when p1_guest = 0 then p1_name else p1_name || '(<<guest_mark>>)' end as p1_name, -- ゲスト無効
     --[individual] --[unregistered_replace] case when p1_guest = 0 then p1_name else :guest_name end as p1_name, -- ゲスト有効
     --[team] p1_team as p1_name,
@@ -28,4 +29,6 @@ where
     --[separate] and results.source = :source
     --[individual] --[guest_not_skip] and game_info.guest_count <= 1 -- ゲストあり(2ゲスト戦除外)
     --[search_word] and game_info.comment like :search_word
+order by
+    results.playtime, results.ts
 ;
@@ -0,0 +1,15 @@
+-- データバージョン(<table_name>)
+create trigger if not exists trg_data_version_<table_name>_insert after insert on <table_name>
+begin
+    update meta set value = value + 1 where key in ('data_version', 'data_version:<table_name>');
+end;
+
+create trigger if not exists trg_data_version_<table_name>_update after update on <table_name>
+begin
+    update meta set value = value + 1 where key in ('data_version', 'data_version:<table_name>');
+end;
+
+create trigger if not exists trg_data_version_<table_name>_delete after delete on <table_name>
+begin
+    update meta set value = value + 1 where key in ('data_version', 'data_version:<table_name>');
+end;
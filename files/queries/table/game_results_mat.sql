@@ -0,0 +1,4 @@
+create table game_results_mat as select * from game_results;
+create unique index if not exists idx_game_results_mat_ts on game_results_mat(ts);
+create index if not exists idx_game_results_mat_playtime on game_results_mat(playtime);
+create index if not exists idx_game_results_mat_rule on game_results_mat(rule_version, mode, playtime);
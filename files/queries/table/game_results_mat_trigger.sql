@@ -0,0 +1,112 @@
+-- ゲーム結果
+create trigger if not exists trg_game_results_mat_result_insert after insert on result
+begin
+    insert into game_results_mat select * from game_results where ts = new.ts;
+end;
+
+create trigger if not exists trg_game_results_mat_result_update after update on result
+begin
+    delete from game_results_mat where ts in (old.ts, new.ts);
+    insert into game_results_mat select * from game_results where ts = new.ts;
+end;
+
+create trigger if not exists trg_game_results_mat_result_delete after delete on result
+begin
+    delete from game_results_mat where ts = old.ts;
+end;
+
+-- メモ
+create trigger if not exists trg_game_results_mat_remarks_insert after insert on remarks
+begin
+    delete from game_results_mat where ts = new.thread_ts;
+    insert into game_results_mat select * from game_results where ts = new.thread_ts;
+end;
+
+create trigger if not exists trg_game_results_mat_remarks_update after update on remarks
+begin
+    delete from game_results_mat where ts in (old.thread_ts, new.thread_ts);
+    insert into game_results_mat select * from game_results where ts in (old.thread_ts, new.thread_ts);
+end;
+
+create trigger if not exists trg_game_results_mat_remarks_delete after delete on remarks
+begin
+    delete from game_results_mat where ts = old.thread_ts;
+    insert into game_results_mat select * from game_results where ts = old.thread_ts;
+end;
+
+-- メンバー(ゲスト判定、所属チーム)
+create trigger if not exists trg_game_results_mat_member_insert after insert on member
+begin
+    delete from game_results_mat where ts in (
+        select ts from result where new.name in (p1_name, p2_name, p3_name, p4_name)
+    );
+    insert into game_results_mat select * from game_results where ts in (
+        select ts from result where new.name in (p1_name, p2_name, p3_name, p4_name)
+    );
+end;
+
+create trigger if not exists trg_game_results_mat_member_update after update on member
+begin
+    delete from game_results_mat where ts in (
+        select ts from result where old.name in (p1_name, p2_name, p3_name, p4_name)
+        union select ts from result where new.name in (p1_name, p2_name, p3_name, p4_name)
+    );
+    insert into game_results_mat select * from game_results where ts in (
+        select ts from result where old.name in (p1_name, p2_name, p3_name, p4_name)
+        union select ts from result where new.name in (p1_name, p2_name, p3_name, p4_name)
+    );
+end;
+
+create trigger if not exists trg_game_results_mat_member_delete after delete on member
+begin
+    delete from game_results_mat where ts in (
+        select ts from result where old.name in (p1_name, p2_name, p3_name, p4_name)
+    );
+    insert into game_results_mat select * from game_results where ts in (
+        select ts from result where old.name in (p1_name, p2_name, p3_name, p4_name)
+    );
+end;
+
+-- チーム(チーム名)
+create trigger if not exists trg_game_results_mat_team_update after update on team
+begin
+    delete from game_results_mat where ts in (
+        select ts from result join member on member.name in (p1_name, p2_name, p3_name, p4_name)
+        where member.team_id in (old.id, new.id)
+    );
+    insert into game_results_mat select * from game_results where ts in (
+        select ts from result join member on member.name in (p1_name, p2_name, p3_name, p4_name)
+        where member.team_id in (old.id, new.id)
+    );
+end;
+
+create trigger if not exists trg_game_results_mat_team_delete after delete on team
+begin
+    delete from game_results_mat where ts in (
+        select ts from result join member on member.name in (p1_name, p2_name, p3_name, p4_name)
+        where member.team_id = old.id
+    );
+    insert into game_results_mat select * from game_results where ts in (
+        select ts from result join member on member.name in (p1_name, p2_name, p3_name, p4_name)
+        where member.team_id = old.id
+    );
+end;
+
+-- レギュレーションワード
+create trigger if not exists trg_game_results_mat_words_insert after insert on words
+begin
+    delete from game_results_mat where ts in (select thread_ts from remarks where matter = new.word);
+    insert into game_results_mat select * from game_results where ts in (select thread_ts from remarks where matter = new.word);
+end;
+
+create trigger if not exists trg_game_results_mat_words_update after update on words
+begin
+    delete from game_results_mat where ts in (select thread_ts from remarks where matter in (old.word, new.word));
+    insert into game_results_mat select * from game_results where ts in (select thread_ts from remarks where matter in (old.word, new.word));
+end;
+
+create trigger if not exists trg_game_results_mat_words_delete after delete on words
+begin
+    delete from game_results_mat where ts in (select thread_ts from remarks where matter = old.word);
+    insert into game_results_mat select * from game_results where ts in (select thread_ts from remarks where matter = old.word);
+end;
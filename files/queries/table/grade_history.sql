@@ -0,0 +1,11 @@
+create table if not exists "grade_history" (
+    "name"              TEXT NOT NULL,
+    "rule_version"      TEXT NOT NULL,
+    "grade_table"       TEXT NOT NULL,
+    "playtime"          TEXT NOT NULL,
+    "ts"                TEXT NOT NULL,
+    "seat"              INTEGER NOT NULL,
+    "grade_level"       INTEGER NOT NULL,
+    "point"             INTEGER NOT NULL,
+    PRIMARY KEY("name", "rule_version", "grade_table", "playtime", "ts", "seat")
+) without rowid;
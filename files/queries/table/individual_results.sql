@@ -0,0 +1,27 @@
+create table if not exists "individual_results" (
+    "playtime"          TEXT,
+    "ts"                TEXT NOT NULL,
+    "seat"              INTEGER NOT NULL,
+    "name"              TEXT,
+    "team"              TEXT,
+    "guest"             INTEGER,
+    "rpoint"            INTEGER,
+    "rank"              INTEGER,
+    "original_point"    INTEGER,
+    "yakuman"           TEXT,
+    "memo"              TEXT,
+    "regulation"        TEXT,
+    "ex_point"          INTEGER,
+    "point"             INTEGER,
+    "remarks"           TEXT,
+    "team_regulation"   TEXT,
+    "team_ex_point"     INTEGER,
+    "team_point"        INTEGER,
+    "team_remarks"      TEXT,
+    "collection_daily"  TEXT,
+    "rule_version"      TEXT,
+    "comment"           TEXT,
+    "source"            TEXT,
+    "mode"              INTEGER,
+    PRIMARY KEY("ts", "seat")
+) without rowid;
@@ -0,0 +1,4 @@
+create index if not exists idx_individual_playtime on individual_results(playtime);
+create index if not exists idx_individual_name on individual_results(name, playtime);
+create index if not exists idx_individual_team on individual_results(team, playtime);
+create index if not exists idx_individual_rule on individual_results(rule_version, mode, playtime);
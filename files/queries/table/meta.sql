@@ -0,0 +1,5 @@
+create table if not exists "meta" (
+    "key"               TEXT NOT NULL,
+    "value"             INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY("key")
+);
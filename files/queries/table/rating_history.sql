@@ -0,0 +1,10 @@
+create table if not exists "rating_history" (
+    "timeline"          TEXT NOT NULL,
+    "game_no"           INTEGER NOT NULL,
+    "ts"                TEXT NOT NULL,
+    "playtime"          TEXT NOT NULL,
+    "seat"              INTEGER NOT NULL,
+    "name"              TEXT NOT NULL,
+    "rating"            REAL NOT NULL,
+    PRIMARY KEY("timeline", "game_no", "name")
+) without rowid;
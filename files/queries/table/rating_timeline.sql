@@ -0,0 +1,5 @@
+create table if not exists "rating_timeline" (
+    "timeline"          TEXT NOT NULL,
+    "dirty_from"        TEXT,
+    PRIMARY KEY("timeline")
+) without rowid;
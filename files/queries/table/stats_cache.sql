@@ -0,0 +1,11 @@
+create table if not exists "stats_cache" (
+    "kind"              TEXT NOT NULL,
+    "name"              TEXT NOT NULL,
+    "rule_key"          TEXT NOT NULL,
+    "mode"              INTEGER NOT NULL,
+    "variant"           INTEGER NOT NULL,
+    "first_playtime"    TEXT,
+    "last_playtime"     TEXT,
+    "state"             TEXT NOT NULL,
+    PRIMARY KEY("kind", "name", "rule_key", "mode", "variant")
+) without rowid;
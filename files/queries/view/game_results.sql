@@ -111,5 +111,5 @@ create view if not exists game_results as
     left join regulations as x4_regulations
         on x4_regulations.thread_ts = result.ts and x4_regulations.name = result.p4_name
     group by
-        result.playtime
+        result.ts
 ;
@@ -1,4 +1,4 @@
-create view if not exists individual_results as
+create view if not exists <view_name> as
 with
     yakuman_table as (
         select
@@ -2,7 +2,7 @@
 integrations/discord/adapter.py
 """
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from integrations.base.interface import AdapterInterface
 from integrations.discord.api import AdapterAPI
@@ -13,6 +13,8 @@ from integrations.discord.parser import MessageParser
 if TYPE_CHECKING:
     from configparser import ConfigParser
 
+    from libs.utils.workerpool import DispatchPool
+
 
 class ServiceAdapter(AdapterInterface[SvcConfig, AdapterAPI, SvcFunctions, MessageParser]):
     """discord interface"""
@@ -24,3 +26,4 @@ class ServiceAdapter(AdapterInterface[SvcConfig, AdapterAPI, SvcFunctions, Messa
         self.api = AdapterAPI()
         self.functions = SvcFunctions(api=self.api, conf=self.conf)
         self.parser = MessageParser
+        self.pool: Optional["DispatchPool"] = None
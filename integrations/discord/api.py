@@ -6,7 +6,7 @@ import asyncio
 import sys
 import textwrap
 from pathlib import PosixPath
-from typing import TYPE_CHECKING, Union, cast
+from typing import TYPE_CHECKING, Any, Coroutine, Optional, Union, cast
 
 import pandas as pd
 from table2ascii import PresetStyle, table2ascii
@@ -17,7 +17,7 @@ from cls.timekit import ExtendedDatetime as ExtDt
 from integrations.base.interface import APIInterface
 from integrations.protocols import CommandType
 from libs.types import StyleOptions
-from libs.utils import converter, formatter, textutil
+from libs.utils import converter, formatter, graphcache, textutil
 
 sys.modules["audioop"] = _audioop
 
@@ -42,6 +42,29 @@ class AdapterAPI(APIInterface):
         # discord object
         self.response: Union["Message", "ApplicationContext"]
 
+        self.post_concurrency: int = 4
+        """同時に実行するポスト処理の上限"""
+        self._post_slots: Optional[asyncio.Semaphore] = None
+
+    def schedule(self, coro: Coroutine[Any, Any, Any]):
+        """コルーチンをボットのイベントループで実行する
+
+        ワーカースレッドから呼ばれた場合はスレッドセーフにイベントループへ引き渡す。
+
+        Args:
+            coro (Coroutine[Any, Any, Any]): 実行するコルーチン
+        """
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:  # イベントループ外(ワーカースレッド)
+            running = None
+
+        if running is not None and running is self.bot.loop:
+            running.create_task(coro)
+        else:
+            asyncio.run_coroutine_threadsafe(coro, self.bot.loop)
+
     def post(self, m: "MessageParserProtocol"):
         """メッセージをポストする（非同期処理ラッパー）
 
@@ -50,18 +73,53 @@ class AdapterAPI(APIInterface):
         """
 
         if m.status.command_flg:
-            asyncio.create_task(self.command_respond(m))
+            self.schedule(self.command_respond(m))
         else:
-            asyncio.create_task(self.post_async(m))
+            self.schedule(self.post_async(m))
+
+    def bind_response(self, m: "MessageParserProtocol") -> Union["Message", "ApplicationContext"]:
+        """応答先のdiscordオブジェクトを返す
+
+        並列処理中に`self.response`が後続のイベントで上書きされるため、メッセージデータが保持しているものを優先する。
+
+        Args:
+            m (MessageParserProtocol): メッセージデータ
+
+        Returns:
+            Union[Message, ApplicationContext]: 応答先
+        """
+
+        if (ctx := getattr(m, "discord_ctx", None)) is not None:
+            return ctx
+        if (message := getattr(m, "discord_msg", None)) is not None:
+            return message
+        return self.response
 
     async def post_async(self, m: "MessageParserProtocol"):
         """メッセージをポストする
 
+        同時に実行するポスト処理の数を`post_concurrency`で制限し、超えた分は空きが出るまで待機する。
+
         Args:
             m (MessageParserProtocol): メッセージデータ
         """
 
-        self.response = cast("Message", self.response)
+        if self._post_slots is None:
+            self._post_slots = asyncio.Semaphore(max(self.post_concurrency, 1))
+
+        async with self._post_slots:
+            try:
+                await self._post(m, cast("Message", self.bind_response(m)))
+            finally:
+                graphcache.release(m)
+
+    async def _post(self, m: "MessageParserProtocol", response: "Message"):
+        """メッセージをポストする(本体)
+
+        Args:
+            m (MessageParserProtocol): メッセージデータ
+            response (Message): 応答先
+        """
 
         def _header_text(title: str) -> str:
             if not title.isnumeric() and title:  # 数値のキーはヘッダにしない
@@ -91,13 +149,13 @@ class AdapterAPI(APIInterface):
             header_title, header_text = next(iter(m.post.headline.items()))
             m.post.thread_title = header_title
             if not m.post.message:
-                thread_msg = await self.response.reply(f"{_header_text(header_title)}{header_text.rstrip()}")
+                thread_msg = await response.reply(f"{_header_text(header_title)}{header_text.rstrip()}")
                 m.post.thread = True
             elif not all(options.header_hidden for _, options in m.post.message):
-                thread_msg = await self.response.reply(f"{_header_text(header_title)}{header_text.rstrip()}")
+                thread_msg = await response.reply(f"{_header_text(header_title)}{header_text.rstrip()}")
                 m.post.thread = True
         elif m.post.thread_title:
-            thread_msg = self.response
+            thread_msg = response
             m.post.thread = True
 
         # 本文
@@ -110,14 +168,15 @@ class AdapterAPI(APIInterface):
                 comment = textwrap.dedent(f"{_header_text(header_title)}{header_text.rstrip()}") if options.use_comment else ""
                 file = self.discord_file(
                     str(data),
+                    filename=graphcache.display_name(data),
                     description=comment,
                 )
-                asyncio.create_task(self.response.channel.send(file=file))
+                asyncio.create_task(response.channel.send(file=file))
 
             if isinstance(data, str):
                 if options.key_title and (options.title != header_title):
                     header = _header_text(options.title)
-                message_text = textwrap.indent(data.rstrip().replace("<@>", f"<@{self.response.author.id}>"), "\t" * options.indent)
+                message_text = textwrap.indent(data.rstrip().replace("<@>", f"<@{response.author.id}>"), "\t" * options.indent)
                 post_msg.append(f"{header}```\n{message_text}\n```\n" if options.codeblock else f"{header}{message_text}\n")
 
             if isinstance(data, pd.DataFrame):
@@ -163,11 +222,11 @@ class AdapterAPI(APIInterface):
             else:  # 数字タイトルはスレッドにしない
                 for msg in post_msg:
                     for split_msg in formatter.split_strings(msg, limit=1800):
-                        await self.response.reply(split_msg)
+                        await response.reply(split_msg)
         else:
             for msg in post_msg:
                 for split_msg in formatter.split_strings(msg, limit=1800):
-                    await self.response.reply(split_msg)
+                    await response.reply(split_msg)
 
     async def command_respond(self, m: "MessageParserProtocol"):
         """スラッシュコマンド応答
@@ -176,22 +235,25 @@ class AdapterAPI(APIInterface):
             m (MessageParserProtocol): メッセージデータ
         """
 
-        self.response = cast("ApplicationContext", self.response)
-
-        for data, options in m.post.message:
-            if isinstance(data, PosixPath) and data.exists():
-                file = self.discord_file(str(data))
-                await self.response.send(file=file)
-
-            if isinstance(data, str):
-                if options.codeblock:
-                    data = f"```\n{data}\n```"
-                await self.response.respond(data)
-
-            if isinstance(data, pd.DataFrame):
-                output = table2ascii(
-                    header=data.columns.to_list(),
-                    body=data.to_dict(orient="split")["data"],
-                    style=PresetStyle.ascii_borderless,
-                )
-                await self.response.respond(f"```\n{output}\n```")
+        response = cast("ApplicationContext", self.bind_response(m))
+
+        try:
+            for data, options in m.post.message:
+                if isinstance(data, PosixPath) and data.exists():
+                    file = self.discord_file(str(data), filename=graphcache.display_name(data))
+                    await response.send(file=file)
+
+                if isinstance(data, str):
+                    if options.codeblock:
+                        data = f"```\n{data}\n```"
+                    await response.respond(data)
+
+                if isinstance(data, pd.DataFrame):
+                    output = table2ascii(
+                        header=data.columns.to_list(),
+                        body=data.to_dict(orient="split")["data"],
+                        style=PresetStyle.ascii_borderless,
+                    )
+                    await response.respond(f"```\n{output}\n```")
+        finally:
+            graphcache.release(m)
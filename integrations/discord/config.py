@@ -40,6 +40,18 @@ class SvcConfig(BaseSection, IntegrationsConfig):
     未定義はすべてのチャンネルでSQLが実行できる
     """
 
+    # イベント処理
+    worker_threads: int = field(default=0)
+    """集計/グラフ/レポートなどのコマンドを処理するワーカースレッド数
+
+    - *0*: イベントループ上でそのまま処理する
+    - *1以上*: ワーカープールに振り分け、スコア登録は専用スレッドで先に処理する
+    """
+    worker_queue: int = field(default=16)
+    """ワーカーが埋まっているときに待機できるコマンド数(超えた分は受け付けない)"""
+    post_concurrency: int = field(default=4)
+    """同時に実行するポスト処理の上限(超えた分は空きが出るまで待機する)"""
+
     bot_name: Optional["ClientUser"] = field(default=None)
     """ボットの名前"""
 
@@ -2,7 +2,6 @@
 integrations/discord/events/comparison.py
 """
 
-import asyncio
 import logging
 import re
 from typing import TYPE_CHECKING, cast
@@ -11,14 +10,12 @@ from discord import Message
 from discord.channel import TextChannel
 
 import libs.global_value as g
-from cls.score import GameResult
 from cls.timekit import ExtendedDatetime as ExtDt
 from cls.timekit import Format
-from integrations.protocols import ActionStatus, CommandType
-from libs.data import modify, search
+from integrations.protocols import ActionStatus
+from libs.data import modify, reconcile, search
 from libs.datamodels import ComparisonResults
 from libs.types import RemarkDict, StyleOptions
-from libs.utils import formatter, validator
 
 if TYPE_CHECKING:
     from integrations.discord.adapter import ServiceAdapter
@@ -32,7 +29,8 @@ def main(m: "MessageParserProtocol"):
         m (MessageParserProtocol): メッセージデータ
     """
 
-    asyncio.create_task(_wrapper(m))
+    g.adapter = cast("ServiceAdapter", g.adapter)
+    g.adapter.api.schedule(_wrapper(m))
 
 
 async def _wrapper(m: "MessageParserProtocol"):
@@ -53,6 +51,8 @@ async def _wrapper(m: "MessageParserProtocol"):
     m.set_data(results.output("remark_del"), StyleOptions(title="メモ削除", key_title=False))
     if results.invalid_score:
         m.set_data(results.output("invalid_score"), StyleOptions(title="供託残り", key_title=False))
+    if results.repair:
+        m.set_data(results.output("repair"), StyleOptions(title="修正結果", key_title=False))
 
     m.post.thread = True
     m.status.action = ActionStatus.NOTHING
@@ -106,52 +106,35 @@ async def check_omission(results: ComparisonResults, messages_list: list["Messag
     """
 
     g.adapter = cast("ServiceAdapter", g.adapter)
-    discord_score: list[GameResult] = []
 
     for work_m in messages_list:
         if work_m.keyword in g.keyword_dispatcher:  # コマンドキーワードはスキップ
             continue
-        if detection := validator.check_score(work_m):
-            score = GameResult(**detection)
-            for k, v in score.to_dict().items():  # 名前の正規化
-                if str(k).endswith("_name"):
-                    score.set(**{k: formatter.name_replace(str(v), not_replace=True)})
-            discord_score.append(score)
-            results.score_list.update({work_m.data.event_ts: work_m})
-            logging.debug(score.to_text("logging"))
+        if (score := reconcile.parse_score(work_m)) is None:
+            continue
+        results.game_results.update({work_m.data.event_ts: score})
+        results.score_list.update({work_m.data.event_ts: work_m})
+        logging.debug(score.to_text("logging"))
 
-    db_score = search.for_db_score(float(results.after.format(Format.TS)))
+    diff = reconcile.diff_scores(results.game_results, search.for_db_score(float(results.after.format(Format.TS))))
 
     # DISCORD -> DATABASE
-    ts_list = [x.ts for x in db_score]
-    for score in discord_score:
-        work_m = results.score_list[score.ts]
-        if score.ts in ts_list:
-            target = db_score[ts_list.index(score.ts)]
-            if score != target:  # 不一致(更新)
-                results.mismatch.append({"before": target, "after": score})
-                logging.info("mismatch: %s (%s)", score.ts, ExtDt(float(score.ts)).format(Format.YMDHMS))
-                logging.debug("  * discord: %s", score.to_text("detail"))
-                logging.debug("  *      db: %s", target.to_text("detail"))
-                modify.db_update(score, work_m)
-        else:  # 取りこぼし(追加)
-            results.missing.append(score)
-            logging.info("missing: %s (%s)", score.ts, ExtDt(float(score.ts)).format(Format.YMDHMS))
-            logging.debug(score.to_text("logging"))
-            modify.db_insert(score, work_m)
+    for target, score in diff.update:  # 不一致(更新)
+        results.mismatch.append({"before": target, "after": score})
+        logging.info("mismatch: %s (%s)", score.ts, ExtDt(float(score.ts)).format(Format.YMDHMS))
+        logging.debug("  * discord: %s", score.to_text("detail"))
+        logging.debug("  *      db: %s", target.to_text("detail"))
+    for score in diff.insert:  # 取りこぼし(追加)
+        results.missing.append(score)
+        logging.info("missing: %s (%s)", score.ts, ExtDt(float(score.ts)).format(Format.YMDHMS))
+        logging.debug(score.to_text("logging"))
 
     # DATABASE -> DISCORD
-    ts_list = [x.ts for x in discord_score]
-    work_m = g.adapter.parser()
-    for score in db_score:
-        if score.ts not in ts_list:  # 削除漏れ
-            results.delete.append(score)
-            work_m.data.event_ts = score.ts
-            if score.source:
-                work_m.data.channel_id = score.source.replace("discord_", "")
-            logging.info("delete (Only database): %s %s", ExtDt(float(score.ts)).format(Format.YMDHMS), score.to_text("logging"))
-            work_m.status.command_type = CommandType.COMPARISON
-            modify.db_delete(work_m)
+    for score in diff.delete:  # 削除漏れ
+        results.delete.append(score)
+        logging.info("delete (Only database): %s %s", ExtDt(float(score.ts)).format(Format.YMDHMS), score.to_text("logging"))
+
+    results.set_repair(modify.score_reconcile(diff, {ts: x.status.source for ts, x in results.score_list.items()}))
 
 
 async def check_remarks(results: ComparisonResults, messages_list: list["MessageParserProtocol"]):
@@ -163,59 +146,22 @@ async def check_remarks(results: ComparisonResults, messages_list: list["Message
     """
 
     g.adapter = cast("ServiceAdapter", g.adapter)
-    discord_remarks: list[RemarkDict] = []
-    score_list: dict[str, GameResult] = {}
 
+    members = {ts: set(score.to_list("name")) for ts, score in results.game_results.items()}
+    discord_remarks: list[RemarkDict] = []
     for loop_m in messages_list:
-        if detection := validator.check_score(loop_m):
-            score = GameResult(**detection)
-            for k, v in score.to_dict().items():  # 名前の正規化
-                if str(k).endswith("_name"):
-                    score.set(**{k: formatter.name_replace(str(v), not_replace=True)})
-            score_list.update({loop_m.data.event_ts: score})
-
         if re.match(rf"^{g.cfg.setting.remarks_word}$", loop_m.keyword):
-            for name, matter in zip(loop_m.argument[0::2], loop_m.argument[1::2]):
-                # 対象外のメモはスキップ
-                if not float(loop_m.data.thread_ts):
-                    continue  # リプライになっていない
-                if loop_m.data.thread_ts not in score_list:
-                    continue  # ゲーム結果に紐付かない
-                pname = formatter.name_replace(str(name), not_replace=True)
-                if pname not in score_list[loop_m.data.thread_ts].to_list("name"):
-                    continue  # ゲーム結果に名前がない
-
-                discord_remarks.append(
-                    {
-                        "thread_ts": loop_m.data.thread_ts,
-                        "event_ts": loop_m.data.event_ts,
-                        "name": pname,
-                        "matter": matter,
-                        "source": loop_m.status.source,
-                    }
-                )
-
-    db_remarks = search.for_db_remarks(float(results.after.format(Format.TS)))
+            discord_remarks.extend(reconcile.extract_remarks(loop_m, members))
 
-    # DISCORD -> DATABASE
-    work_m = g.adapter.parser()
-    work_m.status.command_type = CommandType.COMPARISON
-
-    for remark in discord_remarks:
-        if remark in db_remarks:  # 変化なし
-            continue
-        results.remark_mod.append(remark)
+    diff = reconcile.diff_remarks(discord_remarks, search.for_db_remarks(float(results.after.format(Format.TS))))
 
-    for event_ts in {x["event_ts"] for x in results.remark_mod}:
-        work_m.data.event_ts = event_ts
-        modify.remarks_delete(work_m)
-    modify.remarks_append(work_m, results.remark_mod)
+    # DISCORD -> DATABASE
+    results.remark_mod.extend(diff.modify)
 
     # DATABASE -> DISCORD
-    for remark in db_remarks:
-        if remark not in discord_remarks:  # Discordに記録なし
-            results.remark_del.append(remark)
-            modify.remarks_delete_compar(remark, work_m)
+    results.remark_del.extend(diff.delete)
+
+    modify.remarks_reconcile(diff.replace, results.remark_del)
 
 
 async def check_total_score(results: ComparisonResults, messages_list: list["MessageParserProtocol"]):
@@ -226,11 +172,5 @@ async def check_total_score(results: ComparisonResults, messages_list: list["Mes
         messages_list (list[MessageParserProtocol]): 検索結果
     """
 
-    for work_m in messages_list:
-        if detection := validator.check_score(work_m):
-            score = GameResult(**detection)
-            for k, v in score.to_dict().items():  # 名前の正規化
-                if str(k).endswith("_name"):
-                    score.set(**{k: formatter.name_replace(str(v), not_replace=True)})
-            if score.deposit:
-                results.invalid_score.append(score)
+    _ = messages_list  # スコアは`check_omission`で取り出し済み
+    results.invalid_score.extend(x for x in results.game_results.values() if x.deposit)
@@ -2,6 +2,7 @@
 integrations/discord/events/handler.py
 """
 
+import asyncio
 import logging
 import os
 import sys
@@ -9,10 +10,15 @@ from typing import TYPE_CHECKING
 
 import integrations.discord.events.audioop as _audioop
 import libs.dispatcher
+import libs.global_value as g
 from integrations.protocols import MessageStatus
+from libs.functions import message
+from libs.types import StyleOptions
+from libs.utils.workerpool import DispatchPool
 
 if TYPE_CHECKING:
     from integrations.discord.adapter import ServiceAdapter
+    from integrations.protocols import MessageParserProtocol
 
 
 def main(adapter: "ServiceAdapter"):
@@ -42,6 +48,13 @@ def main(adapter: "ServiceAdapter"):
     intents.messages = True
     bot = commands.Bot(intents=intents)
     adapter.api.bot = bot
+    adapter.api.post_concurrency = adapter.conf.post_concurrency
+
+    if adapter.conf.worker_threads > 0:
+        # チャンネル個別設定は共有の設定値を書き換えるため、利用時は1件ずつ処理する
+        exclusive = any(g.cfg.main_parser.has_option(x, "channel_config") for x in g.cfg.main_parser.sections())
+        adapter.pool = DispatchPool(adapter.conf.worker_threads, adapter.conf.worker_queue, exclusive)
+        logging.info("dispatch pool: workers=%s, queue=%s, exclusive=%s", adapter.conf.worker_threads, adapter.conf.worker_queue, exclusive)
 
     @bot.event
     async def on_ready():
@@ -59,7 +72,7 @@ def main(adapter: "ServiceAdapter"):
         m.data.status = MessageStatus.APPEND
         m.parser(message)
 
-        libs.dispatcher.by_keyword(m)
+        await dispatch(adapter, m)
 
     @bot.event
     async def on_raw_message_edit(payload: discord.RawMessageUpdateEvent):
@@ -87,7 +100,7 @@ def main(adapter: "ServiceAdapter"):
         m.data.status = MessageStatus.CHANGED
         m.parser(message)
 
-        libs.dispatcher.by_keyword(m)
+        await dispatch(adapter, m)
 
     @bot.event
     async def on_message_delete(message: discord.Message):
@@ -100,18 +113,46 @@ def main(adapter: "ServiceAdapter"):
         m.data.status = MessageStatus.DELETED
         m.parser(message)
 
-        libs.dispatcher.by_keyword(m)
+        await dispatch(adapter, m)
 
     @bot.slash_command(name=adapter.conf.slash_command)
     async def slash_command(ctx: discord.ApplicationContext, command: str):
         adapter.api.response = ctx
 
         m = adapter.parser()
+        m.discord_ctx = ctx
         m.status.command_flg = True
         m.data.text = command
         m.data.status = MessageStatus.APPEND
         m.data.thread_ts = "0"
 
+        await dispatch(adapter, m)
+
+    try:
+        bot.run(token=os.environ["DISCORD_TOKEN"])
+    finally:
+        if adapter.pool:
+            adapter.pool.shutdown()
+
+
+async def dispatch(adapter: "ServiceAdapter", m: "MessageParserProtocol"):
+    """イベントを処理する
+
+    ワーカープールが有効な場合は処理レーンに振り分け、完了までイベントループを止めずに待機する。
+
+    Args:
+        adapter (ServiceAdapter): アダプタインターフェース
+        m (MessageParserProtocol): メッセージデータ(イベントごとに生成したもの)
+    """
+
+    if adapter.pool is None:
         libs.dispatcher.by_keyword(m)
+        return
+
+    future = adapter.pool.submit(libs.dispatcher.lane(m), libs.dispatcher.by_keyword, m)
+    if future is None:
+        m.set_data(message.random_reply(m, "busy"), StyleOptions(key_title=False))
+        adapter.api.post(m)
+        return
 
-    bot.run(token=os.environ["DISCORD_TOKEN"])
+    await asyncio.wrap_future(future)
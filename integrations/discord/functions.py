@@ -41,9 +41,9 @@ class SvcFunctions(FunctionsInterface):
             case ActionStatus.NOTHING:
                 return
             case ActionStatus.CHANGE:
-                self.api.bot.loop.create_task(self.update_reaction(m))
+                self.api.schedule(self.update_reaction(m))
             case ActionStatus.DELETE:
-                self.api.bot.loop.create_task(self.delete_reaction(m))
+                self.api.schedule(self.delete_reaction(m))
 
     async def update_reaction(self, m: "MessageParserProtocol"):
         """後処理
@@ -2,7 +2,7 @@
 integrations/discord/parser.py
 """
 
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, Optional, cast
 
 from discord import Message, Thread
 from discord.channel import TextChannel
@@ -12,6 +12,8 @@ from integrations.base.interface import MessageParserDataMixin, MessageParserInt
 from integrations.protocols import CommandType, MsgData, PostData, StatusData
 
 if TYPE_CHECKING:
+    from discord import ApplicationContext
+
     from integrations.discord.adapter import ServiceAdapter
 
 
@@ -24,6 +26,8 @@ class MessageParser(MessageParserDataMixin, MessageParserInterface):
         self.post: PostData = PostData()
         self.status: StatusData = StatusData()
         self.discord_msg: Message
+        self.discord_ctx: Optional["ApplicationContext"] = None
+        """スラッシュコマンドの応答先"""
 
     def parser(self, body: Message):
         self.discord_msg = body
@@ -4,14 +4,18 @@ integrations/slack/api.py
 
 import logging
 import textwrap
-from pathlib import PosixPath
-from typing import TYPE_CHECKING, cast
+import urllib.request
+from concurrent.futures import Future, wait
+from functools import partial
+from pathlib import Path, PosixPath
+from typing import TYPE_CHECKING, Optional, cast
 
 import pandas as pd
 
 from integrations.base.interface import APIInterface
+from integrations.slack.outbound import OutboundQueue
 from libs.types import StyleOptions
-from libs.utils import converter, formatter
+from libs.utils import converter, formatter, graphcache
 
 if TYPE_CHECKING:
     from slack_sdk.web import SlackResponse
@@ -28,9 +32,12 @@ class AdapterAPI(APIInterface):
     """WebClient(botトークン使用)"""
     webclient: "WebClient"
     """WebClient(userトークン使用)"""
+    outbound: OutboundQueue
+    """送信キュー"""
 
     def __init__(self):
         super().__init__()
+        self.outbound = OutboundQueue()
 
         try:
             from slack_sdk.errors import SlackApiError
@@ -70,11 +77,15 @@ class AdapterAPI(APIInterface):
                 text=f"{_header_text(header_title)}{header_text.rstrip()}",
                 thread_ts=m.reply_ts,
             )
-            if res.status_code == 200:  # 見出しがある場合はスレッドにする
+            if getattr(res, "status_code", None) == 200:  # 見出しがある場合はスレッドにする
                 m.post.ts = res.get("ts", "undetermined")
             else:
                 m.post.ts = "undetermined"
 
+        # 送信はチャンネル単位で順番に処理されるため、スレッド先(`m.reply_ts`)は送信時に確定する
+        channel = m.data.channel_id
+        futures: list[Future] = []
+
         if not m.in_thread:
             m.post.thread = False
 
@@ -84,9 +95,9 @@ class AdapterAPI(APIInterface):
         if m.post.headline:
             header_title, header_text = next(iter(m.post.headline.items()))
             if not m.post.message:  # メッセージなし
-                _post_header()
+                futures.append(self.outbound.submit(channel, _post_header))
             elif not all(options.header_hidden for _, options in m.post.message):
-                _post_header()
+                futures.append(self.outbound.submit(channel, _post_header))
 
         # 本文
         options = StyleOptions()
@@ -97,14 +108,8 @@ class AdapterAPI(APIInterface):
 
             if isinstance(data, PosixPath) and data.exists():
                 comment = textwrap.dedent(f"{_header_text(header_title)}{header_text.rstrip()}") if options.use_comment else ""
-                self._call_files_upload(
-                    channel=m.data.channel_id,
-                    title=options.title,
-                    file=str(data),
-                    initial_comment=comment,
-                    thread_ts=m.reply_ts,
-                    request_file_info=False,
-                )
+                uploaded = self.outbound.submit_unordered(partial(self._upload_file, data, options.title))
+                futures.append(self.outbound.submit(channel, partial(self._share_file, m, uploaded, comment)))
 
             if isinstance(data, str):
                 if options.key_title and (options.title != header_title):
@@ -142,19 +147,32 @@ class AdapterAPI(APIInterface):
             post_msg = formatter.group_strings(post_msg)
 
         for msg in post_msg:
+            blocks: Optional[list] = None
             if msg != msg.lstrip() or (not msg.find("*【戦績】*") and block_layout):
-                self._call_chat_post_message(
-                    channel=m.data.channel_id,
-                    text=msg.rstrip(),
-                    blocks=[{"type": "section", "text": {"type": "mrkdwn", "text": msg.rstrip()}}],
-                    thread_ts=m.reply_ts,
-                )
-            else:
-                self._call_chat_post_message(
-                    channel=m.data.channel_id,
-                    text=msg.rstrip(),
-                    thread_ts=m.reply_ts,
-                )
+                blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": msg.rstrip()}}]
+            futures.append(self.outbound.submit(channel, partial(self._post_text, m, msg.rstrip(), blocks)))
+
+        wait(futures)
+        graphcache.release(m)
+        for future in futures:  # 送信スレッドで発生した想定外の例外を握りつぶさない
+            if (err := future.exception()) is not None:
+                logging.error("slack post failed: %s", err, exc_info=err)
+
+    def _post_text(self, m: "MessageParserProtocol", text: str, blocks: Optional[list]) -> "SlackResponse":
+        """本文をポストする
+
+        Args:
+            m (MessageParserProtocol): メッセージデータ
+            text (str): 本文
+            blocks (Optional[list]): ブロックレイアウト
+
+        Returns:
+            SlackResponse: API response
+        """
+
+        if blocks:
+            return self._call_chat_post_message(channel=m.data.channel_id, text=text, blocks=blocks, thread_ts=m.reply_ts)
+        return self._call_chat_post_message(channel=m.data.channel_id, text=text, thread_ts=m.reply_ts)
 
     def _call_chat_post_message(self, **kwargs) -> "SlackResponse":
         """slackにメッセージをポストする
@@ -168,27 +186,57 @@ class AdapterAPI(APIInterface):
             kwargs.pop("thread_ts")
 
         try:
-            res = self.appclient.chat_postMessage(**kwargs)
+            res = self.outbound.call("chat.postMessage", partial(self.appclient.chat_postMessage, **kwargs))
         except self.slack_api_error as err:
             logging.error("slack_api_error: %s", err)
             logging.error("kwargs=%s", kwargs)
 
         return res
 
-    def _call_files_upload(self, **kwargs) -> "SlackResponse":
-        """slackにファイルをアップロードする
+    def _upload_file(self, file: Path, title: Optional[str]) -> dict:
+        """ファイルをアップロードする(チャンネルへの共有は行わない)
+
+        `files_upload_v2`の前半(アップロードURLの取得とファイル本体の送信)に相当する。
+
+        Args:
+            file (Path): ファイル
+            title (Optional[str]): タイトル
 
         Returns:
-            SlackResponse | Any: API response
+            dict: 共有時に指定するファイル情報
+        """
+
+        res = self.outbound.call(
+            "files.getUploadURLExternal",
+            partial(self.appclient.files_getUploadURLExternal, filename=graphcache.display_name(file), length=file.stat().st_size),
+        )
+        req = urllib.request.Request(method="POST", url=res["upload_url"], data=file.read_bytes())
+        with urllib.request.urlopen(req, context=self.appclient.ssl, timeout=self.appclient.timeout) as upload:
+            upload.read()
+
+        return {"id": res["file_id"], "title": title or graphcache.display_name(file)}
+
+    def _share_file(self, m: "MessageParserProtocol", uploaded: Future, comment: str) -> "SlackResponse":
+        """アップロード済みのファイルをチャンネルに共有する
+
+        Args:
+            m (MessageParserProtocol): メッセージデータ
+            uploaded (Future): `_upload_file`の結果
+            comment (str): 共有時のコメント
+
+        Returns:
+            SlackResponse: API response
         """
 
         res = cast("SlackResponse", {})
-        if kwargs.get("thread_ts", "0") == "0":
+        kwargs: dict = {"channel_id": m.data.channel_id, "initial_comment": comment, "thread_ts": m.reply_ts}
+        if kwargs["thread_ts"] == "0":
             kwargs.pop("thread_ts")
 
         try:
-            res = self.appclient.files_upload_v2(**kwargs)
-        except self.slack_api_error as err:
+            kwargs.update(files=[uploaded.result()])
+            res = self.outbound.call("files.completeUploadExternal", partial(self.appclient.files_completeUploadExternal, **kwargs))
+        except (self.slack_api_error, OSError) as err:
             logging.error("slack_api_error: %s", err)
             logging.error("kwargs=%s", kwargs)
 
@@ -32,6 +32,10 @@ class SvcConfig(BaseSection, IntegrationsConfig):
     """データ突合時対象にする日数"""
     search_wait: int = field(default=180)
     """指定秒数以内にポストされているデータを突合対象から除外する"""
+    search_workers: int = field(default=4)
+    """データ突合時に検索結果/メッセージ詳細を並列に取得する数"""
+    history_cache: bool = field(default=True)
+    """データ突合時に取得したメッセージ詳細を作業ディレクトリに保存し、本文が変わっていなければ次回の取得を省略する"""
 
     thread_report: bool = field(default=True)
     """スレッド内にある得点報告の扱い
@@ -55,6 +59,24 @@ class SvcConfig(BaseSection, IntegrationsConfig):
     未定義はすべてのチャンネルでSQLが実行できる
     """
 
+    # イベント処理
+    worker_threads: int = field(default=0)
+    """集計/グラフ/レポートなどのコマンドを処理するワーカースレッド数
+
+    - *0*: イベント受信スレッドでそのまま処理する
+    - *1以上*: ワーカープールに振り分け、スコア登録は専用スレッドで先に処理する
+    """
+    worker_queue: int = field(default=16)
+    """ワーカーが埋まっているときに待機できるコマンド数(超えた分は受け付けない)"""
+    post_workers: int = field(default=0)
+    """メッセージ送信/ファイルアップロードの同時実行数
+
+    - *0*: 呼び出したスレッドで順番に送信する
+    - *1以上*: 送信キューで処理する(チャンネル内の順序は保ち、アップロードは並列に行う)
+    """
+    post_retries: int = field(default=3)
+    """レート制限(HTTP 429)を受けたときのリトライ回数(`Retry-After`の秒数だけ待つ)"""
+
     bot_id: str = field(default="")
     """ボットID"""
 
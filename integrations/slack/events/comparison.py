@@ -6,14 +6,12 @@ import logging
 from typing import TYPE_CHECKING, cast
 
 import libs.global_value as g
-from cls.score import GameResult
 from cls.timekit import ExtendedDatetime as ExtDt
 from cls.timekit import Format
-from integrations.protocols import ActionStatus, CommandType
-from libs.data import lookup, modify, search
+from integrations.protocols import ActionStatus
+from libs.data import lookup, modify, reconcile, search
 from libs.datamodels import ComparisonResults
 from libs.types import StyleOptions
-from libs.utils import formatter, validator
 
 if TYPE_CHECKING:
     from integrations.protocols import MessageParserProtocol
@@ -62,6 +60,8 @@ def main(m: "MessageParserProtocol") -> None:
     m.set_data(results.output("remark_del"), StyleOptions(title="メモ削除", key_title=False))
     if results.invalid_score:
         m.set_data(results.output("invalid_score"), StyleOptions(title="供託残り", key_title=False))
+    if results.repair:
+        m.set_data(results.output("repair"), StyleOptions(title="修正結果", key_title=False))
 
     m.post.thread = True
     m.post.ts = m.data.event_ts
@@ -77,60 +77,42 @@ def check_omission(results: ComparisonResults):
     """
 
     g.adapter = cast("ServiceAdapter", g.adapter)
-    slack_score: list[GameResult] = []
 
-    for work_m in set(g.adapter.functions.pickup_score()):
+    for work_m in g.adapter.functions.pickup_score():
         if work_m.keyword in g.keyword_dispatcher:  # コマンドキーワードはスキップ
             continue
-        if detection := validator.check_score(work_m):
-            score = GameResult(**detection)
-            for k, v in score.to_dict().items():  # 名前の正規化
-                if str(k).endswith("_name"):
-                    score.set(**{k: formatter.name_replace(str(v), not_replace=True)})
-            # 保留チェック
-            if check_pending(work_m):
-                results.pending.append(score)
-            else:
-                slack_score.append(score)
-                results.score_list.update({work_m.data.event_ts: work_m})
-
-    if slack_score:
-        first_ts = float(min(x.ts for x in slack_score))
+        if (score := reconcile.parse_score(work_m)) is None:
+            continue
+        if check_pending(work_m):  # 保留チェック
+            results.pending.append(score)
+        else:
+            results.game_results.update({work_m.data.event_ts: score})
+            results.score_list.update({work_m.data.event_ts: work_m})
+
+    if results.game_results:
+        first_ts = float(min(results.game_results))
     else:
         first_ts = float(results.after.format(Format.TS))
 
-    db_score = search.for_db_score(first_ts)
+    diff = reconcile.diff_scores(results.game_results, search.for_db_score(first_ts))
 
     # SLACK -> DATABASE
-    ts_list = [x.ts for x in db_score]
-    for score in slack_score:
-        work_m = results.score_list[score.ts]
-        if score.ts in ts_list:
-            target = db_score[ts_list.index(score.ts)]
-            if score != target:  # 不一致(更新)
-                results.mismatch.append({"before": target, "after": score})
-                logging.info("mismatch: %s (%s)", score.ts, ExtDt(float(score.ts)).format(Format.YMDHMS))
-                logging.debug("  * slack: %s", score.to_text("detail"))
-                logging.debug("  *    db: %s", target.to_text("detail"))
-                modify.db_update(score, work_m)
-        else:  # 取りこぼし(追加)
-            results.missing.append(score)
-            logging.info("missing: %s (%s)", score.ts, ExtDt(float(score.ts)).format(Format.YMDHMS))
-            logging.debug(score.to_text("logging"))
-            modify.db_insert(score, work_m)
+    for target, score in diff.update:  # 不一致(更新)
+        results.mismatch.append({"before": target, "after": score})
+        logging.info("mismatch: %s (%s)", score.ts, ExtDt(float(score.ts)).format(Format.YMDHMS))
+        logging.debug("  * slack: %s", score.to_text("detail"))
+        logging.debug("  *    db: %s", target.to_text("detail"))
+    for score in diff.insert:  # 取りこぼし(追加)
+        results.missing.append(score)
+        logging.info("missing: %s (%s)", score.ts, ExtDt(float(score.ts)).format(Format.YMDHMS))
+        logging.debug(score.to_text("logging"))
 
     # DATABASE -> SLACK
-    ts_list = [x.ts for x in slack_score]
-    work_m = g.adapter.parser()
-    for score in db_score:
-        if score.ts not in ts_list:  # 削除漏れ
-            work_m.data.event_ts = score.ts
-            if score.source:
-                work_m.data.channel_id = score.source.replace("slack_", "")
-            results.delete.append(score)
-            logging.info("delete (Only database): %s %s", ExtDt(float(score.ts)).format(Format.YMDHMS), score.to_text("logging"))
-            work_m.status.command_type = CommandType.COMPARISON
-            modify.db_delete(work_m)
+    for score in diff.delete:  # 削除漏れ
+        results.delete.append(score)
+        logging.info("delete (Only database): %s %s", ExtDt(float(score.ts)).format(Format.YMDHMS), score.to_text("logging"))
+
+    results.set_repair(modify.score_reconcile(diff, {ts: x.status.source for ts, x in results.score_list.items()}, g.adapter.conf.search_workers))
 
 
 def check_remarks(results: ComparisonResults):
@@ -141,67 +123,23 @@ def check_remarks(results: ComparisonResults):
     """
 
     g.adapter = cast("ServiceAdapter", g.adapter)
-    slack_remarks: list["RemarkDict"] = []
-    score_list: dict[str, GameResult] = {}
-
-    for loop_m in results.score_list.values():
-        if detection := validator.check_score(loop_m):
-            score = GameResult(**detection)
-            for k, v in score.to_dict().items():  # 名前の正規化
-                if str(k).endswith("_name"):
-                    score.set(**{k: formatter.name_replace(str(v), not_replace=True)})
-            score_list.update({loop_m.data.event_ts: score})
 
+    # 保留中のゲーム結果は`game_results`に含まれないので、紐付くメモも対象外になる
+    members = {ts: set(score.to_list("name")) for ts, score in results.game_results.items()}
+    slack_remarks: list["RemarkDict"] = []
     for loop_m in g.adapter.functions.pickup_remarks():
-        for name, matter in zip(loop_m.argument[0::2], loop_m.argument[1::2]):
-            # 対象外のメモはスキップ
-            if not float(loop_m.data.thread_ts):
-                continue  # リプライになっていない
-            if loop_m.data.thread_ts not in score_list:
-                continue  # ゲーム結果に紐付かない
-            pname = formatter.name_replace(str(name), not_replace=True)
-            if pname not in score_list[loop_m.data.thread_ts].to_list("name"):
-                continue  # ゲーム結果に名前がない
-            if loop_m.data.thread_ts in [x.ts for x in results.pending]:
-                continue  # 紐付くゲーム結果が保留中
-            slack_remarks.append(
-                {
-                    "thread_ts": loop_m.data.thread_ts,
-                    "event_ts": loop_m.data.event_ts,
-                    "name": pname,
-                    "matter": matter,
-                    "source": loop_m.status.source,
-                }
-            )
-
-    db_remarks = search.for_db_remarks(float(results.after.format(Format.TS)))
+        slack_remarks.extend(reconcile.extract_remarks(loop_m, members))
+
+    diff = reconcile.diff_remarks(slack_remarks, search.for_db_remarks(float(results.after.format(Format.TS))))
 
     # SLACK -> DATABASE
-    work_m = cast("MessageParserProtocol", g.adapter.parser())
-
-    for remark in slack_remarks:
-        if remark in db_remarks:
-            continue  # 変化なし
-        if remark["thread_ts"] in [x.ts for x in results.pending]:
-            continue  # 紐付くゲーム結果が保留中
-        results.remark_mod.append(remark)
-
-    if results.remark_mod:
-        for remark in results.remark_mod:
-            work_m.data.event_ts = remark["event_ts"]
-            work_m.status.command_type = CommandType.COMPARISON
-            work_m.data.channel_id = remark["source"].replace("slack_", "")
-        work_m.status.command_type = CommandType.COMPARISON  # リセットがかかるので再セット
-        work_m.data.channel_id = remark["source"].replace("slack_", "")
-        modify.remarks_delete(work_m)
-        modify.remarks_append(work_m, results.remark_mod)
+    results.remark_mod.extend(diff.modify)
 
     # DATABASE -> SLACK
-    for remark in db_remarks:
-        if remark not in slack_remarks:  # slackに記録なし
-            if remark["source"] in {x.source for x in score_list.values()}:
-                results.remark_del.append(remark)
-                modify.remarks_delete_compar(remark, work_m)
+    sources = {x.source for x in results.game_results.values()}
+    results.remark_del.extend(x for x in diff.delete if x["source"] in sources)
+
+    modify.remarks_reconcile(diff.replace, results.remark_del, g.adapter.conf.search_workers)
 
 
 def check_total_score(results: ComparisonResults):
@@ -211,14 +149,7 @@ def check_total_score(results: ComparisonResults):
         results (ComparisonResults): 結果格納データクラス
     """
 
-    for loop_m in results.score_list.values():
-        if detection := validator.check_score(loop_m):
-            score = GameResult(**detection)
-            for k, v in score.to_dict().items():  # 名前の正規化
-                if str(k).endswith("_name"):
-                    score.set(**{k: formatter.name_replace(str(v), not_replace=True)})
-            if score.deposit:
-                results.invalid_score.append(score)
+    results.invalid_score.extend(x for x in results.game_results.values() if x.deposit)
 
 
 def check_pending(m: "MessageParserProtocol") -> bool:
@@ -8,10 +8,15 @@ import sys
 from typing import TYPE_CHECKING, cast
 
 import libs.dispatcher
+import libs.global_value as g
 from cls.timekit import Delimiter, Format
 from cls.timekit import ExtendedDatetime as ExtDt
 from integrations.slack.events.handler_registry import register, register_all
 from integrations.slack.events.home_tab import home
+from integrations.slack.outbound import OutboundQueue
+from libs.functions import message
+from libs.types import StyleOptions
+from libs.utils.workerpool import DispatchPool
 
 if TYPE_CHECKING:
     from slack_bolt import App
@@ -55,16 +60,47 @@ def main(adapter: "ServiceAdapter"):
         logging.critical(err)
         sys.exit()
 
+    if adapter.conf.worker_threads > 0:
+        # チャンネル個別設定は共有の設定値を書き換えるため、利用時は1件ずつ処理する
+        exclusive = any(g.cfg.main_parser.has_option(x, "channel_config") for x in g.cfg.main_parser.sections())
+        adapter.pool = DispatchPool(adapter.conf.worker_threads, adapter.conf.worker_queue, exclusive)
+        logging.info("dispatch pool: workers=%s, queue=%s, exclusive=%s", adapter.conf.worker_threads, adapter.conf.worker_queue, exclusive)
+
+    adapter.api.outbound = OutboundQueue(adapter.conf.post_workers, adapter.conf.post_retries)
+    logging.info("outbound queue: workers=%s, retries=%s", adapter.conf.post_workers, adapter.conf.post_retries)
+
     register_all(app, adapter)  # イベント遅延登録
-    SocketModeHandler(app, os.environ["SLACK_APP_TOKEN"]).start()
+    try:
+        SocketModeHandler(app, os.environ["SLACK_APP_TOKEN"]).start()
+    finally:
+        if adapter.pool:
+            adapter.pool.shutdown()
+        adapter.api.outbound.shutdown()
+
+
+def dispatch(adapter: "ServiceAdapter", m: "MessageParserProtocol"):
+    """イベントを処理する
+
+    ワーカープールが有効な場合は処理レーンに振り分けて受信スレッドをすぐに返す。
+
+    Args:
+        adapter (ServiceAdapter): アダプタインターフェース
+        m (MessageParserProtocol): メッセージデータ(イベントごとに生成したもの)
+    """
+
+    if adapter.pool is None:
+        libs.dispatcher.by_keyword(m)
+        return
+
+    if adapter.pool.submit(libs.dispatcher.lane(m), libs.dispatcher.by_keyword, m) is None:
+        m.set_data(message.random_reply(m, "busy"), StyleOptions(key_title=False))
+        adapter.api.post(m)
 
 
 @register
 def register_event_handlers(app: "App", adapter: "ServiceAdapter"):
     """イベントAPI"""
 
-    m = cast("MessageParserProtocol", adapter.parser())
-
     @app.event("message")
     def handle_message_events(body):
         """メッセージイベント
@@ -73,9 +109,9 @@ def register_event_handlers(app: "App", adapter: "ServiceAdapter"):
             body (dict): ポストされたデータ
         """
 
-        m.reset()
+        m = cast("MessageParserProtocol", adapter.parser())
         m.parser(body)
-        libs.dispatcher.by_keyword(m)
+        dispatch(adapter, m)
 
     @app.command(adapter.conf.slash_command)
     def slash_command(ack, body):
@@ -87,9 +123,9 @@ def register_event_handlers(app: "App", adapter: "ServiceAdapter"):
         """
 
         ack()
-        m.reset()
+        m = cast("MessageParserProtocol", adapter.parser())
         m.parser(body)
-        libs.dispatcher.by_keyword(m)
+        dispatch(adapter, m)
 
     @app.event("app_home_opened")
     def handle_home_events(event):
@@ -3,13 +3,16 @@ integrations/slack/functions.py
 """
 
 import logging
-from typing import TYPE_CHECKING, cast
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Optional, cast
 
 import libs.global_value as g
 from cls.timekit import Delimiter, Format
 from cls.timekit import ExtendedDatetime as ExtDt
 from integrations.base.interface import FunctionsInterface
 from integrations.protocols import ActionStatus
+from integrations.slack.history import HistoryCache
 from libs.data import lookup
 from libs.utils import validator
 
@@ -39,6 +42,7 @@ class SvcFunctions(FunctionsInterface):
         """API操作オブジェクト"""
         self.conf = conf
         """個別設定"""
+        self._history: Optional[HistoryCache] = None
 
     def get_messages(self, word: str) -> list["MessageParserProtocol"]:
         """slackログからメッセージを検索して返す
@@ -58,12 +62,19 @@ class SvcFunctions(FunctionsInterface):
         query = f"{word} {channel} after:{after}"
         logging.info("query=%s, check_db=%s", query, g.cfg.setting.database_file)
 
-        # データ取得
-        response = self.api.webclient.search_messages(query=query, sort="timestamp", sort_dir="asc", count=100)
-        matches = response["messages"]["matches"]  # 1ページ目
-        for p in range(2, response["messages"]["paging"]["pages"] + 1):
-            response = self.api.webclient.search_messages(query=query, sort="timestamp", sort_dir="asc", count=100, page=p)
-            matches += response["messages"]["matches"]  # 2ページ目以降
+        def _search(page: int) -> dict:
+            response = self.api.outbound.call(
+                "search.messages",
+                partial(self.api.webclient.search_messages, query=query, sort="timestamp", sort_dir="asc", count=100, page=page),
+            )
+            return cast(dict, response["messages"])
+
+        # データ取得(1ページ目でページ数を確定し、残りは並列に取得)
+        messages = _search(1)
+        matches = list(messages["matches"])
+        with ThreadPoolExecutor(max_workers=max(self.conf.search_workers, 1), thread_name_prefix="slack-search") as executor:
+            for messages in executor.map(_search, range(2, messages["paging"]["pages"] + 1)):  # ページ順を保つ
+                matches += messages["matches"]
 
         # 必要なデータだけ辞書に格納
         data: list["MessageParserProtocol"] = []
@@ -85,28 +96,70 @@ class SvcFunctions(FunctionsInterface):
             list[MessageParserProtocol]: 詳細情報追加データ
         """
 
-        new_matches: list["MessageParserProtocol"] = []
-
-        # 詳細情報取得
-        for key in matches:
-            conversations = self.api.appclient.conversations_replies(channel=key.data.channel_id, ts=key.data.event_ts)
+        def _replies(key: "MessageParserProtocol") -> Optional[dict]:
+            conversations = self.api.outbound.call(
+                "conversations.replies",
+                partial(self.api.appclient.conversations_replies, channel=key.data.channel_id, ts=key.data.event_ts),
+            )
             if msg := conversations.get("messages"):
                 res = cast(dict, msg[0])
             else:
-                continue
+                return None
 
+            detail: dict = {}
             if res:
-                # 各種時間取得
-                key.data.event_ts = str(res.get("ts", "0"))  # イベント発生時間
-                key.data.thread_ts = str(res.get("thread_ts", "0"))  # スレッドの先頭
-                key.data.edited_ts = str(cast(dict, res.get("edited", {})).get("ts", "0"))  # 編集時間
+                detail.update(
+                    event_ts=str(res.get("ts", "0")),  # イベント発生時間
+                    thread_ts=str(res.get("thread_ts", "0")),  # スレッドの先頭
+                    edited_ts=str(cast(dict, res.get("edited", {})).get("ts", "0")),  # 編集時間
+                )
                 # リアクション取得
-                key.data.reaction_ok, key.data.reaction_ng = self.get_reactions_list(res)
+                detail["reaction_ok"], detail["reaction_ng"] = self.get_reactions_list(res)
+            return detail
+
+        history = self.history_cache()
+        details: dict[int, Optional[dict]] = {}
+        for idx, key in enumerate(matches):
+            if history and (cached := history.get(key.data.channel_id, key.data.event_ts, key.data.text)):
+                details[idx] = cached
+
+        # 詳細情報取得(キャッシュにないものだけ並列に取得)
+        fetch = [idx for idx in range(len(matches)) if idx not in details]
+        with ThreadPoolExecutor(max_workers=max(self.conf.search_workers, 1), thread_name_prefix="slack-replies") as executor:
+            for idx, detail in zip(fetch, executor.map(_replies, [matches[x] for x in fetch])):
+                details[idx] = detail
+                if history and detail:
+                    history.put(matches[idx].data.channel_id, matches[idx].data.event_ts, matches[idx].data.text, detail)
 
+        new_matches: list["MessageParserProtocol"] = []
+        for idx, key in enumerate(matches):
+            if (detail := details[idx]) is None:
+                continue
+            if detail:
+                key.data.event_ts = detail["event_ts"]
+                key.data.thread_ts = detail["thread_ts"]
+                key.data.edited_ts = detail["edited_ts"]
+                key.data.reaction_ok, key.data.reaction_ng = list(detail["reaction_ok"]), list(detail["reaction_ng"])
             new_matches.append(key)
 
+        if history:
+            history.save(float(ExtDt(days=-self.conf.search_after - 1).format(Format.TS)))
+
         return new_matches
 
+    def history_cache(self) -> Optional[HistoryCache]:
+        """メッセージ詳細情報のキャッシュを返す
+
+        Returns:
+            Optional[HistoryCache]: キャッシュ(無効時は`None`)
+        """
+
+        if not self.conf.history_cache:
+            return None
+        if self._history is None:
+            self._history = HistoryCache(g.cfg.setting.work_dir / "slack_history.json")
+        return self._history
+
     def get_conversations(self, m: "MessageParserProtocol") -> dict:
         """スレッド情報の取得
 
@@ -0,0 +1,124 @@
+"""
+integrations/slack/history.py
+"""
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+
+class HistoryCache:
+    """メッセージ詳細情報のキャッシュ
+
+    `conversations.replies`で取得した詳細情報(スレッド/編集時刻/リアクション)をチャンネルIDとタイムスタンプをキーに保持する。
+    検索結果の本文が前回と同じメッセージは編集されていないものとして、APIを呼ばずにキャッシュの内容を使う。
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """キャッシュの初期化
+
+        Args:
+            path (Optional[Path], optional): 保存先ファイル. Defaults to None.
+                - *None*: 保存しない(プロセス内のみ)
+        """
+
+        self.path = path
+        self._entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def key(channel_id: str, event_ts: str) -> str:
+        """キャッシュキーを生成する
+
+        Args:
+            channel_id (str): チャンネルID
+            event_ts (str): メッセージのタイムスタンプ
+
+        Returns:
+            str: キャッシュキー
+        """
+
+        return f"{channel_id}:{event_ts}"
+
+    def get(self, channel_id: str, event_ts: str, text: str) -> Optional[dict]:
+        """詳細情報を取得する
+
+        Args:
+            channel_id (str): チャンネルID
+            event_ts (str): メッセージのタイムスタンプ
+            text (str): 検索結果の本文
+
+        Returns:
+            Optional[dict]: 詳細情報(未登録または本文が変わっている場合は`None`)
+        """
+
+        self._load()
+        with self._lock:
+            entry = self._entries.get(self.key(channel_id, event_ts))
+            if entry is None or entry.get("text") != text:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry
+
+    def put(self, channel_id: str, event_ts: str, text: str, detail: dict) -> None:
+        """詳細情報を登録する
+
+        Args:
+            channel_id (str): チャンネルID
+            event_ts (str): メッセージのタイムスタンプ
+            text (str): 検索結果の本文
+            detail (dict): 詳細情報
+        """
+
+        self._load()
+        with self._lock:
+            self._entries[self.key(channel_id, event_ts)] = dict(detail, text=text)
+
+    def save(self, oldest_ts: float) -> None:
+        """検索範囲外のエントリを破棄してファイルに保存する
+
+        Args:
+            oldest_ts (float): 保持するメッセージの最も古いタイムスタンプ
+        """
+
+        with self._lock:
+            self._entries = {k: v for k, v in self._entries.items() if float(k.split(":", 1)[1]) >= oldest_ts}
+            if self.path is None:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.path.with_suffix(".tmp")
+                tmp_file.write_text(json.dumps(self._entries, ensure_ascii=False), encoding="utf-8")
+                tmp_file.replace(self.path)
+            except OSError as err:
+                logging.warning("history cache save failed: %s", err)
+        logging.info("history cache: entries=%s, hits=%s, misses=%s", len(self._entries), self.hits, self.misses)
+
+    def clear(self) -> None:
+        """すべてのエントリを破棄する"""
+
+        with self._lock:
+            self._entries.clear()
+            self._loaded = True
+            if self.path:
+                self.path.unlink(missing_ok=True)
+
+    def _load(self) -> None:
+        """保存済みのエントリを読み込む(初回のみ)"""
+
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if self.path is None or not self.path.exists():
+                return
+            try:
+                self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as err:
+                logging.warning("history cache load failed: %s", err)
@@ -0,0 +1,254 @@
+"""
+integrations/slack/outbound.py
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional
+
+
+@dataclass
+class OutboundMetrics:
+    """送信キューの計測値"""
+
+    submitted: int = 0
+    """受付数"""
+    sent: int = 0
+    """API呼び出しの成功数"""
+    failed: int = 0
+    """リトライ後も失敗した数"""
+    rate_limited: int = 0
+    """レート制限(HTTP 429)を受けた回数"""
+    retried: int = 0
+    """リトライした回数"""
+    backoff_total: float = 0.0
+    """レート制限による待ち時間の合計(秒)"""
+    call_total: float = 0.0
+    """API呼び出し時間の合計(秒)"""
+    call_max: float = 0.0
+    """API呼び出し時間の最大値(秒)"""
+
+    def to_dict(self) -> dict[str, Any]:
+        """平均値を加えて辞書で返す
+
+        Returns:
+            dict[str, Any]: 計測値
+        """
+
+        ret = asdict(self)
+        ret.update(call_avg=self.call_total / self.sent if self.sent else 0.0)
+        return ret
+
+
+def retry_after(err: Exception) -> Optional[float]:
+    """レート制限エラーから待ち時間を取り出す
+
+    Args:
+        err (Exception): API呼び出しの例外(`SlackApiError`)
+
+    Returns:
+        Optional[float]: 待ち時間(秒)、レート制限以外は`None`
+    """
+
+    response = getattr(err, "response", None)
+    if getattr(response, "status_code", None) != 429:
+        return None
+
+    headers = getattr(response, "headers", None) or {}
+    for name, value in headers.items():
+        if name.lower() == "retry-after":
+            try:
+                return max(float(value), 0.0)
+            except (TypeError, ValueError):
+                break
+    return 1.0
+
+
+class OutboundQueue:
+    """Slack Web APIの送信キュー
+
+    - チャンネル単位で到着順に1件ずつ送信し、チャンネルをまたいだ送信は並列に処理する
+    - ファイルのアップロードは順序に関係なく並列に処理する
+    - レート制限を受けたAPIメソッドは`Retry-After`の間だけ後続の呼び出しも待たせてからリトライする
+
+    ワーカー数が0の場合は呼び出したスレッドでそのまま処理する(リトライは行う)。
+    """
+
+    def __init__(self, workers: int = 0, max_retries: int = 3):
+        """送信キューの初期化
+
+        Args:
+            workers (int, optional): 送信/アップロードそれぞれの同時実行数. Defaults to 0.
+            max_retries (int, optional): レート制限時のリトライ回数. Defaults to 3.
+        """
+
+        self.max_retries = max_retries
+        self._executors: Optional[tuple[ThreadPoolExecutor, ThreadPoolExecutor]] = None
+        if workers > 0:
+            self._executors = (
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix="slack-post"),
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix="slack-upload"),
+            )
+        self._channels: dict[str, deque[tuple[Future, Callable[[], Any]]]] = {}
+        self._blocked_until: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._metrics = OutboundMetrics()
+
+    def submit(self, channel: str, func: Callable[[], Any]) -> Future:
+        """チャンネルの送信順を守って処理を投入する
+
+        Args:
+            channel (str): チャンネルID
+            func (Callable[[], Any]): 送信処理
+
+        Returns:
+            Future: 処理結果
+        """
+
+        future: Future = Future()
+        with self._lock:
+            self._metrics.submitted += 1
+            if self._executors is None:
+                pending = None
+            else:
+                pending = self._channels.get(channel)
+                if pending is None:  # 送信中のものがなければ新しく処理を始める
+                    self._channels[channel] = deque([(future, func)])
+                    self._executors[0].submit(self._drain, channel)
+                else:
+                    pending.append((future, func))
+                return future
+
+        self._resolve(future, func)
+        return future
+
+    def submit_unordered(self, func: Callable[[], Any]) -> Future:
+        """順序を問わない処理(アップロードなど)を投入する
+
+        Args:
+            func (Callable[[], Any]): 実行する処理
+
+        Returns:
+            Future: 処理結果
+        """
+
+        with self._lock:
+            self._metrics.submitted += 1
+
+        if self._executors is None:
+            future: Future = Future()
+            self._resolve(future, func)
+            return future
+        return self._executors[1].submit(func)
+
+    def call(self, method: str, func: Callable[[], Any]) -> Any:
+        """レート制限を考慮してAPIを呼び出す
+
+        Args:
+            method (str): APIメソッド名(レート制限の単位)
+            func (Callable[[], Any]): API呼び出し
+
+        Raises:
+            Exception: リトライ後も失敗した場合は最後の例外
+
+        Returns:
+            Any: API response
+        """
+
+        attempt = 0
+        while True:
+            self._wait(method)
+            started = time.perf_counter()
+            try:
+                ret = func()
+            except Exception as err:
+                delay = retry_after(err)
+                with self._lock:
+                    if delay is None or attempt >= self.max_retries:
+                        self._metrics.failed += 1
+                        raise
+                    self._metrics.rate_limited += 1
+                    self._metrics.retried += 1
+                    self._blocked_until[method] = max(self._blocked_until.get(method, 0.0), time.monotonic() + delay)
+                attempt += 1
+                logging.warning("slack rate limited: method=%s, retry_after=%.1fs, attempt=%s", method, delay, attempt)
+                continue
+
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._metrics.sent += 1
+                self._metrics.call_total += elapsed
+                self._metrics.call_max = max(self._metrics.call_max, elapsed)
+            return ret
+
+    def metrics(self) -> dict[str, Any]:
+        """計測値を返す
+
+        Returns:
+            dict[str, Any]: 計測値
+        """
+
+        with self._lock:
+            return self._metrics.to_dict()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """送信キューを停止する
+
+        Args:
+            wait (bool, optional): 送信待ちの処理の完了を待つ. Defaults to True.
+        """
+
+        if self._executors:
+            for executor in self._executors:
+                executor.shutdown(wait=wait)
+        logging.info("outbound metrics: %s", self.metrics())
+
+    def _drain(self, channel: str) -> None:
+        """チャンネルの送信待ちがなくなるまで順に処理する
+
+        Args:
+            channel (str): チャンネルID
+        """
+
+        while True:
+            with self._lock:
+                pending = self._channels[channel]
+                if not pending:
+                    del self._channels[channel]
+                    return
+                future, func = pending.popleft()
+            self._resolve(future, func)
+
+    def _wait(self, method: str) -> None:
+        """レート制限中のAPIメソッドであれば解除まで待つ
+
+        Args:
+            method (str): APIメソッド名
+        """
+
+        with self._lock:
+            delay = self._blocked_until.get(method, 0.0) - time.monotonic()
+            if delay > 0:
+                self._metrics.backoff_total += delay
+        if delay > 0:
+            time.sleep(delay)
+
+    @staticmethod
+    def _resolve(future: Future, func: Callable[[], Any]) -> None:
+        """処理を実行して結果を設定する
+
+        Args:
+            future (Future): 結果の設定先
+            func (Callable[[], Any]): 実行する処理
+        """
+
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func())
+        except Exception as err:  # 呼び出し元で受け取る
+            future.set_exception(err)
@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING
 
 from integrations.base.interface import AdapterInterface
 from integrations.web.api import AdapterAPI
+from integrations.web.cache import ResponseCache
 from integrations.web.config import SvcConfig
 from integrations.web.functions import SvcFunctions
 from integrations.web.parser import MessageParser
@@ -24,3 +25,4 @@ class ServiceAdapter(AdapterInterface[SvcConfig, AdapterAPI, SvcFunctions, Messa
         self.api = AdapterAPI()
         self.functions = SvcFunctions()
         self.parser = MessageParser
+        self.cache = ResponseCache(self.conf.response_cache)
@@ -0,0 +1,126 @@
+"""
+integrations/web/cache.py
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Optional
+
+from libs.data import data_version
+
+if TYPE_CHECKING:
+    from libs.data.data_version import DataChange
+
+
+class ResponseCache:
+    """ページ本文のキャッシュ
+
+    エンドポイント、正規化したcookie(フォーム)の指定内容、データバージョン、集計日時(時単位)をキーにする。
+    データの変更通知を受けるとすべてのエントリを破棄する。
+    """
+
+    def __init__(self, maxsize: int):
+        """キャッシュの初期化
+
+        Args:
+            maxsize (int): 保持するページ数(0は無効)
+        """
+
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+        data_version.subscribe(self.on_change)
+
+    @property
+    def enabled(self) -> bool:
+        """キャッシュが有効か"""
+
+        return self.maxsize > 0
+
+    def etag(self, endpoint: str, options: dict) -> str:
+        """キャッシュキー(ETag)を生成する
+
+        相対指定の集計範囲(今月、今日など)が日付の切り替わりで変わるため、現在時刻(時単位)をキーに含める。
+
+        Args:
+            endpoint (str): エンドポイント名
+            options (dict): cookie/フォームの指定内容
+
+        Returns:
+            str: ETag値(引用符なし)
+        """
+
+        normalized = sorted((k, " ".join(str(v).split())) for k, v in options.items() if str(v).strip())
+        source = repr((endpoint, normalized, data_version.current(), time.strftime("%Y%m%d%H")))
+        return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """キャッシュを参照する
+
+        Args:
+            key (str): キャッシュキー
+
+        Returns:
+            Optional[str]: ページ本文(未登録は`None`)
+        """
+
+        with self._lock:
+            if (body := self._entries.get(key)) is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: str, body: str) -> None:
+        """キャッシュに登録する
+
+        Args:
+            key (str): キャッシュキー
+            body (str): ページ本文
+        """
+
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_build(self, key: str, build: Callable[[], str]) -> str:
+        """キャッシュを参照し、なければ生成して登録する
+
+        Args:
+            key (str): キャッシュキー
+            build (Callable[[], str]): ページ本文の生成処理
+
+        Returns:
+            str: ページ本文
+        """
+
+        if not self.enabled:
+            return build()
+
+        if (body := self.get(key)) is None:
+            body = build()
+            self.put(key, body)
+        logging.debug("response cache: hits=%s, misses=%s, entries=%s", self.hits, self.misses, len(self._entries))
+        return body
+
+    def on_change(self, change: "DataChange") -> None:
+        """データの変更通知を受けてエントリを破棄する
+
+        Args:
+            change (DataChange): 変更通知
+        """
+
+        with self._lock:
+            self._entries.clear()
+        logging.debug("response cache cleared: version=%s", change.version)
@@ -23,6 +23,12 @@ class SvcConfig(BaseSection, IntegrationsConfig):
     """起動アドレス(未指定はコマンドライン引数デフォルト値)"""
     port: int = field(default=0)
     """起動ポート(未指定はコマンドライン引数デフォルト値)"""
+    workers: int = field(default=0)
+    """リクエストを処理するワーカープロセス数
+
+    - *0*: Flask組み込みの開発用サーバーで起動する
+    - *1以上*: 指定数のプロセスをプリフォークして並列に処理する
+    """
 
     # 認証
     require_auth: bool = field(default=False)
@@ -58,6 +64,9 @@ class SvcConfig(BaseSection, IntegrationsConfig):
     custom_css: str = field(default="")
     """ユーザー指定CSSファイル"""
 
+    response_cache: int = field(default=32)
+    """成績サマリ/グラフ/ランキングのページを保持する数(0はキャッシュしない)"""
+
     plotting_backend: Literal["matplotlib", "plotly"] = field(default="plotly")
 
     def __post_init__(self):
@@ -72,6 +81,9 @@ class SvcConfig(BaseSection, IntegrationsConfig):
         if not self.port:
             self.port = g.args.port
 
+        if self.workers < 0:
+            self.workers = 0
+
         if not all([self.username, self.password]):
             self.require_auth = False
 
@@ -6,10 +6,11 @@ from dataclasses import asdict
 from typing import TYPE_CHECKING
 
 import pandas as pd
-from flask import Blueprint, abort, current_app, request
+from flask import Blueprint, abort, current_app, render_template, request
 
 import libs.dispatcher
 import libs.global_value as g
+from libs.utils import graphcache
 
 if TYPE_CHECKING:
     from integrations.web.adapter import ServiceAdapter
@@ -32,30 +33,32 @@ def ranking_bp(adapter: "ServiceAdapter") -> Blueprint:
         if not adapter.conf.view_ranking:
             abort(403)
 
-        padding = current_app.config["padding"]
-
-        m = adapter.parser()
         cookie_data = adapter.functions.get_cookie(request)
-        text = " ".join(cookie_data.values())
-        m.data.text = f"{g.cfg.ranking.commandword[0]} {text}"
-        libs.dispatcher.by_keyword(m)
 
-        message = adapter.functions.header_message(m)
+        def build() -> str:
+            padding = current_app.config["padding"]
+
+            m = adapter.parser()
+            text = " ".join(cookie_data.values())
+            m.data.text = f"{g.cfg.ranking.commandword[0]} {text}"
+            libs.dispatcher.by_keyword(m)
+            graphcache.release(m)  # 画像は表示しない
+
+            message = adapter.functions.header_message(m)
 
-        for data, options in m.post.message:
-            if not options.title.isnumeric() and options.title:
-                message += f"<h2>{options.title}</h2>\n"
+            for data, options in m.post.message:
+                if not options.title.isnumeric() and options.title:
+                    message += f"<h2>{options.title}</h2>\n"
 
-            if isinstance(data, pd.DataFrame):
-                show_index = options.show_index
-                message += adapter.functions.to_styled_html(data, padding, show_index)
+                if isinstance(data, pd.DataFrame):
+                    show_index = options.show_index
+                    message += adapter.functions.to_styled_html(data, padding, show_index)
 
-            if isinstance(data, str):
-                message += adapter.functions.to_text_html(data)
+                if isinstance(data, str):
+                    message += adapter.functions.to_text_html(data)
 
-        cookie_data.update(body=message, **asdict(adapter.conf))
-        page = adapter.functions.set_cookie("ranking.html", request, cookie_data)
+            return render_template("ranking.html", **dict(cookie_data, body=message, **asdict(adapter.conf)))
 
-        return page
+        return adapter.functions.cached_page(adapter.cache, "ranking", request, cookie_data, build)
 
     return bp
@@ -10,6 +10,7 @@ from flask import Blueprint, abort, current_app, request
 
 import libs.dispatcher
 import libs.global_value as g
+from libs.utils import graphcache
 
 if TYPE_CHECKING:
     from integrations.web.adapter import ServiceAdapter
@@ -39,6 +40,7 @@ def report_bp(adapter: "ServiceAdapter") -> Blueprint:
         text = " ".join(cookie_data.values())
         m.data.text = f"{g.cfg.report.commandword[0]} {text}"
         libs.dispatcher.by_keyword(m)
+        graphcache.release(m)  # 画像は表示しない
 
         message = adapter.functions.header_message(m)
 
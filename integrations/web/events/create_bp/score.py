@@ -42,28 +42,29 @@ def score_bp(adapter: "ServiceAdapter") -> Blueprint:
         m = adapter.parser()
 
         def score_table() -> str:
-            df = formatter.df_rename(
-                pd.read_sql(
-                    sql="""
-                select
-                    '<input type="radio" name="ts" value="' || ts || '">' as '#',
-                    playtime,
-                    p1_name, p1_str,
-                    p2_name, p2_str,
-                    p3_name, p3_str,
-                    p4_name, p4_str,
-                    comment, source
-                from
-                    result
-                order by
-                    ts desc
-                limit 0, 10
-                ;
-                """,
-                    con=dbutil.connection(g.cfg.setting.database_file),
-                ),
-                options=StyleOptions(),
-            )
+            with dbutil.reader() as conn:
+                df = formatter.df_rename(
+                    pd.read_sql(
+                        sql="""
+                    select
+                        '<input type="radio" name="ts" value="' || ts || '">' as '#',
+                        playtime,
+                        p1_name, p1_str,
+                        p2_name, p2_str,
+                        p3_name, p3_str,
+                        p4_name, p4_str,
+                        comment, source
+                    from
+                        result
+                    order by
+                        ts desc
+                    limit 0, 10
+                    ;
+                    """,
+                        con=conn,
+                    ),
+                    options=StyleOptions(),
+                )
 
             if not isinstance(df.columns, pd.MultiIndex):
                 new_columns = [tuple(col.split(" ")) if " " in col else ("", col) for col in df.columns]
@@ -83,7 +84,8 @@ def score_bp(adapter: "ServiceAdapter") -> Blueprint:
                 match request.form.get("action"):
                     case "modify":
                         sql = "select * from result where ts = :ts;"
-                        df = pd.read_sql(sql=sql, con=dbutil.connection(g.cfg.setting.database_file), params=data)
+                        with dbutil.reader() as conn:
+                            df = pd.read_sql(sql=sql, con=conn, params=data)
                         data.update(next(iter(df.T.to_dict().values())))
                         return render_template("score_input.html", **data)
                     case "delete":
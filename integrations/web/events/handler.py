@@ -9,6 +9,7 @@ from flask import Flask
 from flask_httpauth import HTTPBasicAuth  # type: ignore
 
 import libs.global_value as g
+from integrations.web import server
 from integrations.web.events import create_bp
 
 if TYPE_CHECKING:
@@ -18,6 +19,36 @@ if TYPE_CHECKING:
 def main(adapter: "ServiceAdapter"):
     """メイン処理"""
 
+    app = create_app(adapter)
+
+    if adapter.conf.use_ssl:
+        if not os.path.exists(adapter.conf.certificate):
+            raise FileNotFoundError("certificate file not found")
+        if not os.path.exists(adapter.conf.private_key):
+            raise FileNotFoundError("private key file not found")
+
+    if adapter.conf.workers > 0:
+        server.serve_prefork(app, adapter.conf)
+    elif adapter.conf.use_ssl:
+        app.run(
+            host=adapter.conf.host,
+            port=adapter.conf.port,
+            ssl_context=(adapter.conf.certificate, adapter.conf.private_key),
+        )
+    else:
+        app.run(host=adapter.conf.host, port=adapter.conf.port)
+
+
+def create_app(adapter: "ServiceAdapter") -> Flask:
+    """アプリケーションを生成する
+
+    Args:
+        adapter (ServiceAdapter): web用アダプタ
+
+    Returns:
+        Flask: WSGIアプリケーション
+    """
+
     app = Flask(
         __name__,
         static_folder=os.path.join(g.cfg.script_dir, "files/html/static"),
@@ -50,15 +81,4 @@ def main(adapter: "ServiceAdapter"):
             return auth.login_required(lambda: None)()
         return None
 
-    if adapter.conf.use_ssl:
-        if not os.path.exists(adapter.conf.certificate):
-            raise FileNotFoundError("certificate file not found")
-        if not os.path.exists(adapter.conf.private_key):
-            raise FileNotFoundError("private key file not found")
-        app.run(
-            host=adapter.conf.host,
-            port=adapter.conf.port,
-            ssl_context=(adapter.conf.certificate, adapter.conf.private_key),
-        )
-    else:
-        app.run(host=adapter.conf.host, port=adapter.conf.port)
+    return app
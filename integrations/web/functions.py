@@ -3,7 +3,7 @@ integrations/web/functions.py
 """
 
 import re
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable
 
 from flask import make_response, render_template
 
@@ -16,6 +16,7 @@ if TYPE_CHECKING:
     from flask import Request, Response
 
     from integrations.base.interface import MessageParserProtocol
+    from integrations.web.cache import ResponseCache
 
 
 class SvcFunctions(FunctionsInterface):
@@ -173,6 +174,18 @@ class SvcFunctions(FunctionsInterface):
         """
 
         page = make_response(render_template(html, **data))
+        self.apply_cookie(page, req)
+
+        return page
+
+    def apply_cookie(self, page: "Response", req: "Request"):
+        """フォームの送信内容をcookieに反映する
+
+        Args:
+            page (Response): Response
+            req (Request): Request
+        """
+
         if req.method == "POST":
             if req.form.get("action") == "reset":  # cookie削除
                 for k in req.cookies.keys():
@@ -183,6 +196,37 @@ class SvcFunctions(FunctionsInterface):
                         continue
                     page.set_cookie(k, v, path=req.path)
 
+    def cached_page(self, cache: "ResponseCache", endpoint: str, req: "Request", cookie_data: dict, build: Callable[[], str]) -> "Response":
+        """キャッシュを利用してページを返す
+
+        同じ指定内容でデータに変更がなければ生成済みのページを返す。
+        `If-None-Match`がETagと一致する場合は本文を返さない(304)。
+
+        Args:
+            cache (ResponseCache): レスポンスキャッシュ
+            endpoint (str): エンドポイント名
+            req (Request): Request
+            cookie_data (dict): cookieデータ
+            build (Callable[[], str]): ページ生成処理
+
+        Returns:
+            Response: Response
+        """
+
+        if not cache.enabled:
+            page = make_response(build())
+            self.apply_cookie(page, req)
+            return page
+
+        key = cache.etag(endpoint, cookie_data)
+        if req.method == "GET" and req.if_none_match.contains(key):
+            page = make_response("", 304)
+        else:
+            page = make_response(cache.get_or_build(key, build))
+            self.apply_cookie(page, req)
+        page.set_etag(key)
+        page.headers["Cache-Control"] = "no-cache"
+
         return page
 
     def get_cookie(self, req: "Request") -> dict:
@@ -0,0 +1,119 @@
+"""
+integrations/web/server.py
+"""
+
+import logging
+import os
+import signal
+import time
+from typing import TYPE_CHECKING, Optional
+
+from werkzeug.serving import make_server
+
+from libs.utils import dbutil
+
+if TYPE_CHECKING:
+    from flask import Flask
+    from werkzeug.serving import BaseWSGIServer
+
+    from integrations.web.config import SvcConfig
+
+
+def serve_prefork(app: "Flask", conf: "SvcConfig"):
+    """プリフォーク方式でアプリケーションを公開する
+
+    待ち受けソケットを作成してから`workers`個の子プロセスを起動し、各プロセスが1リクエストずつ処理する。
+    集計処理は共有の設定値を書き換えるため、プロセス単位で分離して並列化する。
+    異常終了した子プロセスは再起動する。
+
+    Args:
+        app (Flask): WSGIアプリケーション
+        conf (SvcConfig): web用設定
+    """
+
+    if not hasattr(os, "fork"):  # Windows
+        logging.warning("pre-fork is not supported on this platform. fallback to single process.")
+        app.run(host=conf.host, port=conf.port, ssl_context=_ssl_context(conf))
+        return
+
+    server = make_server(conf.host, conf.port, app, ssl_context=_ssl_context(conf))
+    server.multiprocess = True
+    dbutil.close_pool()  # 接続は子プロセスごとに作り直す
+
+    children: dict[int, int] = {}
+    for worker in range(conf.workers):
+        children[_spawn(server, worker)] = worker
+    logging.info("web server: workers=%s, listen=%s:%s, pid=%s", conf.workers, conf.host, conf.port, list(children))
+
+    def terminate(signum, frame):
+        _ = (signum, frame)
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, terminate)
+    try:
+        while True:
+            pid, status = os.wait()
+            if (worker := children.pop(pid, None)) is None:
+                continue
+            logging.warning("web worker exited: worker=%s, pid=%s, code=%s", worker, pid, os.waitstatus_to_exitcode(status))
+            time.sleep(1)  # 起動直後の異常終了で再起動を繰り返さないよう待機
+            children[_spawn(server, worker)] = worker
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        server.server_close()
+        logging.info("web server stopped")
+
+
+def _spawn(server: "BaseWSGIServer", worker: int) -> int:
+    """子プロセスを起動する
+
+    Args:
+        server (BaseWSGIServer): 待ち受け済みのサーバー
+        worker (int): ワーカー番号
+
+    Returns:
+        int: 子プロセスのPID
+    """
+
+    pid = os.fork()
+    if pid:
+        return pid
+
+    # 子プロセス(親のシグナルハンドラや後処理は引き継がない)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    code = 0
+    try:
+        logging.debug("web worker started: worker=%s, pid=%s", worker, os.getpid())
+        server.serve_forever()
+    except BaseException:
+        logging.exception("web worker failed: worker=%s", worker)
+        code = 1
+    finally:
+        os._exit(code)
+
+
+def _ssl_context(conf: "SvcConfig") -> Optional[tuple[str, str]]:
+    """SSLコンテキストの指定を返す
+
+    Args:
+        conf (SvcConfig): web用設定
+
+    Returns:
+        Optional[tuple[str, str]]: 証明書と秘密鍵のパス(HTTPS無効時は`None`)
+    """
+
+    if conf.use_ssl:
+        return (conf.certificate, conf.private_key)
+    return None
@@ -4,11 +4,12 @@ libs/commands/graph/personal.py
 
 from typing import TYPE_CHECKING
 
-import matplotlib.pyplot as plt
 import pandas as pd
 import plotly.express as px  # type: ignore
 import plotly.graph_objects as go  # type: ignore
 from matplotlib import gridspec
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
 from plotly.subplots import make_subplots  # type: ignore
 
 import libs.global_value as g
@@ -18,7 +19,7 @@ from libs.data import loader
 from libs.datamodels import GameInfo
 from libs.functions import compose, message
 from libs.types import StyleOptions
-from libs.utils import formatter, graphutil, textutil
+from libs.utils import downsample, formatter, graphcache, graphrender, graphutil
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -68,59 +69,85 @@ def plot(m: "MessageParserProtocol"):
 
     # --- グラフ生成
     graphutil.setup()
+    positions = downsample.select(df, ["point_sum"])  # 凡例/目盛は間引く前のデータから生成する
+    plot_df = df.iloc[positions].set_axis(positions)
     match g.adapter.conf.plotting_backend:
         case "plotly":
-            m.set_data(plotly_point(df, title_range, total_game_count), StyleOptions(title="通算ポイント"))
-            m.set_data(plotly_rank(df, title_range, total_game_count), StyleOptions(title="獲得順位"))
+            m.set_data(plotly_point(plot_df, title_range, total_game_count), StyleOptions(title="通算ポイント"))
+            m.set_data(plotly_rank(plot_df, title_range, total_game_count), StyleOptions(title="獲得順位"))
         case "matplotlib":
-            save_file = textutil.save_file_path("graph.png")
-            fig = plt.figure(figsize=(12, 8))
-            fig.suptitle(f"{title_text} {title_range}", fontsize=16)
-            fig.tight_layout()
-
-            grid = gridspec.GridSpec(nrows=2, ncols=1, height_ratios=[3, 1])
-            point_ax = fig.add_subplot(grid[0])
-            rank_ax = fig.add_subplot(grid[1], sharex=point_ax)
-
-            # ポイント
-            point_ax.plot(df["playtime"], df["point_sum"], marker="." if len(df) < 50 else None)
-            point_ax.plot(df["playtime"], df["point_avg"], marker="." if len(df) < 50 else None)
-            point_ax.bar(df["playtime"], df["point"], color="blue")
-
-            point_ax.tick_params(axis="x", which="both", labelbottom=False, bottom=False)
-            ylabs = point_ax.get_yticks()[1:-1]  # type: ignore[not-callable]
-            point_ax.set_yticks(ylabs, [str(int(ylab)).replace("-", "▲") for ylab in ylabs])  # type: ignore[not-callable]
-
-            point_ax.legend(
-                [f"通算ポイント ({point_sum}pt)", f"平均ポイント ({point_avg}pt)", "獲得ポイント"],
-                bbox_to_anchor=(1, 1),
-                loc="upper left",
-                borderaxespad=0.5,
+            spec = graphrender.PlotSpec(
+                draw=draw_personal,
+                data={
+                    "df": plot_df.filter(items=["playtime", "point_sum", "point_avg", "point", "rank", "rank_avg"]),
+                    "title": f"{title_text} {title_range}",
+                    "point_legend": [f"通算ポイント ({point_sum}pt)", f"平均ポイント ({point_avg}pt)", "獲得ポイント"],
+                    "rank_legend": ["獲得順位", f"平均順位 ({rank_avg})"],
+                    "xlabel": graphutil.gen_xlabel(len(df)),
+                    "xticks": graphutil.xticks_parameter(df["playtime"].to_list()),
+                    "mode": g.params.get("mode", 4),
+                },
+                figsize=(12, 8),
+                style=g.cfg.setting.graph_style,
             )
+            save_file = graphrender.save(spec, "graph.png")
+            m.set_data(save_file, StyleOptions(title=f"『{player}』の成績", use_comment=True, header_hidden=True, key_title=False))
+
 
-            point_ax.axhline(y=0, linewidth=0.5, ls="dashed", color="grey")
+def draw_personal(fig: Figure, data: dict) -> None:
+    """個人成績グラフ描写
 
-            # 順位
-            rank_ax.plot(df["playtime"], df["rank"], marker="." if len(df) < 50 else None)
-            rank_ax.plot(df["playtime"], df["rank_avg"], marker="." if len(df) < 50 else None)
+    Args:
+        fig (Figure): 描写先
+        data (dict): 描写データ
+    """
 
-            rank_ax.set_xlabel(graphutil.gen_xlabel(len(df)))
-            rank_ax.set_xticks(**graphutil.xticks_parameter(df["playtime"].to_list()))
-            rank_ax.set_yticks(list(range(1, g.params.get("mode", 4) + 1)))  # type: ignore[not-callable]
-            rank_ax.set_ylim(ymin=0.85, ymax=g.params.get("mode", 4) + 0.15)
-            rank_ax.invert_yaxis()
+    df: pd.DataFrame = data["df"]  # indexは間引く前の行位置
+    mode: int = data["mode"]
 
-            rank_ax.legend(
-                ["獲得順位", f"平均順位 ({rank_avg})"],
-                bbox_to_anchor=(1, 1),
-                loc="upper left",
-                borderaxespad=0.5,
-            )
+    fig.suptitle(data["title"], fontsize=16)
+    fig.tight_layout()
 
-            rank_ax.axhline(y=(1 + g.params.get("mode", 4)) / 2, linewidth=0.5, ls="dashed", color="grey")
+    grid = gridspec.GridSpec(nrows=2, ncols=1, height_ratios=[3, 1], figure=fig)
+    point_ax = fig.add_subplot(grid[0])
+    rank_ax = fig.add_subplot(grid[1], sharex=point_ax)
 
-            plt.savefig(save_file, bbox_inches="tight")
-            m.set_data(save_file, StyleOptions(title=f"『{player}』の成績", use_comment=True, header_hidden=True, key_title=False))
+    # ポイント
+    point_ax.plot(df.index, df["point_sum"], marker="." if len(df) < 50 else None)
+    point_ax.plot(df.index, df["point_avg"], marker="." if len(df) < 50 else None)
+    point_ax.bar(df.index, df["point"], color="blue")
+
+    point_ax.tick_params(axis="x", which="both", labelbottom=False, bottom=False)
+    ylabs = point_ax.get_yticks()[1:-1]  # type: ignore[not-callable]
+    point_ax.set_yticks(ylabs, [str(int(ylab)).replace("-", "▲") for ylab in ylabs])  # type: ignore[not-callable]
+
+    point_ax.legend(
+        data["point_legend"],
+        bbox_to_anchor=(1, 1),
+        loc="upper left",
+        borderaxespad=0.5,
+    )
+
+    point_ax.axhline(y=0, linewidth=0.5, ls="dashed", color="grey")
+
+    # 順位
+    rank_ax.plot(df.index, df["rank"], marker="." if len(df) < 50 else None)
+    rank_ax.plot(df.index, df["rank_avg"], marker="." if len(df) < 50 else None)
+
+    rank_ax.set_xlabel(data["xlabel"])
+    rank_ax.set_xticks(**data["xticks"])
+    rank_ax.set_yticks(list(range(1, mode + 1)))  # type: ignore[not-callable]
+    rank_ax.set_ylim(ymin=0.85, ymax=mode + 0.15)
+    rank_ax.invert_yaxis()
+
+    rank_ax.legend(
+        data["rank_legend"],
+        bbox_to_anchor=(1, 1),
+        loc="upper left",
+        borderaxespad=0.5,
+    )
+
+    rank_ax.axhline(y=(1 + mode) / 2, linewidth=0.5, ls="dashed", color="grey")
 
 
 def statistics_plot(m: "MessageParserProtocol"):
@@ -247,35 +274,57 @@ def statistics_plot(m: "MessageParserProtocol"):
             m.set_data(stats_df, StyleOptions(title="素点情報", show_index=True))
             m.set_data(plotly_box("素点分布", rpoint_df), StyleOptions(title="素点分布"))
         case "matplotlib":
-            fig = plt.figure(figsize=(20, 10))
-            fig.suptitle(title_text, size=20, weight="bold")
-            gs = gridspec.GridSpec(figure=fig, nrows=3, ncols=2)
+            spec = graphrender.PlotSpec(
+                draw=draw_statistics,
+                data={
+                    "title": title_text,
+                    "point_df": point_df,
+                    "count_df": count_df,
+                    "rank_table": rank_table,
+                    "rpoint_df": rpoint_df,
+                    "stats_df": stats_df,
+                    "total_index": total_index,
+                    "mode": g.params.get("mode", 4),
+                },
+                figsize=(20, 10),
+                style=g.cfg.setting.graph_style,
+            )
+            save_file = graphrender.save(spec, "graph.png")
+            m.set_data(save_file, StyleOptions(title="個人成績", use_comment=True, header_hidden=True))
 
-            ax_point1 = fig.add_subplot(gs[0, 0])
-            ax_point2 = fig.add_subplot(gs[0, 1])
-            ax_rank1 = fig.add_subplot(gs[1, 0])
-            ax_rank2 = fig.add_subplot(gs[1, 1])
-            ax_rpoint1 = fig.add_subplot(gs[2, 0])
-            ax_rpoint2 = fig.add_subplot(gs[2, 1])
 
-            plt.subplots_adjust(wspace=0.22, hspace=0.18)
+def draw_statistics(fig: Figure, data: dict) -> None:
+    """統計グラフ描写
 
-            # ポイントデータ
-            subplot_point(point_df, ax_point1)
-            subplot_table(count_df.filter(items=["ゲーム数", "区間ポイント", "区間平均", "通算ポイント"]), ax_point2)
+    Args:
+        fig (Figure): 描写先
+        data (dict): 描写データ
+    """
 
-            # 順位データ
-            subplot_rank(count_df.copy(), ax_rank1, total_index)
-            subplot_table(rank_table, ax_rank2)
+    fig.suptitle(data["title"], size=20, weight="bold")
+    gs = gridspec.GridSpec(figure=fig, nrows=3, ncols=2)
 
-            # 素点データ
-            subplot_box(rpoint_df, ax_rpoint1)
-            subplot_table(stats_df, ax_rpoint2)
+    ax_point1 = fig.add_subplot(gs[0, 0])
+    ax_point2 = fig.add_subplot(gs[0, 1])
+    ax_rank1 = fig.add_subplot(gs[1, 0])
+    ax_rank2 = fig.add_subplot(gs[1, 1])
+    ax_rpoint1 = fig.add_subplot(gs[2, 0])
+    ax_rpoint2 = fig.add_subplot(gs[2, 1])
 
-            save_file = textutil.save_file_path("graph.png")
-            plt.savefig(save_file, bbox_inches="tight")
+    fig.subplots_adjust(wspace=0.22, hspace=0.18)
 
-            m.set_data(save_file, StyleOptions(title="個人成績", use_comment=True, header_hidden=True))
+    # ポイントデータ
+    count_df: pd.DataFrame = data["count_df"]
+    subplot_point(data["point_df"], ax_point1)
+    subplot_table(count_df.filter(items=["ゲーム数", "区間ポイント", "区間平均", "通算ポイント"]), ax_point2)
+
+    # 順位データ
+    subplot_rank(count_df.copy(), ax_rank1, data["total_index"], data["mode"])
+    subplot_table(data["rank_table"], ax_rank2)
+
+    # 素点データ
+    subplot_box(data["rpoint_df"], ax_rpoint1)
+    subplot_table(data["stats_df"], ax_rpoint2)
 
 
 def get_data(df: pd.Series, interval: int) -> pd.DataFrame:
@@ -304,12 +353,12 @@ def get_data(df: pd.Series, interval: int) -> pd.DataFrame:
     return pd.DataFrame(rpoint_data)
 
 
-def subplot_box(df: pd.DataFrame, ax: plt.Axes) -> None:
+def subplot_box(df: pd.DataFrame, ax: Axes) -> None:
     """箱ひげ図を生成する
 
     Args:
         df (pd.DataFrame): プロットデータ
-        ax (plt.Axes): プロット先オブジェクト
+        ax (Axes): プロット先オブジェクト
     """
 
     p = [x + 1 for x in range(len(df.columns))]
@@ -333,12 +382,12 @@ def subplot_box(df: pd.DataFrame, ax: plt.Axes) -> None:
     ax.set_yticklabels([str(int(ylab)).replace("-", "▲") for ylab in ylabs])  # type: ignore[not-callable]
 
 
-def subplot_table(df: pd.DataFrame, ax: plt.Axes) -> None:
+def subplot_table(df: pd.DataFrame, ax: Axes) -> None:
     """テーブルを生成する
 
     Args:
         df (pd.DataFrame): プロットデータ
-        ax (plt.Axes): プロット先オブジェクト
+        ax (Axes): プロット先オブジェクト
     """
 
     # 有効桁数の調整
@@ -369,12 +418,12 @@ def subplot_table(df: pd.DataFrame, ax: plt.Axes) -> None:
     ax.axis("off")
 
 
-def subplot_point(df: pd.Series, ax: plt.Axes) -> None:
+def subplot_point(df: pd.Series, ax: Axes) -> None:
     """ポイントデータ
 
     Args:
         df (pd.Series): プロットデータ
-        ax (plt.Axes): プロット先オブジェクト
+        ax (Axes): プロット先オブジェクト
     """
 
     df.plot(  # レイアウト調整用ダミー
@@ -396,13 +445,14 @@ def subplot_point(df: pd.Series, ax: plt.Axes) -> None:
     ax.set_yticklabels([str(int(ylab)).replace("-", "▲") for ylab in ylabs])  # type: ignore[not-callable]
 
 
-def subplot_rank(df: pd.DataFrame, ax: plt.Axes, total_index: str) -> None:
+def subplot_rank(df: pd.DataFrame, ax: Axes, total_index: str, mode: int = 4) -> None:
     """順位データ
 
     Args:
         df (pd.DataFrame): プロットデータ
-        ax (plt.Axes): プロット先オブジェクト
+        ax (Axes): プロット先オブジェクト
         total_index (str): 合計値格納index
+        mode (int, optional): 集計モード. Defaults to 4.
     """
 
     df["1位(%)"] = df["1位(%)"] * 100
@@ -415,17 +465,17 @@ def subplot_rank(df: pd.DataFrame, ax: plt.Axes, total_index: str) -> None:
         ax=ax_rank_avg,
         kind="line",
         ylabel="平均順位",
-        yticks=list(range(1, g.params.get("mode", 4) + 1)),
-        ylim=[0.85, g.params.get("mode", 4) + 0.15],
+        yticks=list(range(1, mode + 1)),
+        ylim=[0.85, mode + 0.15],
         marker="o",
         color="b",
         legend=False,
         grid=False,
     )
     ax_rank_avg.invert_yaxis()
-    ax_rank_avg.axhline(y=(1 + g.params.get("mode", 4)) / 2, linewidth=0.5, ls="dashed", color="grey")
+    ax_rank_avg.axhline(y=(1 + mode) / 2, linewidth=0.5, ls="dashed", color="grey")
 
-    filter_items = ["1位(%)", "2位(%)", "3位(%)", "4位(%)"][: g.params.get("mode", 4)]
+    filter_items = ["1位(%)", "2位(%)", "3位(%)", "4位(%)"][: mode]
     df.filter(items=filter_items).drop(index=total_index).plot(
         ax=ax,
         kind="bar",
@@ -459,7 +509,6 @@ def plotly_point(df: pd.DataFrame, title_range: str, total_game_count: int) -> "
         Path: 保存先ファイルパス
     """
 
-    save_file = textutil.save_file_path("point.html")
 
     fig = go.Figure()
     fig.add_trace(
@@ -508,8 +557,7 @@ def plotly_point(df: pd.DataFrame, title_range: str, total_game_count: int) -> "
         },
     )
 
-    fig.write_html(save_file, full_html=False)
-    return save_file
+    return graphcache.save_plotly(fig, "point.html")
 
 
 def plotly_rank(df: pd.DataFrame, title_range: str, total_game_count: int) -> "Path":
@@ -524,7 +572,6 @@ def plotly_rank(df: pd.DataFrame, title_range: str, total_game_count: int) -> "P
         Path: 保存先ファイルパス
     """
 
-    save_file = textutil.save_file_path("rank.html")
 
     fig = go.Figure()
     fig.add_trace(
@@ -584,8 +631,7 @@ def plotly_rank(df: pd.DataFrame, title_range: str, total_game_count: int) -> "P
         layer="below",
     )
 
-    fig.write_html(save_file, full_html=False)
-    return save_file
+    return graphcache.save_plotly(fig, "rank.html")
 
 
 def plotly_line(title_text: str, df: pd.Series) -> "Path":
@@ -599,7 +645,6 @@ def plotly_line(title_text: str, df: pd.Series) -> "Path":
         Path: 保存先ファイルパス
     """
 
-    save_file = textutil.save_file_path("point.html")
 
     fig = go.Figure()
     fig.add_traces(
@@ -632,8 +677,7 @@ def plotly_line(title_text: str, df: pd.Series) -> "Path":
         tickformat="d",
     )
 
-    fig.write_html(save_file, full_html=False)
-    return save_file
+    return graphcache.save_plotly(fig, "point.html")
 
 
 def plotly_box(title_text: str, df: pd.DataFrame) -> "Path":
@@ -647,7 +691,6 @@ def plotly_box(title_text: str, df: pd.DataFrame) -> "Path":
         Path: 保存先ファイルパス
     """
 
-    save_file = textutil.save_file_path("rpoint.html")
     fig = px.box(df)
     fig.update_layout(
         title={
@@ -678,8 +721,7 @@ def plotly_box(title_text: str, df: pd.DataFrame) -> "Path":
         layer="below",
     )
 
-    fig.write_html(save_file, full_html=False)
-    return save_file
+    return graphcache.save_plotly(fig, "rpoint.html")
 
 
 def plotly_bar(title_text: str, df: pd.DataFrame) -> "Path":
@@ -693,7 +735,6 @@ def plotly_bar(title_text: str, df: pd.DataFrame) -> "Path":
         Path: 保存先ファイルパス
     """
 
-    save_file = textutil.save_file_path("rank.html")
 
     fig = make_subplots(specs=[[{"secondary_y": True}]])
     # 獲得率
@@ -755,5 +796,4 @@ def plotly_bar(title_text: str, df: pd.DataFrame) -> "Path":
         zeroline=False,
     )
 
-    fig.write_html(save_file, full_html=False)
-    return save_file
+    return graphcache.save_plotly(fig, "rank.html")
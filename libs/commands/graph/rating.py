@@ -4,7 +4,6 @@ libs/commands/graph/rating.py
 
 from typing import TYPE_CHECKING
 
-import matplotlib.pyplot as plt
 import plotly.express as px  # type: ignore
 
 import libs.global_value as g
@@ -13,12 +12,13 @@ from libs.data import aggregate, loader
 from libs.datamodels import GameInfo
 from libs.functions import compose, message
 from libs.types import StyleOptions
-from libs.utils import formatter, graphutil, textutil
+from libs.utils import formatter, graphcache, graphrender, graphutil
 
 if TYPE_CHECKING:
     from pathlib import Path
 
     import pandas as pd
+    from matplotlib.figure import Figure
 
     from integrations.protocols import MessageParserProtocol
 
@@ -93,7 +93,6 @@ def _graph_generation(game_info: GameInfo, df: "pd.DataFrame", filename: str) ->
         Path: 保存先ファイル名
     """
 
-    save_file = textutil.save_file_path(filename)
     title_text, xlabel_text = _graph_title(game_info)
     legend_text = []
     count = 1
@@ -101,28 +100,49 @@ def _graph_generation(game_info: GameInfo, df: "pd.DataFrame", filename: str) ->
         legend_text.append(f"{count:2d}位：{name} （{rate:.1f}）")
         count += 1
 
-    # ---
-    df.plot(
+    spec = graphrender.PlotSpec(
+        draw=_draw,
+        data={
+            "df": df,
+            "title_text": title_text,
+            "xlabel_text": xlabel_text,
+            "legend_text": legend_text,
+            "xticks": graphutil.xticks_parameter(df[1:].index.to_list()),
+        },
         figsize=(21, 7),
-        xlabel=xlabel_text,
+        style=g.cfg.setting.graph_style,
+    )
+    return graphrender.save(spec, filename)
+
+
+def _draw(fig: "Figure", data: dict) -> None:
+    """レーティング推移グラフ描写
+
+    Args:
+        fig (Figure): 描写先
+        data (dict): 描写データ
+    """
+
+    df: "pd.DataFrame" = data["df"]
+    ax = fig.add_subplot()
+    df.plot(
+        ax=ax,
+        xlabel=data["xlabel_text"],
         ylabel="レート",
         marker="." if len(df) < 20 else None,
         linewidth=2 if len(df) < 40 else 1,
     )
-    plt.title(title_text, fontsize=16)
-    plt.legend(
-        legend_text,
+    ax.set_title(data["title_text"], fontsize=16)
+    ax.legend(
+        data["legend_text"],
         bbox_to_anchor=(1, 1),
         loc="upper left",
         borderaxespad=0.5,
         ncol=int(len(df.columns) / 25 + 1),
     )
 
-    plt.xticks(**graphutil.xticks_parameter(df[1:].index.to_list()))
-    plt.axhline(y=1500, linewidth=0.5, ls="dashed", color="grey")
-
-    plt.savefig(save_file, bbox_inches="tight")
-    return save_file
+    ax.set_xticks(**data["xticks"])
+    ax.axhline(y=1500, linewidth=0.5, ls="dashed", color="grey")
 
 
 def _graph_generation_plotly(game_info: GameInfo, df: "pd.DataFrame", filename: str) -> "Path":
@@ -137,7 +157,6 @@ def _graph_generation_plotly(game_info: GameInfo, df: "pd.DataFrame", filename:
         Path: 保存先ファイル名
     """
 
-    save_file = textutil.save_file_path(filename)
     # グラフタイトル/ラベル
     title_text, xlabel_text = _graph_title(game_info)
     # 凡例用テキスト
@@ -182,8 +201,7 @@ def _graph_generation_plotly(game_info: GameInfo, df: "pd.DataFrame", filename:
     if len(fig.data) > 40:
         fig.update_traces(mode="lines", line={"width": 1})  # ラインを細く
 
-    fig.write_html(save_file, full_html=False)
-    return save_file
+    return graphcache.save_plotly(fig, filename)
 
 
 def _graph_title(game_info: GameInfo) -> tuple[str, str]:
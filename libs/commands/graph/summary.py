@@ -5,7 +5,6 @@ libs/commands/graph/summary.py
 import logging
 from typing import TYPE_CHECKING, Literal, Optional, TypedDict
 
-import matplotlib.pyplot as plt
 import pandas as pd
 import plotly.express as px  # type: ignore
 
@@ -15,11 +14,13 @@ from libs.data import loader
 from libs.datamodels import GameInfo
 from libs.functions import compose, message
 from libs.types import StyleOptions
-from libs.utils import formatter, graphutil, textutil
+from libs.utils import downsample, formatter, graphcache, graphrender, graphutil
 
 if TYPE_CHECKING:
     from pathlib import Path
 
+    from matplotlib.figure import Figure
+
     from integrations.protocols import MessageParserProtocol
 
 
@@ -199,7 +200,6 @@ def _graph_generation(graph_params: GraphParams) -> "Path":
         Path: 保存先ファイル名
     """
 
-    save_file = textutil.save_file_path(graph_params["save_file"])
     target_data = graph_params["target_data"]
     df = graph_params["pivot"]
 
@@ -217,73 +217,103 @@ def _graph_generation(graph_params: GraphParams) -> "Path":
             {"point": target_data["last_point"].to_list()[::-1]},
             index=target_data["legend"].to_list()[::-1],
         )
+        logging.debug("plot data:\n%s", tmpdf)
+        data: dict = {"df": tmpdf, "color": color[::-1]}
+        figsize = (8, 2 + tmpdf.count().iloc[0] / 5)
+    else:
+        _graph_title(graph_params)
+        logging.debug("plot data:\n%s", df)
+        positions = downsample.select(df)
+        data = {
+            "df": df.iloc[positions].set_axis(positions),  # 目盛に合わせて間引く前の行位置で描写
+            "legend": target_data["legend"].to_list(),
+            "xticks": graphutil.xticks_parameter(df.index.to_list()),
+        }
+        figsize = (8, 6)
+
+    data.update(
+        graph_type=graph_params["graph_type"],
+        title_text=graph_params["title_text"],
+        xlabel_text=graph_params["xlabel_text"],
+        ylabel_text=graph_params["ylabel_text"],
+    )
+    spec = graphrender.PlotSpec(draw=_draw, data=data, figsize=figsize, style=g.cfg.setting.graph_style)
+    return graphrender.save(spec, graph_params["save_file"])
+
+
+def _draw(fig: "Figure", data: dict) -> None:
+    """グラフ描写(matplotlib用)
+
+    Args:
+        fig (Figure): 描写先
+        data (dict): 描写データ
+    """
+
+    df: pd.DataFrame = data["df"]
+    ax = fig.add_subplot()
 
-        tmpdf.plot.barh(
-            figsize=(8, 2 + tmpdf.count().iloc[0] / 5),
+    if data["graph_type"] == "point_hbar":
+        df.plot.barh(
+            ax=ax,
             y="point",
-            xlabel=graph_params["xlabel_text"],
-            color=color[::-1],
-        ).get_figure()
+            xlabel=data["xlabel_text"],
+            color=data["color"],
+        )
 
-        plt.legend().remove()
-        plt.gca().yaxis.tick_right()
+        legend = ax.get_legend()
+        if legend is not None:
+            legend.remove()
+        ax.yaxis.tick_right()
 
         # X軸修正
-        xlocs, xlabs = plt.xticks()
-        new_xlabs = [xlab.get_text().replace("−", "▲") for xlab in xlabs]
-        plt.xticks(list(xlocs[1:-1]), new_xlabs[1:-1])
-
-        logging.debug("plot data:\n%s", tmpdf)
+        xlocs = ax.get_xticks()
+        new_xlabs = [xlab.get_text().replace("−", "▲") for xlab in ax.get_xticklabels()]
+        ax.set_xticks(list(xlocs[1:-1]), new_xlabs[1:-1])
     else:
-        _graph_title(graph_params)
         df.plot(
-            figsize=(8, 6),
-            xlabel=str(graph_params["xlabel_text"]),
-            ylabel=str(graph_params["ylabel_text"]),
+            ax=ax,
+            xlabel=str(data["xlabel_text"]),
+            ylabel=str(data["ylabel_text"]),
             marker="." if len(df) < 20 else None,
             linewidth=2 if len(df) < 40 else 1,
-        ).get_figure()
+        )
 
         # 凡例
-        plt.legend(
-            target_data["legend"].to_list(),
+        ax.legend(
+            data["legend"],
             bbox_to_anchor=(1, 1),
             loc="upper left",
             borderaxespad=0.5,
-            ncol=int(len(target_data) / 20 + 1),
+            ncol=int(len(data["legend"]) / 20 + 1),
         )
 
         # X軸修正
-        plt.xticks(**graphutil.xticks_parameter(df.index.to_list()))
+        ax.set_xticks(**data["xticks"])
 
         # Y軸修正
-        ylocs, ylabs = plt.yticks()
-        new_ylabs = [ylab.get_text().replace("−", "▲") for ylab in ylabs]
-        plt.yticks(list(ylocs[1:-1]), new_ylabs[1:-1])
-        logging.debug("plot data:\n%s", df)
+        ylocs = ax.get_yticks()
+        new_ylabs = [ylab.get_text().replace("−", "▲") for ylab in ax.get_yticklabels()]
+        ax.set_yticks(list(ylocs[1:-1]), new_ylabs[1:-1])
 
     # メモリ調整
-    match graph_params["graph_type"]:
+    match data["graph_type"]:
         case "point_hbar":
-            plt.axvline(x=0, linewidth=0.5, ls="dashed", color="grey")
+            ax.axvline(x=0, linewidth=0.5, ls="dashed", color="grey")
         case "point":
-            plt.axhline(y=0, linewidth=0.5, ls="dashed", color="grey")
+            ax.axhline(y=0, linewidth=0.5, ls="dashed", color="grey")
         case "rank":
-            lab = range(len(target_data) + 1)
+            lab = range(len(data["legend"]) + 1)
             if len(lab) > 10:
-                plt.yticks(list(map(int, lab))[1::2], list(map(str, lab))[1::2])
+                ax.set_yticks(list(map(int, lab))[1::2], list(map(str, lab))[1::2])
             else:
-                plt.yticks(list(map(int, lab))[1:], list(map(str, lab))[1:])
-            plt.gca().invert_yaxis()
+                ax.set_yticks(list(map(int, lab))[1:], list(map(str, lab))[1:])
+            ax.invert_yaxis()
 
-    plt.title(
-        graph_params["title_text"],
+    ax.set_title(
+        data["title_text"],
         fontsize=16,
     )
 
-    plt.savefig(save_file, bbox_inches="tight")
-    return save_file
-
 
 def _graph_generation_plotly(graph_params: GraphParams) -> "Path":
     """グラフ生成共通処理(plotly用)
@@ -295,7 +325,6 @@ def _graph_generation_plotly(graph_params: GraphParams) -> "Path":
         Path: 保存先ファイル名
     """
 
-    save_file = textutil.save_file_path(graph_params["save_file"])
     target_data = graph_params["target_data"]
     df = graph_params["pivot"]
 
@@ -314,6 +343,7 @@ def _graph_generation_plotly(graph_params: GraphParams) -> "Path":
             y=target_data["legend"],
         )
     else:
+        df = df.iloc[downsample.select(df)]
         df.columns = target_data["legend"].to_list()  # 凡例用ラベル生成
         fig = px.line(df, markers=True)
 
@@ -378,8 +408,7 @@ def _graph_generation_plotly(graph_params: GraphParams) -> "Path":
             if len(fig.data) > 40:
                 fig.update_traces(mode="lines", line={"width": 1})
 
-    fig.write_html(save_file, full_html=False)
-    return save_file
+    return graphcache.save_plotly(fig, graph_params["save_file"])
 
 
 def _graph_title(graph_params: GraphParams):
@@ -23,7 +23,9 @@ def main(m: "MessageParserProtocol"):
     m.status.command_type = CommandType.REPORT
     g.params = dictutil.placeholder(g.cfg.report, m)
 
-    if len(g.params["player_list"]) == 1:  # 成績レポート
+    if g.params.get("batch"):  # 成績レポート(全メンバー)
+        report.stats_report.gen_batch(m)
+    elif len(g.params["player_list"]) == 1:  # 成績レポート
         report.stats_report.gen_pdf(m)
     elif g.params.get("order"):
         report.winner.plot(m)
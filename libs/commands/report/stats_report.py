@@ -4,12 +4,20 @@ libs/commands/report/results_report.py
 
 import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from io import BytesIO
-from typing import TYPE_CHECKING, Literal, cast
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Literal, Optional, cast
+from zipfile import ZIP_DEFLATED, ZipFile
 
-import matplotlib.font_manager as fm
-import matplotlib.pyplot as plt
 import pandas as pd
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_LEFT, TA_RIGHT
@@ -19,22 +27,127 @@ from reportlab.lib.units import mm
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.platypus import Image, LongTable, PageBreak, Paragraph, SimpleDocTemplate, Spacer, TableStyle
+from tqdm import tqdm
 
 import libs.global_value as g
+from cls.context import QueryContext
 from cls.timekit import Format
 from libs.data import lookup
 from libs.functions import message
 from libs.types import StyleOptions
-from libs.utils import dbutil, formatter
+from libs.utils import dbutil, formatter, graphrender
 
 if TYPE_CHECKING:
+    import sqlite3
+
+    from matplotlib.figure import Figure
+
     from cls.timekit import ExtendedDatetime as ExtDt
     from integrations.protocols import MessageParserProtocol
 
 
-def get_game_results() -> list:
+@dataclass
+class SectionTiming:
+    """セクション単位の処理時間(秒)"""
+
+    name: str
+    """セクション名"""
+    query: float = 0.0
+    """SQLの実行時間"""
+    render: float = 0.0
+    """グラフの描写時間"""
+    total: float = 0.0
+    """セクション全体の処理時間"""
+
+    def __str__(self) -> str:
+        return f"{self.name}={self.total:.2f}s(query={self.query:.2f}s, render={self.render:.2f}s)"
+
+
+_timing: ContextVar[Optional[SectionTiming]] = ContextVar("report_timing", default=None)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_workers: int = 0
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """セクション生成用ワーカーを返す(設定が変わった場合は作り直す)
+
+    スレッドごとのDB接続を使い回すため、`close_executor()`を呼ぶまで常駐させる。
+
+    Returns:
+        ThreadPoolExecutor: セクション生成用ワーカー
+    """
+
+    global _executor, _executor_workers
+
+    workers = max(g.cfg.setting.report_workers, 1)
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report")
+            _executor_workers = workers
+        return _executor
+
+
+def close_executor() -> None:
+    """セクション生成用ワーカーを停止する"""
+
+    global _executor, _executor_workers
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+        _executor = None
+        _executor_workers = 0
+
+
+@contextmanager
+def _measure(kind: Literal["query", "render"]) -> Iterator[None]:
+    """実行中のセクションに処理時間を加算する
+
+    Args:
+        kind (Literal["query", "render"]): 計測区分
+    """
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if (timing := _timing.get()) is not None:
+            setattr(timing, kind, getattr(timing, kind) + time.perf_counter() - start)
+
+
+def _run_section(name: str, func: Callable[..., list], *args: Any) -> tuple[list, SectionTiming]:
+    """セクションを生成する
+
+    Args:
+        name (str): セクション名
+        func (Callable[..., list]): 生成関数
+
+    Returns:
+        tuple[list, SectionTiming]: 生成内容と処理時間
+    """
+
+    timing = SectionTiming(name)
+    token = _timing.set(timing)
+    start = time.perf_counter()
+    try:
+        elements = func(*args)
+    finally:
+        timing.total = time.perf_counter() - start
+        _timing.reset(token)
+
+    return elements, timing
+
+
+def get_game_results(conn: "sqlite3.Connection") -> list:
     """月/年単位のゲーム結果集計
 
+    Args:
+        conn (sqlite3.Connection): DB接続
+
     Returns:
         list: 集計結果のリスト
     """
@@ -44,11 +157,11 @@ def get_game_results() -> list:
     if "endtime" in g.params:
         g.params.update({"endtime": cast("ExtDt", g.params["endtime"]).format(Format.SQL)})
 
-    resultdb = dbutil.connection(g.cfg.setting.database_file)
-    rows = resultdb.execute(
-        dbutil.query_modification(dbutil.query("REPORT_PERSONAL_DATA")),
-        g.params,
-    )
+    with _measure("query"):
+        rows = conn.execute(
+            dbutil.query_modification(dbutil.query("REPORT_PERSONAL_DATA")),
+            g.params,
+        ).fetchall()
 
     # --- データ収集
     results = [
@@ -71,7 +184,7 @@ def get_game_results() -> list:
         ]
     ]
 
-    for row in rows.fetchall():
+    for row in rows:
         if row["ゲーム数"] == 0:
             break
 
@@ -95,7 +208,6 @@ def get_game_results() -> list:
             ]
         )
     logging.debug("return record: %s", len(results))
-    resultdb.close()
 
     if len(results) == 1:  # ヘッダのみ
         return []
@@ -103,10 +215,11 @@ def get_game_results() -> list:
     return results
 
 
-def get_count_results(game_count: int) -> list:
+def get_count_results(conn: "sqlite3.Connection", game_count: int) -> list:
     """指定間隔区切りのゲーム結果集計
 
     Args:
+        conn (sqlite3.Connection): DB接続
         game_count (int): 区切るゲーム数
 
     Returns:
@@ -114,11 +227,11 @@ def get_count_results(game_count: int) -> list:
     """
 
     g.params.update({"interval": game_count})
-    resultdb = dbutil.connection(g.cfg.setting.database_file)
-    rows = resultdb.execute(
-        dbutil.query_modification(dbutil.query("REPORT_COUNT_DATA")),
-        g.params,
-    )
+    with _measure("query"):
+        rows = conn.execute(
+            dbutil.query_modification(dbutil.query("REPORT_COUNT_DATA")),
+            g.params,
+        ).fetchall()
 
     # --- データ収集
     results = [
@@ -142,7 +255,7 @@ def get_count_results(game_count: int) -> list:
         ]
     ]
 
-    for row in rows.fetchall():
+    for row in rows:
         if row["ゲーム数"] == 0:
             break
 
@@ -167,7 +280,6 @@ def get_count_results(game_count: int) -> list:
             ]
         )
     logging.debug("return record: %s", len(results))
-    resultdb.close()
 
     if len(results) == 1:  # ヘッダのみ
         return []
@@ -175,30 +287,30 @@ def get_count_results(game_count: int) -> list:
     return results
 
 
-def get_count_moving(game_count: int) -> list:
+def get_count_moving(conn: "sqlite3.Connection", game_count: int) -> list:
     """移動平均を取得する
 
     Args:
+        conn (sqlite3.Connection): DB接続
         game_count (int): 平滑化するゲーム数
 
     Returns:
         list: 集計結果のリスト
     """
 
-    resultdb = dbutil.connection(g.cfg.setting.database_file)
     g.params.update({"interval": game_count})
-    rows = resultdb.execute(
-        dbutil.query_modification(dbutil.query("REPORT_COUNT_MOVING")),
-        g.params,
-    )
+    with _measure("query"):
+        rows = conn.execute(
+            dbutil.query_modification(dbutil.query("REPORT_COUNT_MOVING")),
+            g.params,
+        ).fetchall()
 
     # --- データ収集
     results = []
-    for row in rows.fetchall():
+    for row in rows:
         results.append(dict(row))
 
     logging.debug("return record: %s", len(results))
-    resultdb.close()
 
     return results
 
@@ -217,42 +329,50 @@ def graphing_mean_rank(df: pd.DataFrame, title: str, whole: bool = False) -> Byt
         BytesIO: 画像データ
     """
 
-    imgdata = BytesIO()
+    return _render(draw_mean_rank, {"df": df, "title": title, "whole": whole}, (12, 5))
+
+
+def draw_mean_rank(fig: "Figure", data: dict) -> None:
+    """平均順位の折れ線グラフ描写
+
+    Args:
+        fig (Figure): 描写先
+        data (dict): 描写データ
+    """
+
+    df: pd.DataFrame = data["df"]
+    ax = fig.add_subplot()
 
-    if whole:
+    if data["whole"]:
         df.plot(
+            ax=ax,
             kind="line",
-            figsize=(12, 5),
             fontsize=14,
         )
-        plt.legend(
+        ax.legend(
             title="開始 - 終了",
             ncol=int(len(df.columns) / 5) + 1,
         )
     else:
         df.plot(
+            ax=ax,
             kind="line",
             y="rank_avg",
             x="game_no",
             legend=False,
-            figsize=(12, 5),
             fontsize=14,
         )
 
-    plt.title(title, fontsize=18)
-    plt.grid(axis="y")
+    ax.set_title(data["title"], fontsize=18)
+    ax.grid(axis="y")
 
     # Y軸設定
-    plt.ylabel("平均順位", fontsize=14)
-    plt.yticks([4.0, 3.5, 3.0, 2.5, 2.0, 1.5, 1.0])
-    for ax in plt.gcf().get_axes():  # type: ignore[not-callable]  # 逆向きにする
-        ax.invert_yaxis()
+    ax.set_ylabel("平均順位", fontsize=14)
+    ax.set_yticks([4.0, 3.5, 3.0, 2.5, 2.0, 1.5, 1.0])
+    ax.invert_yaxis()
 
     # X軸設定
-    plt.xlabel("ゲーム数", fontsize=14)
-
-    plt.savefig(imgdata, format="jpg", bbox_inches="tight")
-    return imgdata
+    ax.set_xlabel("ゲーム数", fontsize=14)
 
 
 def graphing_total_points(df: pd.DataFrame, title: str, whole: bool = False) -> BytesIO:
@@ -268,64 +388,63 @@ def graphing_total_points(df: pd.DataFrame, title: str, whole: bool = False) ->
         BytesIO: 画像データ
     """
 
-    imgdata = BytesIO()
+    return _render(draw_total_points, {"df": df, "title": title, "whole": whole}, (12, 8))
+
 
-    if whole:
+def draw_total_points(fig: "Figure", data: dict) -> None:
+    """通算ポイント推移の折れ線グラフ描写
+
+    Args:
+        fig (Figure): 描写先
+        data (dict): 描写データ
+    """
+
+    df: pd.DataFrame = data["df"]
+    ax = fig.add_subplot()
+
+    if data["whole"]:
         df.plot(
+            ax=ax,
             kind="line",
-            figsize=(12, 8),
             fontsize=14,
         )
-        plt.legend(
+        ax.legend(
             title="通算 （ 開始 - 終了 ）",
             ncol=int(len(df.columns) / 5) + 1,
         )
     else:
-        point_sum = df.plot(
+        df.plot(
+            ax=ax,
             kind="line",
             y="point_sum",
             label="通算",
-            figsize=(12, 8),
             fontsize=14,
         )
         if len(df) > 50:
-            point_sum = (
-                df["point_sum"]
-                .rolling(40)
-                .mean()
-                .plot(
-                    kind="line",
-                    label="移動平均(40ゲーム)",
-                    ax=point_sum,
-                )
+            df["point_sum"].rolling(40).mean().plot(
+                ax=ax,
+                kind="line",
+                label="移動平均(40ゲーム)",
             )
         if len(df) > 100:
-            point_sum = (
-                df["point_sum"]
-                .rolling(80)
-                .mean()
-                .plot(
-                    kind="line",
-                    label="移動平均(80ゲーム)",
-                    ax=point_sum,
-                )
+            df["point_sum"].rolling(80).mean().plot(
+                ax=ax,
+                kind="line",
+                label="移動平均(80ゲーム)",
             )
-        plt.legend()
+        ax.legend()
 
-    plt.title(title, fontsize=18)
-    plt.grid(axis="y")
+    ax.set_title(data["title"], fontsize=18)
+    ax.grid(axis="y")
 
     # Y軸設定
-    plt.ylabel("ポイント", fontsize=14)
-    ylocs, ylabs = plt.yticks()
-    new_ylabs = [ylab.get_text().replace("−", "▲") for ylab in ylabs]
-    plt.yticks(list(ylocs[1:-1]), new_ylabs[1:-1])
+    ax.set_ylabel("ポイント", fontsize=14)
+    ylocs = ax.get_yticks()
+    new_ylabs = [ylab.get_text().replace("−", "▲") for ylab in ax.get_yticklabels()]
+    ax.set_yticks(list(ylocs[1:-1]), new_ylabs[1:-1])
 
     # X軸設定
-    plt.xlabel("ゲーム数", fontsize=14)
-
-    plt.savefig(imgdata, format="jpg", bbox_inches="tight")
-    return imgdata
+    ax.set_xlabel("ゲーム数", fontsize=14)
 
 
 def graphing_rank_distribution(df: pd.DataFrame, title: str) -> BytesIO:
@@ -339,17 +458,29 @@ def graphing_rank_distribution(df: pd.DataFrame, title: str) -> BytesIO:
         BytesIO: 画像データ
     """
 
-    imgdata = BytesIO()
+    return _render(draw_rank_distribution, {"df": df, "title": title}, (12, 7))
+
+
+def draw_rank_distribution(fig: "Figure", data: dict) -> None:
+    """順位分布の棒グラフ描写
+
+    Args:
+        fig (Figure): 描写先
+        data (dict): 描写データ
+    """
+
+    df: pd.DataFrame = data["df"]
+    ax = fig.add_subplot()
 
     df.plot(
+        ax=ax,
         kind="bar",
         stacked=True,
-        figsize=(12, 7),
         fontsize=14,
     )
 
-    plt.title(title, fontsize=18)
-    plt.legend(
+    ax.set_title(data["title"], fontsize=18)
+    ax.legend(
         bbox_to_anchor=(0.5, 0),
         loc="lower center",
         ncol=4,
@@ -357,20 +488,78 @@ def graphing_rank_distribution(df: pd.DataFrame, title: str) -> BytesIO:
     )
 
     # Y軸設定
-    plt.yticks([0, 25, 50, 75, 100])
-    plt.ylabel("（％）", fontsize=14)
-    for ax in plt.gcf().get_axes():  # type: ignore[not-callable]  # グリッド線を背後にまわす
-        ax.set_axisbelow(True)
-        plt.grid(axis="y")
+    ax.set_yticks([0, 25, 50, 75, 100])
+    ax.set_ylabel("（％）", fontsize=14)
+    ax.set_axisbelow(True)  # グリッド線を背後にまわす
+    ax.grid(axis="y")
 
     # X軸設定
+    ax.tick_params(axis="x", labelrotation=30)
     if len(df) > 10:
-        plt.xticks(rotation=30, ha="right")
-    else:
-        plt.xticks(rotation=30)
+        for label in ax.get_xticklabels():
+            label.set_horizontalalignment("right")
+
+
+def graphing_rank_pie(df: pd.DataFrame, title: str) -> BytesIO:
+    """順位分布の円グラフを生成
+
+    Args:
+        df (pd.DataFrame): 描写データ
+        title (str): グラフタイトル
+
+    Returns:
+        BytesIO: 画像データ
+    """
+
+    return _render(draw_rank_pie, {"df": df, "title": title}, (6, 6))
+
+
+def draw_rank_pie(fig: "Figure", data: dict) -> None:
+    """順位分布の円グラフ描写
 
-    plt.savefig(imgdata, format="jpg", bbox_inches="tight")
-    return imgdata
+    Args:
+        fig (Figure): 描写先
+        data (dict): 描写データ
+    """
+
+    df: pd.DataFrame = data["df"]
+    ax = fig.add_subplot()
+
+    df.plot(
+        ax=ax,
+        kind="pie",
+        y="順位分布",
+        labels=None,
+        fontsize=14,
+        autopct="%.2f%%",
+        wedgeprops={"linewidth": 1, "edgecolor": "white"},
+    )
+    ax.set_title(data["title"], fontsize=18)
+    ax.set_ylabel("")
+    ax.legend(
+        labels=list(df.index),
+        bbox_to_anchor=(0.5, -0.1),
+        loc="lower center",
+        ncol=4,
+        fontsize=12,
+    )
+
+
+def _render(draw: "graphrender.DrawFunc", data: dict, figsize: tuple[float, float]) -> BytesIO:
+    """描写プールで画像を生成する
+
+    Args:
+        draw (graphrender.DrawFunc): 描写関数
+        data (dict): 描写データ
+        figsize (tuple[float, float]): 画像サイズ
+
+    Returns:
+        BytesIO: 画像データ
+    """
+
+    spec = graphrender.PlotSpec(draw=draw, data=data, figsize=figsize, fmt="jpg")
+    with _measure("render"):
+        return BytesIO(graphrender.render_many([spec])[0])
 
 
 def gen_pdf(m: "MessageParserProtocol"):
@@ -399,11 +588,110 @@ def gen_pdf(m: "MessageParserProtocol"):
         m.status.result = False
         return
 
-    # 書式設定
-    font_path = os.path.join(os.path.realpath(os.path.curdir), g.cfg.setting.font_file)
     pdf_path = g.cfg.setting.work_dir / (f"{g.params['filename']}.pdf" if g.params.get("filename") else "results.pdf")
+    timings = build_pdf(pdf_path, target_info)
+    logging.info("report generation: %s (%s)", g.params["player_name"], ", ".join(str(x) for x in timings))
+
+    m.set_data(pdf_path, StyleOptions(title=f"成績レポート({g.params['player_name']})", use_comment=True, header_hidden=True))
+
+
+def gen_batch(m: "MessageParserProtocol"):
+    """検索範囲に記録のある全メンバーの成績レポートを生成してzipにまとめる
+
+    Args:
+        m (MessageParserProtocol): メッセージデータ
+    """
+
+    if g.adapter.conf.plotting_backend == "plotly":
+        m.post.reset()
+        m.post.headline = {"": message.random_reply(m, "not_implemented")}
+        return
+
+    zip_path = g.cfg.setting.work_dir / (f"{g.params['filename']}.zip" if g.params.get("filename") else "results.zip")
+    with TemporaryDirectory(dir=g.cfg.setting.work_dir) as tmp_dir:
+        pdf_files = generate_reports(Path(tmp_dir))
+        if not pdf_files:  # 記録なし
+            m.post.headline = {"成績レポート": message.random_reply(m, "no_hits")}
+            m.status.result = False
+            return
+        archive(pdf_files, zip_path)
+
+    m.set_data(zip_path, StyleOptions(title=f"成績レポート({len(pdf_files)}名)", use_comment=True, header_hidden=True))
+
+
+def generate_reports(output_dir: Path, progress: bool = False) -> list[Path]:
+    """検索範囲に記録のある全メンバー(チーム)の成績レポートを出力する
+
+    記録情報は1回のクエリでまとめて取得し、メンバーごとに`g.params`の複製を切り替えて生成する。
+
+    Args:
+        output_dir (Path): 出力先ディレクトリ
+        progress (bool, optional): 進捗を表示する. Defaults to False.
+
+    Returns:
+        list[Path]: 生成したPDFファイル(登録順)
+    """
+
+    targets_info = lookup.members_info(g.params)
+    registered = g.cfg.member.lists if g.params.get("individual", True) else g.cfg.team.lists
+    targets = [x for x in registered if x in targets_info]
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    ctx = QueryContext.current()
+    ret: list[Path] = []
+    for name in tqdm(targets, desc="report", disable=not progress):
+        with ctx.replace(player_name=name, target_player=[name], player_list={"player_0": name}, competition_list={}).activate():
+            pdf_path = output_dir / f"{_target_name()}.pdf"
+            timings = build_pdf(pdf_path, targets_info[name])
+        logging.info("report generation: %s (%s)", name, ", ".join(str(x) for x in timings))
+        ret.append(pdf_path)
+
+    return ret
+
+
+def archive(files: list[Path], zip_path: Path) -> Path:
+    """ファイルをzipにまとめる
+
+    Args:
+        files (list[Path]): 対象ファイル
+        zip_path (Path): 保存先
+
+    Returns:
+        Path: 保存先
+    """
+
+    with ZipFile(zip_path, "w", compression=ZIP_DEFLATED) as zf:
+        for file in files:
+            zf.write(file, arcname=file.name)
+
+    return zip_path
+
+
+@lru_cache(maxsize=None)
+def _register_font(font_path: str) -> None:
+    """レポート用フォントを登録する(TTFの読み込みはフォントごとに1回)
+
+    Args:
+        font_path (str): フォントファイル
+    """
+
     pdfmetrics.registerFont(TTFont("ReportFont", font_path))
 
+
+def build_pdf(pdf_path: Path, target_info: dict) -> list[SectionTiming]:
+    """`g.params`の対象メンバーの成績レポートをPDFに出力する
+
+    Args:
+        pdf_path (Path): 保存先
+        target_info (dict): プレイヤー情報
+
+    Returns:
+        list[SectionTiming]: セクション単位の処理時間
+    """
+
+    # 書式設定
+    _register_font(os.path.join(os.path.realpath(os.path.curdir), g.cfg.setting.font_file))
+
     doc = SimpleDocTemplate(
         str(pdf_path),
         pagesize=landscape(A4),
@@ -419,22 +707,42 @@ def gen_pdf(m: "MessageParserProtocol"):
     style["Left"] = ParagraphStyle(name="Left", fontName="ReportFont", fontSize=14, alignment=TA_LEFT)
     style["Right"] = ParagraphStyle(name="Right", fontName="ReportFont", fontSize=14, alignment=TA_RIGHT)
 
-    plt.rcParams.update(plt.rcParamsDefault)
-    font_prop = fm.FontProperties(fname=font_path)
-    plt.rcParams["font.family"] = font_prop.get_name()
-    fm.fontManager.addfont(font_path)
+    # レポート作成(セクション単位で並列に生成して順に連結する)
+    sections: list[tuple[str, Callable[..., list], tuple]] = [
+        ("cover_page", cover_page, (style, target_info)),  # 表紙
+        ("entire_aggregate", entire_aggregate, (style,)),  # 全期間
+        ("periodic_aggregation", periodic_aggregation, (style,)),  # 期間集計
+        ("sectional_aggregate", sectional_aggregate, (style, target_info)),  # 区間集計
+    ]
+    ctx = QueryContext.current()
+    executor = get_executor()
+    futures = [executor.submit(ctx.run, _run_section, name, func, *args) for name, func, args in sections]
 
-    # レポート作成
     elements: list = []
-    elements.extend(cover_page(style, target_info))  # 表紙
-    elements.extend(entire_aggregate(style))  # 全期間
-    elements.extend(periodic_aggregation(style))  # 期間集計
-    elements.extend(sectional_aggregate(style, target_info))  # 区間集計
+    timings: list[SectionTiming] = []
+    for future in futures:
+        section, timing = future.result()
+        elements.extend(section)
+        timings.append(timing)
 
+    start = time.perf_counter()
     doc.build(elements)
-    logging.debug("report generation: %s", g.params["player_name"])
+    timings.append(SectionTiming("build", total=time.perf_counter() - start))
+
+    return timings
 
-    m.set_data(pdf_path, StyleOptions(title=f"成績レポート({g.params['player_name']})", use_comment=True, header_hidden=True))
+
+def _target_name() -> str:
+    """レポートに表示する対象メンバー名(匿名化オプションを反映)
+
+    Returns:
+        str: 表示名
+    """
+
+    if g.params.get("anonymous"):
+        mapping_dict = formatter.anonymous_mapping([g.params["player_name"]])
+        return next(iter(mapping_dict.values()))
+    return g.params["player_name"]
 
 
 def cover_page(style: dict, target_info: dict) -> list:
@@ -457,11 +765,7 @@ def cover_page(style: dict, target_info: dict) -> list:
         float(target_info["last_game"])
     )
 
-    if g.params.get("anonymous"):
-        mapping_dict = formatter.anonymous_mapping([g.params["player_name"]])
-        target_player = next(iter(mapping_dict.values()))
-    else:
-        target_player = g.params["player_name"]
+    target_player = _target_name()
 
     # 表紙
     elements.append(Spacer(1, 40 * mm))
@@ -492,175 +796,78 @@ def entire_aggregate(style: dict) -> list:
 
     elements: list = []
 
-    elements.append(Paragraph("全期間", style["Left"]))
-    elements.append(Spacer(1, 5 * mm))
-    data: list = []
-    g.cfg.aggregate_unit = "A"
-    tmp_data = get_game_results()
-
-    if not tmp_data:
-        return []
-
-    for _, val in enumerate(tmp_data):  # ゲーム数を除外
-        data.append(val[1:])
-    tt = LongTable(data, repeatRows=1)
-    tt.setStyle(
-        TableStyle(
-            [
-                ("FONT", (0, 0), (-1, -1), "ReportFont", 10),
-                ("GRID", (0, 0), (-1, -1), 0.25, colors.black),
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                ("SPAN", (3, 0), (4, 0)),
-                ("SPAN", (5, 0), (6, 0)),
-                ("SPAN", (7, 0), (8, 0)),
-                ("SPAN", (9, 0), (10, 0)),
-                ("SPAN", (12, 0), (13, 0)),
-                # ヘッダ行
-                ("BACKGROUND", (0, 0), (-1, 0), colors.navy),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-            ]
-        )
-    )
-    elements.append(tt)
-
-    # 順位分布
-    imgdata = BytesIO()
-    gdata = pd.DataFrame(
-        {
-            "順位分布": [
-                float(str(data[1][4]).replace("%", "")),
-                float(str(data[1][6]).replace("%", "")),
-                float(str(data[1][8]).replace("%", "")),
-                float(str(data[1][10]).replace("%", "")),
-            ],
-        },
-        index=["1位率", "2位率", "3位率", "4位率"],
-    )
-    gdata.plot(
-        kind="pie",
-        y="順位分布",
-        labels=None,
-        figsize=(6, 6),
-        fontsize=14,
-        autopct="%.2f%%",
-        wedgeprops={"linewidth": 1, "edgecolor": "white"},
-    )
-    plt.title("順位分布 （ 全期間 ）", fontsize=18)
-    plt.ylabel("")
-    plt.legend(
-        labels=list(gdata.index),
-        bbox_to_anchor=(0.5, -0.1),
-        loc="lower center",
-        ncol=4,
-        fontsize=12,
-    )
-    plt.savefig(imgdata, format="jpg", bbox_inches="tight")
-
-    elements.append(Spacer(1, 5 * mm))
-    elements.append(Image(imgdata, width=600 * 0.5, height=600 * 0.5))
-
-    data = get_count_moving(0)
-    df = pd.DataFrame(data)
-    df["playtime"] = pd.to_datetime(df["playtime"])
-
-    # 通算ポイント推移
-    imgdata = graphing_total_points(df, "通算ポイント推移 （ 全期間 ）", False)
-    elements.append(Image(imgdata, width=1200 * 0.5, height=800 * 0.5))
-
-    # 平均順位
-    imgdata = graphing_mean_rank(df, "平均順位推移 （ 全期間 ）", False)
-    elements.append(Image(imgdata, width=1200 * 0.5, height=500 * 0.5))
-
-    elements.append(PageBreak())
-
-    return elements
-
-
-def periodic_aggregation(style: dict) -> list:
-    """期間集計
-
-    Args:
-        style (dict): レイアウトスタイル
-
-    Returns:
-        list: 生成内容
-    """
-
-    elements: list = []
-
-    pattern: list[tuple[str, str, Literal["A", "M", "Y"]]] = [
-        # 表タイトル, グラフタイトル, フラグ
-        ("月別集計", "順位分布（月別）", "M"),
-        ("年別集計", "順位分布（年別）", "Y"),
-    ]
-
-    for table_title, graph_title, flag in pattern:
-        elements.append(Paragraph(table_title, style["Left"]))
+    with dbutil.reader() as conn:
+        elements.append(Paragraph("全期間", style["Left"]))
         elements.append(Spacer(1, 5 * mm))
-
         data: list = []
-        g.cfg.aggregate_unit = flag
-        tmp_data = get_game_results()
+        g.params["aggregate_unit"] = "A"
+        tmp_data = get_game_results(conn)
 
         if not tmp_data:
             return []
 
-        for _, val in enumerate(tmp_data):  # 日時を除外
-            data.append(val[:15])
-
+        for _, val in enumerate(tmp_data):  # ゲーム数を除外
+            data.append(val[1:])
         tt = LongTable(data, repeatRows=1)
-        ts = TableStyle(
-            [
-                ("FONT", (0, 0), (-1, -1), "ReportFont", 10),
-                ("GRID", (0, 0), (-1, -1), 0.25, colors.black),
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                ("SPAN", (4, 0), (5, 0)),
-                ("SPAN", (6, 0), (7, 0)),
-                ("SPAN", (8, 0), (9, 0)),
-                ("SPAN", (10, 0), (11, 0)),
-                ("SPAN", (13, 0), (14, 0)),
-                # ヘッダ行
-                ("BACKGROUND", (0, 0), (-1, 0), colors.navy),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-            ]
+        tt.setStyle(
+            TableStyle(
+                [
+                    ("FONT", (0, 0), (-1, -1), "ReportFont", 10),
+                    ("GRID", (0, 0), (-1, -1), 0.25, colors.black),
+                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                    ("SPAN", (3, 0), (4, 0)),
+                    ("SPAN", (5, 0), (6, 0)),
+                    ("SPAN", (7, 0), (8, 0)),
+                    ("SPAN", (9, 0), (10, 0)),
+                    ("SPAN", (12, 0), (13, 0)),
+                    # ヘッダ行
+                    ("BACKGROUND", (0, 0), (-1, 0), colors.navy),
+                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                ]
+            )
         )
-
-        if len(data) > 4:
-            for i in range(len(data) - 2):
-                if i % 2 == 0:
-                    ts.add("BACKGROUND", (0, i + 2), (-1, i + 2), colors.lightgrey)
-        tt.setStyle(ts)
         elements.append(tt)
-        elements.append(Spacer(1, 10 * mm))
 
         # 順位分布
-        df = pd.DataFrame(
+        gdata = pd.DataFrame(
             {
-                "1位率": [float(str(data[x + 1][5]).replace("%", "")) for x in range(len(data) - 1)],
-                "2位率": [float(str(data[x + 1][7]).replace("%", "")) for x in range(len(data) - 1)],
-                "3位率": [float(str(data[x + 1][9]).replace("%", "")) for x in range(len(data) - 1)],
-                "4位率": [float(str(data[x + 1][11]).replace("%", "")) for x in range(len(data) - 1)],
+                "順位分布": [
+                    float(str(data[1][4]).replace("%", "")),
+                    float(str(data[1][6]).replace("%", "")),
+                    float(str(data[1][8]).replace("%", "")),
+                    float(str(data[1][10]).replace("%", "")),
+                ],
             },
-            index=[data[x + 1][0] for x in range(len(data) - 1)],
+            index=["1位率", "2位率", "3位率", "4位率"],
         )
+        imgdata = graphing_rank_pie(gdata, "順位分布 （ 全期間 ）")
 
-        imgdata = graphing_rank_distribution(df, graph_title)
         elements.append(Spacer(1, 5 * mm))
-        elements.append(Image(imgdata, width=1200 * 0.5, height=700 * 0.5))
+        elements.append(Image(imgdata, width=600 * 0.5, height=600 * 0.5))
+
+        data = get_count_moving(conn, 0)
+        df = pd.DataFrame(data)
+        df["playtime"] = pd.to_datetime(df["playtime"])
+
+        # 通算ポイント推移
+        imgdata = graphing_total_points(df, "通算ポイント推移 （ 全期間 ）", False)
+        elements.append(Image(imgdata, width=1200 * 0.5, height=800 * 0.5))
+
+        # 平均順位
+        imgdata = graphing_mean_rank(df, "平均順位推移 （ 全期間 ）", False)
+        elements.append(Image(imgdata, width=1200 * 0.5, height=500 * 0.5))
 
         elements.append(PageBreak())
 
-    return elements
+        return elements
 
 
-def sectional_aggregate(style: dict, target_info: dict) -> list:
-    """区間集計
+def periodic_aggregation(style: dict) -> list:
+    """期間集計
 
     Args:
         style (dict): レイアウトスタイル
-        target_info (dict): プレイヤー情報
 
     Returns:
         list: 生成内容
@@ -668,23 +875,27 @@ def sectional_aggregate(style: dict, target_info: dict) -> list:
 
     elements: list = []
 
-    pattern: list[tuple[int, int, str]] = [
-        # 区切り回数, 閾値, タイトル
-        (80, 100, "短期"),
-        (200, 240, "中期"),
-        (400, 500, "長期"),
+    pattern: list[tuple[str, str, Literal["A", "M", "Y"]]] = [
+        # 表タイトル, グラフタイトル, フラグ
+        ("月別集計", "順位分布（月別）", "M"),
+        ("年別集計", "順位分布（年別）", "Y"),
     ]
 
-    for count, threshold, title in pattern:
-        if target_info["game_count"] > threshold:
-            # テーブル
-            elements.append(Paragraph(f"区間集計 （ {title} ）", style["Left"]))
+    with dbutil.reader() as conn:
+        for table_title, graph_title, flag in pattern:
+            elements.append(Paragraph(table_title, style["Left"]))
             elements.append(Spacer(1, 5 * mm))
-            data = get_count_results(count)
 
-            if not data:
+            data: list = []
+            g.params["aggregate_unit"] = flag
+            tmp_data = get_game_results(conn)
+
+            if not tmp_data:
                 return []
 
+            for _, val in enumerate(tmp_data):  # 日時を除外
+                data.append(val[:15])
+
             tt = LongTable(data, repeatRows=1)
             ts = TableStyle(
                 [
@@ -692,60 +903,137 @@ def sectional_aggregate(style: dict, target_info: dict) -> list:
                     ("GRID", (0, 0), (-1, -1), 0.25, colors.black),
                     ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
                     ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                    ("SPAN", (5, 0), (6, 0)),
-                    ("SPAN", (7, 0), (8, 0)),
-                    ("SPAN", (9, 0), (10, 0)),
-                    ("SPAN", (11, 0), (12, 0)),
-                    ("SPAN", (14, 0), (15, 0)),
+                    ("SPAN", (4, 0), (5, 0)),
+                    ("SPAN", (6, 0), (7, 0)),
+                    ("SPAN", (8, 0), (9, 0)),
+                    ("SPAN", (10, 0), (11, 0)),
+                    ("SPAN", (13, 0), (14, 0)),
                     # ヘッダ行
                     ("BACKGROUND", (0, 0), (-1, 0), colors.navy),
                     ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
                 ]
             )
+
             if len(data) > 4:
                 for i in range(len(data) - 2):
                     if i % 2 == 0:
                         ts.add("BACKGROUND", (0, i + 2), (-1, i + 2), colors.lightgrey)
             tt.setStyle(ts)
             elements.append(tt)
+            elements.append(Spacer(1, 10 * mm))
 
             # 順位分布
             df = pd.DataFrame(
                 {
-                    "1位率": [float(str(data[x + 1][6]).replace("%", "")) for x in range(len(data) - 1)],
-                    "2位率": [float(str(data[x + 1][8]).replace("%", "")) for x in range(len(data) - 1)],
-                    "3位率": [float(str(data[x + 1][10]).replace("%", "")) for x in range(len(data) - 1)],
-                    "4位率": [float(str(data[x + 1][12]).replace("%", "")) for x in range(len(data) - 1)],
+                    "1位率": [float(str(data[x + 1][5]).replace("%", "")) for x in range(len(data) - 1)],
+                    "2位率": [float(str(data[x + 1][7]).replace("%", "")) for x in range(len(data) - 1)],
+                    "3位率": [float(str(data[x + 1][9]).replace("%", "")) for x in range(len(data) - 1)],
+                    "4位率": [float(str(data[x + 1][11]).replace("%", "")) for x in range(len(data) - 1)],
                 },
-                index=[f"{str(data[x + 1][0])} - {str(data[x + 1][1])}" for x in range(len(data) - 1)],
+                index=[data[x + 1][0] for x in range(len(data) - 1)],
             )
 
-            imgdata = graphing_rank_distribution(df, f"順位分布 （ 区間 {title} ）")
+            imgdata = graphing_rank_distribution(df, graph_title)
             elements.append(Spacer(1, 5 * mm))
-            elements.append(Image(imgdata, width=1200 * 0.5, height=800 * 0.5))
-
-            # 通算ポイント推移
-            data = get_count_moving(count)
-            tmp_df = pd.DataFrame(data)
-            df = pd.DataFrame()
-            for i in sorted(tmp_df["interval"].unique().tolist()):
-                list_data = tmp_df[tmp_df.interval == i]["point_sum"].to_list()
-                game_count = tmp_df[tmp_df.interval == i]["total_count"].to_list()
-                df[f"{min(game_count)} - {max(game_count)}"] = [None] * (count - len(list_data)) + list_data
-
-            imgdata = graphing_total_points(df, f"通算ポイント推移（区間 {title}）", True)
-            elements.append(Image(imgdata, width=1200 * 0.5, height=800 * 0.5))
-
-            # 平均順位
-            df = pd.DataFrame()
-            for i in sorted(tmp_df["interval"].unique().tolist()):
-                list_data = tmp_df[tmp_df.interval == i]["rank_avg"].to_list()
-                game_count = tmp_df[tmp_df.interval == i]["total_count"].to_list()
-                df[f"{min(game_count)} - {max(game_count)}"] = [None] * (count - len(list_data)) + list_data
-
-            imgdata = graphing_mean_rank(df, f"平均順位推移（区間 {title}）", True)
-            elements.append(Image(imgdata, width=1200 * 0.5, height=500 * 0.5))
+            elements.append(Image(imgdata, width=1200 * 0.5, height=700 * 0.5))
 
             elements.append(PageBreak())
 
-    return elements
+        return elements
+
+
+def sectional_aggregate(style: dict, target_info: dict) -> list:
+    """区間集計
+
+    Args:
+        style (dict): レイアウトスタイル
+        target_info (dict): プレイヤー情報
+
+    Returns:
+        list: 生成内容
+    """
+
+    elements: list = []
+
+    pattern: list[tuple[int, int, str]] = [
+        # 区切り回数, 閾値, タイトル
+        (80, 100, "短期"),
+        (200, 240, "中期"),
+        (400, 500, "長期"),
+    ]
+
+    with dbutil.reader() as conn:
+        for count, threshold, title in pattern:
+            if target_info["game_count"] > threshold:
+                # テーブル
+                elements.append(Paragraph(f"区間集計 （ {title} ）", style["Left"]))
+                elements.append(Spacer(1, 5 * mm))
+                data = get_count_results(conn, count)
+
+                if not data:
+                    return []
+
+                tt = LongTable(data, repeatRows=1)
+                ts = TableStyle(
+                    [
+                        ("FONT", (0, 0), (-1, -1), "ReportFont", 10),
+                        ("GRID", (0, 0), (-1, -1), 0.25, colors.black),
+                        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+                        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                        ("SPAN", (5, 0), (6, 0)),
+                        ("SPAN", (7, 0), (8, 0)),
+                        ("SPAN", (9, 0), (10, 0)),
+                        ("SPAN", (11, 0), (12, 0)),
+                        ("SPAN", (14, 0), (15, 0)),
+                        # ヘッダ行
+                        ("BACKGROUND", (0, 0), (-1, 0), colors.navy),
+                        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                    ]
+                )
+                if len(data) > 4:
+                    for i in range(len(data) - 2):
+                        if i % 2 == 0:
+                            ts.add("BACKGROUND", (0, i + 2), (-1, i + 2), colors.lightgrey)
+                tt.setStyle(ts)
+                elements.append(tt)
+
+                # 順位分布
+                df = pd.DataFrame(
+                    {
+                        "1位率": [float(str(data[x + 1][6]).replace("%", "")) for x in range(len(data) - 1)],
+                        "2位率": [float(str(data[x + 1][8]).replace("%", "")) for x in range(len(data) - 1)],
+                        "3位率": [float(str(data[x + 1][10]).replace("%", "")) for x in range(len(data) - 1)],
+                        "4位率": [float(str(data[x + 1][12]).replace("%", "")) for x in range(len(data) - 1)],
+                    },
+                    index=[f"{str(data[x + 1][0])} - {str(data[x + 1][1])}" for x in range(len(data) - 1)],
+                )
+
+                imgdata = graphing_rank_distribution(df, f"順位分布 （ 区間 {title} ）")
+                elements.append(Spacer(1, 5 * mm))
+                elements.append(Image(imgdata, width=1200 * 0.5, height=800 * 0.5))
+
+                # 通算ポイント推移
+                data = get_count_moving(conn, count)
+                tmp_df = pd.DataFrame(data)
+                df = pd.DataFrame()
+                for i in sorted(tmp_df["interval"].unique().tolist()):
+                    list_data = tmp_df[tmp_df.interval == i]["point_sum"].to_list()
+                    game_count = tmp_df[tmp_df.interval == i]["total_count"].to_list()
+                    df[f"{min(game_count)} - {max(game_count)}"] = [None] * (count - len(list_data)) + list_data
+
+                imgdata = graphing_total_points(df, f"通算ポイント推移（区間 {title}）", True)
+                elements.append(Image(imgdata, width=1200 * 0.5, height=800 * 0.5))
+
+                # 平均順位
+                df = pd.DataFrame()
+                for i in sorted(tmp_df["interval"].unique().tolist()):
+                    list_data = tmp_df[tmp_df.interval == i]["rank_avg"].to_list()
+                    game_count = tmp_df[tmp_df.interval == i]["total_count"].to_list()
+                    df[f"{min(game_count)} - {max(game_count)}"] = [None] * (count - len(list_data)) + list_data
+
+                imgdata = graphing_mean_rank(df, f"平均順位推移（区間 {title}）", True)
+                elements.append(Image(imgdata, width=1200 * 0.5, height=500 * 0.5))
+
+                elements.append(PageBreak())
+
+        return elements
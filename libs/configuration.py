@@ -19,9 +19,10 @@ import libs.global_value as g
 from cls.config import AppConfig
 from integrations import factory
 from libs.data import initialization, lookup
-from libs.functions import compose
+from libs.functions import command_cache, compose
 from libs.registry import member, team
 from libs.types import Args, StyleOptions
+from libs.utils import dbutil
 
 if TYPE_CHECKING:
     from cls.config import SubCommand
@@ -182,6 +183,34 @@ def arg_parser() -> Args:
                 metavar="count",
                 help="テスト用サンプルデータ生成(count=生成回数, default: %(const)s)",
             )
+            exclusive.add_argument(
+                "--rebuild-materialized",
+                dest="rebuild_materialized",
+                action="store_true",
+                help="実体化テーブル再構築",
+            )
+            exclusive.add_argument(
+                "--check-materialized",
+                dest="check_materialized",
+                action="store_true",
+                help="実体化テーブル整合性チェック",
+            )
+            exclusive.add_argument(
+                "--report-batch",
+                dest="report_batch",
+                type=str,
+                nargs="*",
+                default=None,
+                metavar="KEYWORD",
+                help="全メンバーの成績レポートを一括生成(KEYWORD=レポート生成コマンドの引数)",
+            )
+            report_batch = p.add_argument_group("Only allowed when --report-batch")
+            report_batch.add_argument(
+                "--zip",
+                dest="archive",
+                action="store_true",
+                help="生成したレポートをzipにまとめる",
+            )
         case "test.py":  # 動作テスト用オプション
             p.add_argument(
                 "-t",
@@ -267,6 +296,7 @@ def setup(init_db: bool = True):
         g.cfg.setting.work_dir.mkdir(exist_ok=True)
     except FileExistsError as err:
         sys.exit(str(err))
+    command_cache.cache.reset()  # 作業ディレクトリを残す場合も以前の実行の画像は引き継がない
 
     if isinstance(g.cfg.setting.backup_dir, Path):
         try:
@@ -274,6 +304,9 @@ def setup(init_db: bool = True):
         except FileExistsError as err:
             sys.exit(str(err))
 
+    # クエリ読み込み
+    dbutil.load_queries()
+
     # DB初期化
     if init_db:
         initialization.initialization_resultdb(g.cfg.setting.database_file)
@@ -5,6 +5,12 @@
 - `libs.data.initialization`: データベース初期化
 - `libs.data.loader`: SQLクエリ実行
 - `libs.data.lookup`: 情報取得
+- `libs.data.materialized`: 実体化テーブル管理
 - `libs.data.modify`: DBデータ操作
+- `libs.data.rating`: レーティング計算
 - `libs.data.search`: DB検索
+- `libs.data.stats_cache`: 成績累積値キャッシュ
+- `libs.data.rating_history`: レーティング推移の保持
+- `libs.data.grade_state`: 段位状態の保持
+- `libs.data.derived`: 派生データの一括破棄
 """
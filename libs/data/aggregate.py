@@ -8,7 +8,7 @@ import numpy as np
 import pandas as pd
 
 import libs.global_value as g
-from libs.data import loader
+from libs.data import loader, rating, rating_history
 from libs.utils import formatter
 
 
@@ -52,62 +52,20 @@ def calculation_rating() -> pd.DataFrame:
         pd.DataFrame: 集計結果
     """
 
-    # データ収集
-    df_results = loader.read_data("RANKING_RATINGS").set_index("playtime")
-    df_ratings = pd.DataFrame(index=["initial_rating"] + df_results.index.to_list())  # 記録用
-    last_ratings: dict = {}  # 最終値格納用
-
-    # 獲得スコア
-    score_mapping = {"1": 30.0, "2": 10.0, "3": -10.0, "4": -30.0}
-
-    for x in df_results.itertuples():
-        player_list = (str(x.p1_name), str(x.p2_name), str(x.p3_name), str(x.p4_name))
-        for player in player_list:
-            if player not in df_ratings.columns:
-                last_ratings[player] = 1500.0
-                df_ratings[player] = np.nan
-                df_ratings.loc["initial_rating", player] = 1500.0
-                df_ratings = df_ratings.copy()
-
-        # 天鳳計算式 (https://tenhou.net/man/#RATING)
-        rank_list = (x.p1_rank, x.p2_rank, x.p3_rank, x.p4_rank)
-        rating_list = [last_ratings[player] for player in player_list]
-        rating_avg = 1500.0 if np.mean(rating_list) < 1500.0 else np.mean(rating_list)
-
-        for i, player in enumerate(player_list):
-            rating = float(rating_list[i])
-            rank = str(rank_list[i])
-
-            correction_value: float = (rating_avg - rating) / 40
-            if df_ratings[player].count() >= 400:
-                match_correction = 0.2
-            else:
-                match_correction = 1 - df_ratings[player].count() * 0.002
-
-            new_rating = rating + match_correction * (score_mapping[rank] + correction_value)
-
-            last_ratings[player] = new_rating
-            df_ratings.loc[x.Index, player] = new_rating
+    # 保持済みの推移を優先
+    if (df_ratings := rating_history.read()) is None:
+        df_results = loader.read_data("RANKING_RATINGS")
+
+        engine = rating.RatingEngine()
+        ratings = engine.fold(
+            df_results.filter(items=["p1_name", "p2_name", "p3_name", "p4_name"]).astype(str).to_numpy(),
+            df_results.filter(items=["p1_rank", "p2_rank", "p3_rank", "p4_rank"]).to_numpy(),
+        )
+        df_ratings = engine.to_frame(df_results["playtime"].to_list(), ratings)
 
     # 間引き(集約オプション)
     if collection := g.params.get("collection"):
-        ratings = df_ratings[1:]
-        ratings.index = pd.to_datetime(ratings.index)  # DatetimeIndexに変換
-
-        match collection:
-            case "daily":
-                ratings = ratings.resample("D").last().ffill()
-            case "monthly":
-                ratings = ratings.resample("ME").last().ffill()
-            case "yearly":
-                ratings = ratings.resample("YE").last().ffill()
-            case "all":
-                ratings = df_ratings.ffill().tail(1)
-            case _:
-                return df_ratings
-
-        ratings.index = ratings.index.astype(str)
-        df_ratings = pd.concat([df_ratings.head(1), ratings])
+        df_ratings = rating.resample(df_ratings, collection)
 
     return df_ratings
 
@@ -153,8 +111,8 @@ def matrix_table() -> pd.DataFrame:
     # 結果に含まれるプレイヤーのリスト
     plist = sorted(list(set(df["p1_name"].tolist() + df["p2_name"].tolist() + df["p3_name"].tolist() + df["p4_name"].tolist())))
 
-    # 順位テーブルの作成
-    l_data: dict = {}
+    # 集計対象(表示名: プレイヤー名)
+    targets: dict[str, str] = {}
     for pname in plist:
         if g.params.get("individual"):  # 個人集計
             l_name = formatter.name_replace(pname)
@@ -171,67 +129,79 @@ def matrix_table() -> pd.DataFrame:
         else:  # チーム集計
             l_name = pname
 
-        l_data[l_name] = []
-        for x in df.itertuples():
-            match pname:
-                case x.p1_name:
-                    l_data[l_name] += [x.p1_rank]
-                case x.p2_name:
-                    l_data[l_name] += [x.p2_rank]
-                case x.p3_name:
-                    l_data[l_name] += [x.p3_rank]
-                case x.p4_name:
-                    l_data[l_name] += [x.p4_rank]
-                case _:
-                    l_data[l_name] += [None]
+        targets[l_name] = pname
+
+    return head_to_head(df, targets, g.params["stipulated"])
 
-    # 規定打数以下を足切り
-    if g.params["stipulated"]:
-        for pname in list(l_data.keys()):
-            if sum(x is not None for x in l_data[pname]) < g.params["stipulated"]:
-                l_data.pop(pname)
 
-    rank_df = pd.DataFrame(l_data.values(), columns=list(df.index), index=list(l_data.keys()))
+def head_to_head(df: pd.DataFrame, targets: dict[str, str], stipulated: int = 0) -> pd.DataFrame:
+    """直接対決の勝敗表を作成する
+
+    プレイヤー x ゲームの順位行列を作り、順位ごとの一致行列の積で全組み合わせの勝数/対戦数を求める。
+
+    Args:
+        df (pd.DataFrame): ゲーム結果(`REPORT_MATRIX_TABLE`)
+        targets (dict[str, str]): 集計対象(表示名: プレイヤー名)
+        stipulated (int, optional): 規定打数. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: 対局対戦マトリックス
+    """
+
+    # 順位行列の作成(同一ゲームに同じ名前がある場合は若い席を優先)
+    row_of = {pname: idx for idx, pname in enumerate(targets.values())}
+    ranks = np.full((len(targets), len(df)), np.nan)
+    for seat in (4, 3, 2, 1):
+        rows = df[f"p{seat}_name"].map(row_of).to_numpy(dtype=float)
+        mask = ~np.isnan(rows)
+        ranks[rows[mask].astype(int), np.flatnonzero(mask)] = df[f"p{seat}_rank"].to_numpy(dtype=float)[mask]
+
+    # 規定打数以下を足切り
+    present = ~np.isnan(ranks)
+    keep = present.sum(axis=1) >= stipulated if stipulated else np.ones(len(targets), dtype=bool)
+    names = [name for name, flag in zip(targets, keep) if flag]
+    ranks = ranks[keep]
+    present = present[keep]
 
     # 対象リストが0件になった場合は空のデータフレームを返す
-    if rank_df.empty:
-        return rank_df
+    if not names or not len(df):
+        return pd.DataFrame(index=names, columns=list(df.index))
+
+    # 対戦数と勝数(順位が小さい側の勝ち)
+    present_f = present.astype(float)
+    game_count = np.rint(present_f @ present_f.T).astype(np.int64)
+    win_f = np.zeros((len(names), len(names)))
+    for rank in np.unique(ranks[present]):
+        win_f += (ranks == rank).astype(float) @ (ranks > rank).astype(float).T
+    win = np.rint(win_f).astype(np.int64)
+    np.fill_diagonal(game_count, 0)
+    np.fill_diagonal(win, 0)
 
     # 対局対戦マトリックス表の作成
-    mtx_df = pd.DataFrame(index=list(l_data.keys()), columns=list(l_data.keys()) + ["total"])
-    sorting_df = pd.DataFrame(index=list(l_data.keys()), columns=["win_per", "count"])
-
-    for idx1 in range(len(rank_df)):
-        p1 = rank_df.iloc[idx1]
-        t_game_count = 0
-        t_win = 0
-        for idx2 in range(len(rank_df)):
-            p2 = rank_df.iloc[idx2]
-            if p1.name == p2.name:
-                mtx_df.loc[f"{p1.name}", f"{p2.name}"] = "---"
-            else:
-                game_count = len(pd.concat([p1, p2], axis=1).dropna())
-                win = (p1 < p2).sum()
-                t_game_count += game_count
-                t_win += win
-
-                if game_count:
-                    winning_per = str(round(float(win / game_count * 100), 1))
-                else:
-                    winning_per = "--.-"
-                mtx_df.loc[f"{p1.name}", f"{p2.name}"] = f"{win}-{game_count - win} ({winning_per}%)"
-
-        if t_game_count:
-            t_winning_per = str(round(float(t_win / t_game_count * 100), 1))
-        else:
-            t_winning_per = "--.-"
-        mtx_df.loc[f"{p1.name}", "total"] = f"{t_win}-{t_game_count - t_win} ({t_winning_per}%)"
-        sorting_df.loc[f"{p1.name}", "win_per"] = t_winning_per
-        sorting_df.loc[f"{p1.name}", "count"] = t_game_count
+    def _cell(w: int, c: int) -> str:
+        winning_per = str(round(float(w / c * 100), 1)) if c else "--.-"
+        return f"{w}-{c - w} ({winning_per}%)"
+
+    cells = np.empty((len(names), len(names) + 1), dtype=object)
+    total_win = win.sum(axis=1).tolist()
+    total_count = game_count.sum(axis=1).tolist()
+    for idx, (w_list, c_list) in enumerate(zip(win.tolist(), game_count.tolist())):
+        cells[idx, :-1] = [_cell(w, c) for w, c in zip(w_list, c_list)]
+        cells[idx, idx] = "---"
+        cells[idx, -1] = _cell(total_win[idx], total_count[idx])
+    mtx_df = pd.DataFrame(cells, index=names, columns=names + ["total"])
 
     # 勝率で並び替え
-    sorting_df["win_per"] = pd.to_numeric(sorting_df["win_per"], errors="coerce")
-    sorting_df["count"] = pd.to_numeric(sorting_df["count"], errors="coerce")
+    sorting_df = pd.DataFrame(
+        {
+            "win_per": pd.to_numeric(
+                [str(round(float(w / c * 100), 1)) if c else "--.-" for w, c in zip(total_win, total_count)],
+                errors="coerce",
+            ),
+            "count": total_count,
+        },
+        index=names,
+    )
     sorting_df = sorting_df.sort_values(by=["win_per", "count"], ascending=[False, False])
     mtx_df = mtx_df.reindex(index=list(sorting_df.index), columns=list(sorting_df.index) + ["total"])
 
@@ -0,0 +1,247 @@
+"""
+libs/data/data_version.py
+"""
+
+import inspect
+import logging
+import sqlite3
+import threading
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+import libs.global_value as g
+from libs.utils import dbutil
+
+TRACKED_TABLES: tuple[str, ...] = ("member", "alias", "team", "result", "remarks", "words", "rule")
+"""更新を検知するテーブル(キャッシュ用テーブルは含まない)"""
+
+KEY: str = "data_version"
+"""`meta`テーブルのキー(全体のカウンタ、テーブル単位は`data_version:<table_name>`)"""
+
+
+@dataclass(frozen=True)
+class DataChange:
+    """変更通知"""
+
+    database_file: str
+    """データベースファイル"""
+    version: int
+    """変更後のデータバージョン"""
+    tables: frozenset[str]
+    """更新されたテーブル"""
+
+
+Subscriber = Callable[[DataChange], None]
+
+
+@dataclass
+class _State:
+    """データベース単位の検知状態"""
+
+    pragma: int
+    """最後に確認した`PRAGMA data_version`"""
+    counters: dict[str, int]
+    """最後に確認した`meta`のカウンタ"""
+
+
+_lock = threading.Lock()
+_states: dict[str, _State] = {}
+_subscribers: list[tuple[Union[Subscriber, weakref.WeakMethod], Optional[frozenset[str]]]] = []
+
+
+def _resolve(ref: Union[Subscriber, weakref.WeakMethod]) -> Optional[Subscriber]:
+    """登録内容から呼び出し先を取り出す(破棄済みのインスタンスは`None`)"""
+
+    return ref() if isinstance(ref, weakref.WeakMethod) else ref
+
+
+def setup(resultdb: sqlite3.Connection) -> None:
+    """データバージョンの初期化
+
+    対象テーブルを更新するとトリガーでカウンタが加算されるため、
+    どの経路(外部ツールを含む)で書き込まれても同じトランザクション内でバージョンが進む。
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+    """
+
+    keys = [KEY] + [f"{KEY}:{table_name}" for table_name in TRACKED_TABLES]
+    resultdb.executemany("insert or ignore into meta (key, value) values (?, 0);", [(x,) for x in keys])
+
+    # 定義の変更を反映させるため作り直す
+    drop_triggers(resultdb)
+    _create_triggers(resultdb)
+
+
+def _create_triggers(resultdb: sqlite3.Connection) -> None:
+    """カウンタを加算するトリガーを作成する
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+    """
+
+    for table_name in TRACKED_TABLES:
+        for sql in dbutil.split_statements(dbutil.query("CREATE_TRIGGER_DATA_VERSION").replace("<table_name>", table_name)):
+            resultdb.execute(sql)
+
+
+def drop_triggers(resultdb: sqlite3.Connection) -> None:
+    """カウンタを加算するトリガーを削除する
+
+    トリガーは行単位で動くため、一括更新ではレコード数だけカウンタの更新が発生する。
+    一括更新の前に呼び出し、更新後は`bump()`でトリガーの再作成とカウンタの加算を1回だけ行う。
+    削除から再作成までを1つのトランザクションにまとめるので、他の接続からトリガーのない状態は見えない。
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+    """
+
+    if not resultdb.in_transaction:
+        resultdb.execute("begin;")
+
+    rows = resultdb.execute("select name from sqlite_master where type = 'trigger' and name like 'trg_data_version_%';")
+    for (name,) in rows.fetchall():
+        resultdb.execute(f"drop trigger if exists {name};")
+
+
+def bump(resultdb: sqlite3.Connection, tables: Union[list[str], tuple[str, ...]] = TRACKED_TABLES) -> None:
+    """トリガーを再作成し、更新したテーブルのカウンタを1回だけ加算する
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+        tables (Union[list[str], tuple[str, ...]], optional): 更新したテーブル. Defaults to TRACKED_TABLES.
+    """
+
+    _create_triggers(resultdb)
+    keys = [KEY] + [f"{KEY}:{table_name}" for table_name in tables]
+    resultdb.executemany("update meta set value = value + 1 where key = ?;", [(x,) for x in keys])
+
+
+def read_all(conn: sqlite3.Connection) -> dict[str, int]:
+    """接続を指定してカウンタを取得する
+
+    Args:
+        conn (sqlite3.Connection): 接続オブジェクト
+
+    Returns:
+        dict[str, int]: キーとカウンタ(未初期化時は空)
+    """
+
+    try:
+        rows = conn.execute("select key, value from meta where key = ? or key like ?;", (KEY, f"{KEY}:%")).fetchall()
+    except sqlite3.OperationalError:  # テーブル未作成
+        return {}
+    return {str(row[0]): int(row[1]) for row in rows}
+
+
+def read(conn: sqlite3.Connection) -> int:
+    """接続を指定してデータバージョンを取得する
+
+    Args:
+        conn (sqlite3.Connection): 接続オブジェクト
+
+    Returns:
+        int: データバージョン(未初期化時は0)
+    """
+
+    return read_all(conn).get(KEY, 0)
+
+
+def poll(database_file: Optional[Union[str, Path]] = None) -> int:
+    """データベースの変更を検知してデータバージョンを返す
+
+    `PRAGMA data_version`が前回から変わっていなければカウンタを読まずに前回値を返す。
+    変わっていればカウンタを読み直し、更新されたテーブルを購読者に通知する。
+    他プロセス(外部ツールや別ワーカー)の書き込みも次の呼び出しで検知される。
+
+    Args:
+        database_file (Optional[Union[str, Path]], optional): データベースファイル. Defaults to None.
+
+    Returns:
+        int: データバージョン(未初期化時は0)
+    """
+
+    database_file = str(database_file or g.cfg.setting.database_file)
+    with dbutil.watcher(database_file) as conn:
+        pragma = int(conn.execute("pragma data_version;").fetchone()[0])
+        with _lock:
+            if (state := _states.get(database_file)) is not None and state.pragma == pragma:
+                return state.counters.get(KEY, 0)
+        counters = read_all(conn)
+
+    with _lock:
+        previous = _states.get(database_file)
+        _states[database_file] = _State(pragma, counters)
+
+    if previous is None or previous.counters.get(KEY, 0) == counters.get(KEY, 0):
+        return counters.get(KEY, 0)
+
+    tables = frozenset(
+        key.split(":", 1)[1] for key, value in counters.items() if key != KEY and previous.counters.get(key) != value
+    )
+    publish(DataChange(database_file, counters.get(KEY, 0), tables))
+    return counters.get(KEY, 0)
+
+
+def current(database_file: Optional[Union[str, Path]] = None) -> int:
+    """データバージョンを取得する
+
+    Args:
+        database_file (Optional[Union[str, Path]], optional): データベースファイル. Defaults to None.
+
+    Returns:
+        int: データバージョン(未初期化時は0)
+    """
+
+    return poll(database_file)
+
+
+def subscribe(callback: Subscriber, tables: Optional[Union[list[str], tuple[str, ...]]] = None) -> None:
+    """変更通知を購読する
+
+    バインドメソッドは弱参照で保持するため、インスタンスが破棄されると購読も自動で解除される。
+
+    Args:
+        callback (Subscriber): 変更時に呼び出す関数
+        tables (Optional[Union[list[str], tuple[str, ...]]], optional): 対象テーブル. Defaults to None.
+            - *None*: すべてのテーブル
+    """
+
+    ref = weakref.WeakMethod(callback) if inspect.ismethod(callback) else callback
+    with _lock:
+        _subscribers[:] = [(r, t) for r, t in _subscribers if _resolve(r) not in (None, callback)]
+        _subscribers.append((ref, frozenset(tables) if tables else None))
+
+
+def unsubscribe(callback: Subscriber) -> None:
+    """変更通知の購読を解除する
+
+    Args:
+        callback (Subscriber): 登録した関数
+    """
+
+    with _lock:
+        _subscribers[:] = [(r, t) for r, t in _subscribers if _resolve(r) not in (None, callback)]
+
+
+def publish(change: DataChange) -> None:
+    """購読者に変更を通知する
+
+    Args:
+        change (DataChange): 変更通知
+    """
+
+    with _lock:
+        targets = [(_resolve(r), t) for r, t in _subscribers]
+
+    logging.debug("data changed: version=%s, tables=%s", change.version, sorted(change.tables))
+    for callback, tables in targets:
+        if callback is None or (tables is not None and not tables & change.tables):
+            continue
+        try:
+            callback(change)
+        except Exception:  # 通知先の失敗は他の購読者に影響させない
+            logging.exception("data change subscriber failed: %s", callback)
+
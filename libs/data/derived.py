@@ -0,0 +1,75 @@
+"""
+libs/data/derived.py
+"""
+
+import hashlib
+import logging
+import sqlite3
+
+import libs.global_value as g
+from libs.data import grade_state, rating_history, stats_cache
+
+SETTINGS_KEY: str = "derived_settings"
+"""`meta`テーブルのキー(派生データ作成時の設定フィンガープリント)"""
+
+
+def invalidate(resultdb: sqlite3.Connection) -> None:
+    """ゲーム結果から派生して保持しているデータ(成績キャッシュ/レーティング推移/段位状態)をすべて破棄する
+
+    メンバー/チーム構成の変更や名前の統一など、ゲスト判定や集計対象が変わる更新後に呼び出す。
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+    """
+
+    stats_cache.clear(resultdb)
+    rating_history.clear(resultdb)
+    grade_state.clear(resultdb)
+
+
+def fingerprint(resultdb: sqlite3.Connection) -> int:
+    """派生データの内容に影響する設定のフィンガープリントを返す
+
+    ルール定義、ゲスト名、時刻補正、レギュレーションワード、段位テーブルを対象にする。
+    デフォルトルールは`[mahjong]`セクションの内容を使う。
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+
+    Returns:
+        int: フィンガープリント(`meta`テーブルに格納できる範囲の整数)
+    """
+
+    source = repr(
+        (
+            g.cfg.mahjong.to_dict(),
+            [g.cfg.rule.to_dict(x) for x in sorted(g.cfg.rule.rule_list) if x != g.cfg.mahjong.rule_version],  # 取り込み前後で変わらないように除外
+            g.cfg.member.guest_name,
+            g.cfg.setting.time_adjust,
+            g.cfg.undefined_word,
+            [tuple(x) for x in resultdb.execute("select word, type, ex_point from words order by type, word;")],
+            g.cfg.badge.grade.table_name,
+        )
+    )
+    return int(hashlib.sha1(source.encode("utf-8")).hexdigest()[:15], 16)
+
+
+def check_settings(resultdb: sqlite3.Connection) -> bool:
+    """前回から設定が変わっていれば派生データを破棄する
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+
+    Returns:
+        bool: 破棄した場合は`True`
+    """
+
+    current = fingerprint(resultdb)
+    row = resultdb.execute("select value from meta where key = ?;", (SETTINGS_KEY,)).fetchone()
+    if row and int(row[0]) == current:
+        return False
+
+    invalidate(resultdb)
+    resultdb.execute("insert or replace into meta (key, value) values (?, ?);", (SETTINGS_KEY, current))
+    logging.info("derived data cleared: settings changed")
+    return True
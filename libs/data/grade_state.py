@@ -0,0 +1,120 @@
+"""
+libs/data/grade_state.py
+"""
+
+import logging
+import math
+import sqlite3
+from functools import lru_cache
+from types import CodeType
+
+import libs.global_value as g
+from libs.data import aggregate, lookup
+from libs.utils import dbutil
+
+
+@lru_cache(maxsize=8)
+def addition_code(expression: str) -> CodeType:
+    """昇段ポイント加算式をコンパイルする
+
+    `{rpoint}`/`{origin_point}`のプレースホルダを変数参照に置き換え、式ごとに一度だけコンパイルする。
+
+    Args:
+        expression (str): 段位テーブルの`addition_expression`
+
+    Returns:
+        CodeType: コンパイル済みの式
+    """
+
+    return compile(expression.format(rpoint="rpoint", origin_point="origin_point"), "<addition_expression>", "eval")
+
+
+def addition_point(code: CodeType, rpoint: int, origin_point: int) -> int:
+    """加算ポイントを求める
+
+    Args:
+        code (CodeType): `addition_code()`の結果
+        rpoint (int): 素点
+        origin_point (int): 配給原点
+
+    Returns:
+        int: 加算ポイント(切り上げ)
+    """
+
+    return math.ceil(eval(code, {"math": math}, {"rpoint": rpoint, "origin_point": origin_point}))
+
+
+def current(name: str, rule_version: str = "") -> tuple[int, int]:
+    """現在の段位状態を返す
+
+    保持済みの最終状態から、それ以降のゲームだけを反映する。
+
+    Args:
+        name (str): 対象プレイヤー名
+        rule_version (str, optional): 集計ルールバージョン. Defaults to 空欄.
+
+    Returns:
+        tuple[int, int]: 昇段ポイント, レベル(段位)
+    """
+
+    rule_version = rule_version if rule_version else g.cfg.mahjong.rule_version
+    key = (name, rule_version, g.cfg.badge.grade.table_name)
+
+    with dbutil.reader() as conn:
+        row = conn.execute(
+            """
+            select playtime, ts, seat, grade_level, point from grade_history
+            where name = ? and rule_version = ? and grade_table = ?
+            order by playtime desc, ts desc, seat desc limit 1;
+            """,
+            key,
+        ).fetchone()
+
+    point, grade_level = (row["point"], row["grade_level"]) if row else (0, 0)
+    since = (row["playtime"], row["ts"], row["seat"]) if row else ("", "", 0)
+
+    result_df = lookup.get_results_list(name, rule_version, since)
+    if result_df.empty:
+        return (point, grade_level)
+
+    code = addition_code(g.cfg.badge.grade.table.get("addition_expression", "0"))
+    history: list[tuple] = []
+    for playtime, ts, seat, rank, rpoint in result_df.itertuples(index=False):
+        point, grade_level = aggregate.grade_promotion_check(
+            grade_level,
+            point + addition_point(code, rpoint, g.cfg.mahjong.origin_point),
+            rank,
+        )
+        history.append((*key, playtime, ts, seat, grade_level, point))
+
+    with dbutil.writer() as conn:
+        conn.executemany("insert or replace into grade_history values (?, ?, ?, ?, ?, ?, ?, ?);", history)
+    logging.debug("grade state: name=%s, rule_version=%s, games=%s", name, rule_version, len(history))
+
+    return (point, grade_level)
+
+
+def invalidate(resultdb: sqlite3.Connection, ts: str) -> None:
+    """対象ゲーム以降の段位状態を破棄する
+
+    削除の場合は削除前に呼び出すこと。末尾への追加では破棄対象がないため、次回参照時に追加分だけ反映される。
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+        ts (str): 対象ゲームのタイムスタンプ
+    """
+
+    if not (row := resultdb.execute("select datetime(playtime) from result where ts = ?;", (ts,)).fetchone()):
+        return
+
+    resultdb.execute("delete from grade_history where playtime >= ?;", (row[0],))
+
+
+def clear(resultdb: sqlite3.Connection) -> None:
+    """全ての段位状態を破棄する
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+    """
+
+    resultdb.execute("delete from grade_history;")
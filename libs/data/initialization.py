@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import TYPE_CHECKING, Union, cast
 
 import libs.global_value as g
+from libs.data import data_version, derived, materialized
 from libs.utils import dbutil
 
 if TYPE_CHECKING:
@@ -30,112 +31,124 @@ def initialization_resultdb(database_file: Union[str, Path]) -> None:
     else:
         logging.info(database_file)
 
-    resultdb = dbutil.connection(database_file)
     memdb = dbutil.connection(":memory:")
+    with dbutil.writer(database_file) as resultdb:
+        table_list = {
+            "member": "CREATE_TABLE_MEMBER",  # メンバー登録テーブル
+            "alias": "CREATE_TABLE_ALIAS",  # 別名定義テーブル
+            "team": "CREATE_TABLE_TEAM",  # チーム定義テーブル
+            "result": "CREATE_TABLE_RESULT",  # データ取り込みテーブル
+            "remarks": "CREATE_TABLE_REMARKS",  # メモ格納テーブル
+            "words": "CREATE_TABLE_WORDS",  # レギュレーションワード登録テーブル
+            "rule": "CREATE_TABLE_RULE",  # ルールセット登録テーブル
+            "stats_cache": "CREATE_TABLE_STATS_CACHE",  # 成績キャッシュテーブル
+            "rating_timeline": "CREATE_TABLE_RATING_TIMELINE",  # レーティング推移管理テーブル
+            "rating_history": "CREATE_TABLE_RATING_HISTORY",  # レーティング推移テーブル
+            "grade_history": "CREATE_TABLE_GRADE_HISTORY",  # 段位状態テーブル
+            "meta": "CREATE_TABLE_META",  # 管理情報テーブル
+        }
+        for table_name, keyword in table_list.items():
+            # テーブル作成
+            resultdb.execute(dbutil.query(keyword))
+            memdb.execute(dbutil.query(keyword))
+
+            # スキーマ比較
+            actual_cols = dbutil.table_info(resultdb, table_name)
+            expected_cols = dbutil.table_info(memdb, table_name)
+            for col_name, col_data in expected_cols.items():
+                if col_name not in actual_cols:
+                    # NOT NULL かつ DEFAULT 未指定だと追加できないので回避
+                    if col_data["notnull"] and col_data["dflt_value"] is None:
+                        logging.warning(
+                            "migration skip: table=%s, column=%s, reason='NOT NULL' and 'DEFAULT' unspecified",
+                            table_name,
+                            col_name,
+                        )
+                        continue
+                    col_type = col_data["type"]
+                    notnull = "NOT NULL" if col_data["notnull"] else ""
+                    dflt = f"DEFAULT {col_data['dflt_value']}" if col_data["dflt_value"] is not None else ""
+                    resultdb.execute(f"alter table {table_name} add column {col_name} {col_type} {notnull} {dflt};")
+                    logging.info("migration: table=%s, column=%s", table_name, col_name)
+
+        # 実体化テーブルの更新トリガー停止(起動時に作り直す)
+        materialized.drop_triggers(resultdb)
+
+        # データバージョン
+        data_version.setup(resultdb)
+        dbutil.add_commit_hook(data_version.poll)  # 書き込み直後に変更を通知
+
+        # 追加カラムデータ更新
+        resultdb.execute("update result set mode = 4 where mode isnull and p4_name != '' and p4_str != '';")
+
+        # regulationsテーブル情報読み込み
+        if cast("ConfigParser", getattr(g.cfg, "_parser")).has_section("regulations"):
+            resultdb.execute("delete from words;")
+            for k, v in cast("ConfigParser", getattr(g.cfg, "_parser")).items("regulations"):
+                match k:
+                    case "undefined":
+                        g.cfg.undefined_word = int(v)
+                    case "yakuman_list":
+                        words_list = {x.strip() for x in v.split(",")}
+                        for word in words_list:
+                            resultdb.execute("insert into words(word, type, ex_point) values (?, 0, NULL);", (word,))
+                        logging.debug("regulations table(type0): %s", words_list)
+                    case "word_list":
+                        words_list = {x.strip() for x in v.split(",")}
+                        for word in words_list:
+                            resultdb.execute("insert into words(word, type, ex_point) values (?, 1, NULL);", (word,))
+                        logging.debug("regulations table(type1): %s", words_list)
+                    case _:
+                        word = k.strip()
+                        ex_point = int(v)
+                        resultdb.execute(
+                            "insert into words(word, type, ex_point) values (?, 2, ?);",
+                            (
+                                word,
+                                ex_point,
+                            ),
+                        )
+                        logging.debug("regulations table(type2): %s, %s", word, ex_point)
+
+        if cast("ConfigParser", getattr(g.cfg, "_parser")).has_section("regulations"):
+            for k, v in cast("ConfigParser", getattr(g.cfg, "_parser")).items("regulations_team"):
+                resultdb.execute(
+                    "insert into words(word, type, ex_point) values (?, 3, ?);",
+                    (
+                        k.strip(),
+                        int(v),
+                    ),
+                )
+                logging.debug("regulations table(type3): %s, %s", k.strip(), int(v))
+
+        # VIEW
+        rows = resultdb.execute("select name from sqlite_master where type = 'view';")
+        for row in rows.fetchall():
+            resultdb.execute(f"drop view if exists '{row['name']}';")
+        resultdb.execute(dbutil.query("CREATE_VIEW_GAME_RESULTS").replace("<time_adjust>", str(g.cfg.setting.time_adjust)))
+        resultdb.execute(dbutil.query("CREATE_VIEW_GAME_INFO"))
+        resultdb.execute(dbutil.query("CREATE_VIEW_REGULATIONS").format(undefined_word=g.cfg.undefined_word))
+
+        # INDEX
+        resultdb.execute(dbutil.query("CREATE_INDEX"))
+
+        # 実体化テーブル
+        materialized.setup(resultdb)
+        derived.check_settings(resultdb)  # 設定(ルール/ゲスト)が変わっていれば派生データを破棄
+
+        # ゲスト設定チェック
+        ret = resultdb.execute("select * from member where id=0;")
+        data = ret.fetchall()
+
+        if len(data) == 0:
+            logging.info("ゲスト設定: %s", g.cfg.member.guest_name)
+            sql = "insert into member (id, name) values (0, ?);"
+            resultdb.execute(sql, (g.cfg.member.guest_name,))
+        elif data[0][1] != g.cfg.member.guest_name:
+            logging.warning("ゲスト修正: %s -> %s", data[0][1], g.cfg.member.guest_name)
+            sql = "update member set name=? where id=0;"
+            resultdb.execute(sql, (g.cfg.member.guest_name,))
 
-    table_list = {
-        "member": "CREATE_TABLE_MEMBER",  # メンバー登録テーブル
-        "alias": "CREATE_TABLE_ALIAS",  # 別名定義テーブル
-        "team": "CREATE_TABLE_TEAM",  # チーム定義テーブル
-        "result": "CREATE_TABLE_RESULT",  # データ取り込みテーブル
-        "remarks": "CREATE_TABLE_REMARKS",  # メモ格納テーブル
-        "words": "CREATE_TABLE_WORDS",  # レギュレーションワード登録テーブル
-        "rule": "CREATE_TABLE_RULE",  # ルールセット登録テーブル
-    }
-    for table_name, keyword in table_list.items():
-        # テーブル作成
-        resultdb.execute(dbutil.query(keyword))
-        memdb.execute(dbutil.query(keyword))
-
-        # スキーマ比較
-        actual_cols = dbutil.table_info(resultdb, table_name)
-        expected_cols = dbutil.table_info(memdb, table_name)
-        for col_name, col_data in expected_cols.items():
-            if col_name not in actual_cols:
-                # NOT NULL かつ DEFAULT 未指定だと追加できないので回避
-                if col_data["notnull"] and col_data["dflt_value"] is None:
-                    logging.warning(
-                        "migration skip: table=%s, column=%s, reason='NOT NULL' and 'DEFAULT' unspecified",
-                        table_name,
-                        col_name,
-                    )
-                    continue
-                col_type = col_data["type"]
-                notnull = "NOT NULL" if col_data["notnull"] else ""
-                dflt = f"DEFAULT {col_data['dflt_value']}" if col_data["dflt_value"] is not None else ""
-                resultdb.execute(f"alter table {table_name} add column {col_name} {col_type} {notnull} {dflt};")
-                logging.info("migration: table=%s, column=%s", table_name, col_name)
-
-    # 追加カラムデータ更新
-    resultdb.execute("update result set mode = 4 where mode isnull and p4_name != '' and p4_str != '';")
-
-    # regulationsテーブル情報読み込み
-    if cast("ConfigParser", getattr(g.cfg, "_parser")).has_section("regulations"):
-        resultdb.execute("delete from words;")
-        for k, v in cast("ConfigParser", getattr(g.cfg, "_parser")).items("regulations"):
-            match k:
-                case "undefined":
-                    g.cfg.undefined_word = int(v)
-                case "yakuman_list":
-                    words_list = {x.strip() for x in v.split(",")}
-                    for word in words_list:
-                        resultdb.execute("insert into words(word, type, ex_point) values (?, 0, NULL);", (word,))
-                    logging.debug("regulations table(type0): %s", words_list)
-                case "word_list":
-                    words_list = {x.strip() for x in v.split(",")}
-                    for word in words_list:
-                        resultdb.execute("insert into words(word, type, ex_point) values (?, 1, NULL);", (word,))
-                    logging.debug("regulations table(type1): %s", words_list)
-                case _:
-                    word = k.strip()
-                    ex_point = int(v)
-                    resultdb.execute(
-                        "insert into words(word, type, ex_point) values (?, 2, ?);",
-                        (
-                            word,
-                            ex_point,
-                        ),
-                    )
-                    logging.debug("regulations table(type2): %s, %s", word, ex_point)
-
-    if cast("ConfigParser", getattr(g.cfg, "_parser")).has_section("regulations"):
-        for k, v in cast("ConfigParser", getattr(g.cfg, "_parser")).items("regulations_team"):
-            resultdb.execute(
-                "insert into words(word, type, ex_point) values (?, 3, ?);",
-                (
-                    k.strip(),
-                    int(v),
-                ),
-            )
-            logging.debug("regulations table(type3): %s, %s", k.strip(), int(v))
-
-    # VIEW
-    rows = resultdb.execute("select name from sqlite_master where type = 'view';")
-    for row in rows.fetchall():
-        resultdb.execute(f"drop view if exists '{row['name']}';")
-    resultdb.execute(dbutil.query("CREATE_VIEW_INDIVIDUAL_RESULTS").replace("<time_adjust>", str(g.cfg.setting.time_adjust)))
-    resultdb.execute(dbutil.query("CREATE_VIEW_GAME_RESULTS").replace("<time_adjust>", str(g.cfg.setting.time_adjust)))
-    resultdb.execute(dbutil.query("CREATE_VIEW_GAME_INFO"))
-    resultdb.execute(dbutil.query("CREATE_VIEW_REGULATIONS").format(undefined_word=g.cfg.undefined_word))
-
-    # INDEX
-    resultdb.execute(dbutil.query("CREATE_INDEX"))
-
-    # ゲスト設定チェック
-    ret = resultdb.execute("select * from member where id=0;")
-    data = ret.fetchall()
-
-    if len(data) == 0:
-        logging.info("ゲスト設定: %s", g.cfg.member.guest_name)
-        sql = "insert into member (id, name) values (0, ?);"
-        resultdb.execute(sql, (g.cfg.member.guest_name,))
-    elif data[0][1] != g.cfg.member.guest_name:
-        logging.warning("ゲスト修正: %s -> %s", data[0][1], g.cfg.member.guest_name)
-        sql = "update member set name=? where id=0;"
-        resultdb.execute(sql, (g.cfg.member.guest_name,))
-
-    resultdb.commit()
-    resultdb.close()
     memdb.close()
     read_grade_table()
 
@@ -6,13 +6,13 @@ import logging
 import re
 import sqlite3
 import textwrap
-from contextlib import closing
 from datetime import datetime
 from typing import TYPE_CHECKING, Any, cast
 
 import pandas as pd
 
 import libs.global_value as g
+from cls.context import QueryContext
 from cls.timekit import Format
 from libs.utils import dbutil
 
@@ -20,17 +20,21 @@ if TYPE_CHECKING:
     from cls.timekit import ExtendedDatetime as ExtDt
 
 
-def execute(sql: str, params: dict = {}) -> list[dict[str, Any]]:
+def execute(sql: str, params: dict | QueryContext = {}) -> list[dict[str, Any]]:
     """クエリ実行
 
     Args:
         sql (str): 実行クエリ
-        params (dict): プレースホルダ
+        params (dict | QueryContext): プレースホルダ(`QueryContext`の場合は実行中のみ`g.params`に展開)
 
     Returns:
         list[dict[str, Any]]: 実行結果
     """
 
+    if isinstance(params, QueryContext):
+        with params.activate() as local_params:
+            return execute(sql, cast(dict, local_params))
+
     ret: list[dict[str, Any]] = []
     sql = dbutil.query_modification(sql)
 
@@ -44,38 +48,44 @@ def execute(sql: str, params: dict = {}) -> list[dict[str, Any]]:
         print(f">>> {params=}")
         print(f">>> SQL -> {g.cfg.setting.database_file}\n{named_query(sql, params)}")
 
-    with closing(dbutil.connection(g.cfg.setting.database_file)) as conn:
-        try:
-            rows = conn.execute(sql, params)
-            if conn.total_changes:
-                conn.commit()
-        except sqlite3.OperationalError as err:
-            logging.error("OperationalError: %s", err)
-            logging.error("params=%s", params)
-            logging.error("query: %s", named_query(sql, params))
-            return ret
+    try:
+        if _is_readonly(sql):
+            with dbutil.reader() as conn:
+                rows = conn.execute(sql, params).fetchall()
+        else:
+            with dbutil.writer() as conn:
+                rows = conn.execute(sql, params).fetchall()
+    except sqlite3.OperationalError as err:
+        logging.error("OperationalError: %s", err)
+        logging.error("params=%s", params)
+        logging.error("query: %s", named_query(sql, params))
+        return ret
 
-        for row in rows.fetchall():
-            ret.append(dict(row))
+    for row in rows:
+        ret.append(dict(row))
 
-        if g.args.verbose & 0x02:
-            print("=" * 80)
-            print(ret)
+    if g.args.verbose & 0x02:
+        print("=" * 80)
+        print(ret)
 
     return ret
 
 
-def read_data(keyword: str, params: dict = {}) -> pd.DataFrame:
+def read_data(keyword: str, params: dict | QueryContext = {}) -> pd.DataFrame:
     """データベースからデータを取得する
 
     Args:
         keyword (str): SQL選択キーワード
-        params (dict): プレースホルダ
+        params (dict | QueryContext): プレースホルダ(`QueryContext`の場合は実行中のみ`g.params`に展開)
 
     Returns:
         pd.DataFrame: 集計結果
     """
 
+    if isinstance(params, QueryContext):
+        with params.activate() as local_params:
+            return read_data(keyword, cast(dict, local_params))
+
     if not params:
         params = cast(dict, g.params)
 
@@ -92,16 +102,17 @@ def read_data(keyword: str, params: dict = {}) -> pd.DataFrame:
 
     try:
         query_start_time = datetime.now().timestamp()
-        df = pd.read_sql(
-            sql=sql,
-            con=dbutil.connection(g.cfg.setting.database_file),
-            params={
-                **params,
-                **g.params.get("rule_set", {}),
-                **g.params.get("player_list", {}),
-                **g.params.get("competition_list", {}),
-            },
-        )
+        with dbutil.reader() as conn:
+            df = pd.read_sql(
+                sql=sql,
+                con=conn,
+                params={
+                    **params,
+                    **g.params.get("rule_set", {}),
+                    **g.params.get("player_list", {}),
+                    **g.params.get("competition_list", {}),
+                },
+            )
         query_end_time = datetime.now().timestamp()
     except pd.errors.DatabaseError as err:
         logging.error("DatabaseError: %s", err)
@@ -139,3 +150,19 @@ def named_query(query: str, params: dict) -> str:
             params[k] = v.strftime("%Y-%m-%d %H:%M:%S")
 
     return textwrap.dedent(re.sub(r":(\w+)", lambda m: repr(params.get(m.group(1), m.group(0))), query)).strip()
+
+
+def _is_readonly(sql: str) -> bool:
+    """参照のみのクエリか判定する
+
+    Args:
+        sql (str): 判定するクエリ
+
+    Returns:
+        bool: 判定結果
+            - *True*: 読み込み用接続で実行できる
+            - *False*: 書き込み用接続が必要
+    """
+
+    statement = re.sub(r"^\s*(--.*\n\s*)*", "", sql).lower()
+    return statement.startswith(("select", "with")) and not re.search(r"\b(insert|update|delete)\b", statement)
@@ -4,7 +4,6 @@ libs/data/lookup.py
 
 import logging
 from configparser import ConfigParser
-from contextlib import closing
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Union, cast
 
@@ -106,6 +105,46 @@ def member_info(params: "PlaceholderDict") -> dict[str, Any]:
     return ret[0]
 
 
+def members_info(params: "PlaceholderDict") -> dict[str, dict[str, Any]]:
+    """検索範囲に記録のある全メンバー(チーム)の記録情報をまとめて返す
+
+    Args:
+        params (PlaceholderDict): 集計条件
+
+    Returns:
+        dict[str, dict[str, Any]]: メンバー名(チーム名)をキーにした記録情報
+    """
+
+    column = "name" if params.get("individual", True) else "team"
+    params.update({"starttime": cast(ExtDt, params["starttime"]).format(Format.SQL)})
+    params.update({"endtime": cast(ExtDt, params["endtime"]).format(Format.SQL)})
+    ret = loader.execute(
+        f"""
+        select
+            {column} as target,
+            count() as game_count,
+            min(ts) as first_game,
+            max(ts) as last_game,
+            max(rpoint) as rpoint_max,
+            min(rpoint) as rpoint_min
+        from
+            individual_results
+        where
+            mode = :mode
+            and rule_version in (<<rule_list>>)
+            and playtime between :starttime and :endtime
+            and {column} is not null
+            --[separate] and source = :source
+        group by
+            {column}
+        ;
+        """,
+        cast(dict, params),
+    )
+
+    return {x.pop("target"): x for x in ret}
+
+
 def get_guest() -> str:
     """ゲスト名取得
 
@@ -114,7 +153,7 @@ def get_guest() -> str:
     """
 
     guest_name: str = ""
-    with closing(dbutil.connection(g.cfg.setting.database_file)) as conn:
+    with dbutil.reader() as conn:
         rows = conn.execute("select name from member where id=0")
         guest_name = str(rows.fetchone()[0])
 
@@ -130,11 +169,11 @@ def get_member_info() -> list["MemberDataDict"]:
 
     ret: list["MemberDataDict"] = []
 
-    with closing(dbutil.connection(g.cfg.setting.database_file)) as conn:
+    with dbutil.reader() as conn:
         rows = conn.execute("select name, id from member where id != 0;")
         id_list = dict(rows.fetchall())
 
-    with closing(dbutil.connection(g.cfg.setting.database_file)) as conn:
+    with dbutil.reader() as conn:
         rows = conn.execute("select name, member from alias")
         alias_list = dict(rows.fetchall())
 
@@ -159,7 +198,7 @@ def get_team_info() -> list["TeamDataDict"]:
 
     ret: list["TeamDataDict"] = []
 
-    with closing(dbutil.connection(g.cfg.setting.database_file)) as conn:
+    with dbutil.reader() as conn:
         rows = conn.execute(
             """
                 select
@@ -197,7 +236,7 @@ def regulation_list(word_type: int = 0) -> list:
         list: 取得結果
     """
 
-    with closing(dbutil.connection(g.cfg.setting.database_file)) as cur:
+    with dbutil.reader() as cur:
         ret = cur.execute(
             """
             select
@@ -226,7 +265,7 @@ def exsist_record(ts: str) -> GameResult:
 
     result = GameResult()
 
-    with closing(dbutil.connection(g.cfg.setting.database_file)) as conn:
+    with dbutil.reader() as conn:
         row = conn.execute(dbutil.query("SELECT_GAME_RESULTS"), {"ts": ts}).fetchone()
 
     if row:
@@ -249,7 +288,7 @@ def first_record(rule_list: list[str]) -> ExtDt:
     rule_dict = {f"rule_{idx}": name for idx, name in enumerate(set(rule_list))}
 
     try:
-        with closing(dbutil.connection(g.cfg.setting.database_file)) as conn:
+        with dbutil.reader() as conn:
             table_count = conn.execute(
                 "select count() from sqlite_master where type='view' and name='game_results';",
             ).fetchall()[0][0]
@@ -265,25 +304,30 @@ def first_record(rule_list: list[str]) -> ExtDt:
     return ret
 
 
-def get_results_list(name: str, rule_version: str = "") -> pd.DataFrame:
+def get_results_list(name: str, rule_version: str = "", since: tuple[str, str, int] = ("", "", 0)) -> pd.DataFrame:
     """段位集計用順位リスト生成
 
     Args:
         name (str): 集計対象メンバー名
         rule_version (str, optional): 集計ルールバージョン. Defaults to 空欄.
+        since (tuple[str, str, int], optional): 取得開始位置(playtime, ts, seat)。この位置より後のゲームを返す. Defaults to 全件.
 
     Returns:
-        pd.DataFrame: 順位, 素点
+        pd.DataFrame: ゲーム終了時間, タイムスタンプ, 席, 順位, 素点
     """
 
-    ret_data = pd.read_sql(
-        sql=dbutil.query("SELECT_ALL_RESULTS"),
-        con=dbutil.connection(g.cfg.setting.database_file),
-        params={
-            "rule_version": rule_version if rule_version else g.cfg.mahjong.rule_version,
-            "player_name": name,
-        },
-    )
+    with dbutil.reader() as conn:
+        ret_data = pd.read_sql(
+            sql=dbutil.query("SELECT_ALL_RESULTS"),
+            con=conn,
+            params={
+                "rule_version": rule_version if rule_version else g.cfg.mahjong.rule_version,
+                "player_name": name,
+                "playtime": since[0],
+                "ts": since[1],
+                "seat": since[2],
+            },
+        )
 
     return ret_data
 
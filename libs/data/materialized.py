@@ -0,0 +1,188 @@
+"""
+libs/data/materialized.py
+"""
+
+import logging
+import sqlite3
+from typing import Iterable
+
+import libs.global_value as g
+from libs.utils import dbutil
+
+SOURCE_VIEW: str = "individual_results_source"
+"""実体化テーブルの元データを返すVIEW名"""
+
+GAME_RESULTS_TABLE: str = "game_results_mat"
+"""ゲーム結果の実体化テーブル名"""
+
+
+def enabled() -> bool:
+    """個人成績の実体化テーブルが有効か
+
+    Returns:
+        bool: 判定結果
+    """
+
+    return bool(g.cfg.setting.materialize_individual_results)
+
+
+def game_enabled() -> bool:
+    """ゲーム結果の実体化テーブルが有効か
+
+    Returns:
+        bool: 判定結果
+    """
+
+    return bool(g.cfg.setting.materialize_game_results)
+
+
+def setup(resultdb: sqlite3.Connection) -> None:
+    """実体化テーブルの作成
+
+    設定に応じてVIEWまたは実体化テーブルを作成する。
+    `game_results`/`game_info` のVIEWは作成済みであること。
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+    """
+
+    # 個人成績
+    view_sql = dbutil.query("CREATE_VIEW_INDIVIDUAL_RESULTS").replace("<time_adjust>", str(g.cfg.setting.time_adjust))
+    if enabled():
+        resultdb.execute(view_sql.replace("<view_name>", SOURCE_VIEW))
+        resultdb.execute(dbutil.query("CREATE_TABLE_INDIVIDUAL_RESULTS"))
+        for sql in dbutil.split_statements(dbutil.query("CREATE_INDEX_INDIVIDUAL_RESULTS")):
+            resultdb.execute(sql)
+    else:
+        resultdb.execute("drop table if exists individual_results;")
+        resultdb.execute(view_sql.replace("<view_name>", "individual_results"))
+
+    # ゲーム結果
+    if not game_enabled():
+        drop_triggers(resultdb)
+        resultdb.execute(f"drop table if exists {GAME_RESULTS_TABLE};")
+
+    rebuild(resultdb)
+
+
+def drop_triggers(resultdb: sqlite3.Connection) -> None:
+    """ゲーム結果の実体化テーブルを更新するトリガーを削除する
+
+    一括更新の前に呼び出し、更新後は`rebuild()`で再作成する。
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+    """
+
+    rows = resultdb.execute(
+        "select name from sqlite_master where type = 'trigger' and name like ?;",
+        (f"trg_{GAME_RESULTS_TABLE}_%",),
+    )
+    for row in rows.fetchall():
+        resultdb.execute(f"drop trigger if exists '{row[0]}';")
+
+
+def rebuild(resultdb: sqlite3.Connection) -> dict[str, int]:
+    """実体化テーブルを全件作り直す
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+
+    Returns:
+        dict[str, int]: テーブル名と登録レコード数
+    """
+
+    ret: dict[str, int] = {}
+
+    if enabled():
+        resultdb.execute("delete from individual_results;")
+        ret["individual_results"] = resultdb.execute(f"insert into individual_results select * from {SOURCE_VIEW};").rowcount
+
+    if game_enabled():
+        drop_triggers(resultdb)
+        resultdb.execute(f"drop table if exists {GAME_RESULTS_TABLE};")
+        for sql in dbutil.split_statements(dbutil.query("CREATE_TABLE_GAME_RESULTS_MAT")):
+            resultdb.execute(sql)
+        for sql in dbutil.split_statements(dbutil.query("CREATE_TRIGGER_GAME_RESULTS_MAT")):
+            resultdb.execute(sql)
+        ret[GAME_RESULTS_TABLE] = resultdb.execute(f"select count() from {GAME_RESULTS_TABLE};").fetchone()[0]
+
+    for table_name, count in ret.items():
+        logging.info("rebuild %s: %s rows", table_name, count)
+
+    return ret
+
+
+def refresh(resultdb: sqlite3.Connection, ts_list: Iterable[str]) -> int:
+    """指定ゲームの個人成績を再計算する
+
+    ゲーム結果の実体化テーブルはトリガーで更新されるため対象外。
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+        ts_list (Iterable[str]): 対象ゲームのタイムスタンプ
+
+    Returns:
+        int: 登録レコード数
+    """
+
+    if not enabled():
+        return 0
+
+    count: int = 0
+    targets = set(ts_list)
+    for ts in targets:
+        resultdb.execute("delete from individual_results where ts = ?;", (ts,))
+        count += resultdb.execute(f"insert into individual_results select * from {SOURCE_VIEW} where ts = ?;", (ts,)).rowcount
+    logging.debug("refresh individual_results: ts=%s, %s rows", targets, count)
+
+    return count
+
+
+def refresh_player(resultdb: sqlite3.Connection, name: str) -> int:
+    """指定プレイヤーが参加したゲームの個人成績を再計算する
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+        name (str): プレイヤー名
+
+    Returns:
+        int: 登録レコード数
+    """
+
+    if not enabled():
+        return 0
+
+    rows = resultdb.execute("select distinct ts from individual_results where name = ?;", (name,))
+    return refresh(resultdb, [row[0] for row in rows.fetchall()])
+
+
+def check(resultdb: sqlite3.Connection) -> dict[str, list[str]]:
+    """実体化テーブルとVIEWの内容を比較する
+
+    Args:
+        resultdb (sqlite3.Connection): 接続オブジェクト
+
+    Returns:
+        dict[str, list[str]]: テーブル名と差異のあるゲームのタイムスタンプ
+    """
+
+    target: dict[str, str] = {}
+    if enabled():
+        target.update({"individual_results": SOURCE_VIEW})
+    if game_enabled():
+        target.update({GAME_RESULTS_TABLE: "game_results"})
+
+    ret: dict[str, list[str]] = {}
+    for table_name, view_name in target.items():
+        rows = resultdb.execute(
+            f"""
+            select ts from (select * from {table_name} except select * from {view_name})
+            union
+            select ts from (select * from {view_name} except select * from {table_name})
+            order by ts;
+            """
+        )
+        ret[table_name] = [row[0] for row in rows.fetchall()]
+
+    return ret
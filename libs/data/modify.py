@@ -7,14 +7,15 @@ import os
 import re
 import shutil
 import sqlite3
-from contextlib import closing
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING, cast
 
 import libs.global_value as g
 from cls.timekit import ExtendedDatetime as ExtDt
 from cls.timekit import Format
-from integrations.protocols import ActionStatus, MessageStatus
-from libs.data import lookup
+from integrations.protocols import ActionStatus, CommandType, MessageStatus
+from libs.data import grade_state, lookup, materialized, rating_history, reconcile, stats_cache
 from libs.functions import message
 from libs.types import StyleOptions
 from libs.utils import dbutil, formatter
@@ -24,6 +25,9 @@ if TYPE_CHECKING:
     from integrations.protocols import MessageParserProtocol
     from libs.types import RemarkDict
 
+PostTask = tuple[str, ActionStatus, bool, str]
+"""後処理の単位(入力元識別子, 処理種別, リアクション, タイムスタンプ)"""
+
 
 def db_insert(detection: "GameResult", m: "MessageParserProtocol") -> int:
     """スコアデータをDBに追加する
@@ -39,20 +43,22 @@ def db_insert(detection: "GameResult", m: "MessageParserProtocol") -> int:
     changes: int = 0
 
     if m.check_updatable:
-        with closing(dbutil.connection(g.cfg.setting.database_file)) as cur:
-            try:
-                cur.execute(
+        try:
+            with dbutil.writer() as cur:
+                changes = cur.execute(
                     dbutil.query("RESULT_INSERT"),
                     {
                         "playtime": ExtDt(float(detection.ts)).format(Format.SQL),
                         "rpoint_sum": detection.rpoint_sum,
                         **detection.to_dict(),
                     },
-                )
-                changes = cur.total_changes
-                cur.commit()
-            except sqlite3.IntegrityError as err:
-                logging.error("IntegrityError: %s", err)
+                ).rowcount
+                materialized.refresh(cur, [detection.ts])
+                stats_cache.append(cur, detection.ts)
+                rating_history.mark(cur, detection.ts)
+                grade_state.invalidate(cur, detection.ts)
+        except sqlite3.IntegrityError as err:
+            logging.error("IntegrityError: %s", err)
         logging.info("%s", detection.to_text("logging"))
         _score_check(detection, m)
     else:
@@ -79,17 +85,20 @@ def db_update(detection: "GameResult", m: "MessageParserProtocol") -> int:
     changes: int = int(0)
 
     if m.check_updatable:
-        with closing(dbutil.connection(g.cfg.setting.database_file)) as cur:
-            cur.execute(
+        with dbutil.writer() as cur:
+            stats_cache.invalidate(cur, [detection.ts])  # 変更前の参加者
+            rating_history.mark(cur, detection.ts)
+            grade_state.invalidate(cur, detection.ts)
+            changes = cur.execute(
                 dbutil.query("RESULT_UPDATE"),
                 {
                     "playtime": ExtDt(float(detection.ts)).format(Format.SQL),
                     "rpoint_sum": detection.rpoint_sum,
                     **detection.to_dict(),
                 },
-            )
-            changes = cur.total_changes
-            cur.commit()
+            ).rowcount
+            materialized.refresh(cur, [detection.ts])
+            stats_cache.invalidate(cur, [detection.ts])  # 変更後の参加者
         logging.info("%s", detection.to_text("logging"))
         _score_check(detection, m)
     else:
@@ -109,25 +118,151 @@ def db_delete(m: "MessageParserProtocol"):
     """
 
     if m.check_updatable:
-        with closing(dbutil.connection(g.cfg.setting.database_file)) as cur:
+        with dbutil.writer() as cur:
+            stats_cache.invalidate(cur, [m.data.event_ts])
+            rating_history.mark(cur, m.data.event_ts)
+            grade_state.invalidate(cur, m.data.event_ts)
             # ゲーム結果の削除
-            cur.execute(dbutil.query("RESULT_DELETE"), (m.data.event_ts,))
-            if delete_result := cur.execute("select changes();").fetchone()[0]:
+            if delete_result := cur.execute(dbutil.query("RESULT_DELETE"), (m.data.event_ts,)).rowcount:
                 m.status.target_ts.append(m.data.event_ts)
                 logging.info("result: ts=%s, count=%s", m.data.event_ts, delete_result)
             # メモの削除
             if remark_list := cur.execute("select event_ts from remarks where thread_ts=?", (m.data.event_ts,)).fetchall():
-                cur.execute(dbutil.query("REMARKS_DELETE_ALL"), (m.data.event_ts,))
-                if delete_remark := cur.execute("select changes();").fetchone()[0]:
+                if delete_remark := cur.execute(dbutil.query("REMARKS_DELETE_ALL"), (m.data.event_ts,)).rowcount:
                     m.status.target_ts.extend([x.get("event_ts") for x in list(map(dict, remark_list))])
                     logging.info("remark: ts=%s, count=%s", m.data.event_ts, delete_remark)
-            cur.commit()
+            materialized.refresh(cur, [m.data.event_ts])
         m.status.action = ActionStatus.DELETE
         g.adapter.functions.post_processing(m)
     else:
         logging.warning("A post to a restricted channel was detected.")
 
 
+def score_reconcile(diff: "reconcile.ScoreDiff", sources: dict[str, str], workers: int = 1) -> "reconcile.RepairSummary":
+    """突合結果のスコアを1トランザクションで反映する
+
+    追加/更新/削除をまとめて書き込み、キャッシュ類の更新もゲームのリストで一度に行う。
+    リアクションの更新は書き込み後にまとめて後処理する。
+
+    Args:
+        diff (reconcile.ScoreDiff): スコアの差分
+        sources (dict[str, str]): 投稿メッセージのtsと入力元識別子(リアクションを付けるチャンネル)
+        workers (int, optional): 後処理の同時実行数. Defaults to 1.
+
+    Returns:
+        reconcile.RepairSummary: 処理件数
+    """
+
+    summary = reconcile.RepairSummary()
+    if not (diff.insert or diff.update or diff.delete):
+        return summary
+
+    started = time.perf_counter()
+    tasks: list[PostTask] = []
+    delete_ts = [x.ts for x in diff.delete]
+    with dbutil.writer() as cur:
+        # 変更前の参加者の累積値を破棄
+        stats_cache.invalidate(cur, [x.ts for _, x in diff.update] + delete_ts)
+        for ts in [x.ts for _, x in diff.update] + delete_ts:  # 削除前に記録が必要
+            rating_history.mark(cur, ts)
+            grade_state.invalidate(cur, ts)
+
+        for _, detection in diff.update:
+            detection.calc()
+            params = {"playtime": ExtDt(float(detection.ts)).format(Format.SQL), "rpoint_sum": detection.rpoint_sum, **detection.to_dict()}
+            summary.updated += cur.execute(dbutil.query("RESULT_UPDATE"), params).rowcount
+            tasks.append((sources.get(detection.ts, str(detection.source)), ActionStatus.CHANGE, _score_reaction(detection), detection.ts))
+            logging.info("%s", detection.to_text("logging"))
+
+        for detection in diff.insert:
+            params = {"playtime": ExtDt(float(detection.ts)).format(Format.SQL), "rpoint_sum": detection.rpoint_sum, **detection.to_dict()}
+            try:
+                summary.inserted += cur.execute(dbutil.query("RESULT_INSERT"), params).rowcount
+            except sqlite3.IntegrityError as err:
+                summary.failed += 1
+                summary.failed_ts.append(detection.ts)
+                logging.error("IntegrityError: %s", err)
+                continue
+            rating_history.mark(cur, detection.ts)
+            grade_state.invalidate(cur, detection.ts)
+            tasks.append((sources.get(detection.ts, str(detection.source)), ActionStatus.CHANGE, _score_reaction(detection), detection.ts))
+            logging.info("%s", detection.to_text("logging"))
+
+        for detection in diff.delete:
+            remark_list = [row[0] for row in cur.execute("select event_ts from remarks where thread_ts=?", (detection.ts,))]
+            summary.remarks_deleted += cur.execute(dbutil.query("REMARKS_DELETE_ALL"), (detection.ts,)).rowcount
+            if cur.execute(dbutil.query("RESULT_DELETE"), (detection.ts,)).rowcount:
+                summary.deleted += 1
+                tasks.extend((str(detection.source), ActionStatus.DELETE, False, ts) for ts in [detection.ts, *remark_list])
+            logging.info("delete: ts=%s, remarks=%s", detection.ts, len(remark_list))
+
+        # 変更後の参加者
+        ts_list = [x.ts for _, x in diff.update] + [x.ts for x in diff.insert] + delete_ts
+        materialized.refresh(cur, ts_list)
+        stats_cache.invalidate(cur, ts_list)
+
+    summary.reactions = _post_processing_batch(tasks, workers)
+    summary.elapsed = time.perf_counter() - started
+    logging.info("score reconcile: %s", summary)
+    return summary
+
+
+def _score_reaction(detection: "GameResult") -> bool:
+    """スコアに付けるリアクションを判定する(`_score_check`と同じ条件)
+
+    Args:
+        detection (GameResult): スコアデータ
+
+    Returns:
+        bool: 真偽
+        - *True*: OK
+        - *False*: NG(供託残り、プレイヤー名重複)
+    """
+
+    return not detection.deposit and len(set(detection.to_list())) == detection.mode
+
+
+def _post_processing_batch(tasks: list[PostTask], workers: int = 1) -> int:
+    """後処理(リアクション更新)をまとめて実行する
+
+    入力元/処理種別/リアクションが同じものは1回の後処理にまとめ、まとめた単位で並列に実行する。
+
+    Args:
+        tasks (list[PostTask]): 後処理の一覧
+        workers (int, optional): 同時実行数. Defaults to 1.
+
+    Returns:
+        int: 後処理したタイムスタンプの数
+    """
+
+    groups: dict[tuple[str, ActionStatus, bool], list[str]] = {}
+    for source, action, reaction, ts in tasks:
+        if ts not in (target := groups.setdefault((source, action, reaction), [])):
+            target.append(ts)
+
+    def _run(key: tuple[str, ActionStatus, bool], ts_list: list[str]) -> None:
+        source, action, reaction = key
+        m = g.adapter.parser()
+        m.status.command_type = CommandType.COMPARISON
+        m.status.source = source
+        m.data.channel_id = source.replace(f"{g.adapter.interface_type}_", "")
+        m.data.event_ts = ts_list[0]
+        m.status.target_ts = ts_list
+        m.status.action = action
+        m.status.reaction = reaction
+        g.adapter.functions.post_processing(m)
+
+    if workers > 1 and len(groups) > 1:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="post-processing") as executor:
+            for future in [executor.submit(_run, key, ts_list) for key, ts_list in groups.items()]:
+                future.result()
+    else:
+        for key, ts_list in groups.items():
+            _run(key, ts_list)
+
+    return sum(len(x) for x in groups.values())
+
+
 def db_backup() -> str:
     """データベースのバックアップ
 
@@ -171,19 +306,22 @@ def remarks_append(m: "MessageParserProtocol", remarks: list["RemarkDict"]) -> N
     """
 
     if m.check_updatable:
-        with closing(dbutil.connection(g.cfg.setting.database_file)) as cur:
+        count: int = 0
+        thread_list: list[str] = []
+        with dbutil.writer() as cur:
             for para in remarks:
                 # 親スレッドの情報
                 row = cur.execute("select * from result where ts=:thread_ts", para).fetchone()
                 if row:
                     if para["name"] in [v for k, v in dict(row).items() if str(k).endswith("_name")]:
-                        cur.execute(dbutil.query("REMARKS_INSERT"), para)
+                        count += cur.execute(dbutil.query("REMARKS_INSERT"), para).rowcount
+                        thread_list.append(para["thread_ts"])
                         m.status.target_ts.append(para["event_ts"])
                         if not m.data.channel_id:
                             m.data.channel_id = para["source"].replace(f"{g.adapter.interface_type}_", "")
                         logging.info("insert: %s", para)
-            cur.commit()
-            count = cur.execute("select changes();").fetchone()[0]
+            materialized.refresh(cur, thread_list)
+            stats_cache.invalidate(cur, thread_list)
 
         # 後処理
         if count:
@@ -203,12 +341,13 @@ def remarks_delete(m: "MessageParserProtocol"):
     """
 
     if m.check_updatable:
-        with closing(dbutil.connection(g.cfg.setting.database_file)) as cur:
-            cur.execute(dbutil.query("REMARKS_DELETE_ONE"), (m.data.event_ts,))
-            cur.commit()
-            if count := cur.execute("select changes();").fetchone()[0]:
+        with dbutil.writer() as cur:
+            thread_list = [row[0] for row in cur.execute("select thread_ts from remarks where event_ts=?", (m.data.event_ts,))]
+            if count := cur.execute(dbutil.query("REMARKS_DELETE_ONE"), (m.data.event_ts,)).rowcount:
                 m.status.target_ts.append(m.data.event_ts)
                 logging.info("ts=%s, count=%s", m.data.event_ts, count)
+                materialized.refresh(cur, thread_list)
+                stats_cache.invalidate(cur, thread_list)
         # 後処理
         m.status.action = ActionStatus.DELETE
         g.adapter.functions.post_processing(m)
@@ -222,10 +361,10 @@ def remarks_delete_compar(para: "RemarkDict", m: "MessageParserProtocol") -> Non
         m (MessageParserProtocol): メッセージデータ
     """
 
-    with closing(dbutil.connection(g.cfg.setting.database_file)) as cur:
+    with dbutil.writer() as cur:
         cur.execute(dbutil.query("REMARKS_DELETE_COMPAR"), para)
-        cur.commit()
-
+        materialized.refresh(cur, [para["thread_ts"]])
+        stats_cache.invalidate(cur, [para["thread_ts"]])
         left = cur.execute("select count() from remarks where event_ts=:event_ts;", para).fetchone()[0]
 
     # 後処理
@@ -237,6 +376,49 @@ def remarks_delete_compar(para: "RemarkDict", m: "MessageParserProtocol") -> Non
     g.adapter.functions.post_processing(m)
 
 
+def remarks_reconcile(replace: dict[str, list["RemarkDict"]], delete: list["RemarkDict"], workers: int = 1) -> None:
+    """突合結果のメモを1トランザクションで反映する
+
+    Args:
+        replace (dict[str, list[RemarkDict]]): 記録し直すメモ(`event_ts`単位)
+        delete (list[RemarkDict]): 削除するメモ
+        workers (int, optional): 後処理の同時実行数. Defaults to 1.
+    """
+
+    if not (replace or delete):
+        return
+
+    thread_list: set[str] = set()
+    sources: dict[str, str] = {}  # event_ts -> 入力元識別子
+    with dbutil.writer() as cur:
+        for event_ts, remarks in replace.items():
+            thread_list.update(row[0] for row in cur.execute("select thread_ts from remarks where event_ts=?", (event_ts,)))
+            cur.execute(dbutil.query("REMARKS_DELETE_ONE"), (event_ts,))
+            for para in remarks:
+                row = cur.execute("select * from result where ts=:thread_ts", para).fetchone()
+                if row and para["name"] in [v for k, v in dict(row).items() if str(k).endswith("_name")]:
+                    cur.execute(dbutil.query("REMARKS_INSERT"), para)
+                    thread_list.add(para["thread_ts"])
+                    logging.info("insert: %s", para)
+                sources[event_ts] = para["source"]
+        for para in delete:
+            if para["event_ts"] in replace:
+                continue  # 記録し直しで削除済み
+            cur.execute(dbutil.query("REMARKS_DELETE_COMPAR"), para)
+            thread_list.add(para["thread_ts"])
+            sources[para["event_ts"]] = para["source"]
+            logging.info("delete: %s", para)
+        materialized.refresh(cur, list(thread_list))
+        stats_cache.invalidate(cur, list(thread_list))
+        left = {x for x in sources if cur.execute("select count() from remarks where event_ts=?;", (x,)).fetchone()[0]}
+
+    # 後処理(メモが残っていればOK、なくなればリアクションを外す)
+    _post_processing_batch(
+        [(source, ActionStatus.CHANGE if ts in left else ActionStatus.DELETE, ts in left, ts) for ts, source in sources.items()],
+        workers,
+    )
+
+
 def check_remarks(m: "MessageParserProtocol") -> None:
     """メモの内容を拾ってDBに格納する
 
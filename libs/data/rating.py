@@ -0,0 +1,148 @@
+"""
+libs/data/rating.py
+"""
+
+from dataclasses import dataclass, field
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+INITIAL_RATING: float = 1500.0
+"""初期レーティング"""
+
+SCORE_MAPPING: dict[int, float] = {1: 30.0, 2: 10.0, 3: -10.0, 4: -30.0}
+"""順位ごとの獲得スコア"""
+
+
+@dataclass
+class RatingEngine:
+    """天鳳方式のレーティング計算
+
+    計算式: https://tenhou.net/man/#RATING
+
+    プレイヤーを列番号に対応付け、最終レーティングと対戦数を配列で保持する。
+    ゲームを追加するごとに状態を更新するため、続きのゲームを後から追加できる。
+    """
+
+    index: dict[str, int] = field(default_factory=dict)
+    """プレイヤー名と列番号の対応"""
+    rating: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    """最終レーティング"""
+    games: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    """対戦数"""
+
+    @property
+    def players(self) -> list[str]:
+        """登録順のプレイヤー名"""
+
+        return list(self.index)
+
+    def register(self, names: Iterable[str]) -> None:
+        """プレイヤーを登録する
+
+        Args:
+            names (Iterable[str]): プレイヤー名(登録済みの名前は無視)
+        """
+
+        for name in names:
+            if name not in self.index:
+                self.index[name] = len(self.index)
+
+        if (grow := len(self.index) - len(self.rating)) > 0:
+            self.rating = np.concatenate([self.rating, np.full(grow, INITIAL_RATING)])
+            self.games = np.concatenate([self.games, np.zeros(grow, dtype=np.int64)])
+
+    def fold(self, players: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+        """ゲーム結果を順に反映する
+
+        Args:
+            players (np.ndarray): プレイヤー名(ゲーム数 x 席数)
+            ranks (np.ndarray): 順位(ゲーム数 x 席数)
+
+        Returns:
+            np.ndarray: ゲームごとのレーティング(ゲーム数 x プレイヤー数、不参加は`NaN`)
+        """
+
+        players = np.asarray(players, dtype=str)
+        codes, uniques = pd.factorize(players.ravel())
+        self.register(uniques)
+        columns = np.asarray([self.index[name] for name in uniques], dtype=np.int64)[codes].reshape(players.shape)
+
+        ret = np.full((len(players), len(self.index)), np.nan)
+        rating = self.rating.tolist()
+        games = self.games.tolist()
+        scores = [SCORE_MAPPING[int(rank)] for rank in np.asarray(ranks).ravel()]
+
+        seats = players.shape[1]
+        for row, cols in enumerate(columns.tolist()):
+            rating_list = [rating[col] for col in cols]
+            rating_avg = 0.0
+            for value in rating_list:  # sum()は補正付き加算になるため順に加算する
+                rating_avg += value
+            rating_avg /= len(rating_list)
+            rating_avg = INITIAL_RATING if rating_avg < INITIAL_RATING else rating_avg
+
+            written: set[int] = set()
+            for seat, col in enumerate(cols):
+                count = games[col] + 1  # 初期値を含めた記録数
+                match_correction = 0.2 if count >= 400 else 1 - count * 0.002
+                correction_value = (rating_avg - rating_list[seat]) / 40
+                rating[col] = rating_list[seat] + match_correction * (scores[row * seats + seat] + correction_value)
+                if col not in written:  # 同一ゲームに同じ名前がある場合は後の値で上書き
+                    games[col] += 1
+                    written.add(col)
+                ret[row, col] = rating[col]
+
+        self.rating = np.asarray(rating, dtype=np.float64)
+        self.games = np.asarray(games, dtype=np.int64)
+
+        return ret
+
+    def to_frame(self, playtime: list[str], ratings: np.ndarray) -> pd.DataFrame:
+        """初期値の行を付加してDataFrameに変換する
+
+        Args:
+            playtime (list[str]): ゲーム終了時間(行ラベル)
+            ratings (np.ndarray): `fold()`の結果
+
+        Returns:
+            pd.DataFrame: レーティング推移
+        """
+
+        initial = np.full((1, len(self.index)), INITIAL_RATING)
+        return pd.DataFrame(
+            np.vstack([initial, ratings]) if len(ratings) else initial,
+            index=["initial_rating"] + list(playtime),
+            columns=self.players,
+        )
+
+
+def resample(df_ratings: pd.DataFrame, collection: str) -> pd.DataFrame:
+    """レーティング推移を集約単位で間引く
+
+    Args:
+        df_ratings (pd.DataFrame): レーティング推移(先頭行は初期値)
+        collection (str): 集約単位
+
+    Returns:
+        pd.DataFrame: 集約結果
+    """
+
+    ratings = df_ratings[1:]
+    ratings.index = pd.to_datetime(ratings.index)  # DatetimeIndexに変換
+
+    match collection:
+        case "daily":
+            ratings = ratings.resample("D").last().ffill()
+        case "monthly":
+            ratings = ratings.resample("ME").last().ffill()
+        case "yearly":
+            ratings = ratings.resample("YE").last().ffill()
+        case "all":
+            ratings = df_ratings.ffill().tail(1)
+        case _:
+            return df_ratings
+
+    ratings.index = ratings.index.astype(str)
+    return pd.concat([df_ratings.head(1), ratings])
@@ -0,0 +1,196 @@
+"""
+libs/data/rating_history.py
+"""
+
+import json
+import logging
+import sqlite3
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+import libs.global_value as g
+from cls.timekit import ExtendedDatetime as ExtDt
+from cls.timekit import Format
+from libs.data import rating
+from libs.utils import dbutil
+
+FIRST_PLAYTIME: str = "1900-01-01 00:00:00"
+"""全期間集計の開始時刻"""
+
+LAST_PLAYTIME: str = "2999-12-31 23:59:59"
+"""全期間集計の終了時刻"""
+
+
+def enabled() -> bool:
+    """レーティング履歴が有効か
+
+    Returns:
+        bool: 判定結果
+    """
+
+    return bool(g.cfg.setting.rating_history)
+
+
+def timeline_key() -> Optional[str]:
+    """現在の集計条件から時系列の識別キーを生成する
+
+    期間指定以外の絞り込み(コメント検索、入力元識別子別)がある場合は履歴を利用しない。
+    `dbutil.query_modification()`による補正済みであること。
+
+    Returns:
+        Optional[str]: 識別キー(対象外の場合は`None`)
+    """
+
+    if g.params.get("search_word") or g.params.get("separate"):
+        return None
+
+    return json.dumps(
+        {
+            "individual": bool(g.params.get("individual")),
+            "unregistered_replace": bool(g.params.get("unregistered_replace")),
+            "guest_skip": bool(g.params.get("guest_skip")),
+            "mode": g.params["mode"],
+            "rules": sorted(set(g.params["rule_set"].values())),
+        },
+        ensure_ascii=False,
+    )
+
+
+def read() -> Optional[pd.DataFrame]:
+    """履歴からレーティング推移を取得する
+
+    未反映のゲームがあれば、変更のあったゲーム以降を再計算してから返す。
+    集計開始時刻が最初のゲームより後の場合は初期値から計算し直す必要があるため`None`を返す。
+
+    Returns:
+        Optional[pd.DataFrame]: `aggregate.calculation_rating()`と同じ形式のレーティング推移
+    """
+
+    if not enabled():
+        return None
+
+    sql = dbutil.query_modification(dbutil.query("RANKING_RATINGS"))  # パラメータ補正
+    if (key := timeline_key()) is None:
+        return None
+
+    with dbutil.reader() as conn:
+        row = conn.execute("select dirty_from from rating_timeline where timeline = ?;", (key,)).fetchone()
+    if row is None or row[0] is not None:
+        with dbutil.writer() as conn:
+            sync(conn, key, sql)
+
+    with dbutil.reader() as conn:
+        rows = conn.execute(
+            "select game_no, playtime, name, rating from rating_history where timeline = ? order by game_no, seat;",
+            (key,),
+        ).fetchall()
+
+    df = pd.DataFrame([tuple(x) for x in rows], columns=["game_no", "playtime", "name", "rating"])
+    if not df.empty and ExtDt(g.params["starttime"]).format(Format.SQL) > df["playtime"].iloc[0]:
+        return None
+    df = df.query("playtime <= @endtime", local_dict={"endtime": ExtDt(g.params["endtime"]).format(Format.SQL)})
+
+    # ゲーム x プレイヤーの行列に展開
+    game_idx, game_no = pd.factorize(df["game_no"])
+    player_idx, players = pd.factorize(df["name"])
+    ratings = np.full((len(game_no), len(players)), np.nan)
+    ratings[game_idx, player_idx] = df["rating"].to_numpy()
+
+    engine = rating.RatingEngine()
+    engine.register(players)
+    return engine.to_frame(df.drop_duplicates("game_no")["playtime"].to_list(), ratings)
+
+
+def sync(resultdb: sqlite3.Connection, key: str, sql: str) -> int:
+    """未反映のゲームを履歴に反映する
+
+    `dirty_from`以降の履歴を削除し、直前までの最終値から計算を再開する。
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+        key (str): 時系列の識別キー
+        sql (str): `RANKING_RATINGS`の修正済みクエリ
+
+    Returns:
+        int: 計算したゲーム数
+    """
+
+    row = resultdb.execute("select dirty_from from rating_timeline where timeline = ?;", (key,)).fetchone()
+    start = FIRST_PLAYTIME if row is None else row[0]
+    if start is None:
+        return 0
+
+    # 再開位置の状態
+    resultdb.execute("delete from rating_history where timeline = ? and playtime >= ?;", (key, start))
+    rows = resultdb.execute("select game_no, name, rating from rating_history where timeline = ? order by game_no, seat;", (key,)).fetchall()
+    engine = rating.RatingEngine()
+    last_rating: dict[str, float] = {}
+    games: dict[str, set[int]] = {}
+    for game_no, name, value in rows:
+        last_rating[name] = value
+        games.setdefault(name, set()).add(game_no)
+    engine.register(last_rating)
+    engine.rating = np.asarray(list(last_rating.values()), dtype=np.float64)
+    engine.games = np.asarray([len(games[name]) for name in last_rating], dtype=np.int64)
+    next_no = rows[-1][0] + 1 if rows else 0
+
+    # 再計算
+    df_results = pd.read_sql(
+        sql,
+        resultdb,
+        params={
+            **g.params,
+            "starttime": start,
+            "endtime": LAST_PLAYTIME,
+            **g.params.get("rule_set", {}),
+        },
+    )
+    players = df_results.filter(items=["p1_name", "p2_name", "p3_name", "p4_name"]).astype(str).to_numpy()
+    ratings = engine.fold(players, df_results.filter(items=["p1_rank", "p2_rank", "p3_rank", "p4_rank"]).to_numpy())
+
+    history: list[tuple] = []
+    for idx, (ts, playtime) in enumerate(zip(df_results["ts"], df_results["playtime"])):
+        seat_map: dict[str, int] = {}
+        for seat, name in enumerate(players[idx]):
+            seat_map.setdefault(name, seat)
+        for name, seat in seat_map.items():
+            history.append((key, next_no + idx, ts, playtime, seat, name, ratings[idx, engine.index[name]]))
+    resultdb.executemany("insert into rating_history values (?, ?, ?, ?, ?, ?, ?);", history)
+    resultdb.execute("insert or replace into rating_timeline values (?, null);", (key,))
+    logging.debug("rating history sync: timeline=%s, start=%s, games=%s", key, start, len(df_results))
+
+    return len(df_results)
+
+
+def mark(resultdb: sqlite3.Connection, ts: str) -> None:
+    """ゲームの追加/修正/削除を記録し、次回参照時にそのゲーム以降を再計算させる
+
+    削除の場合は削除前に呼び出すこと。
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+        ts (str): 対象ゲームのタイムスタンプ
+    """
+
+    if not (row := resultdb.execute("select datetime(playtime) from result where ts = ?;", (ts,)).fetchone()):
+        return
+
+    resultdb.execute(
+        "update rating_timeline set dirty_from = ? where dirty_from is null or dirty_from > ?;",
+        (row[0], row[0]),
+    )
+
+
+def clear(resultdb: sqlite3.Connection) -> None:
+    """全ての履歴を破棄する
+
+    メンバー/チーム構成やルールの変更など、集計対象や表示名が変わる更新後に呼び出す。
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+    """
+
+    resultdb.execute("delete from rating_history;")
+    resultdb.execute("delete from rating_timeline;")
@@ -0,0 +1,176 @@
+"""
+libs/data/reconcile.py
+"""
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from cls.score import GameResult
+from libs.utils import formatter, validator
+
+if TYPE_CHECKING:
+    from integrations.protocols import MessageParserProtocol
+    from libs.types import RemarkDict
+
+RemarkKey = tuple[str, str, str, str, str]
+"""メモの照合キー(thread_ts, event_ts, name, matter, source)"""
+
+
+@dataclass
+class ScoreDiff:
+    """スコアの差分"""
+
+    insert: list[GameResult] = field(default_factory=list)
+    """DBにないスコア(取りこぼし)"""
+    update: list[tuple[GameResult, GameResult]] = field(default_factory=list)
+    """内容が異なるスコア(DBの値, 投稿の値)"""
+    delete: list[GameResult] = field(default_factory=list)
+    """投稿にないスコア(削除漏れ)"""
+
+
+@dataclass
+class RepairSummary:
+    """一括修正の結果"""
+
+    inserted: int = 0
+    """追加したゲーム数"""
+    updated: int = 0
+    """更新したゲーム数"""
+    deleted: int = 0
+    """削除したゲーム数"""
+    remarks_deleted: int = 0
+    """ゲームの削除に伴って削除したメモ数"""
+    failed: int = 0
+    """追加できなかったゲーム数(重複など)"""
+    failed_ts: list[str] = field(default_factory=list)
+    """追加できなかったゲームのts"""
+    reactions: int = 0
+    """後処理(リアクション更新)の件数"""
+    elapsed: float = 0.0
+    """処理時間(秒)"""
+
+
+@dataclass
+class RemarkDiff:
+    """メモの差分"""
+
+    modify: list["RemarkDict"] = field(default_factory=list)
+    """DBにないメモ"""
+    delete: list["RemarkDict"] = field(default_factory=list)
+    """投稿にないメモ"""
+    replace: dict[str, list["RemarkDict"]] = field(default_factory=dict)
+    """記録し直すメモ(`event_ts`単位、変化のあったメッセージのメモすべて)"""
+
+
+def parse_score(m: "MessageParserProtocol") -> Optional[GameResult]:
+    """メッセージからスコアを取り出してプレイヤー名を正規化する
+
+    Args:
+        m (MessageParserProtocol): メッセージデータ
+
+    Returns:
+        Optional[GameResult]: スコアデータ(スコア報告でなければ`None`)
+    """
+
+    if not (detection := validator.check_score(m)):
+        return None
+
+    score = GameResult(**detection)
+    for k, v in score.to_dict().items():
+        if str(k).endswith("_name"):
+            score.set(**{k: formatter.name_replace(str(v), not_replace=True)})
+    return score
+
+
+def diff_scores(source: dict[str, GameResult], db_score: list[GameResult]) -> ScoreDiff:
+    """投稿とDBのスコアを突き合わせる
+
+    Args:
+        source (dict[str, GameResult]): 投稿から取り出したスコア(キーはts)
+        db_score (list[GameResult]): DBに記録されているスコア
+
+    Returns:
+        ScoreDiff: 差分
+    """
+
+    ret = ScoreDiff()
+    db_index = {x.ts: x for x in db_score}
+
+    for ts, score in source.items():
+        if (target := db_index.get(ts)) is None:
+            ret.insert.append(score)
+        elif score != target:
+            ret.update.append((target, score))
+
+    ret.delete = [x for x in db_score if x.ts not in source]
+    return ret
+
+
+def remark_key(remark: "RemarkDict") -> RemarkKey:
+    """メモの照合キーを返す
+
+    Args:
+        remark (RemarkDict): メモ
+
+    Returns:
+        RemarkKey: 照合キー
+    """
+
+    return (remark["thread_ts"], remark["event_ts"], remark["name"], remark["matter"], remark["source"])
+
+
+def extract_remarks(m: "MessageParserProtocol", members: dict[str, set[str]]) -> Iterator["RemarkDict"]:
+    """メッセージから突合対象のメモを取り出す
+
+    Args:
+        m (MessageParserProtocol): メッセージデータ(メモの投稿)
+        members (dict[str, set[str]]): ゲーム結果のtsと参加者
+
+    Yields:
+        Iterator[RemarkDict]: メモ
+    """
+
+    if not float(m.data.thread_ts):
+        return  # リプライになっていない
+    if (names := members.get(m.data.thread_ts)) is None:
+        return  # ゲーム結果に紐付かない(保留中を含む)
+
+    for name, matter in zip(m.argument[0::2], m.argument[1::2]):
+        pname = formatter.name_replace(str(name), not_replace=True)
+        if pname not in names:
+            continue  # ゲーム結果に名前がない
+        yield {
+            "thread_ts": m.data.thread_ts,
+            "event_ts": m.data.event_ts,
+            "name": pname,
+            "matter": matter,
+            "source": m.status.source,
+        }
+
+
+def diff_remarks(source: list["RemarkDict"], db_remarks: list["RemarkDict"]) -> RemarkDiff:
+    """投稿とDBのメモを突き合わせる
+
+    Args:
+        source (list[RemarkDict]): 投稿から取り出したメモ
+        db_remarks (list[RemarkDict]): DBに記録されているメモ
+
+    Returns:
+        RemarkDiff: 差分
+    """
+
+    ret = RemarkDiff()
+    source_keys = {remark_key(x) for x in source}
+    db_keys = {remark_key(x) for x in db_remarks}
+
+    ret.modify = [x for x in source if remark_key(x) not in db_keys]
+    ret.delete = [x for x in db_remarks if remark_key(x) not in source_keys]
+
+    changed = {x["event_ts"] for x in ret.modify}
+    seen: set[RemarkKey] = set()
+    for remark in source:
+        if remark["event_ts"] in changed and (key := remark_key(remark)) not in seen:
+            seen.add(key)
+            ret.replace.setdefault(remark["event_ts"], []).append(remark)
+
+    return ret
@@ -3,7 +3,6 @@ libs/data/search.py
 """
 
 import logging
-from contextlib import closing
 from typing import TYPE_CHECKING
 
 import libs.global_value as g
@@ -49,7 +48,7 @@ def for_db_remarks(first_ts: float) -> list["RemarkDict"]:
     """
 
     data: list["RemarkDict"] = []
-    with closing(dbutil.connection(g.cfg.setting.database_file)) as cur:
+    with dbutil.reader() as cur:
         # 記録済みメモ内容
         rows = cur.execute(
             dbutil.query("REMARKS_SELECT"),
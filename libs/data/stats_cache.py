@@ -0,0 +1,572 @@
+"""
+libs/data/stats_cache.py
+"""
+
+import json
+import logging
+import sqlite3
+from dataclasses import asdict, dataclass, field
+from decimal import ROUND_HALF_UP, Decimal
+from itertools import groupby
+from typing import Iterable, Literal, Optional, cast
+
+import pandas as pd
+
+import libs.global_value as g
+from cls.timekit import ExtendedDatetime as ExtDt
+from cls.timekit import Format
+from libs.utils import dbutil
+
+SEAT_LABEL: dict[int, str] = {0: "全体", 1: "東家", 2: "南家", 3: "西家", 4: "北家"}
+"""席IDと表示名"""
+
+STREAK_CONDITION: dict[str, tuple[int, int]] = {
+    "top1": (1, 1),
+    "top2": (1, 2),
+    "top3": (1, 3),
+    "lose2": (2, 4),
+    "lose3": (3, 4),
+    "lose4": (4, 4),
+}
+"""連続記録の種別と対象順位の範囲"""
+
+RESULTS_COLUMNS: list[str] = (
+    ["name", "seat", "id", "total_point", "avg_point", "win", "lose", "draw", "rank1", "rank2", "rank3", "rank4", "count", "rank_avg"]
+    + ["flying", "yakuman", "score", "score_rank1", "score_rank2", "score_rank3", "score_rank4"]
+    + ["rpoint_max", "rpoint_min", "rpoint_avg", "point_max", "point_min", "first_game", "last_game", "first_comment", "last_comment"]
+)
+"""`RESULTS_INFO`の出力カラム"""
+
+RECORD_COLUMNS: list[str] = ["name", "seat", "id"] + [f"{cond}_{x}" for cond in STREAK_CONDITION for x in ("max", "cur")]
+"""`RECORD_INFO`の出力カラム"""
+
+GAME_ROWS: str = """
+    select
+        individual_results.playtime, individual_results.ts, seat, name, team, guest,
+        rpoint, rank, point, team_point, yakuman, comment,
+        individual_results.rule_version, individual_results.mode, rule.origin_point
+    from
+        individual_results
+    left join rule
+        on rule.rule_version = individual_results.rule_version
+    where
+        individual_results.ts in ({target})
+    order by
+        individual_results.playtime, individual_results.ts, individual_results.seat
+    ;
+"""
+"""集計対象ゲームの全席データを取得するクエリ"""
+
+
+@dataclass(frozen=True)
+class CacheKey:
+    """キャッシュキー"""
+
+    kind: Literal["individual", "team"]
+    """集計種別"""
+    name: str
+    """プレイヤー名/チーム名"""
+    rule_key: str
+    """集計対象ルール(ソート済みリストのJSON)"""
+    mode: int
+    """集計モード"""
+    variant: int
+    """2ゲスト戦除外(1: 除外する)"""
+
+    @property
+    def rules(self) -> list[str]:
+        """集計対象ルールのリスト"""
+
+        return json.loads(self.rule_key)
+
+
+@dataclass
+class SeatState:
+    """座席単位の累積値"""
+
+    # 成績(ルール定義のあるゲームのみ)
+    count: int = 0
+    win: int = 0
+    lose: int = 0
+    draw: int = 0
+    rank: list[int] = field(default_factory=lambda: [0, 0, 0, 0])
+    flying: int = 0
+    yakuman: int = 0
+    point_sum: int = 0
+    """獲得ポイント合計(0.1pt単位)"""
+    point_max: Optional[int] = None
+    point_min: Optional[int] = None
+    rpoint_sum: int = 0
+    rpoint_max: Optional[int] = None
+    rpoint_min: Optional[int] = None
+    score: int = 0
+    score_rank: list[int] = field(default_factory=lambda: [0, 0, 0, 0])
+    first_game: Optional[str] = None
+    last_game: Optional[str] = None
+    first_comment: Optional[str] = None
+    last_comment: Optional[str] = None
+
+    # 連続記録
+    games: int = 0
+    streak: dict[str, list[int]] = field(default_factory=lambda: {k: [0, 0] for k in STREAK_CONDITION})
+    """連続記録(現在値, 最大値)"""
+
+    def add_result(self, row: dict) -> None:
+        """成績を加算する
+
+        Args:
+            row (dict): 1席分のデータ
+        """
+
+        point = round(row["point"] * 10)
+        self.count += 1
+        self.win += point > 0
+        self.lose += point < 0
+        self.draw += point == 0
+        self.rank[row["rank"] - 1] += 1
+        self.flying += row["rpoint"] < 0
+        self.yakuman += row["yakuman"] is not None
+        self.point_sum += point
+        self.point_max = point if self.point_max is None else max(self.point_max, point)
+        self.point_min = point if self.point_min is None else min(self.point_min, point)
+        self.rpoint_sum += row["rpoint"]
+        self.rpoint_max = row["rpoint"] if self.rpoint_max is None else max(self.rpoint_max, row["rpoint"])
+        self.rpoint_min = row["rpoint"] if self.rpoint_min is None else min(self.rpoint_min, row["rpoint"])
+        score = row["rpoint"] - row["origin_point"]
+        self.score += score
+        self.score_rank[row["rank"] - 1] += score
+        if self.first_game is None:
+            self.first_game = row["playtime"]
+            self.first_comment = row["comment"]
+        self.last_game = row["playtime"]
+        self.last_comment = row["comment"]
+
+    def add_record(self, rows: list[dict]) -> None:
+        """1ゲーム分の連続記録を更新する
+
+        同一ゲームに複数席ある場合(チーム集計)は、1席でも条件を外れたら
+        そのゲームで条件を満たした席数から数え直す。
+
+        Args:
+            rows (list[dict]): 同一ゲームのデータ
+        """
+
+        self.games += 1
+        for cond, (lower, upper) in STREAK_CONDITION.items():
+            ok = sum(lower <= row["rank"] <= upper for row in rows)
+            cur, best = self.streak[cond]
+            cur = ok if ok < len(rows) else cur + ok
+            self.streak[cond] = [cur, max(best, cur)]
+
+
+@dataclass
+class StatsState:
+    """プレイヤー/チーム単位の累積値"""
+
+    guest: bool = False
+    """未登録プレイヤーとして記録されたゲームを含む"""
+    first_playtime: Optional[str] = None
+    last_playtime: Optional[str] = None
+    seats: dict[int, SeatState] = field(default_factory=dict)
+
+    @classmethod
+    def from_json(cls, text: str) -> "StatsState":
+        """保存データから復元する
+
+        Args:
+            text (str): JSON文字列
+
+        Returns:
+            StatsState: 累積値
+        """
+
+        data = json.loads(text)
+        data["seats"] = {int(k): SeatState(**v) for k, v in data["seats"].items()}
+        return cls(**data)
+
+    def to_json(self) -> str:
+        """保存用のJSON文字列を返す
+
+        Returns:
+            str: JSON文字列
+        """
+
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+    def add_game(self, playtime: str, rows: list[dict]) -> None:
+        """1ゲーム分のデータを加算する
+
+        Args:
+            playtime (str): ゲーム終了時間
+            rows (list[dict]): 集計対象の席データ
+        """
+
+        if not rows:
+            return
+
+        for seat_id in sorted({0, *(row["seat"] for row in rows)}):
+            seat_rows = rows if seat_id == 0 else [row for row in rows if row["seat"] == seat_id]
+            state = self.seats.setdefault(seat_id, SeatState())
+            for row in seat_rows:
+                if row["origin_point"] is not None:
+                    state.add_result(row)
+            state.add_record(seat_rows)
+
+        if self.first_playtime is None:
+            self.first_playtime = playtime
+        self.last_playtime = playtime
+
+    def to_frames(self, name: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """`RESULTS_INFO`/`RECORD_INFO`と同じ形式で出力する
+
+        Args:
+            name (str): プレイヤー名/チーム名
+
+        Returns:
+            tuple[pd.DataFrame, pd.DataFrame]: 成績データ, 連続記録データ
+        """
+
+        results: list[dict] = []
+        records: list[dict] = []
+        for seat_id, state in sorted(self.seats.items()):
+            base = {"name": name, "seat": SEAT_LABEL[seat_id], "id": seat_id}
+            if state.count:
+                results.append(
+                    {
+                        **base,
+                        "total_point": _round(state.point_sum / 10, 1),
+                        "avg_point": _round(state.point_sum / 10 / state.count, 1),
+                        "win": state.win,
+                        "lose": state.lose,
+                        "draw": state.draw,
+                        "rank1": state.rank[0],
+                        "rank2": state.rank[1],
+                        "rank3": state.rank[2],
+                        "rank4": state.rank[3],
+                        "count": state.count,
+                        "rank_avg": _round(sum(r * (i + 1) for i, r in enumerate(state.rank)) / state.count, 2),
+                        "flying": state.flying,
+                        "yakuman": state.yakuman,
+                        "score": state.score,
+                        "score_rank1": state.score_rank[0],
+                        "score_rank2": state.score_rank[1],
+                        "score_rank3": state.score_rank[2],
+                        "score_rank4": state.score_rank[3],
+                        "rpoint_max": state.rpoint_max,
+                        "rpoint_min": state.rpoint_min,
+                        "rpoint_avg": _round(state.rpoint_sum / state.count, 3),
+                        "point_max": cast(int, state.point_max) / 10,
+                        "point_min": cast(int, state.point_min) / 10,
+                        "first_game": state.first_game,
+                        "last_game": state.last_game,
+                        "first_comment": state.first_comment,
+                        "last_comment": state.last_comment,
+                    }
+                )
+            if state.games:
+                record = dict(base)
+                for cond, (cur, best) in state.streak.items():
+                    record.update({f"{cond}_max": best, f"{cond}_cur": cur})
+                records.append(record)
+
+        return (pd.DataFrame(results, columns=RESULTS_COLUMNS), pd.DataFrame(records, columns=RECORD_COLUMNS))
+
+
+def _round(value: float, digits: int) -> float:
+    """SQLiteの`round()`と同じ丸め(四捨五入)
+
+    Args:
+        value (float): 対象値
+        digits (int): 小数点以下の桁数
+
+    Returns:
+        float: 丸めた値
+    """
+
+    return float(Decimal(repr(value)).quantize(Decimal(1).scaleb(-digits), rounding=ROUND_HALF_UP))
+
+
+def enabled() -> bool:
+    """成績キャッシュが有効か
+
+    Returns:
+        bool: 判定結果
+    """
+
+    return bool(g.cfg.setting.stats_cache)
+
+
+def cache_key() -> Optional[CacheKey]:
+    """現在の集計条件からキャッシュキーを生成する
+
+    期間指定以外の絞り込み(コメント検索、入力元識別子別、複数プレイヤー指定)がある場合は
+    キャッシュを利用しない。`dbutil.query_modification()`による補正済みであること。
+
+    Returns:
+        Optional[CacheKey]: キャッシュキー(対象外の場合は`None`)
+    """
+
+    player_name = g.params.get("player_name")
+    if not player_name or g.params.get("search_word") or g.params.get("separate"):
+        return None
+    if list(g.params.get("player_list", {}).values()) != [player_name]:
+        return None
+
+    if g.params.get("individual"):
+        variant = int(bool(g.params.get("unregistered_replace")) and not g.params.get("guest_skip"))
+        return CacheKey("individual", player_name, _rule_key(g.params["rule_set"].values()), g.params["mode"], variant)
+
+    if player_name == "未所属":
+        return None
+    return CacheKey("team", player_name, _rule_key(g.params["rule_set"].values()), g.params["mode"], 0)
+
+
+def _rule_key(rule_list: Iterable[str]) -> str:
+    return json.dumps(sorted(set(rule_list)), ensure_ascii=False)
+
+
+def lookup(params: dict) -> Optional[tuple[pd.DataFrame, pd.DataFrame]]:
+    """キャッシュから成績データを取得する
+
+    キャッシュ未作成の場合は作成してから返す。集計範囲がキャッシュした全期間を
+    含まない場合はSQLで集計する必要があるため`None`を返す。
+
+    Args:
+        params (dict): プレースホルダ
+
+    Returns:
+        Optional[tuple[pd.DataFrame, pd.DataFrame]]: `RESULTS_INFO`/`RECORD_INFO`相当のデータ
+    """
+
+    if not enabled():
+        return None
+
+    dbutil.query_modification(dbutil.query("RESULTS_INFO"))  # パラメータ補正
+    if (key := cache_key()) is None:
+        return None
+
+    with dbutil.reader() as conn:
+        state = load(conn, key)
+    if state is None:
+        with dbutil.writer() as conn:
+            state = build(conn, key)
+            save(conn, key, state)
+        logging.debug("stats cache create: %s", key)
+
+    if state.guest:
+        return None
+
+    if starttime := params.get("starttime"):
+        params.update({"starttime": ExtDt(starttime).format(Format.SQL)})
+    if endtime := params.get("endtime"):
+        params.update({"endtime": ExtDt(endtime).format(Format.SQL)})
+    if state.first_playtime is not None:
+        if not str(params.get("starttime", "")) <= state.first_playtime:
+            return None
+        if not cast(str, state.last_playtime) <= str(params.get("endtime", "")):
+            return None
+
+    logging.debug("stats cache hit: %s", key)
+    return state.to_frames(key.name)
+
+
+def load(resultdb: sqlite3.Connection, key: CacheKey) -> Optional[StatsState]:
+    """保存済みの累積値を取得する
+
+    Args:
+        resultdb (sqlite3.Connection): 接続オブジェクト
+        key (CacheKey): キャッシュキー
+
+    Returns:
+        Optional[StatsState]: 累積値(未作成の場合は`None`)
+    """
+
+    row = resultdb.execute(
+        "select state from stats_cache where kind = ? and name = ? and rule_key = ? and mode = ? and variant = ?;",
+        (key.kind, key.name, key.rule_key, key.mode, key.variant),
+    ).fetchone()
+
+    return StatsState.from_json(row[0]) if row else None
+
+
+def save(resultdb: sqlite3.Connection, key: CacheKey, state: StatsState) -> None:
+    """累積値を保存する
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+        key (CacheKey): キャッシュキー
+        state (StatsState): 累積値
+    """
+
+    resultdb.execute(
+        "insert or replace into stats_cache values (?, ?, ?, ?, ?, ?, ?, ?);",
+        (key.kind, key.name, key.rule_key, key.mode, key.variant, state.first_playtime, state.last_playtime, state.to_json()),
+    )
+
+
+def build(resultdb: sqlite3.Connection, key: CacheKey) -> StatsState:
+    """全ゲームを集計して累積値を作成する
+
+    Args:
+        resultdb (sqlite3.Connection): 接続オブジェクト
+        key (CacheKey): キャッシュキー
+
+    Returns:
+        StatsState: 累積値
+    """
+
+    column = "name" if key.kind == "individual" else "team"
+    rows = resultdb.execute(
+        GAME_ROWS.format(target=f"select ts from individual_results where {column} = ?"),
+        (key.name,),
+    )
+
+    state = StatsState()
+    for playtime, game_rows in groupby(map(dict, rows.fetchall()), key=lambda x: x["playtime"]):
+        _fold(state, key, playtime, list(game_rows))
+
+    return state
+
+
+def _fold(state: StatsState, key: CacheKey, playtime: str, game_rows: list[dict]) -> None:
+    """1ゲーム分のデータから集計対象を抽出して加算する
+
+    Args:
+        state (StatsState): 累積値
+        key (CacheKey): キャッシュキー
+        playtime (str): ゲーム終了時間
+        game_rows (list[dict]): 同一ゲームの全席データ
+    """
+
+    if key.variant and sum(row["guest"] for row in game_rows) > 1:  # 2ゲスト戦除外
+        return
+
+    rules = key.rules
+    target: list[dict] = []
+    for row in game_rows:
+        if key.kind == "individual" and row["name"] != key.name:
+            continue
+        if key.kind == "team" and row["team"] != key.name:
+            continue
+        if row["mode"] != key.mode or row["seat"] > key.mode or row["rule_version"] not in rules:
+            continue
+        if key.kind == "individual":
+            state.guest |= bool(row["guest"])
+        else:
+            row["point"] = row["team_point"]
+        target.append(row)
+
+    state.add_game(playtime, target)
+
+
+def append(resultdb: sqlite3.Connection, ts: str) -> None:
+    """追加したゲームを作成済みの累積値に反映する
+
+    最終記録より前のゲームが追加された場合は連続記録の再計算が必要になるため破棄する。
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+        ts (str): 追加したゲームのタイムスタンプ
+    """
+
+    if not enabled():
+        return
+
+    game_rows = [dict(row) for row in resultdb.execute(GAME_ROWS.format(target="?"), (ts,))]
+    if not game_rows:
+        return
+
+    names = {row["name"] for row in game_rows}
+    teams = {row["team"] for row in game_rows}
+    playtime = game_rows[0]["playtime"]
+    rows = resultdb.execute(
+        f"""
+        select * from stats_cache
+        where
+            (kind = 'individual' and name in ({", ".join("?" * len(names))}))
+            or (kind = 'team' and name in ({", ".join("?" * len(teams))}));
+        """,
+        (*names, *teams),
+    )
+    for row in rows.fetchall():
+        key = CacheKey(row["kind"], row["name"], row["rule_key"], row["mode"], row["variant"])
+        state = StatsState.from_json(row["state"])
+        if state.last_playtime is not None and playtime <= state.last_playtime:
+            delete(resultdb, key)
+            continue
+        _fold(state, key, playtime, [dict(x) for x in game_rows])
+        save(resultdb, key, state)
+
+
+def invalidate(resultdb: sqlite3.Connection, ts_list: Iterable[str]) -> int:
+    """指定ゲームの参加者/所属チームの累積値を破棄する
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+        ts_list (Iterable[str]): 対象ゲームのタイムスタンプ
+
+    Returns:
+        int: 破棄した件数
+    """
+
+    targets = list(set(ts_list))
+    if not enabled() or not targets:
+        return 0
+
+    count = resultdb.execute(
+        f"""
+        delete from stats_cache
+        where
+            (kind = 'individual' and name in (select name from individual_results where ts in ({", ".join("?" * len(targets))})))
+            or (kind = 'team' and name in (select team from individual_results where ts in ({", ".join("?" * len(targets))})));
+        """,
+        (*targets, *targets),
+    ).rowcount
+    logging.debug("stats cache invalidate: ts=%s, %s entries", targets, count)
+
+    return count
+
+
+def delete(resultdb: sqlite3.Connection, key: CacheKey) -> None:
+    """累積値を破棄する
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+        key (CacheKey): キャッシュキー
+    """
+
+    resultdb.execute(
+        "delete from stats_cache where kind = ? and name = ? and rule_key = ? and mode = ? and variant = ?;",
+        (key.kind, key.name, key.rule_key, key.mode, key.variant),
+    )
+
+
+def clear(resultdb: sqlite3.Connection) -> None:
+    """全ての累積値を破棄する
+
+    メンバー/チーム構成の変更など、ゲスト判定や所属が変わる更新後に呼び出す。
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+    """
+
+    resultdb.execute("delete from stats_cache;")
+
+
+def rebuild(resultdb: sqlite3.Connection) -> int:
+    """作成済みの累積値を全件作り直す
+
+    Args:
+        resultdb (sqlite3.Connection): 書き込み用接続
+
+    Returns:
+        int: 再作成した件数
+    """
+
+    rows = resultdb.execute("select kind, name, rule_key, mode, variant from stats_cache;").fetchall()
+    for row in rows:
+        key = CacheKey(*row)
+        save(resultdb, key, build(resultdb, key))
+    logging.info("rebuild stats_cache: %s entries", len(rows))
+
+    return len(rows)
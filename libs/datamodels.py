@@ -14,6 +14,7 @@ from libs.data import loader
 if TYPE_CHECKING:
     from cls.score import GameResult
     from integrations.base.interface import MessageParserProtocol
+    from libs.data.reconcile import RepairSummary
     from libs.types import RemarkDict
 
 
@@ -102,6 +103,8 @@ class ComparisonResults:
     """突合範囲(日数)"""
     score_list: dict[str, "MessageParserProtocol"] = field(default_factory=dict)
     """スコアリスト(一時保管用)"""
+    game_results: dict[str, "GameResult"] = field(default_factory=dict)
+    """`score_list`から取り出したスコア(一時保管用、保留中のものは含まない)"""
 
     mismatch: list[dict[str, "GameResult"]] = field(default_factory=list)
     """スコア差分"""
@@ -117,6 +120,8 @@ class ComparisonResults:
     """素点合計不一致"""
     pending: list["GameResult"] = field(default_factory=list)
     """処理保留データ"""
+    repair: Optional["RepairSummary"] = field(default=None)
+    """スコアの一括修正結果"""
 
     @property
     def after(self) -> ExtDt:
@@ -128,6 +133,16 @@ class ComparisonResults:
         """突合終了日時"""
         return ExtDt()
 
+    def set_repair(self, summary: "RepairSummary") -> None:
+        """スコアの一括修正結果を取り込む(追加できなかったスコアは取りこぼしから外す)
+
+        Args:
+            summary (RepairSummary): 一括修正の結果
+        """
+
+        self.repair = summary
+        self.missing = [x for x in self.missing if x.ts not in summary.failed_ts]
+
     def output(
         self,
         kind: Literal[
@@ -140,12 +155,13 @@ class ComparisonResults:
             "remark_mod",
             "remark_del",
             "invalid_score",
+            "repair",
         ],
     ) -> str:
         """出力メッセージ生成
 
         Args:
-            kind (Literal[summary, headline, pending, mismatch, missing, delete, remark_mod, remark_del, invalid_score]): 種類
+            kind (Literal[summary, headline, pending, mismatch, missing, delete, remark_mod, remark_del, invalid_score, repair]): 種類
 
         Returns:
             str: 生成文字列
@@ -162,6 +178,11 @@ class ComparisonResults:
                 ret += f"remark_mod:{len(self.remark_mod)} "
                 ret += f"remark_del:{len(self.remark_del)} "
                 ret += f"invalid_score:{len(self.invalid_score)} "
+                if self.repair:
+                    ret += f"inserted:{self.repair.inserted} "
+                    ret += f"updated:{self.repair.updated} "
+                    ret += f"deleted:{self.repair.deleted} "
+                    ret += f"failed:{self.repair.failed} "
             case "headline":
                 ret = f"突合範囲：{self.after.format(Format.YMDHMS)} - {self.before.format(Format.YMDHMS)}"
             case "pending":
@@ -193,5 +214,9 @@ class ComparisonResults:
                 ret += f"＊ 素点合計不一致：{len(self.invalid_score)}件\n"
                 for score in self.invalid_score:
                     ret += f"{ExtDt(float(score.ts)).format(Format.YMDHMS)} {score.to_text()}\n"
+            case "repair":
+                if self.repair:
+                    ret += f"＊ 修正結果：追加 {self.repair.inserted}件 / 更新 {self.repair.updated}件 / "
+                    ret += f"削除 {self.repair.deleted}件 / 失敗 {self.repair.failed}件\n"
 
         return ret
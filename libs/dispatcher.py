@@ -12,11 +12,13 @@ from integrations import factory
 from integrations.protocols import MessageStatus
 from libs.data import lookup, modify
 from libs.functions import message
+from libs.functions.command_cache import cache as command_cache
 from libs.types import StyleOptions
 from libs.utils import formatter, validator
 
 if TYPE_CHECKING:
     from integrations.protocols import MessageParserProtocol
+    from libs.utils.workerpool import Lane
 
 
 def by_keyword(m: "MessageParserProtocol"):
@@ -61,12 +63,12 @@ def by_keyword(m: "MessageParserProtocol"):
         case word if word in g.keyword_dispatcher and not m.is_command:
             logging.debug("dispatch keyword")
             if m.data.status == MessageStatus.APPEND:
-                g.keyword_dispatcher[word](m)
+                command_cache.run(g.keyword_dispatcher[word], word, m)
         # コマンド実行
         case word if word in g.command_dispatcher and m.is_command:
             logging.debug("dispatch command")
             if m.data.status == MessageStatus.APPEND:
-                g.command_dispatcher[word](m)
+                command_cache.run(g.command_dispatcher[word], word, m)
         # リマインダ実行
         case "Reminder:":
             logging.debug("dispatch keyword for reminder")
@@ -80,6 +82,33 @@ def by_keyword(m: "MessageParserProtocol"):
     g.adapter.api.post(m)
 
 
+def lane(m: "MessageParserProtocol") -> "Lane":
+    """イベントの処理レーンを判定する
+
+    `by_keyword()`と同じ条件で振り分け、キーワード/コマンド呼び出しを重い処理、
+    それ以外(スコア登録、メモ、削除)を軽い処理とする。
+
+    Args:
+        m (MessageParserProtocol): メッセージデータ
+
+    Returns:
+        Lane: 処理レーン
+    """
+
+    if m.data.status in (MessageStatus.DELETED, MessageStatus.DO_NOTHING):
+        return "fast"
+
+    match m.keyword:
+        case word if word in g.keyword_dispatcher and not m.is_command:
+            return "heavy"
+        case word if word in g.command_dispatcher and m.is_command:
+            return "heavy"
+        case "Reminder:":
+            return "heavy"
+        case _:
+            return "fast"
+
+
 def other_words(word: str, m: "MessageParserProtocol"):
     """コマンド以外のワードの処理
 
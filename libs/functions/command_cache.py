@@ -0,0 +1,265 @@
+"""
+libs/functions/command_cache.py
+"""
+
+import copy
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+import libs.global_value as g
+from cls.command import CommandParser
+from cls.context import QueryContext
+from cls.timekit import ExtendedDatetime as ExtDt
+from cls.timekit import Format
+from libs.data import data_version
+from libs.utils import graphcache
+
+if TYPE_CHECKING:
+    from integrations.protocols import CommandType, MessageParserProtocol, PostData
+    from libs.data.data_version import DataChange
+
+CACHEABLE_MODULES: tuple[str, ...] = (
+    "libs.commands.results.entry",
+    "libs.commands.graph.entry",
+    "libs.commands.ranking.entry",
+    "libs.commands.report.entry",
+)
+"""キャッシュ対象にするコマンド(参照のみで結果がデータと引数だけで決まるもの)"""
+
+
+@dataclass
+class CacheEntry:
+    """キャッシュエントリ"""
+
+    post: "PostData"
+    """ポストデータ(画像ファイルはキャッシュ用ディレクトリに複製済み)"""
+    command_type: "CommandType"
+    """実行したサブコマンド"""
+    params: QueryContext
+    """実行後の`g.params`(ポスト側で参照されるもの)"""
+    version: int
+    """登録時のデータバージョン"""
+    expires: float
+    """有効期限(`time.monotonic()`基準)"""
+    files: list[Path] = field(default_factory=list)
+    """複製した画像ファイル"""
+
+
+class CommandCache:
+    """集計コマンドの結果キャッシュ
+
+    正規化したコマンド引数(`ParsedCommand`)とデータバージョンをキーにポストデータを保持する。
+    データの変更通知を受けるとすべてのエントリを破棄する(参照時もバージョンを照合する)。
+    """
+
+    def __init__(self):
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._serial: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def maxsize(self) -> int:
+        """保持するエントリ数(0は無効)"""
+
+        return int(g.cfg.setting.command_cache)
+
+    @property
+    def ttl(self) -> int:
+        """エントリの有効期間(秒)"""
+
+        return int(g.cfg.setting.command_cache_ttl)
+
+    @property
+    def directory(self) -> Path:
+        """画像ファイルの保存先"""
+
+        return g.cfg.setting.work_dir / "command_cache"
+
+    def key(self, word: str, m: "MessageParserProtocol", version: int) -> str:
+        """キャッシュキーを生成する
+
+        Args:
+            word (str): 呼び出しキーワード/コマンド名
+            m (MessageParserProtocol): メッセージデータ
+            version (int): データバージョン
+
+        Returns:
+            str: キャッシュキー
+        """
+
+        parsed = CommandParser().analysis_argument(m.argument)
+        normalized = (
+            word,
+            m.is_command,
+            m.status.source,
+            sorted((k, repr(v)) for k, v in parsed.flags.items()),
+            parsed.arguments,
+            parsed.unknown,
+            [str(x) for x in parsed.search_range],
+            ExtDt(hours=-g.cfg.setting.time_adjust).format(Format.YMD),  # 相対指定の集計範囲は日付で変わる
+            version,
+        )
+        return hashlib.sha1(repr(normalized).encode("utf-8")).hexdigest()
+
+    def run(self, func: Callable[..., Any], word: str, m: "MessageParserProtocol") -> None:
+        """キャッシュを利用してコマンドを実行する
+
+        Args:
+            func (Callable[..., Any]): ディスパッチテーブルの関数
+            word (str): 呼び出しキーワード/コマンド名
+            m (MessageParserProtocol): メッセージデータ
+        """
+
+        if self.maxsize <= 0 or getattr(func, "__module__", "") not in CACHEABLE_MODULES:
+            func(m)
+            return
+
+        version = data_version.current()
+        key = self.key(word, m, version)
+        if self.restore(key, version, m):
+            logging.debug("command cache hit: word=%s, hits=%s, misses=%s", word, self.hits, self.misses)
+            return
+
+        func(m)
+        if m.status.result:
+            self.store(key, version, m)
+
+    def restore(self, key: str, version: int, m: "MessageParserProtocol") -> bool:
+        """キャッシュの内容をメッセージデータに展開する
+
+        画像ファイルは投稿ごとに複製して渡す(投稿中にエントリが破棄されても影響しない)。
+
+        Args:
+            key (str): キャッシュキー
+            version (int): 現在のデータバージョン
+            m (MessageParserProtocol): メッセージデータ
+
+        Returns:
+            bool: キャッシュの有無
+        """
+
+        with self._lock:
+            self._purge(version)
+            entry = self._entries.get(key)
+            if entry is None or not all(x.exists() for x, _ in entry.post.message if isinstance(x, Path)):
+                self.misses += 1
+                return False
+            self._entries.move_to_end(key)
+            self.hits += 1
+            m.post = copy.deepcopy(entry.post)
+            m.post.message = [(self._checkout(data), options) for data, options in m.post.message]
+            m.status.command_type = entry.command_type
+            g.params = entry.params.to_params()
+            return True
+
+    def store(self, key: str, version: int, m: "MessageParserProtocol") -> None:
+        """ポストデータを登録する
+
+        画像ファイルは次のコマンドで上書きされるため、キャッシュ用ディレクトリに複製して差し替える。
+        グラフ画像のキャッシュにあるファイルは上書きされないため、複製せずにそのまま参照する。
+
+        Args:
+            key (str): キャッシュキー
+            version (int): 登録時のデータバージョン
+            m (MessageParserProtocol): メッセージデータ
+        """
+
+        post = copy.deepcopy(m.post)
+        with self._lock:
+            files: list[Path] = []
+            message: list = []
+            for data, options in post.message:
+                if isinstance(data, Path) and data.exists() and not graphcache.cache.contains(data):
+                    self.directory.mkdir(parents=True, exist_ok=True)
+                    self._serial += 1
+                    data = Path(shutil.copyfile(data, self.directory / f"{key[:16]}_{os.getpid()}_{self._serial}{data.suffix}"))
+                    files.append(data)
+                message.append((data, options))
+            post.message = message
+
+            self._drop(key)
+            self._entries[key] = CacheEntry(post, m.status.command_type, QueryContext.current(), version, time.monotonic() + self.ttl, files)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        """すべてのエントリを破棄する"""
+
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+
+    def reset(self) -> None:
+        """すべてのエントリを破棄し、以前の実行で残った画像ファイルも削除する(起動時に呼び出す)"""
+
+        with self._lock:
+            self._entries.clear()
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def on_change(self, change: "DataChange") -> None:
+        """データの変更通知を受けてエントリを破棄する
+
+        Args:
+            change (DataChange): 変更通知
+        """
+
+        logging.debug("command cache cleared: version=%s", change.version)
+        self.clear()
+
+    def _purge(self, version: int) -> None:
+        """データバージョンが古い、または期限切れのエントリを破棄する
+
+        Args:
+            version (int): 現在のデータバージョン
+        """
+
+        now = time.monotonic()
+        for key in [k for k, v in self._entries.items() if v.version != version or v.expires < now]:
+            self._drop(key)
+
+    def _checkout(self, data: Any) -> Any:
+        """画像ファイルを投稿ごとの一時ファイルに複製する
+
+        キャッシュのファイルは投稿中に破棄される可能性があるため、投稿には複製を使い、投稿後に`graphcache.release()`で削除する。
+
+        Args:
+            data (Any): ポストデータの要素
+
+        Returns:
+            Any: 画像ファイルは複製先、それ以外はそのまま
+        """
+
+        if not isinstance(data, Path):
+            return data
+        return Path(shutil.copyfile(data, graphcache.temporary_file(data.suffix)))
+
+    def _drop(self, key: str) -> None:
+        """エントリと複製した画像ファイルを破棄する
+
+        Args:
+            key (str): キャッシュキー
+        """
+
+        if (entry := self._entries.pop(key, None)) is None:
+            return
+        for file in entry.files:
+            file.unlink(missing_ok=True)
+
+
+cache = CommandCache()
+"""プロセス共通のキャッシュ"""
+
+data_version.subscribe(cache.on_change)
@@ -2,11 +2,10 @@
 libs/functions/compose/badge.py
 """
 
-import math
 from typing import TYPE_CHECKING, cast
 
 import libs.global_value as g
-from libs.data import aggregate, lookup
+from libs.data import grade_state
 
 if TYPE_CHECKING:
     from configparser import ConfigParser
@@ -93,17 +92,7 @@ def grade(name: str, detail: bool = True) -> str:
     if not g.adapter.conf.badge_grade:  # 非表示
         return ""
 
-    # 初期値
-    point: int = 0  # 昇段ポイント
-    grade_level: int = 0  # レベル(段位)
-
-    result_df = lookup.get_results_list(name, g.params.get("rule_version", ""))
-    addition_expression = g.cfg.badge.grade.table.get("addition_expression", "0")
-    for _, data in result_df.iterrows():
-        rank = data["rank"]
-        rpoint = data["rpoint"]
-        addition_point = math.ceil(eval(addition_expression.format(rpoint=rpoint, origin_point=g.cfg.mahjong.origin_point)))
-        point, grade_level = aggregate.grade_promotion_check(grade_level, point + addition_point, rank)
+    point, grade_level = grade_state.current(name, g.params.get("rule_version", ""))
 
     next_point = g.cfg.badge.grade.table["table"][grade_level]["point"][1]
     grade_name = g.cfg.badge.grade.table["table"][grade_level]["grade"]
@@ -48,6 +48,7 @@ def random_reply(m: "MessageParserProtocol", message_type: str) -> str:
         "not_implemented": "未実装",
         "access_denied": "アクセスが拒否されました。",
         "rule_mismatch": "集計モード(四人打/三人打)の指定と集計対象ルールに矛盾があります。",
+        "busy": "<@{user_id}> 処理待ちが多いため受け付けできませんでした。しばらくしてから再度実行してください。",
     }
 
     msg = default_message_type.get(message_type, "invalid_argument")
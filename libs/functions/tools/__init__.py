@@ -7,8 +7,10 @@ Exports:
 - `libs.functions.tools.unification`: 未登録プレイヤーの名前を一括置換
 - `libs.functions.tools.vacuum`: バキューム実行
 - `libs.functions.tools.gen_test_data`: テスト用データ生成ツール
+- `libs.functions.tools.materialize`: 実体化テーブル再構築/整合性チェック
+- `libs.functions.tools.report_batch`: 成績レポート一括生成
 """
 
-from libs.functions.tools import comparison, gen_test_data, member, recalculation, unification, vacuum
+from libs.functions.tools import comparison, gen_test_data, materialize, member, recalculation, report_batch, unification, vacuum
 
-__all__ = ["comparison", "gen_test_data", "member", "recalculation", "unification", "vacuum"]
+__all__ = ["comparison", "gen_test_data", "materialize", "member", "recalculation", "report_batch", "unification", "vacuum"]
@@ -15,7 +15,7 @@ import libs.global_value as g
 from cls.score import GameResult
 from cls.timekit import ExtendedDatetime as ExtDt
 from cls.timekit import Format
-from libs.data import loader, lookup
+from libs.data import data_version, derived, loader, lookup, materialized
 from libs.functions.tools import score_simulator
 from libs.utils import dbutil
 
@@ -42,6 +42,8 @@ def main(season_times: int = 1):
     dt = now
 
     with closing(dbutil.connection(g.cfg.setting.database_file)) as cur:
+        materialized.drop_triggers(cur)
+        data_version.drop_triggers(cur)
         cur.execute("delete from result;")
         for season in range(1, season_times + 1):
             random.shuffle(matchup)
@@ -96,6 +98,9 @@ def main(season_times: int = 1):
                     output += result.to_text("detail")
                     logging.debug(output)
 
+        materialized.rebuild(cur)
+        data_version.bump(cur, ["result"])
+        derived.invalidate(cur)
         cur.commit()
 
     ret = loader.execute("select team, round(sum(point), 1) as point from individual_results group by team order by point desc;")
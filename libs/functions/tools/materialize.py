@@ -0,0 +1,55 @@
+"""
+libs/functions/tools/materialize.py
+"""
+
+import logging
+import time
+
+import libs.global_value as g
+from libs.data import materialized
+from libs.utils import dbutil
+
+
+def main():
+    """実体化テーブル再構築"""
+
+    g.cfg.initialization()
+
+    if not (materialized.enabled() or materialized.game_enabled()):
+        logging.warning("materialized table is disabled.")
+        return
+
+    start_time = time.perf_counter()
+    with dbutil.writer() as resultdb:
+        ret = materialized.rebuild(resultdb)
+
+    logging.info("rebuild: %s, %.3fs", ret, time.perf_counter() - start_time)
+
+
+def check() -> bool:
+    """実体化テーブルとVIEWの整合性チェック
+
+    Returns:
+        bool: 差異の有無
+            - *True*: 差異なし
+            - *False*: 差異あり
+    """
+
+    g.cfg.initialization()
+
+    if not (materialized.enabled() or materialized.game_enabled()):
+        logging.warning("materialized table is disabled.")
+        return True
+
+    with dbutil.reader() as resultdb:
+        ret = materialized.check(resultdb)
+
+    for table_name, ts_list in ret.items():
+        if ts_list:
+            logging.warning("%s: mismatch %s games", table_name, len(ts_list))
+            for ts in ts_list:
+                logging.warning("  ts=%s", ts)
+        else:
+            logging.info("%s: ok", table_name)
+
+    return not any(ret.values())
@@ -7,7 +7,7 @@ import logging
 import pandas as pd
 
 import libs.global_value as g
-from libs.data import modify
+from libs.data import derived, materialized, modify
 from libs.utils import dbutil
 
 
@@ -26,7 +26,8 @@ def export_data():
                 case _:
                     sql = f"select * from {table};"
 
-            df = pd.read_sql(sql, dbutil.connection(g.cfg.setting.database_file))
+            with dbutil.reader() as conn:
+                df = pd.read_sql(sql, conn)
             # 整数値を維持
             if "team_id" in df.columns:
                 df["team_id"] = df["team_id"].astype("Int64")
@@ -43,6 +44,7 @@ def import_data():
     if g.args.import_data:
         modify.db_backup()
         conn = dbutil.connection(g.cfg.setting.database_file)
+        materialized.drop_triggers(conn)
         for table in ("member", "alias", "team"):
             csvfile = f"{g.args.import_data}_{table}.csv"
             conn.execute(f"delete from {table};")
@@ -72,5 +74,7 @@ def import_data():
             for name in member_list:
                 conn.execute("insert into alias(name, member) values (?,?);", name)
 
+        materialized.rebuild(conn)
+        derived.invalidate(conn)
         conn.commit()
         conn.close()
@@ -7,7 +7,7 @@ from contextlib import closing
 
 import libs.global_value as g
 from cls.score import GameResult
-from libs.data import modify
+from libs.data import data_version, derived, materialized, modify
 from libs.utils import dbutil, dictutil
 
 
@@ -19,6 +19,8 @@ def main():
     modify.db_backup()
 
     with closing(dbutil.connection(g.cfg.setting.database_file)) as cur:
+        materialized.drop_triggers(cur)
+        data_version.drop_triggers(cur)
         for rule_version, rule_set in g.cfg.rule.data.items():
             logging.info("%s", rule_set)
             rows = cur.execute(
@@ -44,4 +46,7 @@ def main():
                 count += 1
             logging.info("recalculated: %s", count)
 
+        materialized.rebuild(cur)
+        data_version.bump(cur, ["result"])
+        derived.invalidate(cur)
         cur.commit()
@@ -0,0 +1,56 @@
+"""
+libs/functions/tools/report_batch.py
+"""
+
+import logging
+import os
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import libs.global_value as g
+from integrations import factory
+from libs.commands.report import stats_report
+from libs.utils import dictutil, graphrender
+
+
+def main(argument: list[str], archive: bool = False) -> list[Path]:
+    """全メンバーの成績レポートを一括生成する
+
+    Args:
+        argument (list[str]): レポート生成コマンドの引数(検索範囲など)
+        archive (bool, optional): 生成したレポートをzipにまとめる. Defaults to False.
+
+    Returns:
+        list[Path]: 出力したファイル
+    """
+
+    g.cfg.initialization()
+
+    adapter_std = factory.select_adapter("standard_io", g.cfg)
+    m = adapter_std.parser()
+    m.parser({"text": " ".join([g.cfg.report.commandword[0], *argument])})
+    g.params = dictutil.placeholder(g.cfg.report, m)
+
+    if not g.cfg.setting.render_workers:  # ツール実行時はプロセスプールで描写する
+        g.cfg.setting.render_workers = os.cpu_count() or 1
+
+    start_time = time.perf_counter()
+    output_dir = g.cfg.setting.work_dir / "report"
+    try:
+        if archive:
+            with TemporaryDirectory(dir=g.cfg.setting.work_dir) as tmp_dir:
+                pdf_files = stats_report.generate_reports(Path(tmp_dir), progress=True)
+                ret = [stats_report.archive(pdf_files, output_dir.with_suffix(".zip"))] if pdf_files else []
+        else:
+            pdf_files = stats_report.generate_reports(output_dir, progress=True)
+            ret = pdf_files
+    finally:
+        stats_report.close_executor()
+        graphrender.close_pool()
+
+    if not pdf_files:
+        logging.warning("No game record was found.")
+    logging.info("report batch: %s reports, %.3fs -> %s", len(pdf_files), time.perf_counter() - start_time, [str(x) for x in ret])
+
+    return ret
@@ -6,7 +6,7 @@ import configparser
 import logging
 
 import libs.global_value as g
-from libs.data import lookup, modify
+from libs.data import data_version, derived, lookup, materialized, modify
 from libs.utils import dbutil, textutil, validator
 
 
@@ -26,6 +26,8 @@ def main():
             name_table.setdefault(name, [x.strip() for x in alias.split(",")])
 
         db = dbutil.connection(g.cfg.setting.database_file)
+        materialized.drop_triggers(db)
+        data_version.drop_triggers(db)
         for name, alias_list in name_table.items():
             count = 0
             chk, msg = validator.check_namepattern(name, "member")
@@ -81,10 +83,15 @@ def main():
             else:
                 logging.warning("skip: %s (%s)", name, msg)
                 continue
+        materialized.rebuild(db)
+        data_version.bump(db, ["result", "remarks"])
+        derived.invalidate(db)
         db.commit()
         db.close()
     else:
         db = dbutil.connection(g.cfg.setting.database_file)
+        materialized.drop_triggers(db)
+        data_version.drop_triggers(db)
         for name in g.cfg.member.all_lists:
             check_list: list = [
                 textutil.str_conv(name, textutil.ConversionType.KtoH),
@@ -118,5 +125,8 @@ def main():
                             logging.info("ts=%s, p4_name(%s -> %s)", row["ts"], check, name)
                             db.execute("update result set p4_name=? where p4_name=? and ts=?;", (name, check, row["ts"]))
 
+        materialized.rebuild(db)
+        data_version.bump(db, ["result"])
+        derived.invalidate(db)
         db.commit()
         db.close()
@@ -1,6 +1,9 @@
 """モジュール間データ共有用"""
 
-from typing import TYPE_CHECKING, Any, Callable, Union
+import sys
+import types
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Callable, Union, cast
 
 if TYPE_CHECKING:
     from cls.config import AppConfig
@@ -27,5 +30,33 @@ cfg: "AppConfig"
 """Configインスタンス共有"""
 
 # 環境パラメータ
-params: "PlaceholderDict" = {}
-"""プレースホルダ用パラメータ"""
+params: "PlaceholderDict"
+"""プレースホルダ用パラメータ(実行コンテキスト単位で保持)"""
+
+_params: ContextVar["PlaceholderDict"] = ContextVar("params")
+
+
+class _GlobalValue(types.ModuleType):
+    """`params`をスレッド/タスク単位で切り替えるモジュール型
+
+    `g.params`の参照/代入は実行中のコンテキストに保持された辞書に対して行われるため、
+    複数のリクエストを並行して処理しても互いのパラメータが混ざらない。
+    """
+
+    @property
+    def params(self) -> "PlaceholderDict":
+        """プレースホルダ用パラメータ"""
+
+        try:
+            return _params.get()
+        except LookupError:
+            value = cast("PlaceholderDict", {})
+            _params.set(value)
+            return value
+
+    @params.setter
+    def params(self, value: "PlaceholderDict") -> None:
+        _params.set(value)
+
+
+sys.modules[__name__].__class__ = _GlobalValue
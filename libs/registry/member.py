@@ -5,7 +5,7 @@ libs/registry/member.py
 import logging
 
 import libs.global_value as g
-from libs.data import lookup, modify
+from libs.data import derived, lookup, materialized, modify
 from libs.utils import dbutil, textutil, validator
 
 
@@ -21,96 +21,102 @@ def append(argument: list) -> str:
         str: 処理結果
     """
 
-    resultdb = dbutil.connection(g.cfg.setting.database_file)
-
-    ret: bool = False
-    dbupdate_flg: bool = False
-    msg: str = "使い方が間違っています。"
-
-    if len(argument) == 1:  # 新規追加
-        new_name = textutil.str_conv(argument[0], textutil.ConversionType.HtoZ)
-        rows = resultdb.execute("select count() from member")
-        count = rows.fetchone()[0]
-        if count > g.cfg.member.registration_limit:
-            msg = "登録上限を超えています。"
-        else:  # 登録処理
-            ret, msg = validator.check_namepattern(new_name, "member")
-            if ret:
-                resultdb.execute(
-                    "insert into member(name) values (?)",
-                    (new_name,),
-                )
-                resultdb.execute(
-                    "insert into alias(name, member) values (?,?)",
-                    (new_name, new_name),
-                )
-                msg = f"「{new_name}」を登録しました。"
-                logging.info("add new member: %s", new_name)
-
-    if len(argument) == 2:  # 別名登録
-        new_name = textutil.str_conv(argument[0], textutil.ConversionType.HtoZ)
-        nic_name = textutil.str_conv(argument[1], textutil.ConversionType.HtoZ)
-        registration_flg = True
-        rows = resultdb.execute(
-            "select count() from alias where member=?",
-            (new_name,),
-        )
-        count = rows.fetchone()[0]
-        if count == 0:
-            msg = f"「{new_name}」はまだ登録されていません。"
-            registration_flg = False
-        if count > g.cfg.member.alias_limit:
-            msg = "登録上限を超えています。"
-            registration_flg = False
-
-        if registration_flg:  # 登録処理
-            ret, msg = validator.check_namepattern(nic_name, "member")
-            if ret:
-                resultdb.execute(
-                    "insert into alias(name, member) values (?,?)",
-                    (nic_name, new_name),
-                )
-                msg = f"「{new_name}」に「{nic_name}」を追加しました。"
-                logging.info("add alias: %s -> %s", new_name, nic_name)
-                dbupdate_flg = True
-
-        if dbupdate_flg:
-            rows = resultdb.execute(
-                """
-                select distinct name from (
-                    select p1_name as name from result
-                    union all select p2_name from result
-                    union all select p3_name from result
-                    union all select p4_name from result
-                    union all select name from remarks
-                );
-                """
-            )
-            name_list = [row["name"] for row in rows.fetchall()]
-
-            if {
-                nic_name,
-                textutil.str_conv(nic_name, textutil.ConversionType.KtoH),
-                textutil.str_conv(nic_name, textutil.ConversionType.HtoK),
-            } & set(name_list):
-                msg += modify.db_backup()
-                for tbl, col in [("result", f"p{x}_name") for x in range(1, 5)] + [("remarks", "name")]:
+    with dbutil.writer() as resultdb:
+        ret: bool = False
+        dbupdate_flg: bool = False
+        msg: str = "使い方が間違っています。"
+
+        if len(argument) == 1:  # 新規追加
+            new_name = textutil.str_conv(argument[0], textutil.ConversionType.HtoZ)
+            rows = resultdb.execute("select count() from member")
+            count = rows.fetchone()[0]
+            if count > g.cfg.member.registration_limit:
+                msg = "登録上限を超えています。"
+            else:  # 登録処理
+                ret, msg = validator.check_namepattern(new_name, "member")
+                if ret:
                     resultdb.execute(
-                        f"update {tbl} set {col}=? where {col}=?",
-                        (new_name, nic_name),
+                        "insert into member(name) values (?)",
+                        (new_name,),
                     )
                     resultdb.execute(
-                        f"update {tbl} set {col}=? where {col}=?",
-                        (new_name, textutil.str_conv(nic_name, textutil.ConversionType.KtoH)),
+                        "insert into alias(name, member) values (?,?)",
+                        (new_name, new_name),
                     )
+                    materialized.refresh_player(resultdb, new_name)
+                    derived.invalidate(resultdb)
+                    msg = f"「{new_name}」を登録しました。"
+                    logging.info("add new member: %s", new_name)
+
+        if len(argument) == 2:  # 別名登録
+            new_name = textutil.str_conv(argument[0], textutil.ConversionType.HtoZ)
+            nic_name = textutil.str_conv(argument[1], textutil.ConversionType.HtoZ)
+            registration_flg = True
+            rows = resultdb.execute(
+                "select count() from alias where member=?",
+                (new_name,),
+            )
+            count = rows.fetchone()[0]
+            if count == 0:
+                msg = f"「{new_name}」はまだ登録されていません。"
+                registration_flg = False
+            if count > g.cfg.member.alias_limit:
+                msg = "登録上限を超えています。"
+                registration_flg = False
+
+            if registration_flg:  # 登録処理
+                ret, msg = validator.check_namepattern(nic_name, "member")
+                if ret:
                     resultdb.execute(
-                        f"update {tbl} set {col}=? where {col}=?",
-                        (new_name, textutil.str_conv(nic_name, textutil.ConversionType.HtoK)),
+                        "insert into alias(name, member) values (?,?)",
+                        (nic_name, new_name),
                     )
-                msg += "\nデータベースを更新しました。"
+                    msg = f"「{new_name}」に「{nic_name}」を追加しました。"
+                    logging.info("add alias: %s -> %s", new_name, nic_name)
+                    dbupdate_flg = True
+
+            if dbupdate_flg:
+                rows = resultdb.execute(
+                    """
+                    select distinct name from (
+                        select p1_name as name from result
+                        union all select p2_name from result
+                        union all select p3_name from result
+                        union all select p4_name from result
+                        union all select name from remarks
+                    );
+                    """
+                )
+                name_list = [row["name"] for row in rows.fetchall()]
+
+                if {
+                    nic_name,
+                    textutil.str_conv(nic_name, textutil.ConversionType.KtoH),
+                    textutil.str_conv(nic_name, textutil.ConversionType.HtoK),
+                } & set(name_list):
+                    msg += modify.db_backup()
+                    for tbl, col in [("result", f"p{x}_name") for x in range(1, 5)] + [("remarks", "name")]:
+                        resultdb.execute(
+                            f"update {tbl} set {col}=? where {col}=?",
+                            (new_name, nic_name),
+                        )
+                        resultdb.execute(
+                            f"update {tbl} set {col}=? where {col}=?",
+                            (new_name, textutil.str_conv(nic_name, textutil.ConversionType.KtoH)),
+                        )
+                        resultdb.execute(
+                            f"update {tbl} set {col}=? where {col}=?",
+                            (new_name, textutil.str_conv(nic_name, textutil.ConversionType.HtoK)),
+                        )
+                    for old_name in {
+                        nic_name,
+                        textutil.str_conv(nic_name, textutil.ConversionType.KtoH),
+                        textutil.str_conv(nic_name, textutil.ConversionType.HtoK),
+                    }:
+                        materialized.refresh_player(resultdb, old_name)
+                    derived.invalidate(resultdb)
+                    msg += "\nデータベースを更新しました。"
 
-    resultdb.commit()
-    resultdb.close()
 
     g.cfg.member.info = lookup.get_member_info()
     return msg
@@ -128,40 +134,40 @@ def remove(argument: list) -> str:
         str: 処理結果
     """
 
-    resultdb = dbutil.connection(g.cfg.setting.database_file)
-    msg = "使い方が間違っています。"
+    with dbutil.writer() as resultdb:
+        msg = "使い方が間違っています。"
 
-    if len(argument) == 1:  # メンバー削除
-        new_name = textutil.str_conv(argument[0], textutil.ConversionType.HtoZ)
-        if new_name in g.cfg.member.lists:
-            resultdb.execute(
-                "delete from member where name=?",
-                (new_name,),
-            )
-            resultdb.execute(
-                "delete from alias where member=?",
-                (new_name,),
-            )
-            msg = f"「{new_name}」を削除しました。"
-            logging.info("remove member: %s", new_name)
-        else:
-            msg = f"「{new_name}」は登録されていません。"
-
-    if len(argument) == 2:  # 別名削除
-        new_name = textutil.str_conv(argument[0], textutil.ConversionType.HtoZ)
-        nic_name = textutil.str_conv(argument[1], textutil.ConversionType.HtoZ)
-        if nic_name in g.cfg.member.lists:
-            resultdb.execute(
-                "delete from alias where name=? and member=?",
-                (nic_name, new_name),
-            )
-            msg = f"「{new_name}」から「{nic_name}」を削除しました。"
-            logging.info("alias remove: %s -> %s", new_name, nic_name)
-        else:
-            msg = f"「{new_name}」に「{nic_name}」は登録されていません。"
+        if len(argument) == 1:  # メンバー削除
+            new_name = textutil.str_conv(argument[0], textutil.ConversionType.HtoZ)
+            if new_name in g.cfg.member.lists:
+                resultdb.execute(
+                    "delete from member where name=?",
+                    (new_name,),
+                )
+                resultdb.execute(
+                    "delete from alias where member=?",
+                    (new_name,),
+                )
+                materialized.refresh_player(resultdb, new_name)
+                derived.invalidate(resultdb)
+                msg = f"「{new_name}」を削除しました。"
+                logging.info("remove member: %s", new_name)
+            else:
+                msg = f"「{new_name}」は登録されていません。"
+
+        if len(argument) == 2:  # 別名削除
+            new_name = textutil.str_conv(argument[0], textutil.ConversionType.HtoZ)
+            nic_name = textutil.str_conv(argument[1], textutil.ConversionType.HtoZ)
+            if nic_name in g.cfg.member.lists:
+                resultdb.execute(
+                    "delete from alias where name=? and member=?",
+                    (nic_name, new_name),
+                )
+                msg = f"「{new_name}」から「{nic_name}」を削除しました。"
+                logging.info("alias remove: %s -> %s", new_name, nic_name)
+            else:
+                msg = f"「{new_name}」に「{nic_name}」は登録されていません。"
 
-    resultdb.commit()
-    resultdb.close()
 
     g.cfg.member.info = lookup.get_member_info()
     return msg
@@ -5,7 +5,7 @@ libs/registry/team.py
 import logging
 
 import libs.global_value as g
-from libs.data import initialization, lookup, modify
+from libs.data import derived, initialization, lookup, materialized, modify
 from libs.utils import dbutil, formatter, textutil, validator
 
 
@@ -29,13 +29,11 @@ def create(argument: list) -> str:
         else:  # 登録処理
             ret, msg = validator.check_namepattern(team_name, "team")
             if ret:
-                resultdb = dbutil.connection(g.cfg.setting.database_file)
-                resultdb.execute(
-                    "insert into team(name) values (?)",
-                    (team_name,),
-                )
-                resultdb.commit()
-                resultdb.close()
+                with dbutil.writer() as resultdb:
+                    resultdb.execute(
+                        "insert into team(name) values (?)",
+                        (team_name,),
+                    )
                 g.cfg.team.info = lookup.get_team_info()
                 msg = f"チーム「{team_name}」を登録しました。"
                 logging.info("add new team: %s", team_name)
@@ -62,14 +60,17 @@ def delete(argument: list) -> str:
         else:
             msg = modify.db_backup()
             team_id = [x["id"] for x in g.cfg.team.info if x["team"] == team_name][0]
-            resultdb = dbutil.connection(g.cfg.setting.database_file)
-            resultdb.execute("delete from team where id = ?", (team_id,))
-            resultdb.execute(
-                "update member set team_id = null where team_id = ?",
-                (team_id,),
-            )
-            resultdb.commit()
-            resultdb.close()
+            with dbutil.writer() as resultdb:
+                rows = resultdb.execute("select name from member where team_id = ?", (team_id,))
+                member_list = [row[0] for row in rows.fetchall()]
+                resultdb.execute("delete from team where id = ?", (team_id,))
+                resultdb.execute(
+                    "update member set team_id = null where team_id = ?",
+                    (team_id,),
+                )
+                for name in member_list:
+                    materialized.refresh_player(resultdb, name)
+                derived.invalidate(resultdb)
             g.cfg.team.info = lookup.get_team_info()
             msg += f"\nチーム「{team_name}」を削除しました。"
             logging.info("team delete: %s", team_name)
@@ -121,13 +122,13 @@ def append(argument: list) -> str:
         #    registration_flg = False
 
         if registration_flg and team_id:  # 登録処理
-            resultdb = dbutil.connection(g.cfg.setting.database_file)
-            resultdb.execute(
-                "update member set team_id = ? where name = ?",
-                (team_id, player_name),
-            )
-            resultdb.commit()
-            resultdb.close()
+            with dbutil.writer() as resultdb:
+                resultdb.execute(
+                    "update member set team_id = ? where name = ?",
+                    (team_id, player_name),
+                )
+                materialized.refresh_player(resultdb, player_name)
+                derived.invalidate(resultdb)
             g.cfg.team.info = lookup.get_team_info()
             msg = f"チーム「{team_name}」に「{player_name}」を所属させました。"
             logging.info("team participation: %s -> %s", team_name, player_name)
@@ -149,8 +150,6 @@ def remove(argument: list) -> str:
 
     msg = "使い方が間違っています。"
 
-    resultdb = dbutil.connection(g.cfg.setting.database_file)
-
     if len(argument) == 1:
         msg = delete(argument)
 
@@ -173,13 +172,13 @@ def remove(argument: list) -> str:
             registration_flg = False
 
         if registration_flg and team_id:  # 登録処理
-            resultdb = dbutil.connection(g.cfg.setting.database_file)
-            resultdb.execute(
-                "update member set team_id = null where name = ?",
-                (player_name,),
-            )
-            resultdb.commit()
-            resultdb.close()
+            with dbutil.writer() as resultdb:
+                resultdb.execute(
+                    "update member set team_id = null where name = ?",
+                    (player_name,),
+                )
+                materialized.refresh_player(resultdb, player_name)
+                derived.invalidate(resultdb)
             g.cfg.team.info = lookup.get_team_info()
             msg = f"チーム「{team_name}」から「{player_name}」を離脱させました。"
             logging.info("team breakaway: %s -> %s", team_name, player_name)
@@ -196,12 +195,10 @@ def clear() -> str:
 
     msg = modify.db_backup()
 
-    resultdb = dbutil.connection(g.cfg.setting.database_file)
-    resultdb.execute("update member set team_id = null;")
-    resultdb.execute("drop table team;")
-    resultdb.execute("delete from sqlite_sequence where name = 'team';")
-    resultdb.commit()
-    resultdb.close()
+    with dbutil.writer() as resultdb:
+        resultdb.execute("update member set team_id = null;")
+        resultdb.execute("drop table team;")
+        resultdb.execute("delete from sqlite_sequence where name = 'team';")
 
     initialization.initialization_resultdb(g.cfg.setting.database_file)
     g.cfg.member.info = lookup.get_member_info()
@@ -47,6 +47,10 @@ class Args:
     import_data: str
     vacuum: bool
     gen_test_data: int
+    rebuild_materialized: bool
+    check_materialized: bool
+    report_batch: Optional[list[str]]
+    archive: bool
     testcase: Optional["Path"]
 
 
@@ -245,6 +249,8 @@ class PlaceholderDict(TypedDict, total=False):
     """集計規定ゲーム数"""
     interval: int
     """区間集計範囲"""
+    aggregate_unit: Literal["A", "M", "Y"]
+    """レポート生成用日付範囲(`g.cfg.aggregate_unit`より優先)"""
     target_count: int
     """直近ゲーム数指定"""
     source: str
@@ -287,6 +293,8 @@ class PlaceholderDict(TypedDict, total=False):
     """統計表示モード"""
     rating: bool
     """レーティング表示モード"""
+    batch: bool
+    """成績レポート一括生成モード"""
     verbose: bool
     """詳細表示モード"""
     fourfold: bool
@@ -2,10 +2,18 @@
 libs/utils/dbutil.py
 """
 
+import logging
 import re
 import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
 from importlib.resources import files
-from typing import TYPE_CHECKING, Union
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Union
 
 import libs.global_value as g
 
@@ -33,6 +41,492 @@ def connection(database_path: Union["Path", str]) -> sqlite3.Connection:
     return conn
 
 
+@dataclass
+class PoolMetrics:
+    """接続プール統計情報"""
+
+    reader_opened: int = field(default=0)
+    """作成した読み込み用接続数"""
+    writer_opened: int = field(default=0)
+    """作成した書き込み用接続数"""
+    reader_acquired: int = field(default=0)
+    """読み込み用接続の払い出し回数"""
+    reader_released: int = field(default=0)
+    """スレッド終了で閉じた読み込み用接続数"""
+    writer_acquired: int = field(default=0)
+    """書き込み用接続の払い出し回数"""
+    writer_rollback: int = field(default=0)
+    """書き込み失敗によるロールバック回数"""
+    writer_wait_total: float = field(default=0.0)
+    """書き込みロック待ち時間の累計(秒)"""
+    writer_wait_max: float = field(default=0.0)
+    """書き込みロック待ち時間の最大値(秒)"""
+
+
+class _ThreadReaders:
+    """スレッド単位で保持する読み込み用接続
+
+    スレッドが終了して`threading.local`から破棄されると、プールのファイナライザが接続を閉じる。
+    """
+
+    def __init__(self):
+        self.conns: dict[str, sqlite3.Connection] = {}
+
+
+class ConnectionPool:
+    """DB接続プール
+
+    - 読み込み用接続はスレッド単位で保持して使い回し、スレッド終了時に閉じる
+    - 書き込み用接続はデータベース単位で1つだけ保持し、ロックで直列化する
+    - 変更検知用接続はデータベース単位で1つだけ保持し、ロックで直列化する
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.RLock()  # スレッド終了時のファイナライザがロック保持中に呼ばれることがある
+        self._writers: dict[str, sqlite3.Connection] = {}
+        self._writer_locks: dict[str, threading.Lock] = {}
+        self._watchers: dict[str, sqlite3.Connection] = {}
+        self._watcher_locks: dict[str, threading.Lock] = {}
+        self._readers: list[sqlite3.Connection] = []
+        self._commit_hooks: list[Callable[[str], None]] = []
+        self.metrics = PoolMetrics()
+
+    def _open(self, database_path: str, check_same_thread: bool = True) -> sqlite3.Connection:
+        """接続を作成してPRAGMAを適用する
+
+        Args:
+            database_path (str): データベースファイル
+            check_same_thread (bool, optional): 作成スレッド以外からの利用を禁止する. Defaults to True.
+
+        Returns:
+            sqlite3.Connection: オブジェクト
+        """
+
+        conn = sqlite3.connect(
+            database=f"file:{database_path}",
+            uri=True,
+            check_same_thread=check_same_thread,
+        )
+        conn.row_factory = sqlite3.Row
+
+        for pragma, value in pragma_settings(database_path).items():
+            try:
+                conn.execute(f"pragma {pragma} = {value};")
+            except sqlite3.OperationalError as err:
+                logging.warning("pragma %s = %s: %s", pragma, value, err)
+
+        return conn
+
+    @contextmanager
+    def reader(self, database_path: str) -> Iterator[sqlite3.Connection]:
+        """読み込み用接続を払い出す
+
+        Args:
+            database_path (str): データベースファイル
+
+        Yields:
+            Iterator[sqlite3.Connection]: スレッド専用の接続(`query_only`)
+        """
+
+        if (holder := getattr(self._local, "readers", None)) is None:
+            holder = _ThreadReaders()
+            weakref.finalize(holder, self._release_readers, holder.conns)
+            self._local.readers = holder
+        readers = holder.conns
+
+        if (conn := readers.get(database_path)) is None:
+            conn = self._open(database_path, check_same_thread=False)  # ファイナライザは別スレッドから閉じる
+            conn.execute("pragma query_only = on;")
+            conn.execute("pragma read_uncommitted = on;")  # 共有キャッシュ時のテーブルロック回避
+            readers[database_path] = conn
+            with self._lock:
+                self._readers.append(conn)
+                self.metrics.reader_opened += 1
+
+        with self._lock:
+            self.metrics.reader_acquired += 1
+
+        try:
+            yield conn
+        except Exception:
+            # 実行途中のステートメントがロックを保持し続けないように接続を破棄
+            readers.pop(database_path, None)
+            with self._lock:
+                if conn in self._readers:
+                    self._readers.remove(conn)
+            conn.close()
+            raise
+
+    def _release_readers(self, readers: dict[str, sqlite3.Connection]) -> None:
+        """終了したスレッドの読み込み用接続を閉じる
+
+        Args:
+            readers (dict[str, sqlite3.Connection]): スレッドが保持していた接続
+        """
+
+        with self._lock:
+            for conn in readers.values():
+                if conn in self._readers:
+                    self._readers.remove(conn)
+                    self.metrics.reader_released += 1
+                conn.close()
+            readers.clear()
+
+    @contextmanager
+    def writer(self, database_path: str) -> Iterator[sqlite3.Connection]:
+        """書き込み用接続を払い出す
+
+        ブロックを抜けるとコミットし、例外発生時はロールバックする。
+
+        Args:
+            database_path (str): データベースファイル
+
+        Yields:
+            Iterator[sqlite3.Connection]: 共有の書き込み用接続
+        """
+
+        with self._lock:
+            writer_lock = self._writer_locks.setdefault(database_path, threading.Lock())
+
+        wait_start = time.perf_counter()
+        with writer_lock:
+            wait_time = time.perf_counter() - wait_start
+            with self._lock:
+                if (conn := self._writers.get(database_path)) is None:
+                    conn = self._open(database_path, check_same_thread=False)
+                    self._writers[database_path] = conn
+                    self.metrics.writer_opened += 1
+                self.metrics.writer_acquired += 1
+                self.metrics.writer_wait_total += wait_time
+                self.metrics.writer_wait_max = max(self.metrics.writer_wait_max, wait_time)
+
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                with self._lock:
+                    self.metrics.writer_rollback += 1
+                raise
+
+        for hook in list(self._commit_hooks):
+            try:
+                hook(database_path)
+            except Exception:  # 書き込み自体は完了しているので伝播させない
+                logging.exception("commit hook failed: %s", getattr(hook, "__name__", hook))
+
+    @contextmanager
+    def watcher(self, database_path: str) -> Iterator[sqlite3.Connection]:
+        """変更検知用接続を払い出す
+
+        `PRAGMA data_version`は接続ごとの値で、他の接続がコミットすると変わる。
+        同じ接続で比較する必要があるため、スレッド間で1つの接続を共有する。
+
+        Args:
+            database_path (str): データベースファイル
+
+        Yields:
+            Iterator[sqlite3.Connection]: 共有の変更検知用接続(`query_only`)
+        """
+
+        with self._lock:
+            watcher_lock = self._watcher_locks.setdefault(database_path, threading.Lock())
+
+        with watcher_lock:
+            with self._lock:
+                if (conn := self._watchers.get(database_path)) is None:
+                    conn = self._open(database_path, check_same_thread=False)
+                    conn.execute("pragma query_only = on;")
+                    conn.execute("pragma read_uncommitted = on;")  # 共有キャッシュ時のテーブルロック回避
+                    self._watchers[database_path] = conn
+            yield conn
+
+    def add_commit_hook(self, hook: Callable[[str], None]) -> None:
+        """書き込み用接続のコミット後に呼び出す処理を登録する
+
+        Args:
+            hook (Callable[[str], None]): データベースファイルを受け取る関数
+        """
+
+        with self._lock:
+            if hook not in self._commit_hooks:
+                self._commit_hooks.append(hook)
+
+    def close(self) -> None:
+        """保持しているすべての接続を閉じる"""
+
+        with self._lock:
+            for conn in self._readers + list(self._writers.values()) + list(self._watchers.values()):
+                try:
+                    conn.close()
+                except sqlite3.ProgrammingError:  # 他スレッドの接続
+                    pass
+            self._readers.clear()
+            self._writers.clear()
+            self._writer_locks.clear()
+            self._watchers.clear()
+            self._watcher_locks.clear()
+            self._local = threading.local()
+
+    def stats(self) -> dict[str, Union[int, float]]:
+        """統計情報を返す
+
+        Returns:
+            dict[str, Union[int, float]]: 統計情報
+        """
+
+        with self._lock:
+            ret: dict[str, Union[int, float]] = asdict(self.metrics)
+            ret.update(
+                readers=len(self._readers),
+                writers=len(self._writers),
+            )
+
+        return ret
+
+
+_pool = ConnectionPool()
+
+
+def pragma_settings(database_path: Union["Path", str]) -> dict[str, Union[int, str]]:
+    """接続時に適用するPRAGMAを設定値から生成する
+
+    Args:
+        database_path (Union[Path, str]): データベースファイル
+
+    Returns:
+        dict[str, Union[int, str]]: PRAGMA名と値
+    """
+
+    ret: dict[str, Union[int, str]] = {}
+    if not hasattr(g, "cfg"):
+        return ret
+
+    if not _is_memory_database(database_path) and g.cfg.setting.journal_mode:
+        ret["journal_mode"] = g.cfg.setting.journal_mode
+        ret["synchronous"] = g.cfg.setting.synchronous
+    ret["cache_size"] = g.cfg.setting.cache_size
+    ret["mmap_size"] = g.cfg.setting.mmap_size
+    ret["temp_store"] = g.cfg.setting.temp_store
+
+    return ret
+
+
+def _is_memory_database(database_path: Union["Path", str]) -> bool:
+    """インメモリDBか判定する
+
+    Args:
+        database_path (Union[Path, str]): データベースファイル
+
+    Returns:
+        bool: 判定結果
+    """
+
+    path = str(database_path)
+    return path == ":memory:" or "mode=memory" in path
+
+
+@contextmanager
+def reader(database_path: Optional[Union["Path", str]] = None) -> Iterator[sqlite3.Connection]:
+    """プールから読み込み用接続を取得する
+
+    取得した接続はプールが管理するので閉じてはいけない。
+
+    Args:
+        database_path (Optional[Union[Path, str]], optional): データベースファイル. Defaults to None.
+            - *None*: `g.cfg.setting.database_file`
+
+    Yields:
+        Iterator[sqlite3.Connection]: オブジェクト
+    """
+
+    with _pool.reader(str(database_path or g.cfg.setting.database_file)) as conn:
+        yield conn
+
+
+@contextmanager
+def writer(database_path: Optional[Union["Path", str]] = None) -> Iterator[sqlite3.Connection]:
+    """プールから書き込み用接続を取得する
+
+    ブロックを正常に抜けるとコミット、例外発生時はロールバックされる。
+
+    Args:
+        database_path (Optional[Union[Path, str]], optional): データベースファイル. Defaults to None.
+            - *None*: `g.cfg.setting.database_file`
+
+    Yields:
+        Iterator[sqlite3.Connection]: オブジェクト
+    """
+
+    with _pool.writer(str(database_path or g.cfg.setting.database_file)) as conn:
+        yield conn
+
+
+def pool_metrics() -> dict[str, Union[int, float]]:
+    """接続プールの統計情報を返す
+
+    Returns:
+        dict[str, Union[int, float]]: 統計情報
+    """
+
+    return _pool.stats()
+
+
+@contextmanager
+def watcher(database_path: Optional[Union["Path", str]] = None) -> Iterator[sqlite3.Connection]:
+    """プールから変更検知用接続を取得する
+
+    取得した接続はプールが管理するので閉じてはいけない。
+
+    Args:
+        database_path (Optional[Union[Path, str]], optional): データベースファイル. Defaults to None.
+            - *None*: `g.cfg.setting.database_file`
+
+    Yields:
+        Iterator[sqlite3.Connection]: オブジェクト
+    """
+
+    with _pool.watcher(str(database_path or g.cfg.setting.database_file)) as conn:
+        yield conn
+
+
+def add_commit_hook(hook: Callable[[str], None]) -> None:
+    """`writer()`のコミット後に呼び出す処理を登録する
+
+    Args:
+        hook (Callable[[str], None]): データベースファイルを受け取る関数
+    """
+
+    _pool.add_commit_hook(hook)
+
+
+def close_pool() -> None:
+    """接続プールを破棄する"""
+
+    logging.debug("connection pool: %s", _pool.stats())
+    _pool.close()
+
+
+QUERY_FILES: dict[str, str] = {
+    # テーブル作成
+    "CREATE_TABLE_MEMBER": "table/member.sql",
+    "CREATE_TABLE_ALIAS": "table/alias.sql",
+    "CREATE_TABLE_TEAM": "table/team.sql",
+    "CREATE_TABLE_RESULT": "table/result.sql",
+    "CREATE_TABLE_REMARKS": "table/remarks.sql",
+    "CREATE_TABLE_WORDS": "table/words.sql",
+    "CREATE_TABLE_RULE": "table/rule.sql",
+    "CREATE_TABLE_INDIVIDUAL_RESULTS": "table/individual_results.sql",
+    "CREATE_TABLE_GAME_RESULTS_MAT": "table/game_results_mat.sql",
+    "CREATE_TABLE_STATS_CACHE": "table/stats_cache.sql",
+    "CREATE_TABLE_RATING_TIMELINE": "table/rating_timeline.sql",
+    "CREATE_TABLE_RATING_HISTORY": "table/rating_history.sql",
+    "CREATE_TABLE_GRADE_HISTORY": "table/grade_history.sql",
+    "CREATE_TABLE_META": "table/meta.sql",
+    "CREATE_TRIGGER_GAME_RESULTS_MAT": "table/game_results_mat_trigger.sql",
+    "CREATE_TRIGGER_DATA_VERSION": "table/data_version_trigger.sql",
+    # VIEW作成
+    "CREATE_VIEW_INDIVIDUAL_RESULTS": "view/individual_results.sql",
+    "CREATE_VIEW_GAME_RESULTS": "view/game_results.sql",
+    "CREATE_VIEW_GAME_INFO": "view/game_info.sql",
+    "CREATE_VIEW_REGULATIONS": "view/regulations.sql",
+    # INDEX作成
+    "CREATE_INDEX": "table/index.sql",
+    "CREATE_INDEX_INDIVIDUAL_RESULTS": "table/individual_results_index.sql",
+    # 情報取得
+    "GAME_INFO": "game.info.sql",
+    "RESULTS_INFO": "results.info.sql",
+    "MEMBER_INFO": "member.info.sql",
+    "TEAM_INFO": "team.info.sql",
+    "REMARKS_INFO": "remarks.info.sql",
+    "RECORD_INFO": "record.info.sql",
+    # 集計
+    "SUMMARY_GAMEDATA": "summary/gamedata.sql",
+    "SUMMARY_DETAILS": "summary/details.sql",
+    "SUMMARY_DETAILS2": "summary/details2.sql",
+    "SUMMARY_RESULTS": "summary/results.sql",
+    "SUMMARY_TOTAL": "summary/total.sql",
+    "SUMMARY_VERSUS_MATRIX": "summary/versus_matrix.sql",
+    "RANKING_RESULTS": "ranking/results.sql",
+    "RANKING_RATINGS": "ranking/ratings.sql",
+    "REPORT_PERSONAL_DATA": "report/personal_data.sql",
+    "REPORT_COUNT_DATA": "report/count_data.sql",
+    "REPORT_MONTHLY": "report/monthly.sql",
+    "REPORT_RESULTS_LIST": "report/results_list.sql",
+    "REPORT_WINNER": "report/winner.sql",
+    "REPORT_MATRIX_TABLE": "report/matrix_table.sql",
+    "REPORT_COUNT_MOVING": "report/count_moving.sql",
+    #
+    "RESULT_INSERT": "general/result_insert.sql",
+    "RESULT_UPDATE": "general/result_update.sql",
+    "RESULT_DELETE": "general/result_delete.sql",
+    #
+    "REMARKS_SELECT": "general/remarks_select.sql",
+    "REMARKS_INSERT": "general/remarks_insert.sql",
+    "REMARKS_DELETE_ALL": "general/remarks_delete_all.sql",
+    "REMARKS_DELETE_ONE": "general/remarks_delete_one.sql",
+    "REMARKS_DELETE_COMPAR": "general/remarks_delete_compar.sql",
+    #
+    "SELECT_ALL_RESULTS": "general/select_all_results.sql",
+    "SELECT_GAME_RESULTS": "general/select_game_results.sql",
+}
+"""SQL選択キーワードとクエリファイルの対応表"""
+
+_query_registry: Optional[MappingProxyType[str, str]] = None
+
+QUERY_CACHE_SIZE: int = 512
+"""生成済みクエリの保持上限"""
+
+
+@dataclass(frozen=True)
+class QueryFlags:
+    """クエリ生成に影響するパラメータ(生成済みクエリのキャッシュキー)"""
+
+    individual: bool = field(default=True)
+    unregistered_replace: bool = field(default=False)
+    guest_skip: bool = field(default=False)
+    friendly_fire: bool = field(default=False)
+    collection: Optional[str] = field(default=None)
+    rule_keys: tuple[str, ...] = field(default=())
+    mode: int = field(default=4)
+    separate: bool = field(default=False)
+    search_word: bool = field(default=False)
+    group_length: bool = field(default=False)
+    all_range: bool = field(default=False)
+    """直近N検索(全範囲取得)"""
+    player_keys: Optional[tuple[str, ...]] = field(default=None)
+    guest_mark: str = field(default="")
+    aggregate_unit: Optional[str] = field(default=None)
+    interval: Optional[int] = field(default=None)
+    """`None`: 置換なし, `0`: 固定値, `1`: 計算式"""
+    kind: Optional[str] = field(default=None)
+    undefined_word: int = field(default=0)
+    materialized_game: bool = field(default=False)
+    """`game_results`/`game_info` を実体化テーブルに置き換える"""
+
+
+def load_queries() -> MappingProxyType[str, str]:
+    """クエリファイルをすべて読み込んでレジストリを作成する
+
+    Returns:
+        MappingProxyType[str, str]: SQL選択キーワードとSQL文(変更不可)
+    """
+
+    global _query_registry
+
+    registry: dict[str, str] = {}
+    for keyword, query_path in QUERY_FILES.items():
+        with open(str(files("files.queries").joinpath(query_path)), "r", encoding="utf-8") as queryfile:
+            registry[keyword] = str(queryfile.read()).strip()
+
+    _query_registry = MappingProxyType(registry)
+    _build_query.cache_clear()
+    logging.debug("query registry: %s", len(registry))
+
+    return _query_registry
+
+
 def query(keyword: str) -> str:
     """SQLクエリを返す
 
@@ -46,97 +540,104 @@ def query(keyword: str) -> str:
         str: SQL文
     """
 
-    sql_tables: dict[str, str] = {
-        # テーブル作成
-        "CREATE_TABLE_MEMBER": "table/member.sql",
-        "CREATE_TABLE_ALIAS": "table/alias.sql",
-        "CREATE_TABLE_TEAM": "table/team.sql",
-        "CREATE_TABLE_RESULT": "table/result.sql",
-        "CREATE_TABLE_REMARKS": "table/remarks.sql",
-        "CREATE_TABLE_WORDS": "table/words.sql",
-        "CREATE_TABLE_RULE": "table/rule.sql",
-        # VIEW作成
-        "CREATE_VIEW_INDIVIDUAL_RESULTS": "view/individual_results.sql",
-        "CREATE_VIEW_GAME_RESULTS": "view/game_results.sql",
-        "CREATE_VIEW_GAME_INFO": "view/game_info.sql",
-        "CREATE_VIEW_REGULATIONS": "view/regulations.sql",
-        # INDEX作成
-        "CREATE_INDEX": "table/index.sql",
-        # 情報取得
-        "GAME_INFO": "game.info.sql",
-        "RESULTS_INFO": "results.info.sql",
-        "MEMBER_INFO": "member.info.sql",
-        "TEAM_INFO": "team.info.sql",
-        "REMARKS_INFO": "remarks.info.sql",
-        "RECORD_INFO": "record.info.sql",
-        # 集計
-        "SUMMARY_GAMEDATA": "summary/gamedata.sql",
-        "SUMMARY_DETAILS": "summary/details.sql",
-        "SUMMARY_DETAILS2": "summary/details2.sql",
-        "SUMMARY_RESULTS": "summary/results.sql",
-        "SUMMARY_TOTAL": "summary/total.sql",
-        "SUMMARY_VERSUS_MATRIX": "summary/versus_matrix.sql",
-        "RANKING_RESULTS": "ranking/results.sql",
-        "RANKING_RATINGS": "ranking/ratings.sql",
-        "REPORT_PERSONAL_DATA": "report/personal_data.sql",
-        "REPORT_COUNT_DATA": "report/count_data.sql",
-        "REPORT_MONTHLY": "report/monthly.sql",
-        "REPORT_RESULTS_LIST": "report/results_list.sql",
-        "REPORT_WINNER": "report/winner.sql",
-        "REPORT_MATRIX_TABLE": "report/matrix_table.sql",
-        "REPORT_COUNT_MOVING": "report/count_moving.sql",
-        #
-        "RESULT_INSERT": "general/result_insert.sql",
-        "RESULT_UPDATE": "general/result_update.sql",
-        "RESULT_DELETE": "general/result_delete.sql",
-        #
-        "REMARKS_SELECT": "general/remarks_select.sql",
-        "REMARKS_INSERT": "general/remarks_insert.sql",
-        "REMARKS_DELETE_ALL": "general/remarks_delete_all.sql",
-        "REMARKS_DELETE_ONE": "general/remarks_delete_one.sql",
-        "REMARKS_DELETE_COMPAR": "general/remarks_delete_compar.sql",
-        #
-        "SELECT_ALL_RESULTS": "general/select_all_results.sql",
-        "SELECT_GAME_RESULTS": "general/select_game_results.sql",
-    }
+    registry = _query_registry if _query_registry is not None else load_queries()
 
-    if query_path := sql_tables.get(keyword):
-        with open(str(files("files.queries").joinpath(query_path)), "r", encoding="utf-8") as queryfile:
-            return str(queryfile.read()).strip()
-    else:
+    if (sql := registry.get(keyword)) is None:
         raise ValueError(f"Unknown keyword: {keyword}")
 
+    return sql
+
 
 def query_modification(sql: str) -> str:
     """クエリをオプションの内容で修正する
 
+    パラメータの補正は毎回行い、修正後のクエリはフラグの組み合わせ単位でキャッシュする。
+
+    Args:
+        sql (str): 修正するクエリ
+
+    Returns:
+        str: 修正後のクエリ
+    """
+
+    # チーム集計ではゲスト関連フラグを固定
+    if not g.params.get("individual"):
+        g.params.update({"unregistered_replace": False})
+        g.params.update({"guest_skip": True})
+
+    # 集計対象ルール
+    rule_list: list = []
+    g.params["mode"] = g.params.get("mode", 4)
+    if target_mode := g.params.get("target_mode"):
+        g.params["mode"] = target_mode
+        rule_list.extend(g.cfg.rule.get_version(g.params["mode"], True))
+    if g.params.get("mixed"):
+        rule_list.extend(g.cfg.rule.get_version(g.params["mode"], False))
+    if (rule_version := g.params.get("rule_version")) and g.cfg.rule.to_dict(rule_version):
+        if g.params["mode"] == g.cfg.rule.get_mode(rule_version):
+            rule_list.append(rule_version)
+    if not rule_list:
+        rule_list = list(g.cfg.rule.keyword_mapping.values())
+    g.params["rule_set"] = {f"rule_{idx}": name for idx, name in enumerate(set(rule_list))}
+
+    interval: Optional[int] = None
+    if (interval_value := g.params.get("interval")) is not None:
+        interval = 0 if interval_value == 0 else 1
+
+    flags = QueryFlags(
+        individual=bool(g.params.get("individual")),
+        unregistered_replace=bool(g.params.get("unregistered_replace")),
+        guest_skip=bool(g.params.get("guest_skip")),
+        friendly_fire=bool(g.params.get("friendly_fire")),
+        collection=g.params.get("collection"),
+        rule_keys=tuple(g.params["rule_set"]),
+        mode=g.params["mode"],
+        separate=bool(g.params.get("separate")),
+        search_word=bool(g.params.get("search_word")),
+        group_length=bool(g.params.get("group_length")),
+        all_range=g.params.get("target_count") != 0,
+        player_keys=tuple(g.params["player_list"]) if g.params.get("player_name") else None,
+        guest_mark=g.cfg.setting.guest_mark,
+        aggregate_unit=g.params.get("aggregate_unit", g.cfg.aggregate_unit),
+        interval=interval,
+        kind=g.params.get("kind"),
+        undefined_word=g.cfg.undefined_word,
+        materialized_game=bool(g.cfg.setting.materialize_game_results),
+    )
+
+    return _build_query(sql, flags)
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _build_query(sql: str, flags: QueryFlags) -> str:
+    """フラグに従ってクエリを生成する
+
     Args:
         sql (str): 修正するクエリ
+        flags (QueryFlags): クエリ生成フラグ
 
     Returns:
         str: 修正後のクエリ
     """
 
-    if g.params.get("individual"):  # 個人集計
+    if flags.individual:  # 個人集計
         sql = sql.replace("--[individual] ", "")
         # ゲスト関連フラグ
-        if g.params.get("unregistered_replace"):
+        if flags.unregistered_replace:
             sql = sql.replace("--[unregistered_replace] ", "")
-            if g.params.get("guest_skip"):
+            if flags.guest_skip:
                 sql = sql.replace("--[guest_not_skip] ", "")
             else:
                 sql = sql.replace("--[guest_skip] ", "")
         else:
             sql = sql.replace("--[unregistered_not_replace] ", "")
     else:  # チーム集計
-        g.params.update({"unregistered_replace": False})
-        g.params.update({"guest_skip": True})
         sql = sql.replace("--[team] ", "")
-        if not g.params.get("friendly_fire"):
+        if not flags.friendly_fire:
             sql = sql.replace("--[friendly_fire] ", "")
 
     # 集約集計
-    match g.params.get("collection"):
+    match flags.collection:
         case "daily":
             sql = sql.replace("--[collection_daily] ", "")
             sql = sql.replace("--[collection] ", "")
@@ -156,64 +657,51 @@ def query_modification(sql: str) -> str:
             sql = sql.replace("--[not_collection] ", "")
 
     # 集計対象ルール
-    rule_list: list = []
-    g.params["mode"] = g.params.get("mode", 4)
-    if target_mode := g.params.get("target_mode"):
-        g.params["mode"] = target_mode
-        rule_list.extend(g.cfg.rule.get_version(g.params["mode"], True))
-    if g.params.get("mixed"):
-        rule_list.extend(g.cfg.rule.get_version(g.params["mode"], False))
-    if (rule_version := g.params.get("rule_version")) and g.cfg.rule.to_dict(rule_version):
-        if g.params["mode"] == g.cfg.rule.get_mode(rule_version):
-            rule_list.append(rule_version)
-    if not rule_list:
-        rule_list = list(g.cfg.rule.keyword_mapping.values())
-    g.params["rule_set"] = {f"rule_{idx}": name for idx, name in enumerate(set(rule_list))}
-    sql = sql.replace("<<rule_list>>", ":" + ", :".join(g.params["rule_set"]))
+    sql = sql.replace("<<rule_list>>", ":" + ", :".join(flags.rule_keys))
 
     # 集計モード
-    match g.params.get("mode"):
+    match flags.mode:
         case 3:
             sql = sql.replace("--[mode3] ", "")
         case 4:
             sql = sql.replace("--[mode4] ", "")
 
     # スコア入力元識別子別集計
-    if g.params.get("separate"):
+    if flags.separate:
         sql = sql.replace("--[separate] ", "")
 
     # コメント検索
-    if g.params.get("search_word") or g.params.get("group_length"):
+    if flags.search_word or flags.group_length:
         sql = sql.replace("--[group_by] ", "")
     else:
         sql = sql.replace("--[not_group_by] ", "")
 
-    if g.params.get("search_word"):
+    if flags.search_word:
         sql = sql.replace("--[search_word] ", "")
     else:
         sql = sql.replace("--[not_search_word] ", "")
 
-    if g.params.get("group_length"):
+    if flags.group_length:
         sql = sql.replace("--[group_length] ", "")
     else:
         sql = sql.replace("--[not_group_length] ", "")
-        if g.params.get("search_word"):
+        if flags.search_word:
             sql = sql.replace("--[comment] ", "")
         else:
             sql = sql.replace("--[not_comment] ", "")
 
     # 直近N検索用（全範囲取得してから絞る）
-    if g.params.get("target_count") != 0:
+    if flags.all_range:
         sql = sql.replace("and my.playtime between", "-- and my.playtime between")
 
     # プレイヤーリスト
-    if g.params.get("player_name"):
+    if flags.player_keys is not None:
         sql = sql.replace("--[player_name] ", "")
-        sql = sql.replace("<<player_list>>", ":" + ", :".join(g.params["player_list"]))
-    sql = sql.replace("<<guest_mark>>", g.cfg.setting.guest_mark)
+        sql = sql.replace("<<player_list>>", ":" + ", :".join(flags.player_keys))
+    sql = sql.replace("<<guest_mark>>", flags.guest_mark)
 
     # フラグの処理
-    match g.cfg.aggregate_unit:
+    match flags.aggregate_unit:
         case "M":
             sql = sql.replace("<<collection>>", "substr(collection_daily, 1, 7) as 集計")
             sql = sql.replace("<<group by>>", "group by 集計")
@@ -226,19 +714,19 @@ def query_modification(sql: str) -> str:
         case _:
             pass
 
-    if g.params.get("interval") is not None:
-        if g.params.get("interval") == 0:
+    if flags.interval is not None:
+        if flags.interval == 0:
             sql = sql.replace("<<Calculation Formula>>", ":interval")
         else:
             sql = sql.replace("<<Calculation Formula>>", "(row_number() over (order by total_count desc) - 1) / :interval")
-    if g.params.get("kind") is not None:
-        if g.params.get("kind") == "yakuman":
-            if g.cfg.undefined_word == 0:
+    if flags.kind is not None:
+        if flags.kind == "yakuman":
+            if flags.undefined_word == 0:
                 sql = sql.replace("<<where_string>>", "and (words.type is null or words.type = 0)")
             else:
                 sql = sql.replace("<<where_string>>", "and words.type = 0")
         else:
-            match g.cfg.undefined_word:
+            match flags.undefined_word:
                 case 1:
                     sql = sql.replace("<<where_string>>", "and (words.type is null or words.type = 1)")
                 case 2:
@@ -246,6 +734,15 @@ def query_modification(sql: str) -> str:
                 case _:
                     sql = sql.replace("<<where_string>>", "and (words.type = 1 or words.type = 2)")
 
+    # 実体化テーブル
+    if flags.materialized_game:
+        sql = re.sub(r"\bgame_results\b", "game_results_mat", sql)
+        sql = re.sub(
+            r"\b(from|join)(\s+)game_info\b(?!\s+as\b)",
+            r"\1\2(select playtime, ts, guest_count, same_team, comment, rule_version, source, mode from game_results_mat) as game_info",
+            sql,
+        )
+
     # SQLコメント削除
     sql = re.sub(r"^ *--\[.*$", "", sql, flags=re.MULTILINE)
     sql = re.sub(r"\n+", "\n", sql, flags=re.MULTILINE)
@@ -253,6 +750,48 @@ def query_modification(sql: str) -> str:
     return sql
 
 
+def split_statements(sql: str) -> list[str]:
+    """複数のSQL文を1文ずつに分割する
+
+    トリガー定義など、文中に`;`を含むものも分割できる。
+
+    Args:
+        sql (str): SQL文
+
+    Returns:
+        list[str]: 分割したSQL文
+    """
+
+    statements: list[str] = []
+    buffer: str = ""
+
+    for line in sql.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statements.append(buffer)
+            buffer = ""
+    statements.append(buffer)
+
+    return [stmt for x in statements if (stmt := re.sub(r"^\s*(--.*(\n|$)\s*)*", "", x).strip())]
+
+
+def query_cache_info() -> dict[str, int]:
+    """生成済みクエリキャッシュの統計情報を返す
+
+    Returns:
+        dict[str, int]: ヒット数、ミス数、保持数、上限
+    """
+
+    info = _build_query.cache_info()
+
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "currsize": info.currsize,
+        "maxsize": info.maxsize or 0,
+    }
+
+
 def table_info(conn: sqlite3.Connection, table_name: str) -> dict:
     """テーブルのスキーマを取得して辞書で返す
 
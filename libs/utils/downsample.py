@@ -0,0 +1,118 @@
+"""
+libs/utils/downsample.py
+"""
+
+import logging
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+import libs.global_value as g
+
+
+def lttb(values: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets法で残す点を選ぶ
+
+    X軸は等間隔(行位置)として扱う。最初と最後の点は必ず残す。
+
+    Args:
+        values (np.ndarray): Y軸の値
+        threshold (int): 残す点数
+
+    Returns:
+        np.ndarray: 残す点の位置(昇順)
+    """
+
+    size = len(values)
+    if threshold >= size or threshold < 3:
+        return np.arange(size)
+
+    edges = np.linspace(1, size - 1, threshold - 1).astype(int)  # 先頭/末尾を除いた区間の境界
+    ret = np.empty(threshold, dtype=int)
+    ret[0] = 0
+    ret[-1] = size - 1
+
+    selected = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):  # 次の区間の平均点
+            next_x = (edges[i + 1] + edges[i + 2] - 1) / 2
+            next_y = values[edges[i + 1] : edges[i + 2]].mean()
+        else:  # 最後の区間の次は末尾の点
+            next_x = size - 1
+            next_y = values[-1]
+
+        x = np.arange(start, end)
+        area = np.abs((selected - next_x) * (values[start:end] - values[selected]) - (selected - x) * (next_y - values[selected]))
+        selected = start + int(np.argmax(area))
+        ret[i + 1] = selected
+
+    return ret
+
+
+def minmax(values: np.ndarray, threshold: int) -> np.ndarray:
+    """区間ごとの最大値/最小値を残す点に選ぶ
+
+    最初と最後の点は必ず残す。
+
+    Args:
+        values (np.ndarray): Y軸の値
+        threshold (int): 残す点数
+
+    Returns:
+        np.ndarray: 残す点の位置(昇順)
+    """
+
+    size = len(values)
+    if threshold >= size or threshold < 4:
+        return np.arange(size)
+
+    edges = np.linspace(1, size - 1, (threshold - 2) // 2 + 1).astype(int)
+    ret: set[int] = {0, size - 1}
+    for start, end in zip(edges[:-1], edges[1:]):
+        if start == end:
+            continue
+        ret.add(start + int(np.argmin(values[start:end])))
+        ret.add(start + int(np.argmax(values[start:end])))
+
+    return np.array(sorted(ret), dtype=int)
+
+
+def select(df: pd.DataFrame, columns: Optional[list[str]] = None) -> np.ndarray:
+    """推移グラフの描写で残す行位置を返す
+
+    点数の上限を列数で分け合って列ごとに残す点を選び、その和集合を返す。
+    行単位で残すため、残した行ではすべての列の値が元データと一致する。
+    欠損値(集計範囲より前の期間など)は除いて選び、各列の最初と最後の値は必ず残す。
+
+    Args:
+        df (pd.DataFrame): 描写データ
+        columns (Optional[list[str]], optional): 間引く点の選択に使う列. Defaults to None.
+            - *None*: すべての列
+
+    Returns:
+        np.ndarray: 残す行位置(昇順、間引かない場合は全行)
+    """
+
+    method = g.cfg.setting.graph_downsample
+    threshold = g.cfg.setting.graph_downsample_points
+    if method not in ("lttb", "minmax") or len(df) <= threshold:
+        return np.arange(len(df))
+
+    columns = columns or df.columns.to_list()
+    budget = max(threshold // len(columns), 4)
+    ret: set[int] = set()
+    for column in columns:
+        values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float)
+        valid = np.flatnonzero(~np.isnan(values))
+        if not len(valid):
+            continue
+        if method == "lttb":
+            selected = lttb(values[valid], budget)
+        else:
+            selected = minmax(values[valid], budget)
+        ret.update(valid[selected].tolist())
+
+    logging.debug("downsample(%s): %s -> %s", method, len(df), len(ret))
+    return np.array(sorted(ret), dtype=int)
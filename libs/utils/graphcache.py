@@ -0,0 +1,372 @@
+"""
+libs/utils/graphcache.py
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+import pandas as pd
+
+import libs.global_value as g
+from libs.utils import textutil
+
+if TYPE_CHECKING:
+    from integrations.protocols import MessageParserProtocol
+
+
+def _feed(h: Any, obj: Any) -> None:
+    """ハッシュオブジェクトに値を取り込む
+
+    Args:
+        h (Any): ハッシュオブジェクト(`hashlib`)
+        obj (Any): 取り込む値
+    """
+
+    match obj:
+        case pd.DataFrame():
+            h.update(b"DataFrame")
+            h.update(repr((obj.columns.to_list(), obj.index.names, obj.dtypes.astype(str).to_list())).encode("utf-8"))
+            h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+        case pd.Series():
+            h.update(b"Series")
+            h.update(repr((obj.name, str(obj.dtype))).encode("utf-8"))
+            h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+        case dict():
+            h.update(b"dict")
+            for k in sorted(obj, key=str):
+                _feed(h, k)
+                _feed(h, obj[k])
+        case list() | tuple():
+            h.update(type(obj).__name__.encode("utf-8"))
+            for x in obj:
+                _feed(h, x)
+        case _ if callable(obj):
+            h.update(f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', repr(obj))}".encode("utf-8"))
+        case _:
+            h.update(repr(obj).encode("utf-8"))
+    h.update(b"\x00")
+
+
+def digest(*parts: Any) -> str:
+    """描写内容からキャッシュキーを生成する
+
+    Args:
+        parts (Any): 描写データ/スタイル/バックエンドなど画像を決める値
+
+    Returns:
+        str: キャッシュキー
+    """
+
+    h = hashlib.sha256()
+    for part in parts:
+        _feed(h, part)
+    return h.hexdigest()
+
+
+class ImageCache:
+    """グラフ画像のキャッシュ
+
+    描写データ/スタイル/バックエンドのハッシュ値をファイル名にして保存する。
+    同じ内容の画像は再生成せずに保存済みのファイルを返し、合計サイズが上限を超えたら参照の古い順に削除する。
+    ファイル名が内容で決まるため、同時に生成しても互いのファイルを上書きしない。
+    参照順は更新日時で管理するため、以前の実行や他のワーカープロセスが保存したファイルも上限の対象になる。
+    """
+
+    def __init__(self):
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._indexed: Optional[Path] = None
+        self._touched: int = 0
+        self._lock = threading.Lock()
+        self._locks: dict[str, threading.Lock] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def max_bytes(self) -> int:
+        """保持する合計サイズ(バイト、0は無効)"""
+
+        return int(g.cfg.setting.graph_cache_size) * 1024 * 1024
+
+    @property
+    def directory(self) -> Path:
+        """画像ファイルの保存先"""
+
+        return g.cfg.setting.work_dir / "graph_cache"
+
+    @property
+    def total_bytes(self) -> int:
+        """保持している画像の合計サイズ(バイト)"""
+
+        with self._lock:
+            return sum(self._entries.values())
+
+    def contains(self, path: Path) -> bool:
+        """キャッシュが管理しているファイルか判定する
+
+        Args:
+            path (Path): ファイルパス
+
+        Returns:
+            bool: 判定結果
+        """
+
+        if getattr(g, "cfg", None) is None:  # 設定読み込み前はキャッシュを使っていない
+            return False
+        return path.parent == self.directory
+
+    def get_or_create(self, key: str, suffix: str, create: Callable[[Path], None]) -> Path:
+        """キャッシュ済みの画像を返す(なければ生成して登録する)
+
+        Args:
+            key (str): キャッシュキー
+            suffix (str): 拡張子
+            create (Callable[[Path], None]): 指定パスに画像を書き出す関数
+
+        Returns:
+            Path: 画像ファイル
+        """
+
+        if self.max_bytes <= 0:  # 保持しない(投稿後に`release()`で削除する)
+            path = temporary_file(suffix)
+            create(path)
+            return path
+
+        name = f"{key[:32]}{suffix}"
+        path = self.directory / name
+        with self._lock:
+            if self._indexed != self.directory:  # 初回は保存済みのファイルを読み込んで上限を適用する
+                self._index()
+                self._evict(keep="")
+            key_lock = self._locks.setdefault(name, threading.Lock())
+
+        with key_lock:  # 同じ内容の生成は1回にまとめる
+            try:
+                if (cached := self._lookup(name, path)) is not None:
+                    return cached
+
+                self.directory.mkdir(parents=True, exist_ok=True)
+                tmp_file = path.with_name(f".{name}.{threading.get_ident()}.tmp")
+                create(tmp_file)
+                tmp_file.replace(path)
+
+                with self._lock:
+                    self.misses += 1
+                    self._touch(path)
+                    self._index()  # 他のプロセスが保存/削除した分を反映する
+                    self._entries[name] = path.stat().st_size
+                    self._entries.move_to_end(name)
+                    self._evict(keep=name)
+            finally:
+                with self._lock:
+                    self._locks.pop(name, None)
+
+        logging.debug("graph cache store: %s (entries=%s, hits=%s, misses=%s)", name, len(self._entries), self.hits, self.misses)
+        return path
+
+    def clear(self) -> None:
+        """すべての画像を削除する"""
+
+        with self._lock:
+            for name in list(self._entries):
+                self._drop(name)
+
+    def _index(self) -> None:
+        """保存先のファイルを読み込み、更新日時の古い順に並べ直す
+
+        書き出し途中の一時ファイル(`.`で始まるもの)は対象にしない。
+        """
+
+        files: list[tuple[int, str, int]] = []
+        if self.directory.is_dir():
+            for file in self.directory.iterdir():
+                if file.name.startswith("."):
+                    continue
+                try:
+                    stat = file.stat()
+                except FileNotFoundError:  # 他のプロセスが削除した
+                    continue
+                files.append((stat.st_mtime_ns, file.name, stat.st_size))
+
+        self._entries = OrderedDict((name, size) for _, name, size in sorted(files))
+        self._indexed = self.directory
+
+    def _touch(self, path: Path) -> None:
+        """参照順を他のプロセスからもわかるように更新日時を進める
+
+        ファイルシステムの時刻は粒度が粗いため、連続した参照でも順序が逆転しないように単調増加させる。
+
+        Args:
+            path (Path): ファイルパス
+        """
+
+        self._touched = max(time.time_ns(), self._touched + 1)
+        os.utime(path, ns=(self._touched, self._touched))
+
+    def _lookup(self, name: str, path: Path) -> Optional[Path]:
+        """保存済みの画像を探す
+
+        Args:
+            name (str): ファイル名
+            path (Path): ファイルパス
+
+        Returns:
+            Optional[Path]: 画像ファイル(なければ`None`)
+        """
+
+        with self._lock:
+            if not path.exists():  # 他のプロセスに削除された場合を含む
+                self._entries.pop(name, None)
+                return None
+            if name not in self._entries:  # 他のプロセスが生成したもの
+                self._entries[name] = path.stat().st_size
+                self._evict(keep=name)
+            try:
+                self._touch(path)
+            except FileNotFoundError:
+                self._entries.pop(name, None)
+                return None
+            self._entries.move_to_end(name)
+            self.hits += 1
+            return path
+
+    def _evict(self, keep: str) -> None:
+        """合計サイズが上限を超えた分を参照の古い順に削除する
+
+        Args:
+            keep (str): 削除対象から除外するファイル名
+        """
+
+        while sum(self._entries.values()) > self.max_bytes and len(self._entries) > 1:
+            name = next(iter(self._entries))
+            if name == keep:
+                self._entries.move_to_end(name)
+                continue
+            self._drop(name)
+
+    def _drop(self, name: str) -> None:
+        """画像を削除する
+
+        Args:
+            name (str): ファイル名
+        """
+
+        self._entries.pop(name, None)
+        (self.directory / name).unlink(missing_ok=True)
+
+
+cache = ImageCache()
+"""プロセス共通のキャッシュ"""
+
+
+def temporary_dir() -> Path:
+    """投稿ごとの一時ファイルの保存先"""
+
+    return g.cfg.setting.work_dir / "post_tmp"
+
+
+def temporary_file(suffix: str) -> Path:
+    """投稿ごとの一時ファイルを作成する
+
+    投稿が終わったら`release()`で削除する。
+
+    Args:
+        suffix (str): 拡張子
+
+    Returns:
+        Path: 作成した空のファイル
+    """
+
+    temporary_dir().mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(suffix=suffix, prefix="graph_", dir=temporary_dir())
+    os.close(fd)
+    return Path(name)
+
+
+def is_temporary(path: Path) -> bool:
+    """投稿ごとの一時ファイルか判定する
+
+    Args:
+        path (Path): ファイルパス
+
+    Returns:
+        bool: 判定結果
+    """
+
+    if getattr(g, "cfg", None) is None:
+        return False
+    return path.parent == temporary_dir()
+
+
+def release(m: "MessageParserProtocol") -> None:
+    """投稿が終わったメッセージの一時ファイルを削除する
+
+    Args:
+        m (MessageParserProtocol): メッセージデータ
+    """
+
+    for data, _ in m.post.message:
+        if isinstance(data, Path) and is_temporary(data):
+            data.unlink(missing_ok=True)
+
+
+def publish(path: Path, filename: str) -> Path:
+    """キャッシュの画像を投稿用のパスで返す
+
+    ファイル名の指定(`filename`オプション)がある場合は作業ディレクトリに複製する。
+
+    Args:
+        path (Path): キャッシュの画像ファイル
+        filename (str): 保存先デフォルトファイル名
+
+    Returns:
+        Path: 投稿に使用するファイル
+    """
+
+    if not g.params.get("filename"):
+        return path
+    saved = Path(shutil.copyfile(path, textutil.save_file_path(filename)))
+    if is_temporary(path):
+        path.unlink(missing_ok=True)
+    return saved
+
+
+def display_name(path: Path) -> str:
+    """投稿時のファイル名を返す(キャッシュ/一時ファイルはハッシュ値の代わりに`graph`を使う)
+
+    Args:
+        path (Path): ファイルパス
+
+    Returns:
+        str: ファイル名
+    """
+
+    if cache.contains(path) or is_temporary(path):
+        return f"graph{path.suffix}"
+    return path.name
+
+
+def save_plotly(fig: Any, filename: str) -> Path:
+    """plotlyのグラフをHTMLで保存する
+
+    Args:
+        fig (Any): plotlyのFigureオブジェクト
+        filename (str): 保存先デフォルトファイル名
+
+    Returns:
+        Path: 保存先ファイル名
+    """
+
+    key = digest("plotly", fig.to_json())
+    path = cache.get_or_create(key, ".html", lambda x: fig.write_html(x, full_html=False))
+    return publish(path, filename)
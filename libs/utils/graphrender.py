@@ -0,0 +1,286 @@
+"""
+libs/utils/graphrender.py
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import lru_cache
+from io import BytesIO
+from multiprocessing import get_context
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+import matplotlib
+import matplotlib.font_manager as fm
+import matplotlib.style
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import libs.global_value as g
+from libs.utils import graphcache
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+DrawFunc = Callable[[Figure, Any], None]
+"""描写関数(プロセス間で受け渡すため、モジュールのトップレベルに定義した関数に限る)"""
+
+
+@dataclass
+class PlotSpec:
+    """描写指示"""
+
+    draw: DrawFunc
+    """描写関数"""
+    data: Any
+    """描写関数に渡すデータ(pickle可能なもの)"""
+    figsize: tuple[float, float] = (8.0, 6.0)
+    """画像サイズ(インチ)"""
+    style: Optional[str] = None
+    """スタイル
+    - *None*: matplotlibの初期値
+    - *str*: スタイルシート名(存在しない場合は`ggplot`)
+    """
+    fmt: str = "png"
+    """画像フォーマット"""
+    dpi: Optional[float] = None
+    """解像度(`None`はスタイルの値)"""
+
+
+@lru_cache(maxsize=8)
+def rc_params(font_file: str, style: Optional[str]) -> dict[str, Any]:
+    """描写パラメータを生成する(フォント/スタイルの読み込みはプロセスごとに1回)
+
+    Args:
+        font_file (str): フォントファイル
+        style (Optional[str]): スタイルシート名
+
+    Returns:
+        dict[str, Any]: `rcParams`に適用するパラメータ
+    """
+
+    rc: dict[str, Any] = {k: v for k, v in matplotlib.rcParamsDefault.items() if k not in ("backend", "backend_fallback", "interactive")}
+
+    if style is not None:
+        if style not in matplotlib.style.available:
+            style = "ggplot"
+        rc.update(matplotlib.style.library[style])
+
+        # グリッド線
+        if not rc["axes.grid"]:
+            rc["axes.grid"] = True
+            rc["grid.alpha"] = 0.3
+            rc["grid.linestyle"] = "--"
+        rc["axes.axisbelow"] = True
+
+    fm.fontManager.addfont(font_file)
+    rc["font.family"] = fm.FontProperties(fname=font_file).get_name()
+
+    return rc
+
+
+def render(spec: PlotSpec, font_file: str) -> bytes:
+    """描写指示から画像を生成する
+
+    グローバルな`pyplot`の状態は使わず、`Figure`とAggキャンバスで描写する。
+
+    Args:
+        spec (PlotSpec): 描写指示
+        font_file (str): フォントファイル
+
+    Returns:
+        bytes: 画像データ
+    """
+
+    with matplotlib.rc_context(rc_params(font_file, spec.style)):
+        fig = Figure(figsize=spec.figsize, dpi=spec.dpi)
+        FigureCanvasAgg(fig)
+        spec.draw(fig, spec.data)
+        buf = BytesIO()
+        fig.savefig(buf, format=spec.fmt, bbox_inches="tight")
+
+    return buf.getvalue()
+
+
+def _warm_up(font_file: str, styles: tuple[Optional[str], ...]) -> None:
+    """ワーカープロセスの初期化(フォントとスタイルを読み込んでおく)
+
+    Args:
+        font_file (str): フォントファイル
+        styles (tuple[Optional[str], ...]): 使用するスタイル
+    """
+
+    logging.getLogger("matplotlib").setLevel(logging.WARNING)
+    for style in styles:
+        rc_params(font_file, style)
+
+
+class RenderPool:
+    """グラフ描写プール
+
+    描写指示を受け取り、フォントとスタイルを読み込み済みのワーカープロセスで並列に画像を生成する。
+    ワーカー数が0の場合は呼び出したプロセスで1件ずつ処理する。
+    """
+
+    def __init__(self, workers: int, font_file: str, styles: tuple[Optional[str], ...] = (None,)):
+        """描写プールの初期化
+
+        Args:
+            workers (int): ワーカープロセス数
+            font_file (str): フォントファイル
+            styles (tuple[Optional[str], ...], optional): 事前に読み込むスタイル. Defaults to (None,).
+        """
+
+        self.workers = workers
+        self.font_file = font_file
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        if workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=get_context("spawn"),
+                initializer=_warm_up,
+                initargs=(font_file, styles),
+            )
+
+    def submit(self, spec: PlotSpec) -> "Future[bytes]":
+        """描写指示を受け付ける
+
+        Args:
+            spec (PlotSpec): 描写指示
+
+        Returns:
+            Future[bytes]: 画像データ
+        """
+
+        if self._executor is not None:
+            try:
+                return self._executor.submit(render, spec, self.font_file)
+            except BrokenProcessPool:
+                self._fallback()
+
+        future: "Future[bytes]" = Future()
+        try:
+            with self._lock:  # rcParamsを書き換えるため同時に描写しない
+                future.set_result(render(spec, self.font_file))
+        except Exception as err:  # 呼び出し元で受け取る
+            future.set_exception(err)
+        return future
+
+    def render(self, spec: PlotSpec) -> bytes:
+        """画像を生成する
+
+        Args:
+            spec (PlotSpec): 描写指示
+
+        Returns:
+            bytes: 画像データ
+        """
+
+        return self.render_many([spec])[0]
+
+    def render_many(self, specs: list[PlotSpec]) -> list[bytes]:
+        """複数の画像を並列に生成する
+
+        Args:
+            specs (list[PlotSpec]): 描写指示
+
+        Returns:
+            list[bytes]: 画像データ(指示の順)
+        """
+
+        futures = [self.submit(spec) for spec in specs]
+        ret: list[bytes] = []
+        for spec, future in zip(specs, futures):
+            try:
+                ret.append(future.result())
+            except BrokenProcessPool:
+                self._fallback()
+                ret.append(self.submit(spec).result())
+        return ret
+
+    def shutdown(self) -> None:
+        """ワーカープロセスを停止する"""
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _fallback(self) -> None:
+        """ワーカープロセスが異常終了した場合は呼び出し元での描写に切り替える"""
+
+        if self._executor is not None:
+            logging.warning("render pool is broken, fallback to inline rendering")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_pool: Optional[RenderPool] = None
+_pool_key: tuple = ()
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> RenderPool:
+    """設定に応じた描写プールを返す(設定が変わった場合は作り直す)
+
+    Returns:
+        RenderPool: 描写プール
+    """
+
+    global _pool, _pool_key
+
+    key = (g.cfg.setting.render_workers, str(g.cfg.setting.font_file), g.cfg.setting.graph_style)
+    with _pool_lock:
+        if _pool is None or _pool_key != key:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool = RenderPool(key[0], key[1], (key[2], None))
+            _pool_key = key
+        return _pool
+
+
+def close_pool() -> None:
+    """描写プールを停止する"""
+
+    global _pool, _pool_key
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+        _pool_key = ()
+
+
+def render_many(specs: list[PlotSpec]) -> list[bytes]:
+    """複数の画像を生成する
+
+    Args:
+        specs (list[PlotSpec]): 描写指示
+
+    Returns:
+        list[bytes]: 画像データ(指示の順)
+    """
+
+    return get_pool().render_many(specs)
+
+
+def save(spec: PlotSpec, filename: str) -> "Path":
+    """画像を生成して保存する
+
+    同じ描写内容の画像が保存済みであれば再生成せずにそのファイルを返す。
+
+    Args:
+        spec (PlotSpec): 描写指示
+        filename (str): 保存先デフォルトファイル名
+
+    Returns:
+        Path: 保存先ファイル名
+    """
+
+    pool = get_pool()
+    key = graphcache.digest("matplotlib", spec.draw, spec.data, spec.figsize, spec.style, spec.fmt, spec.dpi, pool.font_file)
+    path = graphcache.cache.get_or_create(key, f".{spec.fmt}", lambda x: x.write_bytes(pool.render(spec)))
+    return graphcache.publish(path, filename)
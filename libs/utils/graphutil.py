@@ -4,12 +4,12 @@ libs/utils/graphutil.py
 
 import logging
 
-import matplotlib.font_manager as fm
 import matplotlib.pyplot as plt
 import pandas as pd
 from matplotlib import use
 
 import libs.global_value as g
+from libs.utils import graphrender
 
 
 def setup():
@@ -22,33 +22,13 @@ def setup():
         case _:
             pass  # 以下に処理をベタ書き
 
-    plt.close()
-    plt.rcdefaults()
-
+    plt.close("all")
     use(backend="agg")
     mlogger = logging.getLogger("matplotlib")
     mlogger.setLevel(logging.WARNING)
 
-    # スタイルの適応
-    if (style := g.cfg.setting.graph_style) not in plt.style.available:
-        style = "ggplot"
-    plt.style.use(style)
-
-    # フォント再設定
-    for x in ("family", "serif", "sans-serif", "cursive", "fantasy", "monospace"):
-        if f"font.{x}" in plt.rcParams:
-            plt.rcParams[f"font.{x}"] = ""
-
-    fm.fontManager.addfont(g.cfg.setting.font_file)
-    font_prop = fm.FontProperties(fname=g.cfg.setting.font_file)
-    plt.rcParams["font.family"] = font_prop.get_name()
-
-    # グリッド線
-    if not plt.rcParams["axes.grid"]:
-        plt.rcParams["axes.grid"] = True
-        plt.rcParams["grid.alpha"] = 0.3
-        plt.rcParams["grid.linestyle"] = "--"
-    plt.rcParams["axes.axisbelow"] = True
+    # スタイル/フォントの適応(読み込みは初回のみ)
+    plt.rcParams.update(graphrender.rc_params(str(g.cfg.setting.font_file), g.cfg.setting.graph_style))
 
 
 def gen_xlabel(game_count: int) -> str:
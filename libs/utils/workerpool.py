@@ -0,0 +1,168 @@
+"""
+libs/utils/workerpool.py
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Literal, Optional
+
+Lane = Literal["fast", "heavy"]
+"""処理レーン
+- *fast*: スコア登録/メモ/削除など(単一スレッドで到着順に処理)
+- *heavy*: 集計/グラフ/レポートなどのコマンド(複数スレッドで並列処理)
+"""
+
+
+@dataclass
+class LaneMetrics:
+    """レーン単位の計測値"""
+
+    submitted: int = 0
+    """受付数"""
+    completed: int = 0
+    """完了数(失敗を含む)"""
+    failed: int = 0
+    """例外で終了した数"""
+    rejected: int = 0
+    """キューが埋まっていて受け付けなかった数"""
+    depth: int = 0
+    """待機中+実行中の数"""
+    max_depth: int = 0
+    """`depth`の最大値"""
+    wait_total: float = 0.0
+    """キュー待ち時間の合計(秒)"""
+    wait_max: float = 0.0
+    """キュー待ち時間の最大値(秒)"""
+    run_total: float = 0.0
+    """処理時間の合計(秒)"""
+    run_max: float = 0.0
+    """処理時間の最大値(秒)"""
+
+    def to_dict(self) -> dict[str, Any]:
+        """平均値を加えて辞書で返す
+
+        Returns:
+            dict[str, Any]: 計測値
+        """
+
+        ret = asdict(self)
+        ret.update(
+            wait_avg=self.wait_total / self.completed if self.completed else 0.0,
+            run_avg=self.run_total / self.completed if self.completed else 0.0,
+        )
+        return ret
+
+
+class DispatchPool:
+    """イベント処理のワーカープール
+
+    受け取ったイベントを処理レーンごとのスレッドプールに振り分ける。
+    重い処理(heavy)は同時実行数と待機数に上限を設け、上限を超えた分は受け付けない。
+    軽い処理(fast)は到着順を保つため単一スレッドで処理し、重い処理の完了を待たない。
+    """
+
+    def __init__(self, workers: int, queue_size: int, exclusive: bool = False):
+        """ワーカープールの初期化
+
+        Args:
+            workers (int): heavyレーンの同時実行数
+            queue_size (int): heavyレーンの待機数上限
+            exclusive (bool, optional): 全レーンの処理を1件ずつ実行する(共有設定を書き換える構成向け). Defaults to False.
+        """
+
+        self._executors: dict[Lane, ThreadPoolExecutor] = {
+            "fast": ThreadPoolExecutor(max_workers=1, thread_name_prefix="dispatch-fast"),
+            "heavy": ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="dispatch-heavy"),
+        }
+        self._slots: dict[Lane, Optional[threading.BoundedSemaphore]] = {
+            "fast": None,
+            "heavy": threading.BoundedSemaphore(max(workers, 1) + max(queue_size, 0)),
+        }
+        self._metrics: dict[Lane, LaneMetrics] = {"fast": LaneMetrics(), "heavy": LaneMetrics()}
+        self._lock = threading.Lock()
+        self._exclusive = threading.Lock() if exclusive else None
+
+    def submit(self, lane: Lane, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Optional[Future]:
+        """処理を投入する
+
+        Args:
+            lane (Lane): 処理レーン
+            func (Callable[..., Any]): 実行する関数
+
+        Returns:
+            Optional[Future]: 投入結果(キューが埋まっている場合は`None`)
+        """
+
+        slots = self._slots[lane]
+        if slots and not slots.acquire(blocking=False):
+            with self._lock:
+                self._metrics[lane].rejected += 1
+            logging.warning("dispatch rejected: lane=%s, depth=%s", lane, self._metrics[lane].depth)
+            return None
+
+        with self._lock:
+            metrics = self._metrics[lane]
+            metrics.submitted += 1
+            metrics.depth += 1
+            metrics.max_depth = max(metrics.max_depth, metrics.depth)
+
+        try:
+            return self._executors[lane].submit(self._run, lane, time.perf_counter(), func, args, kwargs)
+        except RuntimeError:  # シャットダウン済み
+            with self._lock:
+                self._metrics[lane].depth -= 1
+            if slots:
+                slots.release()
+            raise
+
+    def _run(self, lane: Lane, enqueued: float, func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        started = time.perf_counter()
+        failed = False
+        try:
+            if self._exclusive:
+                with self._exclusive:
+                    return func(*args, **kwargs)
+            return func(*args, **kwargs)
+        except Exception:  # ワーカーを止めない
+            failed = True
+            logging.exception("dispatch failed: lane=%s, func=%s", lane, getattr(func, "__name__", func))
+            return None
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                metrics = self._metrics[lane]
+                metrics.completed += 1
+                metrics.failed += int(failed)
+                metrics.depth -= 1
+                metrics.wait_total += started - enqueued
+                metrics.wait_max = max(metrics.wait_max, started - enqueued)
+                metrics.run_total += finished - started
+                metrics.run_max = max(metrics.run_max, finished - started)
+                depth = metrics.depth
+            if slots := self._slots[lane]:
+                slots.release()
+            logging.debug("dispatch done: lane=%s, wait=%.3fs, run=%.3fs, depth=%s", lane, started - enqueued, finished - started, depth)
+
+    def metrics(self) -> dict[str, dict[str, Any]]:
+        """レーンごとの計測値を返す
+
+        Returns:
+            dict[str, dict[str, Any]]: 計測値
+        """
+
+        with self._lock:
+            return {lane: metrics.to_dict() for lane, metrics in self._metrics.items()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """ワーカープールを停止する
+
+        Args:
+            wait (bool, optional): 処理中/待機中の処理の完了を待つ. Defaults to True.
+        """
+
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait)
+        logging.info("dispatch metrics: %s", self.metrics())
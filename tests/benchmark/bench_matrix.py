@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+tests/benchmark/bench_matrix.py
+
+対局対戦マトリックス作成のベンチマーク(従来実装との比較)
+
+Usage:
+    PYTHONPATH=. python tests/benchmark/bench_matrix.py [--games 2000 20000] [--players 60] [--legacy-limit 2000]
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from libs.data import aggregate
+from tests.benchmark.bench_rating import generate_results
+
+
+def legacy_matrix(df: pd.DataFrame, targets: dict[str, str], stipulated: int = 0) -> pd.DataFrame:
+    """従来実装(プレイヤーごとにゲームを走査し、1セルずつ更新)
+
+    Args:
+        df (pd.DataFrame): ゲーム結果(playtimeをインデックスに設定済み)
+        targets (dict[str, str]): 集計対象(表示名: プレイヤー名)
+        stipulated (int, optional): 規定打数. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: 対局対戦マトリックス
+    """
+
+    l_data: dict = {}
+    for l_name, pname in targets.items():
+        l_data[l_name] = []
+        for x in df.itertuples():
+            match pname:
+                case x.p1_name:
+                    l_data[l_name] += [x.p1_rank]
+                case x.p2_name:
+                    l_data[l_name] += [x.p2_rank]
+                case x.p3_name:
+                    l_data[l_name] += [x.p3_rank]
+                case x.p4_name:
+                    l_data[l_name] += [x.p4_rank]
+                case _:
+                    l_data[l_name] += [None]
+
+    if stipulated:
+        for pname in list(l_data.keys()):
+            if sum(x is not None for x in l_data[pname]) < stipulated:
+                l_data.pop(pname)
+
+    rank_df = pd.DataFrame(l_data.values(), columns=list(df.index), index=list(l_data.keys()))
+    if rank_df.empty:
+        return rank_df
+
+    mtx_df = pd.DataFrame(index=list(l_data.keys()), columns=list(l_data.keys()) + ["total"])
+    sorting_df = pd.DataFrame(index=list(l_data.keys()), columns=["win_per", "count"])
+
+    for idx1 in range(len(rank_df)):
+        p1 = rank_df.iloc[idx1]
+        t_game_count = 0
+        t_win = 0
+        for idx2 in range(len(rank_df)):
+            p2 = rank_df.iloc[idx2]
+            if p1.name == p2.name:
+                mtx_df.loc[f"{p1.name}", f"{p2.name}"] = "---"
+            else:
+                game_count = len(pd.concat([p1, p2], axis=1).dropna())
+                win = (p1 < p2).sum()
+                t_game_count += game_count
+                t_win += win
+
+                if game_count:
+                    winning_per = str(round(float(win / game_count * 100), 1))
+                else:
+                    winning_per = "--.-"
+                mtx_df.loc[f"{p1.name}", f"{p2.name}"] = f"{win}-{game_count - win} ({winning_per}%)"
+
+        if t_game_count:
+            t_winning_per = str(round(float(t_win / t_game_count * 100), 1))
+        else:
+            t_winning_per = "--.-"
+        mtx_df.loc[f"{p1.name}", "total"] = f"{t_win}-{t_game_count - t_win} ({t_winning_per}%)"
+        sorting_df.loc[f"{p1.name}", "win_per"] = t_winning_per
+        sorting_df.loc[f"{p1.name}", "count"] = t_game_count
+
+    sorting_df["win_per"] = pd.to_numeric(sorting_df["win_per"], errors="coerce")
+    sorting_df["count"] = pd.to_numeric(sorting_df["count"], errors="coerce")
+    sorting_df = sorting_df.sort_values(by=["win_per", "count"], ascending=[False, False])
+    mtx_df = mtx_df.reindex(index=list(sorting_df.index), columns=list(sorting_df.index) + ["total"])
+
+    return mtx_df
+
+
+def targets_of(df: pd.DataFrame) -> dict[str, str]:
+    """結果に含まれる全プレイヤーを集計対象にする
+
+    Args:
+        df (pd.DataFrame): ゲーム結果
+
+    Returns:
+        dict[str, str]: 集計対象(表示名: プレイヤー名)
+    """
+
+    names = sorted(set(df[["p1_name", "p2_name", "p3_name", "p4_name"]].to_numpy().ravel().tolist()))
+    return {name: name for name in names}
+
+
+def main():
+    """ベンチマーク実行"""
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, nargs="+", default=[2000, 20000], help="ゲーム数")
+    parser.add_argument("--players", type=int, default=60, help="プレイヤー数")
+    parser.add_argument("--legacy-limit", type=int, default=2000, help="従来実装を計測する最大ゲーム数")
+    args = parser.parse_args()
+
+    for games in args.games:
+        df = generate_results(games, args.players).set_index("playtime")
+        targets = targets_of(df)
+
+        start = time.perf_counter()
+        df_matrix = aggregate.head_to_head(df, targets)
+        matrix_time = time.perf_counter() - start
+        print(f"games={games:>7}: matrix {matrix_time:8.3f}s", end="")
+
+        if games <= args.legacy_limit:
+            start = time.perf_counter()
+            df_legacy = legacy_matrix(df, targets)
+            legacy_time = time.perf_counter() - start
+            pd.testing.assert_frame_equal(df_matrix, df_legacy)
+            print(f", legacy {legacy_time:8.3f}s (x{legacy_time / matrix_time:.0f}, identical)")
+        else:
+            print(", legacy skipped (--legacy-limit)")
+
+
+if __name__ == "__main__":
+    main()
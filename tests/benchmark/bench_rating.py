@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+tests/benchmark/bench_rating.py
+
+レーティング計算のベンチマーク(従来実装との比較)
+
+Usage:
+    PYTHONPATH=. python tests/benchmark/bench_rating.py [--games 10000 100000] [--legacy-limit 10000]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from libs.data import rating
+
+
+def generate_results(games: int, players: int = 40, seed: int = 0) -> pd.DataFrame:
+    """`RANKING_RATINGS`相当のダミーデータを生成する
+
+    Args:
+        games (int): ゲーム数
+        players (int, optional): プレイヤー数. Defaults to 40.
+        seed (int, optional): 乱数シード. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: ゲーム結果
+    """
+
+    rnd = random.Random(seed)
+    names = [f"player_{idx:03d}" for idx in range(players)]
+    start = pd.Timestamp("2020-01-01 12:00:00")
+
+    data: dict[str, list] = {"playtime": []}
+    for seat in range(1, 5):
+        data.update({f"p{seat}_name": [], f"p{seat}_rank": []})
+
+    for idx in range(games):
+        data["playtime"].append(str(start + pd.Timedelta(minutes=30 * idx)))
+        for seat, (name, rank) in enumerate(zip(rnd.sample(names, 4), rnd.sample(range(1, 5), 4)), start=1):
+            data[f"p{seat}_name"].append(name)
+            data[f"p{seat}_rank"].append(rank)
+
+    return pd.DataFrame(data)
+
+
+def legacy_rating(df_results: pd.DataFrame) -> pd.DataFrame:
+    """従来実装(DataFrameを1セルずつ更新)
+
+    Args:
+        df_results (pd.DataFrame): ゲーム結果
+
+    Returns:
+        pd.DataFrame: レーティング推移
+    """
+
+    df_results = df_results.set_index("playtime")
+    df_ratings = pd.DataFrame(index=["initial_rating"] + df_results.index.to_list())
+    last_ratings: dict = {}
+    score_mapping = {"1": 30.0, "2": 10.0, "3": -10.0, "4": -30.0}
+
+    for x in df_results.itertuples():
+        player_list = (str(x.p1_name), str(x.p2_name), str(x.p3_name), str(x.p4_name))
+        for player in player_list:
+            if player not in df_ratings.columns:
+                last_ratings[player] = 1500.0
+                df_ratings[player] = np.nan
+                df_ratings.loc["initial_rating", player] = 1500.0
+                df_ratings = df_ratings.copy()
+
+        rank_list = (x.p1_rank, x.p2_rank, x.p3_rank, x.p4_rank)
+        rating_list = [last_ratings[player] for player in player_list]
+        rating_avg = 1500.0 if np.mean(rating_list) < 1500.0 else np.mean(rating_list)
+
+        for i, player in enumerate(player_list):
+            player_rating = float(rating_list[i])
+            rank = str(rank_list[i])
+
+            correction_value: float = (rating_avg - player_rating) / 40
+            if df_ratings[player].count() >= 400:
+                match_correction = 0.2
+            else:
+                match_correction = 1 - df_ratings[player].count() * 0.002
+
+            new_rating = player_rating + match_correction * (score_mapping[rank] + correction_value)
+
+            last_ratings[player] = new_rating
+            df_ratings.loc[x.Index, player] = new_rating
+
+    return df_ratings
+
+
+def engine_rating(df_results: pd.DataFrame) -> pd.DataFrame:
+    """`RatingEngine`による計算
+
+    Args:
+        df_results (pd.DataFrame): ゲーム結果
+
+    Returns:
+        pd.DataFrame: レーティング推移
+    """
+
+    engine = rating.RatingEngine()
+    ratings = engine.fold(
+        df_results.filter(items=["p1_name", "p2_name", "p3_name", "p4_name"]).astype(str).to_numpy(),
+        df_results.filter(items=["p1_rank", "p2_rank", "p3_rank", "p4_rank"]).to_numpy(),
+    )
+    return engine.to_frame(df_results["playtime"].to_list(), ratings)
+
+
+def main():
+    """ベンチマーク実行"""
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, nargs="+", default=[10000, 100000], help="ゲーム数")
+    parser.add_argument("--players", type=int, default=40, help="プレイヤー数")
+    parser.add_argument("--legacy-limit", type=int, default=10000, help="従来実装を計測する最大ゲーム数")
+    args = parser.parse_args()
+
+    for games in args.games:
+        df_results = generate_results(games, args.players)
+
+        start = time.perf_counter()
+        df_engine = engine_rating(df_results)
+        engine_time = time.perf_counter() - start
+        print(f"games={games:>7}: engine {engine_time:8.3f}s", end="")
+
+        if games <= args.legacy_limit:
+            start = time.perf_counter()
+            df_legacy = legacy_rating(df_results)
+            legacy_time = time.perf_counter() - start
+            pd.testing.assert_frame_equal(df_engine, df_legacy, check_exact=True)
+            print(f", legacy {legacy_time:8.3f}s (x{legacy_time / engine_time:.0f}, identical)")
+        else:
+            print(", legacy skipped (--legacy-limit)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+tests/benchmark/bench_web.py
+
+WebUIの負荷試験(ページごとのレイテンシ計測)
+
+Usage:
+    python app.py --service=web --config=<config>  # 別端末で起動しておく
+    PYTHONPATH=. python tests/benchmark/bench_web.py [--url http://127.0.0.1:8000] [--requests 50] [--concurrency 4]
+"""
+
+import argparse
+import base64
+import math
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values: list[float], q: float) -> float:
+    """パーセンタイル値(最近傍順位法)
+
+    Args:
+        values (list[float]): 計測値
+        q (float): パーセント(0-100)
+
+    Returns:
+        float: パーセンタイル値
+    """
+
+    if not values:
+        return float("nan")
+
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def request(url: str, auth: str) -> tuple[float, int]:
+    """1リクエストを送信して応答時間を計測する
+
+    Args:
+        url (str): 対象URL
+        auth (str): BASIC認証ヘッダ(未使用時は空文字)
+
+    Returns:
+        tuple[float, int]: 応答時間(秒), ステータスコード
+    """
+
+    req = urllib.request.Request(url)
+    if auth:
+        req.add_header("Authorization", auth)
+
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=300) as res:
+            res.read()
+            status = res.status
+    except urllib.error.HTTPError as err:
+        status = err.code
+    except urllib.error.URLError:
+        status = 0
+    return time.perf_counter() - start, status
+
+
+def main():
+    """負荷試験実行"""
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="WebUIのURL")
+    parser.add_argument("--paths", nargs="+", default=["/summary/", "/graph/", "/ranking/"], help="計測するページ")
+    parser.add_argument("--requests", type=int, default=50, help="ページごとのリクエスト数")
+    parser.add_argument("--concurrency", type=int, default=4, help="同時リクエスト数")
+    parser.add_argument("--username", default="", help="BASIC認証ユーザ名")
+    parser.add_argument("--password", default="", help="BASIC認証パスワード")
+    args = parser.parse_args()
+
+    auth = ""
+    if args.username:
+        auth = "Basic " + base64.b64encode(f"{args.username}:{args.password}".encode()).decode()
+
+    print(f"url={args.url}, requests={args.requests}, concurrency={args.concurrency}")
+    for path in args.paths:
+        url = args.url.rstrip("/") + path
+        request(url, auth)  # ウォームアップ
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(lambda _: request(url, auth), range(args.requests)))
+        elapsed = time.perf_counter() - start
+
+        latencies = [sec for sec, status in results if status == 200]
+        errors = len(results) - len(latencies)
+        print(
+            f"{path:<12} p50 {percentile(latencies, 50) * 1000:8.1f}ms",
+            f"p99 {percentile(latencies, 99) * 1000:8.1f}ms",
+            f"max {max(latencies, default=float('nan')) * 1000:8.1f}ms",
+            f"{len(results) / elapsed:6.1f} req/s",
+            f"errors {errors}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,30 @@ tests/database/conftest.py
 テスト共通前処理
 """
 
+import sys
 from contextlib import closing
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
 import pandas as pd
 import pytest
 
 import libs.global_value as g
 from cls.config import AppConfig
+from cls.score import GameResult
+from cls.timekit import ExtendedDatetime as ExtDt
+from cls.timekit import Format
+from integrations import factory
 from libs import configuration
-from libs.data import initialization, lookup
-from libs.utils import dbutil
+from libs.data import initialization, lookup, modify
+from libs.registry import member
+from libs.utils import dbutil, validator
+
+if TYPE_CHECKING:
+    from integrations.protocols import MessageParserProtocol
+
+MEMBERS: list[str] = ["ひと", "いぬ", "さる", "とり"]
+"""`memdb`で登録するメンバー"""
 
 
 @pytest.fixture(scope="package")
@@ -59,3 +72,61 @@ def initialize_database(database_connection):
         conn.commit()
 
     lookup.read_memberslist()
+
+
+@pytest.fixture(name="memdb")
+def fixture_memdb(monkeypatch):
+    """機能ごとの共有インメモリDBを作成する(ファクトリ)
+
+    `memdb(name, members=True, **settings)`で設定を読み直し、`memdb_<name>`に差し替えて初期化する。
+    `settings`は`[setting]`セクションの値を上書きする。設定と`g.adapter`はテスト後に元に戻す。
+    """
+    monkeypatch.setattr(g, "cfg", getattr(g, "cfg", None), raising=False)  # 後続テストのために設定を戻す
+    monkeypatch.setattr(g, "adapter", getattr(g, "adapter", None), raising=False)
+    monkeypatch.setattr(sys, "argv", ["progname", "--config=tests/testdata/minimal.ini"])
+    keep_conn: list = []
+
+    def create(name: str, members: bool = True, **settings: Any) -> None:
+        configuration.setup(init_db=False)
+        g.cfg.setting.database_file = f"memdb_{name}?mode=memory&cache=shared"  # DB差し替え
+        for k, v in settings.items():
+            setattr(g.cfg.setting, k, v)
+        g.adapter = factory.select_adapter("standard_io", g.cfg)
+        g.cfg.selected_service = "standard_io"
+        keep_conn.append(dbutil.connection(g.cfg.setting.database_file))  # 共有インメモリDBの保持
+        initialization.initialization_resultdb(g.cfg.setting.database_file)
+        g.cfg.rule.register_to_database()
+        if members:
+            for x in MEMBERS:
+                member.append([x])
+        g.params = {}
+
+    yield create
+    dbutil.close_pool()
+    for conn in keep_conn:
+        conn.close()
+    g.params = {}
+
+
+@pytest.fixture(name="insert_game")
+def fixture_insert_game() -> Callable[..., tuple[GameResult, "MessageParserProtocol"]]:
+    """スコア報告を記録する関数
+
+    `insert_game(text, ts=None, **values)`で`text`をスコアとして記録する(`ts`省略時は現在時刻)。
+    `values`はスコアデータの値を上書きする。
+    """
+
+    def insert(text: str, ts: Optional[float] = None, **values: Any) -> tuple[GameResult, "MessageParserProtocol"]:
+        m = g.adapter.parser()
+        m.data.text = text
+        m.data.event_ts = (ExtDt() if ts is None else ExtDt(ts)).format(Format.TS)
+
+        score_data = GameResult(**validator.check_score(m))
+        if values:
+            score_data.set(**values)
+        score_data.calc()
+        modify.db_insert(score_data, m)
+
+        return score_data, m
+
+    return insert
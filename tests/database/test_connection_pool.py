@@ -0,0 +1,109 @@
+"""
+tests/database/test_connection_pool.py
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from libs.utils import dbutil
+
+
+def test_reader_reuse():
+    """読み込み用接続の再利用テスト"""
+    with dbutil.reader() as conn1:
+        pass
+    with dbutil.reader() as conn2:
+        pass
+
+    assert conn1 is conn2
+
+
+def test_reader_per_thread():
+    """読み込み用接続がスレッド単位で分かれるか"""
+    with dbutil.reader() as main_conn:
+        pass
+
+    thread_conn: list[sqlite3.Connection] = []
+
+    def worker():
+        with dbutil.reader() as conn:
+            thread_conn.append(conn)
+            conn.execute("select count() from member;").fetchall()
+
+    th = threading.Thread(target=worker)
+    th.start()
+    th.join()
+
+    assert thread_conn
+    assert thread_conn[0] is not main_conn
+
+
+def test_reader_released_on_thread_exit():
+    """スレッド終了時に読み込み用接続が閉じられるか"""
+    before = dbutil.pool_metrics()
+
+    def worker():
+        with dbutil.reader() as conn:
+            conn.execute("select count() from member;").fetchall()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+
+    after = dbutil.pool_metrics()
+    assert after["reader_opened"] == before["reader_opened"] + 8
+    assert after["reader_released"] == before["reader_released"] + 8
+    assert after["readers"] == before["readers"]
+
+
+def test_reader_query_only():
+    """読み込み用接続で更新できないこと"""
+    with pytest.raises(sqlite3.OperationalError):
+        with dbutil.reader() as conn:
+            conn.execute("insert into words(word, type, ex_point) values ('pool_test', 1, NULL);")
+
+    # エラーを起こした接続は破棄される
+    with dbutil.reader() as new_conn:
+        assert new_conn is not conn
+
+
+def test_writer_rollback():
+    """書き込み失敗時のロールバック"""
+    before = dbutil.pool_metrics()["writer_rollback"]
+
+    with pytest.raises(sqlite3.OperationalError):
+        with dbutil.writer() as conn:
+            conn.execute("insert into words(word, type, ex_point) values ('pool_test', 1, NULL);")
+            conn.execute("insert into undefined_table values (1);")
+
+    with dbutil.reader() as conn:
+        count = conn.execute("select count() from words where word = 'pool_test';").fetchone()[0]
+
+    assert count == 0
+    assert dbutil.pool_metrics()["writer_rollback"] == before + 1
+
+
+def test_writer_serialized():
+    """書き込みが直列化されること"""
+    before = dbutil.pool_metrics()["writer_acquired"]
+
+    def worker(idx: int):
+        with dbutil.writer() as conn:
+            conn.execute("insert into words(word, type, ex_point) values (?, 1, NULL);", (f"pool_{idx}",))
+
+    threads = [threading.Thread(target=worker, args=(idx,)) for idx in range(8)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+
+    with dbutil.writer() as conn:
+        count = conn.execute("delete from words where word like 'pool_%';").rowcount
+
+    assert count == 8
+    assert dbutil.pool_metrics()["writer_acquired"] == before + 9
+    assert dbutil.pool_metrics()["writers"] >= 1
@@ -0,0 +1,105 @@
+"""
+tests/database/test_data_version.py
+"""
+
+import pytest
+
+import libs.global_value as g
+from cls.score import GameResult
+from cls.timekit import ExtendedDatetime as ExtDt
+from cls.timekit import Format
+from libs.data import data_version, modify, stats_cache
+from libs.registry import member
+from libs.utils import dbutil, validator
+
+
+@pytest.fixture(name="version_db")
+def fixture_version_db(memdb):
+    """データバージョン確認用DB"""
+    memdb("data_version", members=False)
+
+
+def test_data_version(version_db):
+    """書き込みのたびにバージョンが進み、キャッシュ用テーブルの更新では進まないか"""
+    _ = version_db  # pylint (W0613: Unused argument)
+
+    version = data_version.current()
+    for name in ["ひと", "いぬ", "さる", "とり"]:
+        member.append([name])
+    assert data_version.current() > version
+
+    m = g.adapter.parser()
+    m.data.text = "終局ひと400いぬ300さる200とり100"
+    m.data.event_ts = ExtDt("2025-01-01 12:00:00").format(Format.TS)
+    score_data = GameResult(**validator.check_score(m))
+    score_data.calc()
+
+    version = data_version.current()
+    modify.db_insert(score_data, m)
+    inserted = data_version.current()
+    assert inserted > version
+
+    with dbutil.writer() as conn:
+        stats_cache.clear(conn)
+    assert data_version.current() == inserted
+
+    modify.db_delete(m)
+    assert data_version.current() > inserted
+
+
+def test_change_notification(version_db):
+    """書き込みと外部接続の更新を検知し、対象テーブルの購読者だけに通知するか"""
+    _ = version_db  # pylint (W0613: Unused argument)
+
+    data_version.current()  # 検知状態の初期化
+    received: list[data_version.DataChange] = []
+    filtered: list[data_version.DataChange] = []
+    data_version.subscribe(received.append)
+    data_version.subscribe(filtered.append, tables=["result"])
+
+    try:
+        member.append(["ひと"])  # 書き込み用接続のコミット後に通知
+        assert len(received) == 1
+        assert "member" in received[0].tables
+        assert received[0].version == data_version.current()
+        assert not filtered
+
+        external = dbutil.connection(g.cfg.setting.database_file)  # プール外の接続
+        external.execute("delete from member where name = 'ひと';")
+        external.commit()
+        external.close()
+        assert len(received) == 1  # 次の確認まで検知されない
+        version = data_version.current()
+        assert len(received) == 2
+        assert received[1].version == version
+        assert received[1].tables == frozenset({"member"})
+
+        data_version.current()  # 変更がなければ通知しない
+        assert len(received) == 2
+    finally:
+        data_version.unsubscribe(received.append)
+        data_version.unsubscribe(filtered.append)
+
+    member.append(["いぬ"])
+    assert len(received) == 2
+
+
+def test_bulk_update(version_db):
+    """一括更新ではカウンタを1回だけ進め、トリガーを元に戻すか"""
+    _ = version_db  # pylint (W0613: Unused argument)
+
+    with dbutil.writer() as conn:
+        before = data_version.read_all(conn)
+        data_version.drop_triggers(conn)
+        for name in ["ひと", "いぬ", "さる", "とり"]:
+            conn.execute("insert into member(name) values (?);", (name,))
+        data_version.bump(conn, ["member"])
+
+    with dbutil.writer() as conn:
+        after = data_version.read_all(conn)
+        assert after[data_version.KEY] == before[data_version.KEY] + 1
+        assert after[f"{data_version.KEY}:member"] == before[f"{data_version.KEY}:member"] + 1
+        assert after[f"{data_version.KEY}:result"] == before[f"{data_version.KEY}:result"]
+
+        conn.execute("delete from member where name = 'ひと';")  # トリガーが戻っている
+        assert data_version.read(conn) == after[data_version.KEY] + 1
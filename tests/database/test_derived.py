@@ -0,0 +1,40 @@
+"""
+tests/database/test_derived.py
+"""
+
+
+import pytest
+
+import libs.global_value as g
+from libs import configuration
+from libs.data import derived
+from libs.utils import dbutil
+
+
+@pytest.fixture(name="derived_db")
+def fixture_derived_db(memdb):
+    """派生データ確認用DB"""
+    memdb("derived", members=False)
+
+
+def _grade_rows() -> int:
+    with dbutil.writer() as conn:
+        return conn.execute("select count() from grade_history;").fetchone()[0]
+
+
+def test_check_settings(derived_db):
+    """設定が変わらなければ保持し、変わった場合だけ破棄するか"""
+    _ = derived_db  # pylint (W0613: Unused argument)
+
+    with dbutil.writer() as conn:
+        conn.execute("insert into grade_history values ('ひと', 'default_rule', '', '2025-01-01 12:00:00', '1', 1, 0, 10);")
+
+    configuration.initialization.initialization_resultdb(g.cfg.setting.database_file)  # 再起動
+    assert _grade_rows() == 1
+
+    g.cfg.member.guest_name = "ゲスト2"
+    configuration.initialization.initialization_resultdb(g.cfg.setting.database_file)
+    assert _grade_rows() == 0
+
+    with dbutil.writer() as conn:
+        assert not derived.check_settings(conn)
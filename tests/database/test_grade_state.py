@@ -0,0 +1,99 @@
+"""
+tests/database/test_grade_state.py
+"""
+
+import math
+from contextlib import closing
+
+import pytest
+
+import libs.global_value as g
+from cls.timekit import ExtendedDatetime as ExtDt
+from libs import configuration
+from libs.data import aggregate, grade_state, modify
+from libs.utils import dbutil
+
+GAMES: list[str] = [
+    "終局ひと400いぬ300さる200とり100",
+    "終局いぬ450ひと250とり200さる100",
+    "終局さる350とり300ひと250いぬ100",
+    "終局ひと-50いぬ350さる350とり350",
+    "終局とり400さる300いぬ200ひと100",
+    "終局ひと500いぬ300さる150とり50",
+]
+
+
+@pytest.fixture(name="grade_db")
+def fixture_grade_db(memdb):
+    """段位テーブルを設定したDB"""
+    memdb("grade_state")
+    g.cfg.badge.grade.table_name = "mahjongsoul"
+    configuration.initialization.read_grade_table()
+
+
+def _replay(name: str) -> tuple[int, int]:
+    """全ゲームを先頭から再計算"""
+    point, grade_level = 0, 0
+    with closing(dbutil.connection(g.cfg.setting.database_file)) as conn:
+        rows = conn.execute(
+            "select rank, rpoint from individual_results where name = ? and rule_version = ? order by playtime, ts, seat;",
+            (name, g.cfg.mahjong.rule_version),
+        ).fetchall()
+    for rank, rpoint in rows:
+        addition_point = math.ceil(eval(g.cfg.badge.grade.table["addition_expression"].format(rpoint=rpoint, origin_point=g.cfg.mahjong.origin_point)))
+        point, grade_level = aggregate.grade_promotion_check(grade_level, point + addition_point, rank)
+
+    return (point, grade_level)
+
+
+def _assert_same():
+    for name in ["ひと", "いぬ", "さる", "とり"]:
+        assert grade_state.current(name) == _replay(name)
+
+
+def _stored() -> int:
+    with closing(dbutil.connection(g.cfg.setting.database_file)) as conn:
+        return conn.execute("select count() from grade_history;").fetchone()[0]
+
+
+def test_grade_state(grade_db, insert_game):
+    """保持した段位状態と先頭からの再計算が一致するか"""
+    _ = grade_db  # pylint (W0613: Unused argument)
+
+    base_ts = ExtDt("2025-01-01 12:00:00").timestamp()
+    games = [insert_game(text, base_ts + idx * 3600) for idx, text in enumerate(GAMES[:4])]
+    assert _stored() == 0
+    _assert_same()
+    assert _stored() == 16
+
+    # 末尾に追加(破棄なし)
+    insert_game(GAMES[4], base_ts + 5 * 3600)
+    assert _stored() == 16
+    _assert_same()
+    assert _stored() == 20
+
+    # 途中に追加
+    insert_game(GAMES[5], base_ts + 4 * 3600)
+    assert _stored() == 16
+    _assert_same()
+
+    # 修正
+    score_data, m = games[1]
+    score_data.set(p1_str="100", p4_str="450")
+    modify.db_update(score_data, m)
+    assert _stored() == 4
+    _assert_same()
+
+    # 削除
+    modify.db_delete(games[2][1])
+    _assert_same()
+    assert _stored() == 20
+
+
+def test_addition_code():
+    """加算式のコンパイル結果"""
+    code = grade_state.addition_code("({rpoint}-{origin_point})/10")
+
+    assert grade_state.addition_code("({rpoint}-{origin_point})/10") is code
+    assert grade_state.addition_point(code, 321, 250) == 8
+    assert grade_state.addition_point(code, -55, 250) == -30
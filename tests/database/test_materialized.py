@@ -0,0 +1,87 @@
+"""
+tests/database/test_materialized.py
+"""
+
+from contextlib import closing
+
+import pytest
+
+import libs.global_value as g
+from libs.data import materialized, modify
+from libs.registry import member
+from libs.utils import dbutil
+
+
+@pytest.fixture(name="materialized_db")
+def fixture_materialized_db(memdb):
+    """実体化テーブルを有効にしたDB"""
+    memdb("materialized", members=False, materialize_individual_results=True, materialize_game_results=True)
+
+
+def _diff_rows() -> tuple[list, list]:
+    with closing(dbutil.connection(g.cfg.setting.database_file)) as conn:
+        actual = [tuple(row) for row in conn.execute("select * from individual_results order by ts, seat;")]
+        expected = [tuple(row) for row in conn.execute(f"select * from {materialized.SOURCE_VIEW};")]
+    return actual, expected
+
+
+def test_materialized_table(materialized_db):
+    """実体化テーブルの作成"""
+    _ = materialized_db  # pylint (W0613: Unused argument)
+
+    with closing(dbutil.connection(g.cfg.setting.database_file)) as conn:
+        row = conn.execute("select type from sqlite_master where name = 'individual_results';").fetchone()
+
+    assert row["type"] == "table"
+
+
+def test_materialized_query(materialized_db):
+    """ゲーム結果の参照先が実体化テーブルに置き換わるか"""
+    _ = materialized_db  # pylint (W0613: Unused argument)
+
+    g.params = {"individual": True}
+    sql = dbutil.query_modification(dbutil.query("SUMMARY_DETAILS2"))
+
+    assert "game_results_mat as results" in sql
+    assert "from game_results_mat) as game_info" in sql
+
+
+def test_materialized_sync(materialized_db, insert_game):
+    """スコア登録/修正/削除で実体化テーブルが追従するか"""
+    _ = materialized_db  # pylint (W0613: Unused argument)
+
+    score_data, m = insert_game("終局ひと250いぬ250さる250とり250", rule_version="test")
+    actual, expected = _diff_rows()
+    assert len(actual) == 4
+    assert actual == expected
+
+    # メモ(トリガー)
+    with dbutil.writer() as conn:
+        conn.execute(
+            dbutil.query("REMARKS_INSERT"),
+            {"thread_ts": m.data.event_ts, "event_ts": "0", "name": "ひと", "matter": "メモ", "source": ""},
+        )
+    with closing(dbutil.connection(g.cfg.setting.database_file)) as conn:
+        row = conn.execute("select p1_remarks from game_results_mat where ts = ?;", (m.data.event_ts,)).fetchone()
+        assert row["p1_remarks"] == "メモ"
+
+    # 修正
+    score_data.set(p1_str="450", p4_str="50")
+    modify.db_update(score_data, m)
+    actual, expected = _diff_rows()
+    assert actual == expected
+
+    # メンバー登録でゲストフラグが変わる
+    member.append(["ひと"])
+    actual, expected = _diff_rows()
+    assert [x for x in actual if x[3] == "ひと"][0][5] == 0
+    assert actual == expected
+
+    # 削除
+    modify.db_delete(m)
+    actual, expected = _diff_rows()
+    assert not actual
+    assert actual == expected
+
+    with closing(dbutil.connection(g.cfg.setting.database_file)) as conn:
+        assert materialized.check(conn) == {"individual_results": [], "game_results_mat": []}
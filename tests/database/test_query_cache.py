@@ -0,0 +1,47 @@
+"""
+tests/database/test_query_cache.py
+"""
+
+import pytest
+
+import libs.global_value as g
+from libs.utils import dbutil
+
+
+def test_query_registry():
+    """クエリレジストリの変更禁止"""
+    registry = dbutil.load_queries()
+
+    assert set(registry) == set(dbutil.QUERY_FILES)
+    with pytest.raises(TypeError):
+        registry["GAME_INFO"] = ""  # type: ignore[index]
+    with pytest.raises(ValueError):
+        dbutil.query("UNKNOWN_KEYWORD")
+
+
+def test_query_cache_hit():
+    """同一フラグでのキャッシュヒット"""
+    g.params = {"individual": True, "unregistered_replace": True, "guest_skip": True}
+    sql1 = dbutil.query_modification(dbutil.query("SUMMARY_TOTAL"))
+    before = dbutil.query_cache_info()
+
+    g.params = {"individual": True, "unregistered_replace": True, "guest_skip": True}
+    sql2 = dbutil.query_modification(dbutil.query("SUMMARY_TOTAL"))
+    after = dbutil.query_cache_info()
+
+    assert sql1 == sql2
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"]
+
+
+def test_query_cache_side_effect():
+    """キャッシュヒット時もパラメータ補正が行われる"""
+    for _ in range(2):
+        g.params = {"individual": False, "unregistered_replace": True, "guest_skip": False}
+        sql = dbutil.query_modification(dbutil.query("SUMMARY_TOTAL"))
+
+        assert "--[" not in sql
+        assert g.params["unregistered_replace"] is False
+        assert g.params["guest_skip"] is True
+        assert g.params["mode"] == 4
+        assert "rule_set" in g.params
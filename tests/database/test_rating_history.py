@@ -0,0 +1,106 @@
+"""
+tests/database/test_rating_history.py
+"""
+
+from contextlib import closing
+
+import pandas as pd
+import pytest
+
+import libs.global_value as g
+from cls.timekit import ExtendedDatetime as ExtDt
+from libs.data import aggregate, modify
+from libs.registry import member
+from libs.utils import dbutil
+
+GAMES: list[str] = [
+    "終局ひと400いぬ300さる200とり100",
+    "終局いぬ450ひと250とり200さる100",
+    "終局さる350とり300ひと250いぬ100",
+    "終局ひと-50いぬ350さる350とり350",
+    "終局とり400さる300いぬ200ひと100",
+    "終局ひと300いぬ300さる200とり200",
+]
+
+
+@pytest.fixture(name="rating_history_db")
+def fixture_rating_history_db(memdb):
+    """レーティング履歴を有効にしたDB"""
+    memdb("rating_history", rating_history=True)
+
+
+def _params(**kwargs) -> dict:
+    return {
+        "individual": True,
+        "player_list": {},
+        "competition_list": {},
+        "starttime": ExtDt("1900-01-01 00:00:00"),
+        "endtime": ExtDt("2100-01-01 00:00:00"),
+        "unregistered_replace": True,
+        "guest_skip": True,
+        "guest_name": g.cfg.member.guest_name,
+        **kwargs,
+    }
+
+
+def _assert_same(**kwargs):
+    g.cfg.setting.rating_history = False
+    g.params = _params(**kwargs)
+    expected = aggregate.calculation_rating()
+
+    g.cfg.setting.rating_history = True
+    g.params = _params(**kwargs)
+    pd.testing.assert_frame_equal(aggregate.calculation_rating(), expected)
+
+
+def _timeline() -> list[tuple]:
+    with closing(dbutil.connection(g.cfg.setting.database_file)) as conn:
+        return [tuple(x) for x in conn.execute("select dirty_from, (select count() from rating_history) from rating_timeline;")]
+
+
+def test_rating_history(rating_history_db, insert_game):
+    """履歴と全件計算の結果が一致するか"""
+    _ = rating_history_db  # pylint (W0613: Unused argument)
+
+    base_ts = ExtDt("2025-01-01 12:00:00").timestamp()
+    games = [insert_game(text, base_ts + idx * 3600) for idx, text in enumerate(GAMES[:4])]
+    assert not _timeline()
+
+    _assert_same()
+    assert _timeline() == [(None, 16)]
+
+    # 末尾に追加(追加分のみ計算)
+    insert_game(GAMES[4], base_ts + 5 * 3600)
+    assert _timeline() == [("2025-01-01 17:00:00", 16)]
+    _assert_same()
+    assert _timeline() == [(None, 20)]
+
+    # 途中に追加
+    insert_game(GAMES[5], base_ts + 4 * 3600)
+    assert _timeline() == [("2025-01-01 16:00:00", 20)]
+    _assert_same()
+
+    # 修正
+    score_data, m = games[1]
+    score_data.set(p1_str="100", p4_str="450")
+    modify.db_update(score_data, m)
+    assert _timeline() == [("2025-01-01 13:00:00", 24)]
+    _assert_same()
+
+    # 削除
+    modify.db_delete(games[2][1])
+    assert _timeline() == [("2025-01-01 14:00:00", 24)]
+    _assert_same()
+    assert _timeline() == [(None, 20)]
+
+    # 集計範囲
+    _assert_same(endtime=ExtDt("2025-01-01 15:30:00"))
+    _assert_same(collection="daily")
+    _assert_same(starttime=ExtDt("2025-01-01 13:30:00"))  # 全件計算
+    _assert_same(individual=False)
+    assert len(_timeline()) == 2
+
+    # メンバー変更で破棄
+    member.remove(["いぬ"])
+    assert not _timeline()
+    _assert_same()
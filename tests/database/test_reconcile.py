@@ -0,0 +1,145 @@
+"""
+tests/database/test_reconcile.py
+"""
+
+import pytest
+
+import libs.global_value as g
+from cls.score import GameResult
+from cls.timekit import ExtendedDatetime as ExtDt
+from cls.timekit import Format
+from integrations.protocols import ActionStatus
+from libs.data import modify, reconcile
+from libs.datamodels import ComparisonResults
+from libs.utils import dbutil
+
+
+@pytest.fixture(name="reconcile_db")
+def fixture_reconcile_db(memdb, monkeypatch):
+    """突合確認用DB"""
+    memdb("reconcile")
+
+    processed: list[tuple[ActionStatus, list[str]]] = []
+    monkeypatch.setattr(
+        g.adapter.functions,
+        "post_processing",
+        lambda m: processed.append((m.status.action, list(m.status.target_ts))),
+    )
+    return processed
+
+
+def score(ts: str, text: str = "終局ひと400いぬ300さる200とり100") -> GameResult:
+    """スコアデータを生成する"""
+    m = g.adapter.parser()
+    m.data.text = text
+    m.data.event_ts = ts
+    ret = reconcile.parse_score(m)
+    assert ret is not None
+    return ret
+
+
+def test_diff_scores(reconcile_db):
+    """追加/更新/削除をtsで照合して振り分けるか"""
+    _ = reconcile_db  # pylint (W0613: Unused argument)
+
+    db_score = [score("1.0"), score("2.0"), score("3.0")]
+    source = {
+        "2.0": score("2.0"),
+        "3.0": score("3.0", "終局ひと100いぬ300さる200とり400"),
+        "4.0": score("4.0"),
+    }
+    diff = reconcile.diff_scores(source, db_score)
+
+    assert [x.ts for x in diff.insert] == ["4.0"]
+    assert [(before.ts, after.ts) for before, after in diff.update] == [("3.0", "3.0")]
+    assert [x.ts for x in diff.delete] == ["1.0"]
+
+
+def test_remarks_reconcile(reconcile_db):
+    """変化のあったメッセージのメモはまとめて記録し直し、投稿にないメモを削除するか"""
+    processed = reconcile_db
+    game_ts = ExtDt("2025-01-01 12:00:00").format(Format.TS)
+    m = g.adapter.parser()
+    m.data.event_ts = game_ts
+    game = score(game_ts)
+    game.calc()
+    modify.db_insert(game, m)
+
+    def remark(event_ts: str, name: str, matter: str) -> dict:
+        return {"thread_ts": game_ts, "event_ts": event_ts, "name": name, "matter": matter, "source": "standard_io_C1"}
+
+    with dbutil.writer() as cur:
+        for para in [remark("10.0", "ひと", "役満A"), remark("11.0", "いぬ", "焼き鳥")]:
+            cur.execute(dbutil.query("REMARKS_INSERT"), para)
+    db_remarks = [remark("10.0", "ひと", "役満A"), remark("11.0", "いぬ", "焼き鳥")]
+
+    # 10.0に1件追加、11.0は投稿から消えた
+    source = [remark("10.0", "ひと", "役満A"), remark("10.0", "さる", "役満B"), remark("10.0", "さる", "役満B")]
+    diff = reconcile.diff_remarks(source, db_remarks)
+    assert diff.modify == [remark("10.0", "さる", "役満B")] * 2
+    assert diff.delete == [remark("11.0", "いぬ", "焼き鳥")]
+    assert diff.replace == {"10.0": [remark("10.0", "ひと", "役満A"), remark("10.0", "さる", "役満B")]}
+
+    processed.clear()
+    modify.remarks_reconcile(diff.replace, diff.delete)
+
+    with dbutil.reader() as conn:
+        rows = [tuple(x) for x in conn.execute("select event_ts, name, matter from remarks order by event_ts, name;")]
+    assert rows == [("10.0", "さる", "役満B"), ("10.0", "ひと", "役満A")]
+    assert sorted(processed) == [(ActionStatus.CHANGE, ["10.0"]), (ActionStatus.DELETE, ["11.0"])]
+
+
+def test_score_reconcile(reconcile_db):
+    """追加/更新/削除を1回の書き込みで反映し、リアクションをまとめて後処理するか"""
+    processed = reconcile_db
+    ts_list = [ExtDt(f"2025-01-0{x} 12:00:00").format(Format.TS) for x in range(1, 4)]
+    for ts in ts_list[:2]:
+        m = g.adapter.parser()
+        m.data.event_ts = ts
+        game = score(ts)
+        game.calc()
+        modify.db_insert(game, m)
+
+    diff = reconcile.diff_scores(
+        {
+            ts_list[1]: score(ts_list[1], "終局ひと100いぬ300さる200とり400"),
+            ts_list[2]: score(ts_list[2], "終局ひと100いぬ300さる200とり300"),  # 供託残り
+        },
+        [score(ts) for ts in ts_list[:2]],
+    )
+    processed.clear()
+    writer_acquired = dbutil.pool_metrics()["writer_acquired"]
+    summary = modify.score_reconcile(diff, {ts: "standard_io_C1" for ts in ts_list}, workers=2)
+
+    assert (summary.inserted, summary.updated, summary.deleted, summary.failed) == (1, 1, 1, 0)
+    assert summary.reactions == 3
+    assert dbutil.pool_metrics()["writer_acquired"] == writer_acquired + 1
+    with dbutil.reader() as conn:
+        rows = {row[0]: row[1] for row in conn.execute("select ts, p1_name from result;")}
+    assert set(rows) == set(ts_list[1:])
+    assert sorted(processed) == [
+        (ActionStatus.CHANGE, [ts_list[1]]),
+        (ActionStatus.CHANGE, [ts_list[2]]),
+        (ActionStatus.DELETE, [ts_list[0]]),
+    ]
+
+
+def test_score_reconcile_failed(reconcile_db):
+    """追加できなかったスコアは件数を返し、突合結果の取りこぼしから外れるか"""
+    _ = reconcile_db  # pylint (W0613: Unused argument)
+    ts_list = [ExtDt(f"2025-01-0{x} 12:00:00").format(Format.TS) for x in range(1, 3)]
+    m = g.adapter.parser()
+    m.data.event_ts = ts_list[0]
+    game = score(ts_list[0])
+    game.calc()
+    modify.db_insert(game, m)
+
+    diff = reconcile.ScoreDiff(insert=[score(ts) for ts in ts_list])  # 1件目は登録済み
+    results = ComparisonResults(missing=list(diff.insert))
+    results.set_repair(modify.score_reconcile(diff, {}))
+
+    assert results.repair is not None
+    assert (results.repair.inserted, results.repair.failed) == (1, 1)
+    assert results.repair.failed_ts == [ts_list[0]]
+    assert [x.ts for x in results.missing] == [ts_list[1]]
+    assert "追加 1件 / 更新 0件 / 削除 0件 / 失敗 1件" in results.output("repair")
@@ -0,0 +1,115 @@
+"""
+tests/database/test_stats_cache.py
+"""
+
+from contextlib import closing
+
+import pandas as pd
+import pytest
+
+import libs.global_value as g
+from cls.timekit import ExtendedDatetime as ExtDt
+from libs.data import loader, modify, stats_cache
+from libs.registry import member
+from libs.utils import dbutil
+
+GAMES: list[str] = [
+    "終局ひと400いぬ300さる200とり100",
+    "終局いぬ450ひと250とり200さる100",
+    "終局さる350とり300ひと250いぬ100",
+    "終局ひと-50いぬ350さる350とり350",
+    "終局とり400さる300いぬ200ひと100",
+]
+
+
+@pytest.fixture(name="stats_cache_db")
+def fixture_stats_cache_db(memdb):
+    """成績キャッシュを有効にしたDB"""
+    memdb("stats_cache", stats_cache=True)
+
+
+def _params(name: str) -> dict:
+    return {
+        "individual": True,
+        "player_name": name,
+        "player_list": {"player_0": name},
+        "competition_list": {},
+        "starttime": ExtDt("1900-01-01 00:00:00"),
+        "endtime": ExtDt("2100-01-01 00:00:00"),
+        "unregistered_replace": True,
+        "guest_skip": False,
+        "guest_name": g.cfg.member.guest_name,
+    }
+
+
+def _assert_same(name: str):
+    g.params = _params(name)
+    cached = stats_cache.lookup(g.params)
+    assert cached is not None
+
+    g.params = _params(name)
+    for keyword, df in zip(["RESULTS_INFO", "RECORD_INFO"], cached):
+        expected = loader.read_data(keyword, g.params)
+        assert not expected.empty
+        pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+
+
+def _entries() -> int:
+    with closing(dbutil.connection(g.cfg.setting.database_file)) as conn:
+        return conn.execute("select count() from stats_cache;").fetchone()[0]
+
+
+def test_stats_cache(stats_cache_db, insert_game):
+    """キャッシュとSQLの集計結果が一致するか"""
+    _ = stats_cache_db  # pylint (W0613: Unused argument)
+
+    base_ts = ExtDt("2025-01-01 12:00:00").timestamp()
+    games = [insert_game(text, base_ts + idx * 3600) for idx, text in enumerate(GAMES[:3])]
+    assert _entries() == 0
+
+    _assert_same("ひと")
+    assert _entries() == 1
+
+    # 追加(差分反映)
+    for idx, text in enumerate(GAMES[3:], start=3):
+        insert_game(text, base_ts + idx * 3600)
+    assert _entries() == 1
+    _assert_same("ひと")
+
+    # 修正(破棄して再作成)
+    score_data, m = games[0]
+    score_data.set(p1_str="100", p4_str="400")
+    modify.db_update(score_data, m)
+    assert _entries() == 0
+    _assert_same("ひと")
+
+    # 削除
+    modify.db_delete(games[1][1])
+    assert _entries() == 0
+    _assert_same("ひと")
+
+    # 集計範囲が全期間を含まない場合はSQLで集計
+    g.params = _params("ひと")
+    g.params.update({"starttime": ExtDt("2025-01-01 15:00:00")})
+    assert stats_cache.lookup(g.params) is None
+
+
+def test_stats_cache_rebuild(stats_cache_db, insert_game):
+    """全件再作成"""
+    _ = stats_cache_db  # pylint (W0613: Unused argument)
+
+    base_ts = ExtDt("2025-02-01 12:00:00").timestamp()
+    for idx, text in enumerate(GAMES):
+        insert_game(text, base_ts + idx * 3600)
+    for name in ["ひと", "いぬ"]:
+        _assert_same(name)
+
+    with dbutil.writer() as conn:
+        conn.execute("update stats_cache set state = '{\"seats\": {}}';")
+        assert stats_cache.rebuild(conn) == 2
+    for name in ["ひと", "いぬ"]:
+        _assert_same(name)
+
+    # メンバー変更でゲスト判定が変わるため破棄
+    member.remove(["いぬ"])
+    assert _entries() == 0
@@ -0,0 +1,98 @@
+"""
+tests/database/test_stats_report.py
+"""
+
+import logging
+import sys
+from zipfile import ZipFile
+
+import pytest
+
+import libs.global_value as g
+from cls.score import GameResult
+from cls.timekit import ExtendedDatetime as ExtDt
+from cls.timekit import Format
+from integrations import factory
+from libs import configuration
+from libs.commands.report import entry, stats_report
+from libs.data import modify
+from libs.registry import member
+from libs.utils import dbutil, validator
+
+
+@pytest.fixture(name="report_db")
+def fixture_report_db(monkeypatch, tmp_path):
+    """成績レポート確認用DB"""
+    monkeypatch.setattr(g, "cfg", getattr(g, "cfg", None), raising=False)  # 後続テストのために設定を戻す
+    monkeypatch.setattr(g, "adapter", getattr(g, "adapter", None), raising=False)
+    config_file = tmp_path / "report.ini"
+    config_file.write_text(f"[mahjong]\n\n[setting]\ndatabase_file = {tmp_path / 'report.db'}\nwork_dir = {tmp_path}\n", encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["progname", f"--config={config_file}"])  # 引数解析で設定が読み直されるためファイルで指定
+    configuration.setup()
+    g.adapter = factory.select_adapter("standard_io", g.cfg)
+    g.cfg.selected_service = "standard_io"
+    g.params = {}
+    for name in ["ひと", "いぬ", "さる", "とり"]:
+        member.append([name])
+
+    for day, text in enumerate(["終局ひと400いぬ300さる200とり100", "終局ひと100いぬ200さる300とり400"] * 3, start=1):
+        m = g.adapter.parser()
+        m.data.text = text
+        m.data.event_ts = ExtDt(f"2025-01-{day:02d} 12:00:00").format(Format.TS)
+        score_data = GameResult(**validator.check_score(m))
+        score_data.calc()
+        modify.db_insert(score_data, m)
+    yield
+    stats_report.close_executor()
+    dbutil.close_pool()
+    g.params = {}
+
+
+def test_gen_pdf(report_db, caplog):
+    """セクションを並列に生成して表紙から順に連結し、処理時間を記録するか"""
+    _ = report_db  # pylint (W0613: Unused argument)
+
+    m = g.adapter.parser()
+    m.parser({"event": {"text": "麻雀成績レポート ひと default_rule 全部"}})
+    with caplog.at_level(logging.INFO):
+        entry.main(m)
+
+    assert m.status.result, m.post.headline
+    pdf_file = g.cfg.setting.work_dir / "results.pdf"
+    assert pdf_file.read_bytes().startswith(b"%PDF")
+    assert "aggregate_unit" not in g.params  # セクション内の変更は呼び出し元に影響しない
+    assert g.cfg.aggregate_unit is None
+
+    timing = next(x.getMessage() for x in caplog.records if x.getMessage().startswith("report generation:"))
+    for name in ["cover_page", "entire_aggregate", "periodic_aggregation", "sectional_aggregate", "build"]:
+        assert f"{name}=" in timing
+
+
+def test_executor(report_db):
+    """セクション生成用ワーカーを使い回し、設定変更と停止で作り直すか"""
+    _ = report_db  # pylint (W0613: Unused argument)
+
+    g.cfg.setting.report_workers = 2
+    executor = stats_report.get_executor()
+    assert stats_report.get_executor() is executor
+
+    g.cfg.setting.report_workers = 1
+    resized = stats_report.get_executor()
+    assert resized is not executor
+
+    stats_report.close_executor()
+    assert stats_report.get_executor() is not resized
+
+
+def test_gen_batch(report_db):
+    """記録のある全メンバーのレポートを1つのzipにまとめるか"""
+    _ = report_db  # pylint (W0613: Unused argument)
+
+    m = g.adapter.parser()
+    m.parser({"event": {"text": "麻雀成績レポート default_rule 全部 一括"}})
+    entry.main(m)
+
+    assert m.status.result, m.post.headline
+    with ZipFile(g.cfg.setting.work_dir / "results.zip") as zf:
+        assert sorted(zf.namelist()) == sorted(f"{x}.pdf" for x in ["ひと", "いぬ", "さる", "とり"])
+        assert all(zf.read(x).startswith(b"%PDF") for x in zf.namelist())
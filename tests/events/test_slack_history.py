@@ -0,0 +1,104 @@
+"""
+tests/events/test_slack_history.py
+"""
+
+import sys
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("slack_sdk")
+
+import libs.global_value as g  # noqa: E402
+from integrations import factory  # noqa: E402
+from libs import configuration  # noqa: E402
+
+
+class FakeClient:
+    """search.messages/conversations.repliesを返す偽のWebClient"""
+
+    def __init__(self, pages: int, per_page: int):
+        now = time.time()
+        self.messages = [
+            {"iid": f"i{n}", "channel": {"id": "C1", "name": "test"}, "user": "U1", "ts": f"{now - n:.6f}", "text": f"msg{n}"}
+            for n in range(pages * per_page)
+        ]
+        self.per_page = per_page
+        self.replies: list[str] = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def _enter(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+
+    def search_messages(self, page: int = 1, **_kwargs):
+        """検索結果(ページ単位)"""
+        self._enter()
+        start = (page - 1) * self.per_page
+        matches = [dict(x, channel=dict(x["channel"])) for x in self.messages[start : start + self.per_page]]
+        return {"messages": {"matches": matches, "paging": {"pages": len(self.messages) // self.per_page}}}
+
+    def conversations_replies(self, channel: str, ts: str):
+        """メッセージ詳細"""
+        _ = channel
+        self._enter()
+        with self.lock:
+            self.replies.append(ts)
+        return {"messages": [{"ts": ts, "thread_ts": ts, "edited": {"ts": "0"}}]}
+
+
+@pytest.fixture(name="slack_functions")
+def fixture_slack_functions(monkeypatch, tmp_path):
+    """偽のAPIに接続したslackアダプタ"""
+    monkeypatch.setattr(g, "cfg", getattr(g, "cfg", None), raising=False)  # 後続テストのために設定を戻す
+    monkeypatch.setattr(g, "adapter", getattr(g, "adapter", None), raising=False)
+    monkeypatch.setattr(sys, "argv", ["progname", "--config=tests/testdata/minimal.ini"])
+    configuration.setup(init_db=False)
+    g.cfg.setting.work_dir = tmp_path
+    g.adapter = factory.select_adapter("slack", g.cfg)
+    client = FakeClient(pages=3, per_page=4)
+    g.adapter.api.webclient = client  # type: ignore[assignment]
+    g.adapter.api.appclient = client  # type: ignore[assignment]
+    yield g.adapter.functions, client
+
+
+def test_parallel_search(slack_functions):
+    """ページと詳細情報を並列に取得し、順序を保つか"""
+    functions, client = slack_functions
+
+    matches = functions.get_messages("msg")
+    assert [x.data.text for x in matches] == [x["text"] for x in client.messages]
+    assert client.peak > 1
+
+    details = functions.get_message_details(matches)
+    assert [x.data.event_ts for x in details] == [x["ts"] for x in client.messages]
+    assert all(x.data.thread_ts == x.data.event_ts for x in details)
+    assert len(client.replies) == len(client.messages)
+
+
+def test_history_cache(slack_functions):
+    """本文が変わっていないメッセージは詳細情報の取得を省略するか"""
+    functions, client = slack_functions
+
+    functions.get_message_details(functions.get_messages("msg"))
+    assert len(client.replies) == 12
+    assert (g.cfg.setting.work_dir / "slack_history.json").exists()
+
+    client.replies.clear()
+    client.messages[0]["text"] = "msg0 (edited)"
+    functions._history = None  # 保存したファイルから読み直す
+    details = functions.get_message_details(functions.get_messages("msg"))
+    assert client.replies == [client.messages[0]["ts"]]
+    assert len(details) == 12
+
+    functions.conf.history_cache = False
+    client.replies.clear()
+    functions.get_message_details(functions.get_messages("msg"))
+    assert len(client.replies) == 12
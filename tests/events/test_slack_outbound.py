@@ -0,0 +1,179 @@
+"""
+tests/events/test_slack_outbound.py
+"""
+
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("slack_sdk")
+
+from slack_sdk import WebClient  # noqa: E402
+
+from integrations.slack.api import AdapterAPI  # noqa: E402
+from integrations.slack.outbound import OutboundQueue  # noqa: E402
+from integrations.slack.parser import MessageParser  # noqa: E402
+from libs.types import StyleOptions  # noqa: E402
+
+
+class FakeSlack(BaseHTTPRequestHandler):
+    """Slack Web APIの代わりに応答するサーバ"""
+
+    calls: list[tuple[str, dict]] = []
+    uploads: list[tuple[float, float]] = []
+    limited: set[str] = set()
+    lock = threading.Lock()
+
+    def do_POST(self):  # noqa: N802
+        """APIリクエストを記録して応答する"""
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        path = self.path.split("?")[0]
+
+        if path.startswith("/upload/"):
+            started = time.monotonic()
+            time.sleep(0.3)
+            with self.lock:
+                self.uploads.append((started, time.monotonic()))
+            return self.reply({"ok": True})
+
+        method = path.rsplit("/", 1)[-1]
+        if "json" in self.headers.get("Content-Type", ""):
+            params = json.loads(body or b"{}")
+        else:
+            params = {k: v[0] for k, v in urllib.parse.parse_qs(body.decode()).items()}
+
+        with self.lock:
+            if method == "chat.postMessage" and method not in self.limited:  # 初回はレート制限
+                self.limited.add(method)
+                return self.reply({"ok": False, "error": "ratelimited"}, status=429, headers={"Retry-After": "0.2"})
+            self.calls.append((method, params))
+            serial = len(self.calls)
+
+        match method:
+            case "files.getUploadURLExternal":
+                port = self.server.server_address[1]
+                return self.reply({"ok": True, "upload_url": f"http://127.0.0.1:{port}/upload/F{serial}", "file_id": f"F{serial}"})
+            case "chat.postMessage":
+                return self.reply({"ok": True, "ts": f"100.{serial}"})
+        return self.reply({"ok": True})
+
+    def reply(self, data: dict, status: int = 200, headers: dict | None = None):
+        """JSONで応答する"""
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):  # noqa: A002
+        """アクセスログを出さない"""
+
+
+@pytest.fixture(name="slack_api")
+def fixture_slack_api():
+    """偽のSlackサーバに接続したAPI"""
+    FakeSlack.calls, FakeSlack.uploads, FakeSlack.limited = [], [], set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSlack)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    api = AdapterAPI()
+    api.appclient = WebClient(token="xoxb-test", base_url=f"http://127.0.0.1:{server.server_address[1]}/api/")
+    api.outbound = OutboundQueue(workers=4, max_retries=2)
+    yield api
+    api.outbound.shutdown()
+    server.shutdown()
+    server.server_close()
+
+
+def test_outbound_queue(slack_api, tmp_path):
+    """チャンネル内の順序を守り、レート制限をリトライし、アップロードを並列に行うか"""
+    images = []
+    for name in ["a.png", "b.png"]:
+        images.append(tmp_path / name)
+        images[-1].write_bytes(b"png")
+
+    m = MessageParser()
+    m.data.channel_id = "C1"
+    m.data.event_ts = "1.0"
+    m.post.headline = {"見出し": "ヘッダ"}
+    m.set_data(images[0], StyleOptions(title="画像A"))
+    m.set_data(images[1], StyleOptions(title="画像B"))
+    m.set_data("本文1", StyleOptions(key_title=False, summarize=False))
+    m.set_data("本文2", StyleOptions(key_title=False, summarize=False))
+    slack_api.post(m)
+
+    posted = [(x, p.get("text") or p.get("files")) for x, p in FakeSlack.calls if x != "files.getUploadURLExternal"]
+    assert [x for x, _ in posted] == [
+        "chat.postMessage",
+        "files.completeUploadExternal",
+        "files.completeUploadExternal",
+        "chat.postMessage",
+        "chat.postMessage",
+    ]
+    assert [json.loads(p)[0]["title"] for _, p in posted[1:3]] == ["画像A", "画像B"]
+    assert [p for _, p in posted[3:]] == ["本文1", "本文2"]
+
+    # 本文は見出しのスレッドに返信する
+    replies = [p for x, p in FakeSlack.calls if x != "files.getUploadURLExternal"]
+    header_ts = f"100.{[p for _, p in FakeSlack.calls].index(replies[0]) + 1}"
+    assert all(p.get("thread_ts") == header_ts for p in replies[1:])
+
+    # アップロードは並列に実行される
+    (start_a, end_a), (start_b, end_b) = FakeSlack.uploads
+    assert start_a < end_b and start_b < end_a
+
+    metrics = slack_api.outbound.metrics()
+    assert metrics["rate_limited"] == 1
+    assert metrics["failed"] == 0
+    assert metrics["backoff_total"] > 0.1
+
+
+def test_post_failure_logged(slack_api, tmp_path, caplog):
+    """送信スレッドで発生した例外を記録し、残りの送信を続けるか"""
+    image = tmp_path / "a.png"
+    image.write_bytes(b"png")
+
+    def broken(**kwargs):
+        raise RuntimeError("broken upload")
+
+    slack_api.appclient.files_getUploadURLExternal = broken
+
+    m = MessageParser()
+    m.data.channel_id = "C1"
+    m.data.event_ts = "1.0"
+    m.set_data(image, StyleOptions(title="画像A"))
+    m.set_data("本文1", StyleOptions(key_title=False, summarize=False))
+    slack_api.post(m)
+
+    assert "broken upload" in caplog.text
+    assert [p.get("text") for x, p in FakeSlack.calls if x == "chat.postMessage"] == ["本文1"]
+
+
+def test_retry_exhausted():
+    """リトライ回数を超えたレート制限は呼び出し元に返すか"""
+
+    class Response:
+        status_code = 429
+        headers = {"retry-after": "0"}
+
+    class RateLimited(Exception):
+        response = Response()
+
+    outbound = OutboundQueue(max_retries=2)
+    calls: list[int] = []
+
+    def call():
+        calls.append(1)
+        raise RateLimited()
+
+    with pytest.raises(RateLimited):
+        outbound.call("chat.postMessage", call)
+    assert len(calls) == 3
+    assert outbound.metrics()["failed"] == 1
@@ -0,0 +1,67 @@
+"""
+tests/events/test_web_cache.py
+"""
+
+import sys
+from unittest.mock import patch
+
+import pytest
+
+import libs.global_value as g
+from integrations import factory
+from integrations.web.events import handler
+from libs import configuration
+
+
+@pytest.fixture(name="web")
+def fixture_web(monkeypatch):
+    """データバージョンを差し替えたテストクライアント"""
+    monkeypatch.setattr(g, "cfg", getattr(g, "cfg", None), raising=False)  # 後続テストのために設定を戻す
+    monkeypatch.setattr(sys, "argv", ["app.py", "--service=web", "--config=tests/testdata/minimal.ini"])
+    configuration.setup(init_db=False)
+    adapter = factory.select_adapter("web", g.cfg)
+    version = {"value": 1}
+    monkeypatch.setattr("libs.data.data_version.current", lambda: version["value"])
+
+    app = handler.create_app(adapter)
+    app.config["TESTING"] = True
+    with patch("libs.dispatcher.by_keyword") as by_keyword:
+        with app.test_client() as client:
+            yield client, by_keyword, version, adapter
+
+
+def test_response_cache(web):
+    """同じ指定内容はキャッシュから返し、データ更新で作り直すか"""
+    client, by_keyword, version, adapter = web
+
+    first = client.get("/summary/")
+    assert first.status_code == 200
+    assert first.headers["ETag"]
+    assert by_keyword.call_count == 1
+
+    second = client.get("/summary/")
+    assert second.data == first.data
+    assert by_keyword.call_count == 1
+
+    not_modified = client.get("/summary/", headers={"If-None-Match": first.headers["ETag"]})
+    assert not_modified.status_code == 304
+    assert by_keyword.call_count == 1
+
+    client.get("/ranking/")  # エンドポイントごとに別のキー
+    assert by_keyword.call_count == 2
+
+    version["value"] += 1  # データ更新
+    refreshed = client.get("/summary/", headers={"If-None-Match": first.headers["ETag"]})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["ETag"] != first.headers["ETag"]
+    assert by_keyword.call_count == 3
+
+    posted = client.post("/summary/", data={"action": "update", "range": "今月"})
+    assert posted.headers["ETag"] != refreshed.headers["ETag"]
+    assert "range=" in posted.headers.get("Set-Cookie", "")
+    assert by_keyword.call_count == 4
+
+    adapter.cache.maxsize = 0  # キャッシュ無効
+    client.get("/summary/")
+    client.get("/summary/")
+    assert by_keyword.call_count == 6
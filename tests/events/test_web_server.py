@@ -0,0 +1,71 @@
+"""
+tests/events/test_web_server.py
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import textwrap
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+SERVER = textwrap.dedent(
+    """
+    import os, sys, time
+    from types import SimpleNamespace
+    from flask import Flask
+    from integrations.web import server
+
+    app = Flask(__name__)
+
+    @app.route("/")
+    def index():
+        time.sleep(0.3)
+        return str(os.getpid())
+
+    conf = SimpleNamespace(host="127.0.0.1", port=int(sys.argv[1]), workers=3, use_ssl=False)
+    server.serve_prefork(app, conf)
+    """
+)
+
+
+def free_port() -> int:
+    """空きポートを取得する"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork not supported")
+def test_prefork_workers():
+    """複数のワーカープロセスで並列に処理し、終了時に子プロセスも停止するか"""
+    port = free_port()
+    proc = subprocess.Popen([sys.executable, "-c", SERVER, str(port)], env={**os.environ, "PYTHONPATH": "."})
+    url = f"http://127.0.0.1:{port}/"
+
+    try:
+        for _ in range(50):  # 起動待ち
+            try:
+                urllib.request.urlopen(url, timeout=5).read()
+                break
+            except OSError:
+                time.sleep(0.1)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            pids = list(executor.map(lambda _: urllib.request.urlopen(url, timeout=5).read().decode(), range(3)))
+        elapsed = time.perf_counter() - start
+
+        assert len(set(pids)) == 3
+        assert str(proc.pid) not in pids
+        assert elapsed < 0.8  # 直列なら0.9秒以上
+    finally:
+        proc.terminate()
+        assert proc.wait(timeout=10) == 0
+
+    with pytest.raises(OSError):
+        urllib.request.urlopen(url, timeout=1)
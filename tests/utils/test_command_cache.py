@@ -0,0 +1,100 @@
+"""
+tests/utils/test_command_cache.py
+"""
+
+import sys
+
+import pytest
+
+import libs.global_value as g
+from integrations import factory
+from integrations.protocols import CommandType
+from libs import configuration
+from libs.functions.command_cache import CommandCache
+from libs.types import StyleOptions
+from libs.utils import graphcache
+
+
+@pytest.fixture(name="env")
+def fixture_env(monkeypatch, tmp_path):
+    """作業ディレクトリとデータバージョンを差し替えた環境"""
+    monkeypatch.setattr(g, "cfg", getattr(g, "cfg", None), raising=False)  # 後続テストのために設定を戻す
+    monkeypatch.setattr(g, "adapter", getattr(g, "adapter", None), raising=False)
+    monkeypatch.setattr(sys, "argv", ["progname", "--service=std", "--config=tests/testdata/minimal.ini"])
+    configuration.setup(init_db=False)
+    g.adapter = factory.select_adapter("standard_io", g.cfg)
+    g.cfg.setting.work_dir = tmp_path
+    g.cfg.setting.command_cache = 2
+    version = {"value": 1}
+    monkeypatch.setattr("libs.data.data_version.current", lambda: version["value"])
+
+    calls: list[str] = []
+
+    def plot(m):
+        calls.append(m.data.text)
+        g.params = {"player_name": m.argument[-1]}
+        save_file = tmp_path / "graph.png"  # 毎回同じファイル名で上書きされる
+        save_file.write_text(m.data.text)
+        m.status.command_type = CommandType.GRAPH
+        m.post.headline = {"成績グラフ": m.data.text}
+        m.set_data(save_file, StyleOptions(title="グラフ"))
+
+    plot.__module__ = "libs.commands.graph.entry"
+
+    def run(text: str):
+        m = g.adapter.parser()
+        m.data.text = text
+        cache.run(plot, m.keyword, m)
+        return m
+
+    cache = CommandCache()
+    yield cache, run, calls, version
+    cache.clear()
+    g.params = {}
+
+
+def test_command_cache(env):
+    """同じ引数はキャッシュから返し、画像は上書きされず、データ更新で作り直すか"""
+    cache, run, calls, version = env
+
+    first = run("成績グラフ 今月 ひと")
+    run("成績グラフ 今月 いぬ")  # graph.pngを上書き
+    second = run("成績グラフ  今月 ひと")
+    assert calls == ["成績グラフ 今月 ひと", "成績グラフ 今月 いぬ"]
+    assert second.status.command_type == CommandType.GRAPH
+    assert second.post.headline == first.post.headline
+    assert g.params == {"player_name": "ひと"}  # 実行時のパラメータも復元
+
+    cached_file = second.post.message[0][0]
+    assert cached_file != g.cfg.setting.work_dir / "graph.png"
+    assert cached_file.read_text() == "成績グラフ 今月 ひと"
+    assert graphcache.is_temporary(cached_file)  # 投稿ごとの複製
+
+    run("成績グラフ 先月")  # 上限(2件)を超えたものから破棄
+    assert len(cache) == 2
+
+    stored = list(cache.directory.iterdir())
+    version["value"] += 1  # データ更新
+    run("成績グラフ 今月 ひと")
+    assert len(calls) == 4
+    assert not any(x.exists() for x in stored)
+    assert cached_file.read_text() == "成績グラフ 今月 ひと"  # 投稿中のファイルは残る
+
+    graphcache.release(second)
+    assert not cached_file.exists()
+
+    cache.reset()
+    assert not len(cache) and not cache.directory.exists()
+
+
+def test_not_cacheable(env):
+    """対象外のコマンドやキャッシュ無効時はそのまま実行するか"""
+    cache, _, _, _ = env
+    calls: list = []
+
+    m = g.adapter.parser()
+    m.data.text = "メンバー一覧"
+    cache.run(calls.append, m.keyword, m)
+    cache.run(calls.append, m.keyword, m)
+    assert len(calls) == 2
+    assert not cache
@@ -0,0 +1,59 @@
+"""
+tests/utils/test_context.py
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import libs.global_value as g
+from cls.context import QueryContext
+from cls.timekit import ExtendedDatetime as ExtDt
+
+
+def test_params_isolation():
+    """スレッドごとにg.paramsが独立しているか"""
+    g.params = {"player_name": "main"}
+    barrier = threading.Barrier(4)
+
+    def worker(name: str) -> tuple[dict, str]:
+        initial = dict(g.params)
+        g.params = {"player_name": name}
+        barrier.wait()  # 全スレッドが代入してから参照
+        g.params.update({"stipulated": 1})
+        barrier.wait()
+        return initial, str(g.params["player_name"])
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(worker, ["a", "b", "c", "d"]))
+
+    assert [x[0] for x in results] == [{}] * 4
+    assert [x[1] for x in results] == ["a", "b", "c", "d"]
+    assert g.params == {"player_name": "main"}
+
+
+def test_query_context():
+    """スナップショットの不変性と展開"""
+    g.params = {"player_list": {"player_0": "ひと"}, "starttime": ExtDt("2025-01-01 12:00:00")}
+    ctx = QueryContext.current()
+    g.params["player_list"].update({"player_1": "いぬ"})  # 元の辞書の変更は反映されない
+
+    assert dict(ctx["player_list"]) == {"player_0": "ひと"}
+    with pytest.raises(TypeError):
+        ctx.data["player_name"] = "さる"  # type: ignore[index]
+
+    other = ctx.replace(player_name="さる")
+    assert "player_name" not in ctx
+    assert other["player_name"] == "さる"
+
+    saved = g.params
+    with ctx.activate() as params:
+        params.update({"stipulated": 3})  # 展開先の変更はスナップショットに影響しない
+        assert g.params is params
+    assert g.params is saved
+    assert "stipulated" not in ctx
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        names = list(executor.map(lambda x: x.run(lambda: g.params.get("player_name")), [ctx, other]))
+    assert names == [None, "さる"]
@@ -0,0 +1,88 @@
+"""
+tests/utils/test_discord_dispatch.py
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("discord")
+
+import integrations.discord.events.handler as handler  # noqa: E402
+from integrations.discord.api import AdapterAPI  # noqa: E402
+from libs.utils.workerpool import DispatchPool  # noqa: E402
+
+
+@pytest.fixture(name="loop")
+def fixture_loop():
+    """別スレッドで動かすイベントループ"""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+
+
+def test_post_backpressure(loop):
+    """ワーカースレッドからのポストがイベントループで上限付きで実行されるか"""
+    api = AdapterAPI()
+    api.bot = SimpleNamespace(loop=loop)  # type: ignore[assignment]
+    api.post_concurrency = 2
+    state = {"running": 0, "peak": 0, "done": 0}
+    finished = threading.Event()
+
+    async def fake_post(m, response):
+        _ = (m, response)
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(0.02)
+        state["running"] -= 1
+        state["done"] += 1
+        if state["done"] == 6:
+            finished.set()
+
+    api._post = fake_post  # type: ignore[method-assign]
+    api.response = None  # type: ignore[assignment]
+    m = SimpleNamespace(status=SimpleNamespace(command_flg=False))
+
+    threads = [threading.Thread(target=api.post, args=(m,)) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert finished.wait(5)
+    assert state["peak"] == 2
+
+
+def test_dispatch_keeps_loop_responsive(loop, monkeypatch):
+    """重い処理の実行中もイベントループが応答し、溢れた分は受け付けないか"""
+    release = threading.Event()
+    posted: list = []
+    monkeypatch.setattr(handler.libs.dispatcher, "lane", lambda m: "heavy")
+    monkeypatch.setattr(handler.libs.dispatcher, "by_keyword", lambda m: release.wait(5))
+    monkeypatch.setattr(handler.message, "random_reply", lambda m, key: key)
+
+    adapter = SimpleNamespace(
+        pool=DispatchPool(workers=1, queue_size=0),
+        api=SimpleNamespace(post=posted.append),
+    )
+    m = SimpleNamespace(set_data=lambda data, options: posted.append(data))
+
+    running = asyncio.run_coroutine_threadsafe(handler.dispatch(adapter, m), loop)  # type: ignore[arg-type]
+    started = time.perf_counter()
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result(timeout=1)
+    assert time.perf_counter() - started < 1  # ループは止まっていない
+
+    asyncio.run_coroutine_threadsafe(handler.dispatch(adapter, m), loop).result(timeout=1)  # type: ignore[arg-type]
+    assert posted == ["busy", m]
+
+    release.set()
+    running.result(timeout=5)
+    adapter.pool.shutdown()
+    assert adapter.pool.metrics()["heavy"]["rejected"] == 1
@@ -0,0 +1,69 @@
+"""
+tests/utils/test_downsample.py
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import libs.global_value as g
+from libs import configuration
+from libs.utils import downsample
+
+
+@pytest.fixture(name="setting")
+def fixture_setting(monkeypatch):
+    """間引き設定"""
+    monkeypatch.setattr(g, "cfg", getattr(g, "cfg", None), raising=False)  # 後続テストのために設定を戻す
+    monkeypatch.setattr(g, "adapter", getattr(g, "adapter", None), raising=False)
+    monkeypatch.setattr(sys, "argv", ["progname", "--config=tests/testdata/minimal.ini"])
+    configuration.setup(init_db=False)
+    g.cfg.setting.graph_downsample_points = 100
+    yield g.cfg.setting
+
+
+@pytest.mark.parametrize("method", [downsample.lttb, downsample.minmax])
+def test_keep_edges(method):
+    """指定点数以内に収まり、最初と最後の点と極値を残すか"""
+    values = np.sin(np.linspace(0, 20, 5000)) * np.linspace(1, 10, 5000)
+
+    ret = method(values, 200)
+
+    assert len(ret) <= 200
+    assert ret[0] == 0 and ret[-1] == len(values) - 1
+    assert np.all(np.diff(ret) > 0)
+    assert int(np.argmax(values)) in ret or abs(values[ret].max() - values.max()) < 0.1
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_select(setting, method):
+    """列ごとの最初/最後の値を保ったまま行を間引くか"""
+    setting.graph_downsample = method
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "A": rng.normal(size=3000).cumsum(),
+            "B": [np.nan] * 1000 + rng.normal(size=2000).cumsum().tolist(),  # 途中から参加
+        }
+    ).ffill()
+
+    positions = downsample.select(df)
+    plot_df = df.iloc[positions]
+
+    assert len(plot_df) <= 100
+    assert plot_df["A"].iloc[-1] == df["A"].iloc[-1]
+    assert plot_df["B"].first_valid_index() == 1000
+    assert plot_df["B"].iloc[-1] == df["B"].iloc[-1]
+
+
+def test_select_disabled(setting):
+    """無効時/点数以下の場合は全行を返すか"""
+    df = pd.DataFrame({"A": range(500)})
+
+    setting.graph_downsample = "none"
+    assert len(downsample.select(df)) == 500
+
+    setting.graph_downsample = "lttb"
+    assert len(downsample.select(df.head(100))) == 100
@@ -0,0 +1,119 @@
+"""
+tests/utils/test_graphcache.py
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pandas as pd
+import plotly.express as px  # type: ignore
+import pytest
+
+import libs.global_value as g
+from libs import configuration
+from libs.types import StyleOptions
+from libs.utils import graphcache
+
+
+@pytest.fixture(name="image_cache")
+def fixture_image_cache(monkeypatch, tmp_path):
+    """作業ディレクトリを差し替えたキャッシュ"""
+    monkeypatch.setattr(g, "cfg", getattr(g, "cfg", None), raising=False)  # 後続テストのために設定を戻す
+    monkeypatch.setattr(g, "adapter", getattr(g, "adapter", None), raising=False)
+    monkeypatch.setattr(sys, "argv", ["progname", "--config=tests/testdata/minimal.ini"])
+    configuration.setup(init_db=False)
+    g.cfg.setting.work_dir = tmp_path
+    g.params = {}
+    cache = graphcache.ImageCache()
+    yield cache
+    g.params = {}
+
+
+def test_digest():
+    """描写内容が同じならキーが一致し、データ/スタイル/バックエンドが違えば変わるか"""
+    df = pd.DataFrame({"a": [1.0, 2.0]}, index=["x", "y"])
+
+    base = graphcache.digest("matplotlib", {"df": df, "title": "t"}, "ggplot")
+    assert base == graphcache.digest("matplotlib", {"title": "t", "df": df.copy()}, "ggplot")
+    assert base != graphcache.digest("matplotlib", {"df": df.assign(a=[1.0, 2.5]), "title": "t"}, "ggplot")
+    assert base != graphcache.digest("matplotlib", {"df": df, "title": "t"}, "classic")
+    assert base != graphcache.digest("plotly", {"df": df, "title": "t"}, "ggplot")
+
+
+def test_get_or_create(image_cache):
+    """同じ内容は再生成せず、上限を超えたら参照の古いものから削除するか"""
+    created: list[str] = []
+
+    def writer(size: int):
+        def create(path):
+            created.append(path.name)
+            path.write_bytes(b"x" * size)
+
+        return create
+
+    g.cfg.setting.graph_cache_size = 1  # MiB
+    half = 512 * 1024
+    first = image_cache.get_or_create("a" * 64, ".png", writer(half))
+    assert image_cache.get_or_create("a" * 64, ".png", writer(half)) == first
+    assert len(created) == 1 and image_cache.hits == 1
+
+    second = image_cache.get_or_create("b" * 64, ".png", writer(half))
+    image_cache.get_or_create("a" * 64, ".png", writer(half))  # aを最近参照にする
+    third = image_cache.get_or_create("c" * 64, ".png", writer(half))
+
+    assert first.exists() and third.exists()
+    assert not second.exists()
+    assert image_cache.total_bytes <= 1024 * 1024
+    assert image_cache.contains(third)
+
+
+def test_save_plotly(image_cache, monkeypatch):
+    """plotlyのグラフも内容が同じなら同じファイルを返し、ファイル名指定時は複製するか"""
+    monkeypatch.setattr(graphcache, "cache", image_cache)
+    df = pd.DataFrame({"a": [1, 2, 3]})
+
+    first = graphcache.save_plotly(px.line(df), "graph.html")
+    second = graphcache.save_plotly(px.line(df), "graph.html")
+    other = graphcache.save_plotly(px.line(df * 2), "graph.html")
+
+    assert first == second != other
+    assert graphcache.display_name(first) == "graph.html"
+
+    g.params = {"filename": "custom"}
+    named = graphcache.save_plotly(px.line(df), "graph.html")
+    assert named == g.cfg.setting.work_dir / "custom.html"
+    assert named.read_text(encoding="utf-8") == first.read_text(encoding="utf-8")
+
+
+def test_existing_files(image_cache):
+    """以前の実行で保存されたファイルも上限の対象になり、更新日時の古い順に削除されるか"""
+    directory = g.cfg.setting.work_dir / "graph_cache"
+    directory.mkdir()
+    half = 512 * 1024
+    for i, name in enumerate(["old.png", "new.png"]):
+        (directory / name).write_bytes(b"x" * half)
+        os.utime(directory / name, ns=(i * 10**9, i * 10**9))
+
+    g.cfg.setting.graph_cache_size = 1  # MiB
+    image_cache.get_or_create("a" * 64, ".png", lambda x: x.write_bytes(b"x" * half))
+
+    assert not (directory / "old.png").exists()
+    assert (directory / "new.png").exists()
+    assert image_cache.total_bytes <= 1024 * 1024
+
+
+def test_no_cache(image_cache, monkeypatch):
+    """保持しない設定では投稿ごとの一時ファイルに書き出し、投稿後に削除するか"""
+    monkeypatch.setattr(graphcache, "cache", image_cache)
+    g.cfg.setting.graph_cache_size = 0
+
+    first = image_cache.get_or_create("a" * 64, ".png", lambda x: x.write_bytes(b"x"))
+    second = image_cache.get_or_create("a" * 64, ".png", lambda x: x.write_bytes(b"x"))
+    assert first != second
+    assert graphcache.is_temporary(first) and not image_cache.contains(first)
+    assert graphcache.display_name(first) == "graph.png"
+
+    m = SimpleNamespace(post=SimpleNamespace(message=[(first, StyleOptions()), ("text", StyleOptions())]))
+    graphcache.release(m)
+    assert not first.exists() and second.exists()
@@ -0,0 +1,44 @@
+"""
+tests/utils/test_graphrender.py
+"""
+
+import matplotlib
+import pandas as pd
+from matplotlib.figure import Figure
+
+from libs.utils.graphrender import PlotSpec, RenderPool
+
+FONT_FILE = "ipaexg.ttf"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def draw_line(fig: Figure, data: dict) -> None:
+    """テスト用描写関数"""
+    ax = fig.add_subplot()
+    pd.DataFrame(data["values"]).plot(ax=ax)
+    ax.set_title(data["title"])
+
+
+def test_inline_render():
+    """呼び出し元で描写し、グローバルな描写パラメータを変更しないか"""
+    before = dict(matplotlib.rcParams)
+    pool = RenderPool(workers=0, font_file=FONT_FILE)
+
+    images = pool.render_many([PlotSpec(draw=draw_line, data={"values": {"a": [1, 2, 3]}, "title": "タイトル"}, style="ggplot")])
+
+    assert images[0].startswith(PNG_SIGNATURE)
+    assert dict(matplotlib.rcParams) == before
+    pool.shutdown()
+
+
+def test_process_render():
+    """ワーカープロセスで描写した結果が指示の順に返るか"""
+    pool = RenderPool(workers=2, font_file=FONT_FILE, styles=("ggplot", None))
+    specs = [PlotSpec(draw=draw_line, data={"values": {"a": list(range(x + 2))}, "title": f"グラフ{x}"}, figsize=(2 + x, 2)) for x in range(4)]
+
+    images = pool.render_many(specs)
+    inline = RenderPool(workers=0, font_file=FONT_FILE).render_many(specs)
+    pool.shutdown()
+
+    assert all(x.startswith(PNG_SIGNATURE) for x in images)
+    assert [len(x) for x in images] == [len(x) for x in inline]
@@ -0,0 +1,43 @@
+"""
+tests/utils/test_matrix.py
+"""
+
+import pandas as pd
+import pytest
+
+from libs.data import aggregate
+from tests.benchmark import bench_matrix, bench_rating
+
+
+@pytest.mark.parametrize("games, stipulated", [(1, 0), (300, 0), (300, 60)])
+def test_head_to_head(games, stipulated):
+    """従来実装と集計結果が一致するか"""
+    df = bench_rating.generate_results(games, players=10).set_index("playtime")
+    targets = bench_matrix.targets_of(df)
+
+    pd.testing.assert_frame_equal(
+        aggregate.head_to_head(df, targets, stipulated),
+        bench_matrix.legacy_matrix(df, targets, stipulated),
+    )
+
+
+def test_head_to_head_variation():
+    """同順位/同一ゲームに同じ名前/集計対象の絞り込み/表示名の重複"""
+    df = bench_rating.generate_results(200, players=8).set_index("playtime")
+    df.iloc[::5, df.columns.get_loc("p2_rank")] = df.iloc[::5]["p1_rank"].to_numpy()
+    df.iloc[::7, df.columns.get_loc("p3_name")] = df.iloc[::7]["p1_name"].to_numpy()
+    targets = {"A": "player_000", "B": "player_001", "C": "player_002", "A ": "player_003"}
+    targets["A"] = "player_004"
+
+    pd.testing.assert_frame_equal(
+        aggregate.head_to_head(df, targets),
+        bench_matrix.legacy_matrix(df, targets),
+    )
+
+
+def test_head_to_head_empty():
+    """対象がいない場合"""
+    df = bench_rating.generate_results(50, players=8).set_index("playtime")
+
+    assert aggregate.head_to_head(df, {}).empty
+    assert aggregate.head_to_head(df, bench_matrix.targets_of(df), stipulated=1000).empty
@@ -0,0 +1,65 @@
+"""
+tests/utils/test_rating.py
+"""
+
+import pandas as pd
+import pytest
+
+from libs.data import rating
+from tests.benchmark import bench_rating
+
+
+@pytest.mark.parametrize("games", [1, 500])
+def test_rating_engine(games):
+    """従来実装と計算結果が一致するか"""
+    df_results = bench_rating.generate_results(games, players=8)
+
+    pd.testing.assert_frame_equal(
+        bench_rating.engine_rating(df_results),
+        bench_rating.legacy_rating(df_results),
+        check_exact=True,
+    )
+
+
+def test_rating_engine_empty():
+    """ゲームがない場合"""
+    df_ratings = bench_rating.engine_rating(bench_rating.generate_results(0))
+
+    assert df_ratings.empty
+    assert df_ratings.index.to_list() == ["initial_rating"]
+
+
+def test_rating_engine_same_name():
+    """同一ゲームに同じ名前がある場合(ゲスト/チーム集計)"""
+    df_results = bench_rating.generate_results(200, players=8)
+    df_results.loc[::3, "p2_name"] = df_results.loc[::3, "p1_name"]
+
+    pd.testing.assert_frame_equal(
+        bench_rating.engine_rating(df_results),
+        bench_rating.legacy_rating(df_results),
+        check_exact=True,
+    )
+
+
+def test_rating_engine_continue():
+    """ゲームを分割して追加しても結果が変わらないか"""
+    df_results = bench_rating.generate_results(300, players=8)
+    players = df_results.filter(like="_name").to_numpy()
+    ranks = df_results.filter(like="_rank").to_numpy()
+
+    engine = rating.RatingEngine()
+    engine.fold(players[:100], ranks[:100])
+    engine.fold(players[100:], ranks[100:])
+    expected = bench_rating.legacy_rating(df_results).ffill().iloc[-1]
+
+    assert engine.rating.tolist() == expected[engine.players].tolist()
+
+
+@pytest.mark.parametrize("collection", ["daily", "monthly", "yearly", "all"])
+def test_rating_resample(collection):
+    """集約単位での間引き"""
+    df_ratings = bench_rating.engine_rating(bench_rating.generate_results(3000, players=8))
+    df_resampled = rating.resample(df_ratings, collection)
+
+    assert df_resampled.index[0] == "initial_rating"
+    assert df_resampled.iloc[-1].tolist() == df_ratings.ffill().iloc[-1].tolist()
@@ -0,0 +1,72 @@
+"""
+tests/utils/test_workerpool.py
+"""
+
+import threading
+
+from libs.utils.workerpool import DispatchPool
+
+
+def test_fast_lane_not_blocked():
+    """重い処理の実行中でも軽い処理が先に完了するか"""
+    pool = DispatchPool(workers=1, queue_size=1)
+    release = threading.Event()
+    order: list[str] = []
+
+    heavy = pool.submit("heavy", lambda: (release.wait(5), order.append("heavy")))
+    fast = [pool.submit("fast", order.append, f"fast{idx}") for idx in range(3)]
+    for future in fast:
+        assert future is not None
+        future.result(timeout=5)
+    assert order == ["fast0", "fast1", "fast2"]  # 到着順
+
+    release.set()
+    assert heavy is not None
+    heavy.result(timeout=5)
+    pool.shutdown()
+
+    metrics = pool.metrics()
+    assert metrics["fast"]["completed"] == 3
+    assert metrics["heavy"]["completed"] == 1
+    assert metrics["heavy"]["depth"] == 0
+    assert metrics["heavy"]["run_max"] > 0
+
+
+def test_heavy_lane_backpressure():
+    """上限を超えた重い処理は受け付けないか"""
+    pool = DispatchPool(workers=2, queue_size=1)
+    release = threading.Event()
+
+    accepted = [pool.submit("heavy", release.wait, 5) for _ in range(3)]
+    assert all(accepted)
+    assert pool.submit("heavy", release.wait, 5) is None
+    assert pool.metrics()["heavy"]["max_depth"] == 3
+
+    release.set()
+    for future in accepted:
+        assert future is not None
+        future.result(timeout=5)
+    assert pool.submit("heavy", lambda: None) is not None  # 空きができれば再び受け付ける
+    pool.shutdown()
+
+    metrics = pool.metrics()
+    assert metrics["heavy"]["rejected"] == 1
+    assert metrics["heavy"]["completed"] == 4
+
+
+def test_failure_isolated():
+    """例外で終了してもワーカーが止まらないか"""
+    pool = DispatchPool(workers=1, queue_size=0, exclusive=True)
+
+    def fail():
+        raise ValueError("test")
+
+    first = pool.submit("heavy", fail)
+    assert first is not None
+    assert first.result(timeout=5) is None
+    second = pool.submit("heavy", lambda: "ok")
+    assert second is not None
+    assert second.result(timeout=5) == "ok"
+    pool.shutdown()
+
+    assert pool.metrics()["heavy"]["failed"] == 1